@@ -46,7 +46,17 @@ cdef class AttributeType:
 # Base of all snapshot accessing implementation
 cdef class SnapshotListAbc:
     # Query states from snapshot list
-    cdef query(self, NODE_TYPE node_type, list ticks, list node_index_list, list attr_list) except +
+    cdef query(self, NODE_TYPE node_type, list ticks, list node_index_list, list attr_list, object out=*) except +
+
+    # Resolve querying parameters except ticks, result can be executed with different ticks
+    cdef object compile_query(self, NODE_TYPE node_type, list node_index_list, list attr_list) except +
+
+    # Query states with compiled parameters from compile_query
+    cdef execute_query(self, object compiled_query, list ticks, object out=*) except +
+
+    # Read-only array of an attribute for all nodes at specified ticks, in attribute data type,
+    # shares memory with snapshot list if possible
+    cdef view(self, NODE_TYPE node_type, list ticks, ATTR_TYPE attr_type) except +
 
     # Record current backend state into snapshot list
     cdef void take_snapshot(self, INT tick) except +
@@ -54,9 +64,18 @@ cdef class SnapshotListAbc:
     # List of available frame index in snapshot list
     cdef list get_frame_index_list(self) except +
 
+    # Number of node copies skipped since last reset, as nodes not changed when taking snapshot for same tick again
+    cdef ULONG get_elided_copy_number(self) except +
+
     # Get number of specified node
     cdef NODE_INDEX get_node_number(self, NODE_TYPE node_type) except +
 
+    # Copy of snapshots and their ticks, used to restore snapshot list later
+    cdef object save_state(self) except +
+
+    # Restore snapshots from result of save_state
+    cdef object restore_state(self, object state) except +
+
     # Enable history, history will dump backend into files each time take_snapshot called
     cdef void enable_history(self, str history_folder) except +
 
@@ -96,6 +115,21 @@ cdef class BackendAbc:
     # Get values of specified slots.
     cdef list get_attr_values(self, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX[:] slot_indices) except +
 
+    # Get values of an attribute for all nodes of specified type, in attribute data type.
+    cdef object get_attr_column(self, NODE_TYPE node_type, ATTR_TYPE attr_type) except +
+
+    # Set values of an attribute for all nodes of specified type, value will be broadcast to the column shape.
+    cdef object set_attr_column(self, NODE_TYPE node_type, ATTR_TYPE attr_type, object value) except +
+
+    # Copy of current frame states and snapshot list, used to restore backend later.
+    cdef object save_state(self) except +
+
+    # Restore current frame states and snapshot list from result of save_state.
+    cdef object restore_state(self, object state) except +
+
+    # Descriptor of shared memory that holds frame and snapshots, None if not placed in shared memory.
+    cdef object get_shared_memory_descriptor(self) except +
+
     # Get node definition of backend.
     cdef dict get_node_info(self) except +
 
@@ -129,6 +163,12 @@ cdef class BackendAbc:
     # Insert a slot to list attribute.
     cdef void insert_to_list(self, NODE_INDEX index, ATTR_TYPE attr_type, SLOT_INDEX slot_index, object value) except +
 
+    # Append several values to specified list attribute.
+    cdef void extend_list(self, NODE_INDEX index, ATTR_TYPE attr_type, object values) except +
+
+    # Remove several slots from list attribute.
+    cdef void remove_many_from_list(self, NODE_INDEX index, ATTR_TYPE attr_type, object slot_indices) except +
+
     # Dump Snapshot into target folder (without filename).
     cdef void dump(self, str folder) except +
 
@@ -155,3 +195,7 @@ cdef class BackendAbc:
 
     # Get slot number for specified attribute, only support dynamic backend.
     cdef SLOT_INDEX get_slot_number(self, NODE_INDEX index, ATTR_TYPE attr_type) except +
+
+
+# Get a zero filled holder for querying result, output buffer will be used if provided.
+cdef object prepare_query_result(object out, tuple shape)
@@ -6,8 +6,12 @@
 
 from enum import Enum
 
+import numpy as np
+
 from cpython cimport bool
 
+from maro.utils.exception.backends_exception import BackendsInvalidQueryOutputException
+
 
 cdef class AttributeType:
     Byte = b"byte"
@@ -25,8 +29,41 @@ cdef int raise_get_attr_error() except +:
     raise Exception("Bad parameters to get attribute value.")
 
 
+cdef object prepare_query_result(object out, tuple shape):
+    if out is None:
+        return np.zeros(shape, dtype=np.double)
+
+    cdef size_t size = 1
+
+    for dim in shape:
+        size *= dim
+
+    if (
+        type(out) is not np.ndarray
+        or out.dtype != np.double
+        or out.size != size
+        or not out.flags.c_contiguous
+        or not out.flags.writeable
+    ):
+        raise BackendsInvalidQueryOutputException()
+
+    out.fill(0)
+
+    # Reshape of a C-contiguous array is a view, so result will be written into output buffer.
+    return out.reshape(shape)
+
+
 cdef class SnapshotListAbc:
-    cdef query(self, NODE_TYPE node_type, list ticks, list node_index_list, list attr_list) except +:
+    cdef query(self, NODE_TYPE node_type, list ticks, list node_index_list, list attr_list, object out=None) except +:
+        pass
+
+    cdef object compile_query(self, NODE_TYPE node_type, list node_index_list, list attr_list) except +:
+        pass
+
+    cdef execute_query(self, object compiled_query, list ticks, object out=None) except +:
+        pass
+
+    cdef view(self, NODE_TYPE node_type, list ticks, ATTR_TYPE attr_type) except +:
         pass
 
     cdef void take_snapshot(self, INT tick) except +:
@@ -35,6 +72,12 @@ cdef class SnapshotListAbc:
     cdef NODE_INDEX get_node_number(self, NODE_TYPE node_type) except +:
         return 0
 
+    cdef object save_state(self) except +:
+        pass
+
+    cdef object restore_state(self, object state) except +:
+        pass
+
     cdef void enable_history(self, str history_folder) except +:
         pass
 
@@ -44,6 +87,9 @@ cdef class SnapshotListAbc:
     cdef list get_frame_index_list(self) except +:
         return []
 
+    cdef ULONG get_elided_copy_number(self) except +:
+        return 0
+
     cdef void dump(self, str folder) except +:
         pass
 
@@ -70,6 +116,21 @@ cdef class BackendAbc:
     cdef list get_attr_values(self, NODE_INDEX node_index, ATTR_TYPE attr_id, SLOT_INDEX[:] slot_indices) except +:
         pass
 
+    cdef object get_attr_column(self, NODE_TYPE node_type, ATTR_TYPE attr_type) except +:
+        pass
+
+    cdef object set_attr_column(self, NODE_TYPE node_type, ATTR_TYPE attr_type, object value) except +:
+        pass
+
+    cdef object save_state(self) except +:
+        pass
+
+    cdef object restore_state(self, object state) except +:
+        pass
+
+    cdef object get_shared_memory_descriptor(self) except +:
+        return None
+
     cdef void reset(self) except +:
         pass
 
@@ -105,6 +166,12 @@ cdef class BackendAbc:
     cdef void insert_to_list(self, NODE_INDEX index, ATTR_TYPE attr_type, SLOT_INDEX slot_index, object value) except +:
         pass
 
+    cdef void extend_list(self, NODE_INDEX index, ATTR_TYPE attr_type, object values) except +:
+        pass
+
+    cdef void remove_many_from_list(self, NODE_INDEX index, ATTR_TYPE attr_type, object slot_indices) except +:
+        pass
+
     cdef void dump(self, str folder) except +:
         pass
 
@@ -136,7 +136,17 @@ cdef class FrameBase:
     Args:
         enable_snapshot (bool): If enable snapshot list to keep frame snapshot at specified point. Defaults to False.
         total_snapshots (int): Total snapshots number in memory.
-        options (dict): Additional options, reserved for later using.
+        options (dict): Additional options for backend. Dynamic backend supports following options:
+
+            - snapshot_mode (str): "full" to copy all attributes for each snapshot, or "delta" to only copy
+              attribute blocks that changed since previous snapshot. Defaults to "full".
+            - snapshot_block_size (int): Number of attributes in each block for "delta" mode. Defaults to 256.
+
+            Static backend supports following options:
+
+            - shared_memory (bool): Place frame and snapshots in a shared memory segment, so that other processes
+              can read them by ``shared_memory_descriptor``. Defaults to the "DEFAULT_BACKEND_SHARED_MEMORY"
+              environment variable ("true" to enable), or False.
 
     Attributes:
         snapshots (SnapshotList): Property to access snapshot list, readonly, see SnapshotList for details.
@@ -152,6 +162,9 @@ cdef class FrameBase:
         dict _node_name2attrname_dict
         dict _node_origin_number_dict
 
+        # Node name -> columnar accessor.
+        dict _node_columns_dict
+
         # enable dynamic fields
         dict __dict__
 
@@ -14,7 +14,7 @@ import numpy as np
 
 from cpython cimport bool
 
-from typing import Union
+from typing import Optional, Union
 
 from maro.backends.backend cimport (
     ATTR_TYPE,
@@ -169,7 +169,7 @@ cdef class _NodeAttributeAccessor:
 
         self._backend.append_to_list(self._node_index, self._attr_type, value)
 
-        self._slot_number = self._backend.get_slot_number(self._node_index, self._attr_type)
+        self._slot_number += 1
 
         if "_cb" in self.__dict__:
             self._cb(None)
@@ -188,7 +188,7 @@ cdef class _NodeAttributeAccessor:
 
         self._backend.resize_list(self._node_index, self._attr_type, new_size)
 
-        self._slot_number = self._backend.get_slot_number(self._node_index, self._attr_type)
+        self._slot_number = new_size
 
         if "_cb" in self.__dict__:
             self._cb(None)
@@ -221,7 +221,7 @@ cdef class _NodeAttributeAccessor:
 
         self._backend.insert_to_list(self._node_index, self._attr_type, slot_index, value)
 
-        self._slot_number = self._backend.get_slot_number(self._node_index, self._attr_type)
+        self._slot_number += 1
 
         if "_cb" in self.__dict__:
             self._cb(None)
@@ -237,6 +237,41 @@ cdef class _NodeAttributeAccessor:
 
         self._backend.remove_from_list(self._node_index, self._attr_type, slot_index)
 
+        self._slot_number -= 1
+
+        if "_cb" in self.__dict__:
+            self._cb(None)
+
+    def extend(self, values):
+        """Append values to current list attribute in one call, this is faster than appending one by one.
+
+        Args:
+            values(Iterable): Values to append, the data type must fit the declared one.
+        """
+        if not self._is_list:
+            raise BackendsAppendToNonListAttributeException()
+
+        self._backend.extend_list(self._node_index, self._attr_type, values)
+
+        self._slot_number = self._backend.get_slot_number(self._node_index, self._attr_type)
+
+        if "_cb" in self.__dict__:
+            self._cb(None)
+
+    def remove_many(self, slot_indices):
+        """Remove several slots from current list attribute in one pass.
+
+        NOTE:
+            Slot indices are the ones before removing, duplicated indices will be removed once.
+
+        Args:
+            slot_indices(Iterable[int]): Slot indices to remove, in any order.
+        """
+        if not self._is_list:
+            raise BackendsRemoveFromNonListAttributeException()
+
+        self._backend.remove_many_from_list(self._node_index, self._attr_type, slot_indices)
+
         self._slot_number = self._backend.get_slot_number(self._node_index, self._attr_type)
 
         if "_cb" in self.__dict__:
@@ -492,6 +527,81 @@ cdef class FrameNode:
         self._number = number
 
 
+# Columnar accessor for all instances of a node type.
+cdef class NodeColumns:
+    """Access an attribute of all instances of a node type in one call, instead of node by node.
+
+    Values are exchanged as numpy array in attribute data type, shape is (node number,) for attribute with 1 slot,
+    or (node number, slot number) for others. For dynamic backend, deleted nodes will be skipped when setting,
+    and their values will be 0 when getting.
+
+    NOTE:
+        List attributes are not supported, and value changed callbacks (_on_<attr name>_changed) of nodes
+        will not be invoked.
+
+    Examples:
+
+        .. code-block:: python
+
+            stations = frame.columns("stations")
+
+            # Reset statistics fields of all the stations.
+            stations.fill("shortage", 0)
+
+            # Update with values of another attribute.
+            stations.set_column("min_bikes", stations.get_column("bikes"))
+    """
+    cdef:
+        NODE_TYPE _node_type
+
+        # Attribute name -> attribute type.
+        dict _attributes
+
+        BackendAbc _backend
+
+    def __cinit__(self, NODE_TYPE node_type, dict attributes, BackendAbc backend):
+        self._node_type = node_type
+        self._attributes = attributes
+        self._backend = backend
+
+    def get_column(self, attr_name: str) -> np.ndarray:
+        """Get values of specified attribute for all node instances.
+
+        Args:
+            attr_name (str): Name of attribute.
+
+        Returns:
+            np.ndarray: A copy of attribute values, grouped by node.
+        """
+        return self._backend.get_attr_column(self._node_type, self._get_attr_type(attr_name))
+
+    def set_column(self, attr_name: str, values: Union[np.ndarray, list]):
+        """Set values of specified attribute for all node instances.
+
+        Args:
+            attr_name (str): Name of attribute.
+            values (Union[np.ndarray, list]): Values to set, it will be broadcast to the shape of column.
+        """
+        self._backend.set_attr_column(self._node_type, self._get_attr_type(attr_name), values)
+
+    def fill(self, attr_name: str, value: Union[int, float]):
+        """Set specified attribute of all node instances to same value.
+
+        Args:
+            attr_name (str): Name of attribute.
+            value (Union[int, float]): Value to set.
+        """
+        self._backend.set_attr_column(self._node_type, self._get_attr_type(attr_name), value)
+
+    cdef ATTR_TYPE _get_attr_type(self, str attr_name) except *:
+        cdef object attr_type = self._attributes.get(attr_name, None)
+
+        if attr_type is None:
+            raise BackendsInvalidAttributeException()
+
+        return attr_type
+
+
 cdef class FrameBase:
     def __init__(self, enable_snapshot: bool = False, total_snapshot: int = 0, options: dict = {}, backend_name=None):
         # Backend name from parameter has highest priority.
@@ -503,11 +613,27 @@ cdef class FrameBase:
 
         self._backend_name = "static" if backend == NumpyBackend else "dynamic"
 
+        snapshot_mode = options.get("snapshot_mode", "full")
+
+        if snapshot_mode not in ("full", "delta"):
+            raise ValueError(f"Invalid snapshot mode: {snapshot_mode}, it should be 'full' or 'delta'.")
+
+        shared_memory = options.get("shared_memory", None)
+
+        if shared_memory is None:
+            # Default from environment settings, it only works for static backend.
+            shared_memory = backend == NumpyBackend and os.environ.get("DEFAULT_BACKEND_SHARED_MEMORY", "") == "true"
+        elif shared_memory and backend != NumpyBackend:
+            raise ValueError("Shared memory is only supported by static backend.")
+
+        options = dict(options, shared_memory=bool(shared_memory))
+
         self._backend = backend()
 
         self._node_cls_dict = {}
         self._node_origin_number_dict = {}
         self._node_name2attrname_dict = {}
+        self._node_columns_dict = {}
 
         self._setup_backend(enable_snapshot, total_snapshot, options)
 
@@ -521,6 +647,30 @@ cdef class FrameBase:
         """SnapshotList: Snapshots of this frame."""
         return self._snapshot_list
 
+    @property
+    def shared_memory_descriptor(self) -> Optional[dict]:
+        """Optional[dict]: Descriptor of shared memory that holds frame and snapshots, it can be sent to other
+        processes to create ``maro.backends.shared_memory.SharedSnapshotList``. None if frame is not placed in
+        shared memory (``shared_memory`` option).
+        """
+        return self._backend.get_shared_memory_descriptor()
+
+    def columns(self, node_name: str) -> NodeColumns:
+        """Get columnar accessor of specified node type, used to get or set an attribute for all nodes in one call.
+
+        Args:
+            node_name (str): Name of node type.
+
+        Returns:
+            NodeColumns: Columnar accessor of specified node type.
+        """
+        cdef NodeColumns node_columns = self._node_columns_dict.get(node_name, None)
+
+        if node_columns is None:
+            raise BackendsInvalidNodeException()
+
+        return node_columns
+
     def get_node_info(self) -> dict:
         """Get a dictionary contains node attribute and number definition.
 
@@ -538,6 +688,14 @@ cdef class FrameBase:
         self._backend.reset()
 
         cdef NodeBase node
+        cdef _NodeAttributeAccessor attr_acc
+
+        # Lists are cleared by backend, accessors of list attribute count their slot number from 0 again.
+        for attr_name in self._node_name2attrname_dict.values():
+            for node in self.__dict__[attr_name]:
+                for attr_acc in [acc for acc in node.__dict__.values() if isinstance(acc, _NodeAttributeAccessor)]:
+                    if attr_acc._is_list:
+                        attr_acc._slot_number = 0
 
         if self._backend.is_support_dynamic_features():
             # We need to make sure node number same as origin after reset.
@@ -554,6 +712,74 @@ cdef class FrameBase:
 
             # Also
 
+    def save_state(self) -> object:
+        """Save a copy of current frame states and snapshot list, used to restore frame later.
+
+        States are copied in memory block level, so it is much cheaper than re-building the states by replaying,
+        snapshots of raw backend are shared with the copy until they are overwritten.
+
+        NOTE:
+            Const attributes are not included, as they will not be changed after initializing.
+
+        Returns:
+            object: State object that can be passed to ``restore_state`` for several times.
+        """
+        cdef dict node_deleted_dict = {}
+
+        if self._backend.is_support_dynamic_features():
+            # Node number and deleted flags of node instances, as they may be changed after saving.
+            for node_name in self._node_origin_number_dict.keys():
+                node_deleted_dict[node_name] = [
+                    node.is_deleted for node in self.__dict__[self._node_name2attrname_dict[node_name]]
+                ]
+
+        return self._backend.save_state(), node_deleted_dict
+
+    def restore_state(self, state: object):
+        """Restore frame states and snapshot list from a saved state.
+
+        Args:
+            state (object): State object from ``save_state`` method of this frame.
+        """
+        cdef NodeBase node
+        cdef NodeBase first_node
+        cdef list node_list
+        cdef _NodeAttributeAccessor attr_acc
+
+        backend_state, node_deleted_dict = state
+
+        self._backend.restore_state(backend_state)
+
+        for node_name, deleted_list in node_deleted_dict.items():
+            node_list = self.__dict__[self._node_name2attrname_dict[node_name]]
+
+            # Node type without instance, nothing to restore, and it cannot be appended.
+            if len(node_list) == 0:
+                continue
+
+            first_node = node_list[0]
+
+            # Remove node instances appended after saving, or re-create the ones removed by reset.
+            del node_list[len(deleted_list):]
+
+            for i in range(len(node_list), len(deleted_list)):
+                node = self._node_cls_dict[node_name]()
+
+                node.setup(self._backend, i, first_node._type, first_node._attributes)
+
+                node_list.append(node)
+
+            for node, is_deleted in zip(node_list, deleted_list):
+                node._is_deleted = is_deleted
+
+                if is_deleted:
+                    continue
+
+                # Accessors of list attribute keep the slot number, it should be same as restored one.
+                for attr_acc in [acc for acc in node.__dict__.values() if isinstance(acc, _NodeAttributeAccessor)]:
+                    if attr_acc._is_list:
+                        attr_acc._slot_number = self._backend.get_slot_number(node._index, attr_acc._attr_type)
+
     cpdef void take_snapshot(self, INT tick) except *:
         """Take snapshot for specified point (tick) for current frame.
 
@@ -574,11 +800,15 @@ cdef class FrameBase:
 
     cpdef void enable_history(self, str path) except *:
         """Enable snapshot history, history will be dumped into files under specified folder,
-        history of nodes will be dump seperately, named as node name.
+        history of nodes will be dump seperately, named as node name with ".hist" extension.
 
         Different with take snapshot, history will not over-write oldest or snapshot at same point,
         it will keep all the changes after ``take_snapshot`` method is called.
 
+        History is written in compressed chunks, each reset of snapshot list starts a new episode segment,
+        use ``maro.backends.history.SnapshotHistoryReader`` to read states of specified ticks and nodes.
+        List attributes are not recorded.
+
         Args:
             path (str): Folder path to save history files.
         """
@@ -706,6 +936,7 @@ cdef class FrameBase:
                         attr_name_type_dict[node_attr_name] = attr_type
 
                 node_attr_type_dict[node_name] = attr_name_type_dict
+                self._node_columns_dict[node_name] = NodeColumns(node_type, attr_name_type_dict, self._backend)
 
                 # Create instance.
                 for i in range(node_number):
@@ -729,6 +960,68 @@ cdef class FrameBase:
     def dump(self, filePath):
         self._backend.dump(filePath)
 
+# Resolved querying parameters with a tick window, used to query same shape repeatedly.
+cdef class SnapshotQueryPlan:
+    """Compiled querying for a node type, with fixed node indices, attributes and tick window.
+
+    Attribute names and node indices are resolved once when compiling, and the result buffer is reused,
+    so executing only needs the anchor tick.
+
+    NOTE:
+        Result of executing is the reused buffer, it will be over-written by next executing,
+        copy it if you need to keep it.
+
+    .. code-block:: python
+
+        # Compile once.
+        plan = env.snapshot_list["vessels"].compile([0, 1], ["empty", "full"], window=4)
+
+        # Same as env.snapshot_list["vessels"][[tick - 3, tick - 2, tick - 1, tick]:[0, 1]:["empty", "full"]].
+        states = plan.execute(tick)
+    """
+    cdef:
+        SnapshotListAbc _snapshots
+
+        # Querying parameters resolved by backend.
+        object _compiled_query
+
+        # Offsets of ticks in window to the anchor tick, from oldest to latest.
+        list _tick_offsets
+
+        # Result buffer, allocated by first executing.
+        object _out
+
+    def __cinit__(self, NODE_TYPE node_type, SnapshotListAbc snapshots, list node_list, list attr_type_list, int window):
+        self._snapshots = snapshots
+        self._compiled_query = snapshots.compile_query(node_type, node_list, attr_type_list)
+        self._tick_offsets = list(range(1 - window, 1))
+        self._out = None
+
+    @property
+    def window(self) -> int:
+        """int: Number of ticks in window."""
+        return len(self._tick_offsets)
+
+    def execute(self, tick: int):
+        """Query states of ticks in window that ends with anchor tick.
+
+        Args:
+            tick (int): Latest tick in window, ticks not exist (include negative ticks) will be padding.
+
+        Returns:
+            np.ndarray: Same result as slice interface with ticks in window, it is the reused result buffer.
+        """
+        cdef int offset
+        cdef list ticks = [tick + offset for offset in self._tick_offsets]
+
+        result = self._snapshots.execute_query(self._compiled_query, ticks, self._out)
+
+        if self._out is None:
+            self._out = result
+
+        return result
+
+
 # Wrapper to access specified node in snapshots (read-only), to provide quick way for querying.
 # All the slice interface will start from here to construct final parameters.
 cdef class SnapshotNode:
@@ -753,40 +1046,63 @@ cdef class SnapshotNode:
 
     def __getitem__(self, key: slice):
         """Used to support states slice querying."""
+        return self.query(key.start, key.stop, key.step)
+
+    def query(self, ticks=None, node_indices=None, attributes=None, out: np.ndarray = None):
+        """Query states with same parameters as slice interface, with an optional output buffer.
 
-        cdef list ticks = []
+        Passing a preallocated output buffer avoids allocating result for each querying,
+        it is useful when querying with same shape repeatly, like building states in a loop.
+
+        .. code-block:: python
+
+            # Same as my_snapshots[(0, 1)::["a", "b"]], but write result into buf.
+            buf = np.empty(result_size, dtype=np.float64)
+            my_snapshots.query((0, 1), None, ["a", "b"], out=buf)
+
+        Args:
+            ticks (Union[int, list, tuple]): Tick or tick list to query, None means all ticks.
+            node_indices (Union[int, list, tuple]): Node index or index list to query, None means all nodes.
+            attributes (Union[str, list, tuple]): Attribute name or name list to query.
+            out (np.ndarray): Output buffer to hold result, it must be a C-contiguous float64 array with same size
+                as result. Defaults to None.
+
+        Returns:
+            np.ndarray: Querying result, it is a view of output buffer if provided.
+        """
+        cdef list tick_list = []
         cdef list node_list = []
         cdef list attr_list = []
 
-        cdef type start_type = type(key.start)
-        cdef type stop_type = type(key.stop)
-        cdef type step_type = type(key.step)
+        cdef type start_type = type(ticks)
+        cdef type stop_type = type(node_indices)
+        cdef type step_type = type(attributes)
 
         # Prepare ticks.
-        if key.start is None:
-            ticks = []
+        if ticks is None:
+            tick_list = []
         elif start_type is tuple or start_type is list:
-            ticks = list(key.start)
+            tick_list = list(ticks)
         else:
-            ticks.append(key.start)
+            tick_list.append(ticks)
 
         # Prepare node index list.
-        if key.stop is None:
+        if node_indices is None:
             node_list = []
         elif stop_type is tuple or stop_type is list:
-            node_list = list(key.stop)
+            node_list = list(node_indices)
         else:
-            node_list.append(key.stop)
+            node_list.append(node_indices)
 
         # Querying need at least one attribute.
-        if key.step is None:
+        if attributes is None:
             return None
 
         # Prepare attribute names.
         if step_type is tuple or step_type is list:
-            attr_list = list(key.step)
+            attr_list = list(attributes)
         else:
-            attr_list = [key.step]
+            attr_list = [attributes]
 
         cdef str attr_name
         cdef list attr_type_list = []
@@ -798,7 +1114,103 @@ cdef class SnapshotNode:
 
             attr_type_list.append(self._attributes[attr_name])
 
-        return self._snapshots.query(self._node_type, ticks, node_list, attr_type_list)
+        return self._snapshots.query(self._node_type, tick_list, node_list, attr_type_list, out)
+
+    def compile(self, node_indices=None, attributes=None, window: int = 1) -> SnapshotQueryPlan:
+        """Compile a querying plan with fixed node indices and attributes, to query a tick window repeatedly.
+
+        Args:
+            node_indices (Union[int, list, tuple]): Node index or index list to query, None means all current nodes.
+            attributes (Union[str, list, tuple]): Attribute name or name list to query.
+            window (int): Number of ticks to query for each executing, ends with the anchor tick. Defaults to 1.
+
+        Returns:
+            SnapshotQueryPlan: Compiled plan, call its execute method with anchor tick to query.
+        """
+        cdef list node_list
+        cdef list attr_list
+        cdef str attr_name
+        cdef list attr_type_list = []
+
+        if window <= 0:
+            raise ValueError(f"Window of querying plan must be larger than 0, but got {window}.")
+
+        # Fix node indices, so that the result shape will not change with appended nodes.
+        if node_indices is None:
+            node_list = list(range(len(self)))
+        elif type(node_indices) is tuple or type(node_indices) is list:
+            node_list = list(node_indices)
+        else:
+            node_list = [node_indices]
+
+        if type(attributes) is tuple or type(attributes) is list:
+            attr_list = list(attributes)
+        else:
+            attr_list = [attributes]
+
+        for attr_name in attr_list:
+            if attr_name not in self._attributes:
+                raise BackendsInvalidAttributeException()
+
+            attr_type_list.append(self._attributes[attr_name])
+
+        return SnapshotQueryPlan(self._node_type, self._snapshots, node_list, attr_type_list, window)
+
+    def view(self, ticks=None, attributes=None):
+        """Get read-only states of all nodes in attribute data type, without copying if possible.
+
+        Different with slice interface, result of each attribute is an array in shape (ticks, nodes) for attribute
+        with 1 slot, or (ticks, nodes, slots), and ticks dimension will be removed if ticks is an integer.
+
+        For dynamic backend, the result shares memory with snapshot list if there is only one tick and there are no
+        deleted nodes, the shared block is kept unchanged until the result released. Static backend reuses the
+        snapshot rows in place, so the result is always copied. In both cases, the result keeps the states of the
+        ticks after taking new snapshots. Ticks not exist will be padding with 0.
+
+        .. code-block:: python
+
+            # Array in shape (ticks, nodes).
+            empty = env.snapshot_list["ports"].view([0, 1, 2], "empty")
+
+            # Dictionary of attribute name to array in shape (nodes,).
+            states = env.snapshot_list["ports"].view(2, ["empty", "full"])
+
+        Args:
+            ticks (Union[int, list, tuple]): Tick or tick list to access, None means all ticks.
+            attributes (Union[str, list, tuple]): Attribute name or name list to access, list attribute is not
+                supported.
+
+        Returns:
+            Union[np.ndarray, dict]: Read-only array of the attribute,
+                or dictionary of attribute name to its array if attributes is a list or tuple.
+        """
+        cdef list tick_list
+        cdef list attr_list
+        cdef str attr_name
+        cdef dict result = {}
+
+        if ticks is None:
+            tick_list = []
+        elif type(ticks) is tuple or type(ticks) is list:
+            tick_list = list(ticks)
+        else:
+            tick_list = [ticks]
+
+        if type(attributes) is tuple or type(attributes) is list:
+            attr_list = list(attributes)
+        else:
+            attr_list = [attributes]
+
+        for attr_name in attr_list:
+            if attr_name not in self._attributes:
+                raise BackendsInvalidAttributeException()
+
+            states = self._snapshots.view(self._node_type, tick_list, self._attributes[attr_name])
+
+            # Remove ticks dimension for single tick.
+            result[attr_name] = states[0] if isinstance(ticks, int) else states
+
+        return result if type(attributes) is tuple or type(attributes) is list else result[attributes]
 
 
 cdef class SnapshotList:
@@ -832,6 +1244,15 @@ cdef class SnapshotList:
         """Max size of snapshot."""
         return len(self._snapshots)
 
+    @property
+    def elided_copy_number(self) -> int:
+        """int: Number of node copies skipped since last reset, it is saved and restored with snapshots.
+
+        Taking snapshot for the same frame index again (like several decision events at one tick) only copies
+        the node types that changed since the last snapshot.
+        """
+        return self._snapshots.get_elided_copy_number()
+
     def reset(self):
         """Reset current states, this will cause all the values to be 0, make sure call it after states querying."""
         self._snapshots.reset()
@@ -0,0 +1,384 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import json
+import os
+import zlib
+from collections import namedtuple
+from struct import Struct
+from typing import List, Union
+
+import numpy as np
+
+# Version of history file format.
+HISTORY_VERSION = 100
+
+# Number of records (snapshots) in each compressed chunk.
+DEFAULT_CHUNK_SIZE = 100
+
+HISTORY_MAGIC = b"MHIS"
+INDEX_MAGIC = b"MIDX"
+
+# File header: magic, version, size of meta (json) following the header.
+history_header_struct = Struct("<4s H I")
+
+# Chunk header: episode, record number, node number, raw size, compressed size,
+# followed by ticks of records (int32) and compressed records.
+chunk_header_struct = Struct("<I I I Q Q")
+
+# Index entry of a chunk: offset of chunk header, episode, record number, node number,
+# followed by ticks of records (int32).
+chunk_index_struct = Struct("<Q I I I")
+
+# Footer: offset of index, chunk number, magic, only exists if writer closed normally.
+footer_struct = Struct("<Q I 4s")
+
+ChunkInfo = namedtuple(
+    "ChunkInfo",
+    [
+        "offset",
+        "episode",
+        "record_number",
+        "node_number",
+        "ticks",
+    ],
+)
+
+
+def _dtype_from_descr(descr: list) -> np.dtype:
+    """Restore structured data type from descr that loaded from json, as tuples are converted into lists."""
+    return np.dtype([tuple(field[:2]) + tuple(tuple(shape) for shape in field[2:]) for field in descr])
+
+
+class SnapshotHistoryWriter:
+    """Write snapshots of a node type into a compressed history file.
+
+    The file composed with:
+
+    1. header: magic, version and meta (node name, data type, compression).
+    2. chunks: each chunk contains ticks and compressed records with same episode and node number.
+    3. index: episode, ticks and offset of all chunks, written when closing, used to seek without scanning.
+
+    Args:
+        path (str): Path of history file, it will be truncated if exist.
+        node_name (str): Name of node type.
+        dtype (np.dtype): Structured data type of a node instance.
+        chunk_size (int): Max number of records in a chunk. Defaults to 100.
+        compress_level (int): Level of zlib compression. Defaults to 1 (fastest).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        node_name: str,
+        dtype: np.dtype,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        compress_level: int = 1,
+    ):
+        self._dtype = dtype
+        self._chunk_size = chunk_size
+        self._compress_level = compress_level
+
+        self._episode = 0
+        self._episode_record_number = 0
+        self._node_number = 0
+        self._pending_ticks = []
+        self._pending_records = []
+        self._chunks: List[ChunkInfo] = []
+
+        self._fp = open(path, "wb")
+
+        meta = json.dumps(
+            {
+                "node_name": node_name,
+                "dtype": dtype.descr,
+                "compression": "zlib",
+            },
+        ).encode()
+
+        self._fp.write(history_header_struct.pack(HISTORY_MAGIC, HISTORY_VERSION, len(meta)))
+        self._fp.write(meta)
+
+    @property
+    def dtype(self) -> np.dtype:
+        """np.dtype: Structured data type of a node instance."""
+        return self._dtype
+
+    @property
+    def episode(self) -> int:
+        """int: Current episode, records will be written into the segment of this episode."""
+        return self._episode
+
+    def record(self, tick: int, arr: np.ndarray):
+        """Record states of all node instances at specified tick.
+
+        Args:
+            tick (int): Tick of states.
+            arr (np.ndarray): States in structured data type, 1 row for each node instance.
+        """
+        if len(arr) != self._node_number:
+            self.flush()
+
+            self._node_number = len(arr)
+
+        self._pending_ticks.append(tick)
+        self._episode_record_number += 1
+        self._pending_records.append(arr.astype(self._dtype, copy=False).tobytes())
+
+        if len(self._pending_records) >= self._chunk_size:
+            self.flush()
+
+    def new_episode(self):
+        """Start a new episode segment, following records will not be mixed with previous ones.
+
+        Nothing will be changed if there is no record in current episode, so reset before the first episode is safe.
+        """
+        self.flush()
+
+        if self._episode_record_number > 0:
+            self._episode += 1
+            self._episode_record_number = 0
+
+    def flush(self):
+        """Compress and write pending records as a chunk."""
+        if self._fp is None or len(self._pending_records) == 0:
+            return
+
+        raw_data = b"".join(self._pending_records)
+        compressed_data = zlib.compress(raw_data, self._compress_level)
+        ticks = np.array(self._pending_ticks, dtype=np.int32)
+
+        self._chunks.append(
+            ChunkInfo(self._fp.tell(), self._episode, len(ticks), self._node_number, ticks),
+        )
+
+        self._fp.write(
+            chunk_header_struct.pack(self._episode, len(ticks), self._node_number, len(raw_data), len(compressed_data)),
+        )
+        self._fp.write(ticks.tobytes())
+        self._fp.write(compressed_data)
+        self._fp.flush()
+
+        self._pending_ticks.clear()
+        self._pending_records.clear()
+
+    def close(self):
+        """Flush pending records, then write index and close the file."""
+        if self._fp is None:
+            return
+
+        self.flush()
+
+        index_offset = self._fp.tell()
+
+        for chunk in self._chunks:
+            self._fp.write(chunk_index_struct.pack(chunk.offset, chunk.episode, chunk.record_number, chunk.node_number))
+            self._fp.write(chunk.ticks.tobytes())
+
+        self._fp.write(footer_struct.pack(index_offset, len(self._chunks), INDEX_MAGIC))
+        self._fp.close()
+
+        self._fp = None
+
+    def __del__(self):
+        self.close()
+
+
+class SnapshotHistoryReader:
+    """Read states from history file, only chunks that contain required ticks will be decompressed.
+
+    Examples:
+
+        .. code-block:: python
+
+            with SnapshotHistoryReader("history/ports.hist") as reader:
+                # Ticks recorded in first episode.
+                ticks = reader.get_ticks(episode=0)
+
+                # States of first 2 ports at latest 10 ticks, in shape (10, 2).
+                states = reader.read(ticks[-10:], [0, 1])
+
+                shortage = states["shortage"]
+
+    Args:
+        path (str): Path of history file.
+    """
+
+    def __init__(self, path: str):
+        self._fp = open(path, "rb")
+
+        magic, version, meta_size = history_header_struct.unpack(self._fp.read(history_header_struct.size))
+
+        if magic != HISTORY_MAGIC:
+            raise ValueError(f"Invalid history file: {path}.")
+
+        if version != HISTORY_VERSION:
+            raise ValueError(f"Unsupported history file version: {version}, expected: {HISTORY_VERSION}.")
+
+        meta = json.loads(self._fp.read(meta_size))
+
+        self._node_name = meta["node_name"]
+        self._dtype = _dtype_from_descr(meta["dtype"])
+        self._data_offset = history_header_struct.size + meta_size
+
+        self._chunks = self._load_index()
+
+        # Episode -> tick -> (chunk index, row in chunk), later record will over-write previous one with same tick.
+        self._tick_index = {}
+
+        for chunk_index, chunk in enumerate(self._chunks):
+            ticks = self._tick_index.setdefault(chunk.episode, {})
+
+            for row, tick in enumerate(chunk.ticks.tolist()):
+                ticks[tick] = (chunk_index, row)
+
+        # Only keep latest decompressed chunk, as reading is usually sequential.
+        self._cached_chunk_index = None
+        self._cached_chunk = None
+
+    @property
+    def node_name(self) -> str:
+        """str: Name of node type."""
+        return self._node_name
+
+    @property
+    def dtype(self) -> np.dtype:
+        """np.dtype: Structured data type of a node instance."""
+        return self._dtype
+
+    @property
+    def episodes(self) -> List[int]:
+        """List[int]: Episodes that contains records."""
+        return list(self._tick_index.keys())
+
+    def get_ticks(self, episode: int = 0) -> List[int]:
+        """Get ticks recorded in specified episode.
+
+        Args:
+            episode (int): Episode of records. Defaults to 0.
+
+        Returns:
+            List[int]: Recorded ticks.
+        """
+        return list(self._tick_index.get(episode, {}).keys())
+
+    def read(self, ticks: Union[int, list] = None, node_indices: list = None, episode: int = 0) -> np.ndarray:
+        """Read states of specified ticks and nodes.
+
+        Args:
+            ticks (Union[int, list]): Tick or list of ticks to read, None means all the ticks in the episode.
+            node_indices (list): Indices of node instance, None means all node instances of the record.
+            episode (int): Episode of records. Defaults to 0.
+
+        Returns:
+            np.ndarray: Structured array in shape (tick number, node number), ticks or nodes that not recorded
+                will be padding with 0.
+        """
+        tick_index = self._tick_index.get(episode, {})
+
+        if ticks is None:
+            ticks = list(tick_index.keys())
+        elif type(ticks) == int:
+            ticks = [ticks]
+
+        if node_indices is None:
+            node_indices = list(
+                range(
+                    max([self._chunks[tick_index[tick][0]].node_number for tick in ticks if tick in tick_index] or [0])
+                ),
+            )
+
+        nodes = np.array(node_indices, dtype=np.int64)
+        result = np.zeros((len(ticks), len(nodes)), dtype=self._dtype)
+
+        for i, tick in enumerate(ticks):
+            if tick not in tick_index:
+                continue
+
+            chunk_index, row = tick_index[tick]
+            records = self._get_chunk(chunk_index)[row]
+            valid = nodes < len(records)
+
+            result[i, valid] = records[nodes[valid]]
+
+        return result
+
+    def close(self):
+        """Close history file."""
+        if self._fp is not None:
+            self._fp.close()
+
+            self._fp = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _get_chunk(self, chunk_index: int) -> np.ndarray:
+        """Decompress records of specified chunk, in shape (record number, node number)."""
+        if chunk_index != self._cached_chunk_index:
+            chunk = self._chunks[chunk_index]
+
+            self._fp.seek(chunk.offset)
+
+            _, record_number, node_number, _, compressed_size = chunk_header_struct.unpack(
+                self._fp.read(chunk_header_struct.size),
+            )
+
+            self._fp.seek(record_number * 4, os.SEEK_CUR)
+
+            data = zlib.decompress(self._fp.read(compressed_size))
+
+            self._cached_chunk = np.frombuffer(data, dtype=self._dtype).reshape(record_number, node_number)
+            self._cached_chunk_index = chunk_index
+
+        return self._cached_chunk
+
+    def _load_index(self) -> List[ChunkInfo]:
+        """Load chunk information from index, or scan chunk headers if the writer was not closed normally."""
+        chunks = []
+
+        file_size = self._fp.seek(0, os.SEEK_END)
+
+        if file_size >= self._data_offset + footer_struct.size:
+            self._fp.seek(file_size - footer_struct.size)
+
+            index_offset, chunk_number, magic = footer_struct.unpack(self._fp.read(footer_struct.size))
+
+            if magic == INDEX_MAGIC:
+                self._fp.seek(index_offset)
+
+                for _ in range(chunk_number):
+                    offset, episode, record_number, node_number = chunk_index_struct.unpack(
+                        self._fp.read(chunk_index_struct.size),
+                    )
+                    ticks = np.frombuffer(self._fp.read(record_number * 4), dtype=np.int32)
+
+                    chunks.append(ChunkInfo(offset, episode, record_number, node_number, ticks))
+
+                return chunks
+
+        # Scan chunks one by one, skip the compressed data, and ignore the incomplete one at the end.
+        offset = self._data_offset
+
+        while offset + chunk_header_struct.size <= file_size:
+            self._fp.seek(offset)
+
+            episode, record_number, node_number, _, compressed_size = chunk_header_struct.unpack(
+                self._fp.read(chunk_header_struct.size),
+            )
+
+            next_offset = offset + chunk_header_struct.size + record_number * 4 + compressed_size
+
+            if next_offset > file_size:
+                break
+
+            ticks = np.frombuffer(self._fp.read(record_number * 4), dtype=np.int32)
+
+            chunks.append(ChunkInfo(offset, episode, record_number, node_number, ticks))
+
+            offset = next_offset
+
+        return chunks
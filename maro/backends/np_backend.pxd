@@ -38,35 +38,20 @@ cdef class NumpyBackend(BackendAbc):
 
         bool _is_snapshot_enabled
 
+        # Node types that changed since last snapshot, used to skip copying when taking snapshot for same tick again
+        set _dirty_node_types
+
         IF NODES_MEMORY_LAYOUT == "ONE_BLOCK":
             char* _data
 
             # memory size
             size_t _data_size
 
+            # Name of shared memory segment that holds data, None if data is allocated in private memory.
+            str _shared_memory_name
 
-cdef class NPBufferedMmap:
-    """Used to dump snapshot history using memory mapping with a fixed size in-memory buffer"""
-    cdef:
-        str _path
-
-        np.dtype _dtype
-
-        # used to define the shape, as we do not exactly know the number we need to save
-        int _buffer_size
-
-        # current offset, used to specified the offset in dumped file, to avoid reach the mmap limitation
-        int _offset
-
-        # current record item number,
-        int _current_record_number
-
-        int _node_number
-
-        # memory mapping np array
-        np.ndarray _data_arr
-
-    cdef void reload(self) except +
+            # Name of shared memory, node data offsets and shapes, used to attach from other processes.
+            dict _shared_memory_descriptor
 
 
 cdef class NPSnapshotList(SnapshotListAbc):
@@ -85,12 +70,21 @@ cdef class NPSnapshotList(SnapshotListAbc):
         # current index to insert snapshot, default should be 1, never be 0
         int _cur_index
 
+        # index of last taken snapshot, 0 if no snapshot taken since last reset
+        int _last_index
+
+        # number of node copies skipped since last reset
+        ULONG _elided_copy_number
+
+        # Tick of each row in shared memory, -1 means empty or being written, None if not in shared memory.
+        object _row_ticks
+
         int _max_size
 
         #
         bool _is_history_enabled
 
-        # key: node name, value: history buffer
+        # key: node name, value: history writer
         dict _history_dict
 
     cdef void enable_history(self, str history_folder) except +
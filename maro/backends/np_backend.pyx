@@ -6,9 +6,12 @@
 #distutils: define_macros=NPY_NO_DEPRECATED_API=NPY_1_7_API_VERSION
 
 import os
+from multiprocessing.shared_memory import SharedMemory
 
 import numpy as np
 
+from maro.backends.history import SnapshotHistoryWriter
+
 cimport cython
 cimport numpy as np
 from cpython cimport bool
@@ -25,6 +28,7 @@ from maro.backends.backend cimport (
     AttributeType,
     BackendAbc,
     SnapshotListAbc,
+    prepare_query_result,
 )
 
 # Attribute data type mapping.
@@ -52,6 +56,10 @@ attribute_type_range = {
     "Q": ("AttributeType.ULong", 0, 18446744073709551615),
 }
 
+# Shared memory segments created by backends, name -> (SharedMemory, creator process id).
+# NOTE: segments are kept out of backends, as objects in reference cycles may be cleared by GC before __dealloc__.
+_shared_memory_segments = {}
+
 
 IF NODES_MEMORY_LAYOUT == "ONE_BLOCK":
     # with this flag, we will allocate a big enough memory for all node types, then use this block construct numpy array
@@ -71,43 +79,6 @@ IF NODES_MEMORY_LAYOUT == "ONE_BLOCK":
         np.ndarray PyArray_NewFromDescr(PyTypeObject* subtype, np.dtype descr, int nd, np.npy_intp* dims, np.npy_intp* strides, void* data, int flags, object obj)
 
 
-
-cdef int MMAP_BUFFER_SIZE = 100
-
-
-# TODO:
-# 1. add dtype in header, to make it easy to read
-# 2. add tick for each snapshot
-cdef class NPBufferedMmap:
-    """Buffered memmap of numpy array, as it have size limitation around 2G"""
-    def __cinit__(self, str path, np.dtype dtype, int node_number):
-        self._node_number = node_number
-        self._offset = 0
-        self._current_record_number = 0
-        self._path = path
-        self._dtype = dtype
-        self._buffer_size = MMAP_BUFFER_SIZE
-
-        # first time, we will write from start
-        self.reload()
-
-    def record(self, np.ndarray arr):
-        """Record specified array into file"""
-        self._data_arr[self._current_record_number] = arr
-
-        self._current_record_number += 1
-
-        # reload the file with offset if reach the max size
-        if self._current_record_number >= self._buffer_size:
-            self.reload()
-
-    cdef void reload(self) except +:
-        """Reload the file with offset to avoid memmap size limitation"""
-        self._data_arr = np.memmap(self._path, self._dtype, "w+", offset=self._offset, shape=(self._buffer_size, self._node_number))
-
-        self._offset += self._dtype.itemsize * self._buffer_size * self._node_number
-
-
 cdef class NodeInfo:
     """Internal structure to hold node info."""
     cdef:
@@ -150,12 +121,15 @@ cdef class AttrInfo:
     def __repr__(self):
         return f"<AttrInfo name: {self.name}, type: {self.type}, node_type: {self.node_type}, slot_number: {self.slot_number}>"
 
+# Keep name of shared memory for __dealloc__, it may be cleared by GC before that if in a reference cycle.
+@cython.no_gc_clear
 cdef class NumpyBackend(BackendAbc):
     def __cinit__(self):
         self._nodes_list = []
         self._attrs_list = []
         self._node_attr_dict = {}
         self._node_data_dict = {}
+        self._dirty_node_types = set()
 
     cdef NODE_TYPE add_node(self, str name, NODE_INDEX number) except +:
         """Add a new node type with name and number in backend"""
@@ -210,6 +184,8 @@ cdef class NumpyBackend(BackendAbc):
         else:
             attr_array[0][node_index] = value
 
+        self._dirty_node_types.add(attr.node_type)
+
     cdef object get_attr_value(self, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index) except +:
         """Get specified attribute value"""
         if attr_type >= len(self._attrs_list):
@@ -254,6 +230,8 @@ cdef class NumpyBackend(BackendAbc):
                     )
             attr_array[0][node_index, slot_index] = value
 
+        self._dirty_node_types.add(attr.node_type)
+
     cdef list get_attr_values(self, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX[:] slot_indices) except +:
         cdef AttrInfo attr = self._attrs_list[attr_type]
         cdef np.ndarray attr_array = self._node_data_dict[attr.node_type][attr.name]
@@ -263,6 +241,32 @@ cdef class NumpyBackend(BackendAbc):
         else:
             return attr_array[0][node_index, slot_indices].tolist()
 
+    cdef object get_attr_column(self, NODE_TYPE node_type, ATTR_TYPE attr_type) except +:
+        """Get a copy of attribute values for all nodes, shape is (node number,) or (node number, slot number)"""
+        cdef AttrInfo attr = self._attrs_list[attr_type]
+        cdef np.ndarray attr_array = self._node_data_dict[attr.node_type][attr.name]
+
+        return attr_array[0].copy()
+
+    cdef object set_attr_column(self, NODE_TYPE node_type, ATTR_TYPE attr_type, object value) except +:
+        """Set attribute values for all nodes with one numpy assignment"""
+        cdef AttrInfo attr = self._attrs_list[attr_type]
+        cdef np.ndarray attr_array = self._node_data_dict[attr.node_type][attr.name]
+
+        cdef bytes dtype = attr.dtype.encode()
+        cdef np.ndarray frame_array = attr_array[0]
+        cdef np.ndarray values = np.broadcast_to(value, (<object>frame_array).shape)
+
+        if dtype in attribute_type_range and values.size > 0:
+            assert values.min() >= attribute_type_range[dtype][1] and values.max() <= attribute_type_range[dtype][2], (
+                f"Value out of range ({attribute_type_range[dtype][0]}: "
+                f"[{attribute_type_range[dtype][1]}, {attribute_type_range[dtype][2]}])"
+            )
+
+        frame_array[...] = values
+
+        self._dirty_node_types.add(attr.node_type)
+
     cdef void setup(self, bool enable_snapshot, USHORT total_snapshot, dict options) except +:
         """Set up the numpy backend"""
         self._is_snapshot_enabled = enable_snapshot
@@ -278,12 +282,16 @@ cdef class NumpyBackend(BackendAbc):
         cdef NodeInfo ni
         cdef tuple shape
         cdef UINT max_tick = 0
+        cdef bool is_shared_memory = options.get("shared_memory", False)
 
         IF NODES_MEMORY_LAYOUT == "ONE_BLOCK":
             # Total memory size we need to hold nodes in both frame and snapshot list
             self._data_size = 0
             # Temp node information, as we need several steps to build backend
             node_info = {}
+        ELSE:
+            if is_shared_memory:
+                raise Exception("Shared memory is only supported with ONE_BLOCK nodes memory layout.")
 
         for node_type, node_attrs in self._node_attr_dict.items():
             ni = self._nodes_list[node_type]
@@ -316,9 +324,29 @@ cdef class NumpyBackend(BackendAbc):
                 # one memory block for each node
                 self._node_data_dict[node_type] = np.zeros(shape, data_type)
 
+        cdef object row_ticks = None
+
         IF NODES_MEMORY_LAYOUT == "ONE_BLOCK":
-            # allocate memory, and construct numpy array with numpy c api
-            self._data = <char*>PyMem_Malloc(self._data_size)
+            # Tick of each snapshot row is placed after node data (aligned), so readers can find rows by tick.
+            cdef size_t ticks_offset = (self._data_size + sizeof(np.int64_t) - 1) // sizeof(np.int64_t) * sizeof(np.int64_t)
+            cdef np.npy_intp row_number = snapshot_number + 1
+            cdef unsigned char[::1] shared_buffer
+
+            if is_shared_memory:
+                self._data_size = ticks_offset + row_number * sizeof(np.int64_t)
+
+                # Readers in other processes attach to this segment with the descriptor.
+                shared_memory = SharedMemory(create=True, size=self._data_size)
+
+                self._shared_memory_name = shared_memory.name
+                _shared_memory_segments[shared_memory.name] = (shared_memory, os.getpid())
+
+                shared_buffer = shared_memory.buf
+
+                self._data = <char*>&shared_buffer[0]
+            else:
+                # allocate memory, and construct numpy array with numpy c api
+                self._data = <char*>PyMem_Malloc(self._data_size)
 
             # TODO: memory allocation failed checking
 
@@ -342,18 +370,57 @@ cdef class NumpyBackend(BackendAbc):
                 # or it will cause seg fault
                 Py_INCREF(data_type)
 
+            if is_shared_memory:
+                data_type = np.dtype(np.int64)
+
+                row_ticks = PyArray_NewFromDescr(&PyArray_Type, data_type, 1, &row_number, NULL, &self._data[ticks_offset], np.NPY_ARRAY_C_CONTIGUOUS | np.NPY_ARRAY_WRITEABLE, None)
+
+                Py_INCREF(data_type)
+
+                row_ticks[:] = -1
+
+                self._shared_memory_descriptor = {
+                    "name": self._shared_memory_name,
+                    "nodes": {
+                        self._nodes_list[node_type].name: (info[2], info[0], info[1])
+                        for node_type, info in node_info.items()
+                    },
+                    "ticks": (ticks_offset, row_number),
+                }
+
+        cdef NPSnapshotList snapshots
+
         if enable_snapshot:
-            self.snapshots = NPSnapshotList(self, snapshot_number + 1)
+            snapshots = NPSnapshotList(self, snapshot_number + 1)
+            snapshots._row_ticks = row_ticks
+
+            self.snapshots = snapshots
 
     def __dealloc__(self):
         """Clear resources before deleted"""
         IF NODES_MEMORY_LAYOUT == "ONE_BLOCK":
             self._node_data_dict = None
 
-            PyMem_Free(self._data)
+            if self._shared_memory_name is not None:
+                shared_memory, creator_pid = _shared_memory_segments.pop(self._shared_memory_name)
+
+                shared_memory.close()
+
+                # Segment is removed by creator, forked processes may also release the inherited backend.
+                # Attached readers keep their mapping until they close it.
+                if creator_pid == os.getpid():
+                    shared_memory.unlink()
+            else:
+                PyMem_Free(self._data)
         ELSE:
             pass
 
+    cdef object get_shared_memory_descriptor(self) except +:
+        IF NODES_MEMORY_LAYOUT == "ONE_BLOCK":
+            return self._shared_memory_descriptor
+        ELSE:
+            return None
+
     cdef dict get_node_info(self) except +:
         cdef dict node_info = {}
 
@@ -388,6 +455,28 @@ cdef class NumpyBackend(BackendAbc):
                 # we only reset frame here, without snapshot list
                 data_arr[0][attr_info.name] = 0
 
+        self._dirty_node_types.update(self._node_data_dict.keys())
+
+    cdef object save_state(self) except +:
+        """Copy current frame (1st row) of each node type, with states of snapshot list."""
+        cdef dict frame_state = {node_type: data_arr[0].copy() for node_type, data_arr in self._node_data_dict.items()}
+
+        return frame_state, self.snapshots.save_state() if self.snapshots is not None else None
+
+    cdef object restore_state(self, object state) except +:
+        cdef NODE_TYPE node_type
+        cdef np.ndarray data_arr
+
+        frame_state, snapshots_state = state
+
+        for node_type, data_arr in self._node_data_dict.items():
+            data_arr[0] = frame_state[node_type]
+
+        self._dirty_node_types.update(self._node_data_dict.keys())
+
+        if self.snapshots is not None:
+            self.snapshots.restore_state(snapshots_state)
+
     cdef void dump(self, str folder) except +:
         for node_type, data_arr in self._node_data_dict.items():
             node = self._nodes_list[node_type]
@@ -466,6 +555,8 @@ cdef class NPSnapshotList(SnapshotListAbc):
         self._max_size = max_size
         self._is_history_enabled = False
         self._history_dict = {}
+        self._last_index = 0
+        self._elided_copy_number = 0
 
         for node in backend._nodes_list:
             self._node_name2type_dict[node.name] = node.type
@@ -478,6 +569,9 @@ cdef class NPSnapshotList(SnapshotListAbc):
     cdef list get_frame_index_list(self) except +:
         return list(self._tick2index_dict.keys())
 
+    cdef ULONG get_elided_copy_number(self) except +:
+        return self._elided_copy_number
+
     cdef void take_snapshot(self, INT tick) except +:
         """Take snapshot for current backend"""
         cdef NODE_TYPE node_type
@@ -505,48 +599,113 @@ cdef class NPSnapshotList(SnapshotListAbc):
             if old_tick in self._tick2index_dict:
                 del self._tick2index_dict[old_tick]
 
+        if self._row_ticks is not None:
+            # Mark the row as being written, so readers in other processes will not use it.
+            self._row_ticks[target_index] = -1
+
+        # Taking snapshot into the same row again (like several decisions at one tick),
+        # nodes not changed since last time are still same as the ones in row.
+        cdef bint is_retaking = target_index == self._last_index
+        cdef set dirty_node_types = self._backend._dirty_node_types
+
         # recording will copy data at 1st row into _cur_index row
         for node_type, data_arr in self._backend._node_data_dict.items():
             ni = self._backend._nodes_list[node_type]
-            data_arr[target_index] = data_arr[0]
+
+            if is_retaking and node_type not in dirty_node_types:
+                self._elided_copy_number += 1
+            else:
+                data_arr[target_index] = data_arr[0]
 
             if self._is_history_enabled:
-                self._history_dict[ni.name].record(data_arr[0])
+                self._history_dict[ni.name].record(tick, data_arr[0])
+
+        if self._row_ticks is not None:
+            self._row_ticks[target_index] = tick
 
         self._index2tick_dict[target_index] = tick
 
         self._tick2index_dict[tick] = target_index
 
-    cdef query(self, NODE_TYPE node_type, list ticks, list node_index_list, list attr_list) except +:
-        cdef UINT tick
-        cdef NODE_INDEX node_index
+        dirty_node_types.clear()
+        self._last_index = target_index
+
+    cdef query(self, NODE_TYPE node_type, list ticks, list node_index_list, list attr_list, object out=None) except +:
+        return self.execute_query(self.compile_query(node_type, node_index_list, attr_list), ticks, out)
+
+    cdef object compile_query(self, NODE_TYPE node_type, list node_index_list, list attr_list) except +:
         cdef ATTR_TYPE attr_type
         cdef AttrInfo attr
+        cdef UINT slot_offset = 0
+        cdef list fields = []
         cdef np.ndarray data_arr = self._backend._node_data_dict[node_type]
 
-        # TODO: how about use a pre-allocate np array instead concat?
-        cdef list retq = []
+        if len(node_index_list) == 0:
+            node_index_list = [i for i in range(self._backend._nodes_list[node_type].number)]
+
+        # Field of structured array is a view, it keeps valid as we never re-allocate data array.
+        for attr_type in attr_list:
+            attr = self._backend._attrs_list[attr_type]
+
+            fields.append((data_arr[attr.name], slot_offset, attr.slot_number))
+
+            slot_offset += attr.slot_number
+
+        return np.array(node_index_list, dtype=np.int64), fields, slot_offset
+
+    cdef execute_query(self, object compiled_query, list ticks, object out=None) except +:
+        cdef INT tick
+        cdef UINT slot_offset
+        cdef UINT slot_number
+        cdef np.ndarray nodes
+        cdef list fields
+        cdef UINT frame_slot_number
+
+        nodes, fields, frame_slot_number = compiled_query
 
         if len(ticks) == 0:
             ticks = [t for t in self._tick2index_dict.keys()][-(self._max_size-1):]
 
-        if len(node_index_list) == 0:
-            node_index_list = [i for i in range(self._backend._nodes_list[node_type].number)]
+        # Result is grouped by tick -> node -> attribute -> slot,
+        # so we fill all the ticks and nodes of one attribute each time.
+        result = prepare_query_result(out, (len(ticks), len(nodes), frame_slot_number))
+
+        if result.size == 0:
+            return result.reshape(-1)
+
+        # Row of ticks which not exist will be padding with 0, we use 1st row to query, then reset them.
+        cdef list tick_rows = [self._tick2index_dict.get(tick, 0) for tick in ticks]
+        cdef np.ndarray rows = np.array(tick_rows, dtype=np.int64)[:, None]
+
+        for field_arr, slot_offset, slot_number in fields:
+            result[:, :, slot_offset:slot_offset + slot_number] = field_arr[rows, nodes].reshape(
+                len(ticks), len(nodes), slot_number)
+
+        if 0 in tick_rows:
+            result[np.array(tick_rows) == 0] = 0
+
+        return result.reshape(-1)
+
+    cdef view(self, NODE_TYPE node_type, list ticks, ATTR_TYPE attr_type) except +:
+        cdef INT tick
+        cdef AttrInfo attr = self._backend._attrs_list[attr_type]
+        cdef np.ndarray data_arr = self._backend._node_data_dict[node_type][attr.name]
 
-        # querying by tick attribute
-        for tick in ticks:
-            for node_index in node_index_list:
-                for attr_type in attr_list:
-                    attr = self._backend._attrs_list[attr_type]
+        if len(ticks) == 0:
+            ticks = [t for t in self._tick2index_dict.keys()][-(self._max_size-1):]
+
+        cdef list rows = [self._tick2index_dict.get(tick, 0) for tick in ticks]
+
+        # Rows are reused by later snapshots in place, so copy them to keep the states of the ticks,
+        # same as dynamic backend that keeps the snapshot block alive for the result.
+        result = data_arr[rows]
 
-                    # since we have a clear tick to index mapping, do not need additional checking here
-                    if tick in self._tick2index_dict:
-                        retq.append(data_arr[attr.name][self._tick2index_dict[tick], node_index].astype(np.double).flatten())
-                    else:
-                        # padding for tick which not exist
-                        retq.append(np.zeros(attr.slot_number, dtype=np.double))
+        # Padding for ticks not exist.
+        result[np.array(rows, dtype=np.int64) == 0] = 0
 
-        return np.concatenate(retq)
+        result.flags.writeable = False
+
+        return result
 
     cdef void enable_history(self, str history_folder) except +:
         """Enable history recording, used to save all the snapshots into file"""
@@ -562,16 +721,57 @@ cdef class NPSnapshotList(SnapshotListAbc):
 
         for node_type, data_arr in self._backend._node_data_dict.items():
             ni = self._backend._nodes_list[node_type]
-            dump_path = os.path.join(history_folder, f"{ni.name}.bin")
+            dump_path = os.path.join(history_folder, f"{ni.name}.hist")
+
+            self._history_dict[ni.name] = SnapshotHistoryWriter(dump_path, ni.name, data_arr.dtype)
+
+    cdef object save_state(self) except +:
+        """Copy snapshot rows of each node type, with tick mappings."""
+        cdef dict data_state = {node_type: data_arr[1:].copy() for node_type, data_arr in self._backend._node_data_dict.items()}
 
-            self._history_dict[ni.name] = NPBufferedMmap(dump_path, data_arr.dtype, ni.number)
+        return (
+            data_state,
+            dict(self._tick2index_dict),
+            dict(self._index2tick_dict),
+            self._cur_index,
+            self._elided_copy_number,
+        )
+
+    cdef object restore_state(self, object state) except +:
+        cdef NODE_TYPE node_type
+        cdef np.ndarray data_arr
+
+        data_state, tick2index_dict, index2tick_dict, self._cur_index, self._elided_copy_number = state
+
+        for node_type, data_arr in self._backend._node_data_dict.items():
+            data_arr[1:] = data_state[node_type]
+
+        self._tick2index_dict = dict(tick2index_dict)
+        self._index2tick_dict = dict(index2tick_dict)
+
+        # Current frame may be different from the latest restored snapshot.
+        self._last_index = 0
+
+        if self._row_ticks is not None:
+            self._row_ticks[:] = -1
+
+            for index, tick in self._index2tick_dict.items():
+                self._row_ticks[index] = tick
 
     cdef void reset(self) except +:
         """Reset snapshot list"""
         self._cur_index = 0
+        self._last_index = 0
+        self._elided_copy_number = 0
         self._tick2index_dict.clear()
         self._index2tick_dict.clear()
-        self._history_dict.clear()
+
+        if self._row_ticks is not None:
+            self._row_ticks[:] = -1
+
+        # Following history will be recorded as a new episode.
+        for writer in self._history_dict.values():
+            writer.new_episode()
 
         cdef NODE_TYPE node_type
         cdef AttrInfo attr_info
@@ -583,7 +783,5 @@ cdef class NPSnapshotList(SnapshotListAbc):
                 # we only reset frame here, without snapshot list
                 data_arr[1:][attr_info.name] = 0
 
-        # NOTE: we do not reset the history file here, so the file will keep increasing
-
     def __len__(self):
         return len(self._index2tick_dict)
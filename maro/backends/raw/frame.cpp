@@ -145,6 +145,49 @@ namespace maro
         node.resize_list(node_index, attr_type, new_size);
       }
 
+      void Frame::extend_list(NODE_INDEX node_index, ATTR_TYPE attr_type, const QUERY_FLOAT* values, SLOT_INDEX length)
+      {
+        NODE_TYPE node_type = extract_node_type(attr_type);
+
+        auto& node = get_node(node_type);
+
+        node.extend_list(node_index, attr_type, values, length);
+      }
+
+      void Frame::remove_many_from_list(NODE_INDEX node_index, ATTR_TYPE attr_type, const SLOT_INDEX* slot_indices, SLOT_INDEX length)
+      {
+        NODE_TYPE node_type = extract_node_type(attr_type);
+
+        auto& node = get_node(node_type);
+
+        node.remove_many_from_list(node_index, attr_type, slot_indices, length);
+      }
+
+      NODE_INDEX Frame::get_max_node_number(NODE_TYPE node_type)
+      {
+        auto& node = get_node(node_type);
+
+        return node.get_max_number();
+      }
+
+      void Frame::get_attr_column(ATTR_TYPE attr_type, QUERY_FLOAT* result)
+      {
+        NODE_TYPE node_type = extract_node_type(attr_type);
+
+        auto& node = get_node(node_type);
+
+        node.get_attr_column(attr_type, result);
+      }
+
+      void Frame::set_attr_column(ATTR_TYPE attr_type, const QUERY_FLOAT* values)
+      {
+        NODE_TYPE node_type = extract_node_type(attr_type);
+
+        auto& node = get_node(node_type);
+
+        node.set_attr_column(attr_type, values);
+      }
+
       void Frame::setup()
       {
         if (_is_setup)
@@ -211,6 +254,8 @@ namespace maro
         auto& target_attr = node.get_attr(node_index, attr_type, slot_index);
 
         target_attr = T(value);
+
+        node.mark_dirty();
       }
 
 #define ATTRIBUTE_SETTER(type) \
@@ -183,6 +183,24 @@ namespace maro
         template<typename T>
         void insert_to_list(NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index, T value);
 
+        /// <summary>
+        /// Append values to a list attribute, see Node::extend_list.
+        /// </summary>
+        /// <param name="node_index">Index of node instance to extend.</param>
+        /// <param name="attr_type">Type of attribute.</param>
+        /// <param name="values">Values to append.</param>
+        /// <param name="length">Number of values.</param>
+        void extend_list(NODE_INDEX node_index, ATTR_TYPE attr_type, const QUERY_FLOAT* values, SLOT_INDEX length);
+
+        /// <summary>
+        /// Remove several slots from a list attribute, see Node::remove_many_from_list.
+        /// </summary>
+        /// <param name="node_index">Index of node instance.</param>
+        /// <param name="attr_type">Type of attribute.</param>
+        /// <param name="slot_indices">Slot indices to remove.</param>
+        /// <param name="length">Number of slot indices.</param>
+        void remove_many_from_list(NODE_INDEX node_index, ATTR_TYPE attr_type, const SLOT_INDEX* slot_indices, SLOT_INDEX length);
+
         /// <summary>
         /// Initial current frame.
         /// </summary>
@@ -209,6 +227,27 @@ namespace maro
 
         SLOT_INDEX get_slot_number(NODE_INDEX node_index, ATTR_TYPE attr_type);
 
+        /// <summary>
+        /// Get max node instance number (include deleted ones) of specified node type.
+        /// </summary>
+        /// <param name="node_type">Type of node.</param>
+        /// <returns>Max number of node instance.</returns>
+        NODE_INDEX get_max_node_number(NODE_TYPE node_type);
+
+        /// <summary>
+        /// Get values of a fixed size attribute for all node instances, see Node::get_attr_column.
+        /// </summary>
+        /// <param name="attr_type">Type of attribute.</param>
+        /// <param name="result">Pointer to hold values, grouped by node.</param>
+        void get_attr_column(ATTR_TYPE attr_type, QUERY_FLOAT* result);
+
+        /// <summary>
+        /// Set values of a fixed size attribute for all node instances, see Node::set_attr_column.
+        /// </summary>
+        /// <param name="attr_type">Type of attribute.</param>
+        /// <param name="values">Values to set, grouped by node.</param>
+        void set_attr_column(ATTR_TYPE attr_type, const QUERY_FLOAT* values);
+
       };
 
 
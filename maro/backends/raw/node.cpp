@@ -43,6 +43,9 @@ namespace maro
         _type = node._type;
         _is_setup = node._is_setup;
 
+        // Copied states may be different from the ones in latest snapshot.
+        _is_dirty = true;
+
         // Ignore name.
         _name = "";
 
@@ -57,23 +60,20 @@ namespace maro
           memcpy(&_dynamic_block[0], &node._dynamic_block[0], valid_dynamic_size * sizeof(Attribute));
         }
 
-        // Copy list attributes store.
-        if (node._list_store.size() > 0)
-        {
-          _list_store.resize(node._list_store.size());
+        // Copy list attributes store, lists that are empty in source should be cleared too,
+        // as this may be used to restore states of an existing node.
+        _list_store.resize(node._list_store.size());
 
-          for (size_t i = 0; i < _list_store.size(); i++)
-          {
-            auto& source_list = node._list_store[i];
-
-            if (source_list.size() > 0)
-            {
-              auto& target_list = _list_store[i];
+        for (size_t i = 0; i < _list_store.size(); i++)
+        {
+          auto& source_list = node._list_store[i];
+          auto& target_list = _list_store[i];
 
-              target_list.resize(source_list.size());
+          target_list.resize(source_list.size());
 
-              memcpy(&target_list[0], &source_list[0], source_list.size() * sizeof(Attribute));
-            }
+          if (source_list.size() > 0)
+          {
+            memcpy(&target_list[0], &source_list[0], source_list.size() * sizeof(Attribute));
           }
         }
 
@@ -189,6 +189,21 @@ namespace maro
         return _attribute_definitions[attr_index];
       }
 
+      bool Node::is_dirty() const noexcept
+      {
+        return _is_dirty;
+      }
+
+      void Node::mark_dirty() noexcept
+      {
+        _is_dirty = true;
+      }
+
+      void Node::clear_dirty() noexcept
+      {
+        _is_dirty = false;
+      }
+
       bool Node::is_node_alive(NODE_INDEX node_index) const noexcept
       {
         ensure_setup();
@@ -256,6 +271,8 @@ namespace maro
 
       void Node::reset()
       {
+        _is_dirty = true;
+
         ensure_setup();
 
         // Reset all node number to pre-defined.
@@ -297,6 +314,8 @@ namespace maro
 
       void Node::append_nodes(NODE_INDEX node_number)
       {
+        _is_dirty = true;
+
         ensure_setup();
 
         if (node_number == 0)
@@ -354,6 +373,8 @@ namespace maro
 
       void Node::remove_node(NODE_INDEX node_index)
       {
+        _is_dirty = true;
+
         ensure_setup();
         ensure_node_index(node_index);
 
@@ -362,6 +383,8 @@ namespace maro
 
       void Node::resume_node(NODE_INDEX node_index)
       {
+        _is_dirty = true;
+
         ensure_setup();
 
         if(node_index < _max_node_number)
@@ -491,8 +514,29 @@ namespace maro
         return target_list;
       }
 
+      // Assign a querying value to attribute, keep its data type.
+      inline void assign_attr_value(Attribute& attr, AttrDataType data_type, QUERY_FLOAT value)
+      {
+        switch (data_type)
+        {
+        case AttrDataType::ACHAR: attr = ATTR_CHAR(value); break;
+        case AttrDataType::AUCHAR: attr = ATTR_UCHAR(value); break;
+        case AttrDataType::ASHORT: attr = ATTR_SHORT(value); break;
+        case AttrDataType::AUSHORT: attr = ATTR_USHORT(value); break;
+        case AttrDataType::AINT: attr = ATTR_INT(value); break;
+        case AttrDataType::AUINT: attr = ATTR_UINT(value); break;
+        case AttrDataType::ALONG: attr = ATTR_LONG(value); break;
+        case AttrDataType::AULONG: attr = ATTR_ULONG(value); break;
+        case AttrDataType::AFLOAT: attr = ATTR_FLOAT(value); break;
+        case AttrDataType::ADOUBLE: attr = ATTR_DOUBLE(value); break;
+        default: throw AttributeInvalidDataTypeError();
+        }
+      }
+
       void Node::clear_list(NODE_INDEX node_index, ATTR_TYPE attr_type)
       {
+        _is_dirty = true;
+
         auto& target_attr = get_list_attribute(node_index, attr_type);
         auto& target_list = get_attribute_list(target_attr);
 
@@ -503,6 +547,8 @@ namespace maro
 
       void Node::resize_list(NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX new_size)
       {
+        _is_dirty = true;
+
         auto& target_attr = get_list_attribute(node_index, attr_type);
         auto& target_list = get_attribute_list(target_attr);
 
@@ -514,6 +560,8 @@ namespace maro
       template<typename T>
       void Node::append_to_list(NODE_INDEX node_index, ATTR_TYPE attr_type, T value)
       {
+        _is_dirty = true;
+
         auto& target_attr = get_list_attribute(node_index, attr_type);
         auto& target_list = get_attribute_list(target_attr);
 
@@ -538,6 +586,8 @@ namespace maro
 
       void Node::remove_from_list(NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index)
       {
+        _is_dirty = true;
+
         auto& target_attr = get_list_attribute(node_index, attr_type);
         auto& target_list = get_attribute_list(target_attr);
 
@@ -554,6 +604,8 @@ namespace maro
       template<typename T>
       void Node::insert_to_list(NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index, T value)
       {
+        _is_dirty = true;
+
         auto& target_attr = get_list_attribute(node_index, attr_type);
         auto& target_list = get_attribute_list(target_attr);
 
@@ -588,6 +640,162 @@ namespace maro
       INSERT_TO_LIST(ATTR_FLOAT)
       INSERT_TO_LIST(ATTR_DOUBLE)
 
+      void Node::extend_list(NODE_INDEX node_index, ATTR_TYPE attr_type, const QUERY_FLOAT* values, SLOT_INDEX length)
+      {
+        _is_dirty = true;
+
+        auto& target_attr = get_list_attribute(node_index, attr_type);
+        auto& target_list = get_attribute_list(target_attr);
+        auto& attr_def = get_attr_definition(attr_type);
+
+        auto old_size = target_list.size();
+        auto new_size = old_size + length;
+
+        if (new_size > MAX_SLOT_NUMBER)
+        {
+          throw MaxSlotNumberError();
+        }
+
+        // Grow capacity geometrically, as reserve may allocate the exact size,
+        // then extending one list for many times will not re-allocate each time.
+        if (new_size > target_list.capacity())
+        {
+          target_list.reserve(max(new_size, target_list.capacity() * 2));
+        }
+
+        target_list.resize(new_size);
+
+        for (SLOT_INDEX i = 0; i < length; i++)
+        {
+          assign_attr_value(target_list[old_size + i], attr_def.data_type, values[i]);
+        }
+
+        target_attr.slot_number = SLOT_INDEX(new_size);
+      }
+
+      void Node::remove_many_from_list(NODE_INDEX node_index, ATTR_TYPE attr_type, const SLOT_INDEX* slot_indices, SLOT_INDEX length)
+      {
+        _is_dirty = true;
+
+        auto& target_attr = get_list_attribute(node_index, attr_type);
+        auto& target_list = get_attribute_list(target_attr);
+
+        if (length == 0)
+        {
+          return;
+        }
+
+        vector<SLOT_INDEX> indices(slot_indices, slot_indices + length);
+
+        sort(indices.begin(), indices.end());
+        indices.erase(unique(indices.begin(), indices.end()), indices.end());
+
+        if (indices.back() >= target_list.size())
+        {
+          throw InvalidSlotIndexError();
+        }
+
+        // Move the remaining values forward, each value moves at most once.
+        size_t write_index = indices[0];
+        size_t next_removed = 0;
+
+        for (size_t read_index = indices[0]; read_index < target_list.size(); read_index++)
+        {
+          if (next_removed < indices.size() && indices[next_removed] == read_index)
+          {
+            next_removed++;
+
+            continue;
+          }
+
+          target_list[write_index] = target_list[read_index];
+
+          write_index++;
+        }
+
+        target_list.resize(write_index);
+
+        target_attr.slot_number = SLOT_INDEX(write_index);
+      }
+
+      inline vector<Attribute>& Node::get_column_block(const AttributeDef& attr_def, size_t& node_size)
+      {
+        if (attr_def.is_list)
+        {
+          throw OperationsOnListAttributeError();
+        }
+
+        if (attr_def.is_const)
+        {
+          node_size = _const_size_per_node;
+
+          return _const_block;
+        }
+
+        node_size = _dynamic_size_per_node;
+
+        return _dynamic_block;
+      }
+
+      void Node::get_attr_column(ATTR_TYPE attr_type, QUERY_FLOAT* result)
+      {
+        ensure_setup();
+
+        auto& attr_def = get_attr_definition(attr_type);
+        size_t node_size = 0;
+        auto& target_block = get_column_block(attr_def, node_size);
+
+        const auto slot_number = attr_def.slot_number;
+
+        for (NODE_INDEX node_index = 0; node_index < _max_node_number; node_index++)
+        {
+          auto* target = &result[node_index * slot_number];
+
+          if (!_node_instance_masks.get(node_index))
+          {
+            fill(target, target + slot_number, QUERY_FLOAT(0));
+
+            continue;
+          }
+
+          auto attr_offset = compose_attr_offset_in_node(node_index, node_size, attr_def.offset);
+
+          for (SLOT_INDEX slot_index = 0; slot_index < slot_number; slot_index++)
+          {
+            target[slot_index] = QUERY_FLOAT(target_block[attr_offset + slot_index]);
+          }
+        }
+      }
+
+      void Node::set_attr_column(ATTR_TYPE attr_type, const QUERY_FLOAT* values)
+      {
+        _is_dirty = true;
+
+        ensure_setup();
+
+        auto& attr_def = get_attr_definition(attr_type);
+        size_t node_size = 0;
+        auto& target_block = get_column_block(attr_def, node_size);
+
+        const auto slot_number = attr_def.slot_number;
+
+        for (NODE_INDEX node_index = 0; node_index < _max_node_number; node_index++)
+        {
+          if (!_node_instance_masks.get(node_index))
+          {
+            continue;
+          }
+
+          auto attr_offset = compose_attr_offset_in_node(node_index, node_size, attr_def.offset);
+          const auto* source = &values[node_index * slot_number];
+
+          for (SLOT_INDEX slot_index = 0; slot_index < slot_number; slot_index++)
+          {
+            assign_attr_value(target_block[attr_offset + slot_index], attr_def.data_type, source[slot_index]);
+          }
+        }
+      }
+
       const char* OperationsBeforeSetupError::what() const noexcept
       {
         return "Node has not been setup.";
@@ -632,6 +840,11 @@ namespace maro
       {
         return "Reach the max number of slot.";
       }
+
+      const char* OperationsOnListAttributeError::what() const noexcept
+      {
+        return "Column accessing only support for fixed size attribute.";
+      }
     }
   }
 }
@@ -4,6 +4,7 @@
 #ifndef  _MARO_BACKENDS_RAW_NODE_
 #define _MARO_BACKENDS_RAW_NODE_
 
+#include <algorithm>
 #include <vector>
 #include <string>
 #include <iostream>
@@ -113,6 +114,9 @@ namespace maro
         // Is this node been setup.
         bool _is_setup = false;
 
+        // Is any attribute or instance changed since dirty flag cleared (by snapshot list).
+        bool _is_dirty = true;
+
         // Copy content from source node, for taking snapshot.
         void copy_from(const Node& node, bool is_deep_copy = false);
 
@@ -130,6 +134,9 @@ namespace maro
 
         // Get actual list of a list attribute
         inline vector<Attribute>& get_attribute_list(Attribute& attribute);
+
+        // Get memory block and per node size of a fixed size attribute, for column accessing.
+        inline vector<Attribute>& get_column_block(const AttributeDef& attr_def, size_t& node_size);
       public:
         Node();
 
@@ -186,6 +193,22 @@ namespace maro
         /// <returns>Definition of specified attribute.</returns>
         const AttributeDef& get_attr_definition(ATTR_TYPE attr_type) const;
 
+        /// <summary>
+        /// Check if any attribute value or node instance changed since dirty flag cleared.
+        /// </summary>
+        /// <returns>True if changed, or false.</returns>
+        bool is_dirty() const noexcept;
+
+        /// <summary>
+        /// Mark this node as changed, used when attribute value changed outside.
+        /// </summary>
+        void mark_dirty() noexcept;
+
+        /// <summary>
+        /// Clear dirty flag, used after current states are recorded.
+        /// </summary>
+        void clear_dirty() noexcept;
+
         /// <summary>
         /// Check if specified node instance is alive.
         /// </summary>
@@ -294,6 +317,39 @@ namespace maro
         /// <param name="attr_type">Type of attribute.</param>
         template<typename T>
         void insert_to_list(NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index, T value);
+
+        /// <summary>
+        /// Append values to list attribute in one call, values will be casted to the data type of attribute.
+        /// </summary>
+        /// <param name="node_index">Index of node instance to extend.</param>
+        /// <param name="attr_type">Type of attribute.</param>
+        /// <param name="values">Values to append.</param>
+        /// <param name="length">Number of values.</param>
+        void extend_list(NODE_INDEX node_index, ATTR_TYPE attr_type, const QUERY_FLOAT* values, SLOT_INDEX length);
+
+        /// <summary>
+        /// Remove several slots from list attribute in one pass, duplicated indices will be removed once.
+        /// </summary>
+        /// <param name="node_index">Index of node instance.</param>
+        /// <param name="attr_type">Type of attribute.</param>
+        /// <param name="slot_indices">Slot indices to remove, in any order.</param>
+        /// <param name="length">Number of slot indices.</param>
+        void remove_many_from_list(NODE_INDEX node_index, ATTR_TYPE attr_type, const SLOT_INDEX* slot_indices, SLOT_INDEX length);
+
+        /// <summary>
+        /// Get values of a fixed size attribute for all node instances (include deleted ones).
+        /// NOTE: result must have space for max node number * slot number values, values of deleted node will be 0.
+        /// </summary>
+        /// <param name="attr_type">Type of attribute.</param>
+        /// <param name="result">Pointer to hold values, grouped by node.</param>
+        void get_attr_column(ATTR_TYPE attr_type, QUERY_FLOAT* result);
+
+        /// <summary>
+        /// Set values of a fixed size attribute for all node instances, deleted nodes will be skipped.
+        /// </summary>
+        /// <param name="attr_type">Type of attribute.</param>
+        /// <param name="values">Values to set, grouped by node, length should be max node number * slot number.</param>
+        void set_attr_column(ATTR_TYPE attr_type, const QUERY_FLOAT* values);
       };
 
       struct OperationsBeforeSetupError : public exception
@@ -340,6 +396,11 @@ namespace maro
       {
         const char* what() const noexcept override;
       };
+
+      struct OperationsOnListAttributeError : public exception
+      {
+        const char* what() const noexcept override;
+      };
     }
   }
 }
@@ -25,11 +25,19 @@ namespace maro
         }
       }
 
-      void SnapshotList::set_max_size(USHORT max_size)
+      void SnapshotList::set_max_size(UINT max_size)
       {
         _max_size = max_size;
 
         ensure_max_size();
+
+        reset();
+
+        // Preallocate slots, node snapshots will be resized on first taking.
+        _slots.clear();
+        _slots.resize(max_size);
+        _slot_ticks.resize(max_size);
+        _tick2slot.reserve(max_size);
       }
 
       void SnapshotList::setup(Frame* frame)
@@ -39,27 +47,217 @@ namespace maro
         ensure_cur_frame();
       }
 
+      void SnapshotList::set_mode(SnapshotMode mode, size_t block_size)
+      {
+        // Mode cannot be changed once we have snapshots, as blocks may be shared.
+        if (_size > 0 || block_size == 0)
+        {
+          throw SnapshotInvalidModeError();
+        }
+
+        _mode = mode;
+        _block_size = block_size;
+      }
+
+      size_t SnapshotList::get_copied_block_number() const noexcept
+      {
+        return _copied_block_number;
+      }
+
+      size_t SnapshotList::get_shared_block_number() const noexcept
+      {
+        return _shared_block_number;
+      }
+
+      size_t SnapshotList::get_elided_copy_number() const noexcept
+      {
+        return _elided_copy_number;
+      }
+
+      void SnapshotList::clear_last_slot() noexcept
+      {
+        _last_slot = -1;
+      }
+
+      const Attribute& NodeSnapshot::get(size_t offset) const
+      {
+        return (*blocks[offset / block_size])[offset % block_size];
+      }
+
+      void SnapshotList::copy_node(const Node& node, NodeSnapshot& snapshot, const NodeSnapshot* prev_snapshot)
+      {
+        snapshot.max_node_number = node._max_node_number;
+        snapshot.dynamic_size_per_node = node._dynamic_size_per_node;
+        snapshot.node_instance_masks = node._node_instance_masks;
+
+        // Compact lists into one block, so that there is only one allocation for all lists,
+        // and the block of overwritten snapshot will be reused if it has enough capacity.
+        auto list_number = node._list_store.size();
+
+        snapshot.list_offsets.resize(list_number + 1);
+
+        size_t list_block_size = 0;
+
+        for (size_t list_index = 0; list_index < list_number; list_index++)
+        {
+          snapshot.list_offsets[list_index] = list_block_size;
+
+          list_block_size += node._list_store[list_index].size();
+        }
+
+        snapshot.list_offsets[list_number] = list_block_size;
+        snapshot.list_block.resize(list_block_size);
+
+        for (size_t list_index = 0; list_index < list_number; list_index++)
+        {
+          auto& source_list = node._list_store[list_index];
+
+          if (source_list.size() > 0)
+          {
+            memcpy(&snapshot.list_block[snapshot.list_offsets[list_index]], &source_list[0], source_list.size() * sizeof(Attribute));
+          }
+        }
+
+        // Copy according to max_node number, as memory block may larger than it (after reset).
+        auto valid_dynamic_size = node._dynamic_size_per_node * node._max_node_number;
+
+        // Full mode always keep whole dynamic block in one block.
+        snapshot.block_size = _mode == SnapshotMode::DELTA ? _block_size : MAX(valid_dynamic_size, 1);
+
+        auto block_number = (valid_dynamic_size + snapshot.block_size - 1) / snapshot.block_size;
+
+        snapshot.blocks.resize(block_number);
+
+        for (size_t block_index = 0; block_index < block_number; block_index++)
+        {
+          auto block_start = block_index * snapshot.block_size;
+          auto block_length = min(snapshot.block_size, valid_dynamic_size - block_start);
+          auto* source = &node._dynamic_block[block_start];
+
+          // Share the block of previous snapshot if nothing changed.
+          if (_mode == SnapshotMode::DELTA
+            && prev_snapshot != nullptr
+            && block_index < prev_snapshot->blocks.size())
+          {
+            auto& prev_block = prev_snapshot->blocks[block_index];
+
+            if (prev_block->size() == block_length
+              && memcmp(&(*prev_block)[0], source, block_length * sizeof(Attribute)) == 0)
+            {
+              snapshot.blocks[block_index] = prev_block;
+
+              _shared_block_number++;
+
+              continue;
+            }
+          }
+
+          auto& block = snapshot.blocks[block_index];
+
+          // Reuse the block of overwritten snapshot if no other snapshot refers to it,
+          // or allocate a new one, as the old one is still used by others.
+          if (block == nullptr || block.use_count() > 1)
+          {
+            block = make_shared<AttributeBlock>(block_length);
+          }
+          else
+          {
+            block->resize(block_length);
+          }
+
+          // NOTE: use memcpy to keep the bytes same as current frame, so that memcmp works for next snapshot.
+          memcpy(&(*block)[0], source, block_length * sizeof(Attribute));
+
+          _copied_block_number++;
+        }
+      }
+
       void SnapshotList::take_snapshot(int tick)
       {
         ensure_max_size();
         ensure_cur_frame();
 
-        // Try to remove exist tick.
-        _snapshots.erase(tick);
+        // Latest snapshot used to find unchanged blocks.
+        const vector<NodeSnapshot>* prev_snapshot = _size > 0 ? &_slots[latest_slot()] : nullptr;
+
+        UINT slot;
+        auto tick_pair = _tick2slot.find(tick);
+
+        if (tick_pair != _tick2slot.end())
+        {
+          // Over-write exist tick in place.
+          slot = tick_pair->second;
+        }
+        else if (_size < _max_size)
+        {
+          slot = (_head + _size) % _max_size;
+
+          _size++;
+        }
+        else
+        {
+          // Reuse the slot of oldest one if we reach the max size limitation.
+          slot = _head;
+
+          _tick2slot.erase(_slot_ticks[slot]);
+
+          _head = (_head + 1) % _max_size;
+        }
+
+        _slot_ticks[slot] = tick;
+        _tick2slot[tick] = slot;
+
+        auto& snapshot = _slots[slot];
+        auto& nodes = _cur_frame->_nodes;
+
+        // Taking snapshot into the same slot again (like several decisions at one tick),
+        // nodes not changed since last time are still same as the ones in slot.
+        bool is_retaking = static_cast<int>(slot) == _last_slot && snapshot.size() == nodes.size();
+
+        snapshot.resize(nodes.size());
+
+        for (size_t node_type = 0; node_type < nodes.size(); node_type++)
+        {
+          if (is_retaking && !nodes[node_type].is_dirty())
+          {
+            _elided_copy_number++;
+
+            continue;
+          }
+
+          const NodeSnapshot* prev_node = nullptr;
+
+          if (prev_snapshot != nullptr && node_type < prev_snapshot->size())
+          {
+            prev_node = &(*prev_snapshot)[node_type];
+          }
+
+          copy_node(nodes[node_type], snapshot[node_type], prev_node);
+        }
 
-        // Remove oldest one if we reach the max size limitation.
-        if (_snapshots.size() > 0 && _snapshots.size() >= _max_size)
+        for (auto& node : nodes)
         {
-          _snapshots.erase(_snapshots.begin());
+          node.clear_dirty();
         }
 
-        // Copy current frame.
-        _snapshots[tick] = *_cur_frame;
+        _last_slot = slot;
+      }
+
+      inline UINT SnapshotList::latest_slot() const noexcept
+      {
+        return (_head + _size - 1) % _max_size;
+      }
+
+      inline const vector<NodeSnapshot>* SnapshotList::get_snapshot(int tick) const noexcept
+      {
+        auto tick_pair = _tick2slot.find(tick);
+
+        return tick_pair == _tick2slot.end() ? nullptr : &_slots[tick_pair->second];
       }
 
       UINT SnapshotList::size() const noexcept
       {
-        return _snapshots.size();
+        return _size;
       }
 
       UINT SnapshotList::max_size() const noexcept
@@ -76,7 +274,17 @@ namespace maro
 
       void SnapshotList::reset()
       {
-        _snapshots.clear();
+        // Keep the slots, so that their blocks can be reused.
+        _tick2slot.clear();
+
+        _head = 0;
+        _size = 0;
+
+        _copied_block_number = 0;
+        _shared_block_number = 0;
+        _elided_copy_number = 0;
+
+        _last_slot = -1;
       }
 
       void SnapshotList::get_ticks(int* result) const
@@ -86,13 +294,68 @@ namespace maro
           throw SnapshotQueryResultPtrNullError();
         }
 
-        auto i = 0;
-        for (auto& iter : _snapshots)
+        // From oldest to latest.
+        for (UINT i = 0; i < _size; i++)
         {
-          result[i] = iter.first;
+          result[i] = _slot_ticks[(_head + i) % _max_size];
+        }
+      }
 
-          i++;
+      SnapshotAttributeLayout SnapshotList::get_attr_layout(int tick, ATTR_TYPE attr_type) const
+      {
+        SnapshotAttributeLayout layout;
+
+        auto node_type = extract_node_type(attr_type);
+        auto& cur_node = _cur_frame->get_node(node_type);
+        auto& attr_def = cur_node.get_attr_definition(attr_type);
+
+        if (attr_def.is_list)
+        {
+          throw SnapshotLayoutListAttributeError();
+        }
+
+        layout.slot_number = attr_def.slot_number;
+        layout.node_number = cur_node.get_max_number();
+
+        auto* snapshot = get_snapshot(tick);
+
+        if (attr_def.is_const || snapshot == nullptr || layout.node_number == 0)
+        {
+          return layout;
+        }
+
+        auto& history_node = (*snapshot)[node_type];
+
+        // Padding is needed if node number changed.
+        if (history_node.max_node_number != layout.node_number)
+        {
+          return layout;
         }
+
+        // Deleted nodes should be padding too.
+        for (NODE_INDEX node_index = 0; node_index < layout.node_number; node_index++)
+        {
+          if (!history_node.node_instance_masks.get(node_index))
+          {
+            return layout;
+          }
+        }
+
+        auto first_offset = compose_attr_offset_in_node(0, history_node.dynamic_size_per_node, attr_def.offset);
+        auto last_offset = compose_attr_offset_in_node(
+          layout.node_number - 1, history_node.dynamic_size_per_node, attr_def.offset, layout.slot_number - 1);
+
+        // Attributes may be split into different blocks in delta mode.
+        if (first_offset / history_node.block_size != last_offset / history_node.block_size)
+        {
+          return layout;
+        }
+
+        layout.block = history_node.blocks[first_offset / history_node.block_size];
+        layout.offset = first_offset % history_node.block_size;
+        layout.node_stride = history_node.dynamic_size_per_node;
+
+        return layout;
       }
 
       SnapshotQueryResultShape SnapshotList::prepare(NODE_TYPE node_type, int ticks[], UINT tick_length, NODE_INDEX node_indices[], UINT node_length, ATTR_TYPE attributes[], UINT attr_length)
@@ -113,7 +376,7 @@ namespace maro
         _query_parameters.is_list = attr_definition.is_list;
 
         shape.max_node_number = node_indices == nullptr ? cur_node.get_max_number() : node_length;
-        shape.tick_number = ticks == nullptr ? _snapshots.size() : tick_length;
+        shape.tick_number = ticks == nullptr ? _size : tick_length;
 
         if (!_query_parameters.is_list)
         {
@@ -143,7 +406,7 @@ namespace maro
           // we only support query 1 list attribute (1st one) for 1 node at 1 tick each time to reduce too much padding.
 
           // Make sure we have at least one tick.
-          if (_snapshots.size() == 0)
+          if (_size == 0)
           {
             throw SnapshotQueryNoSnapshotsError();
           }
@@ -160,27 +423,30 @@ namespace maro
           shape.max_node_number = 1;
 
           // Use first tick in parameter, or latest tick in snapshot.
-          int tick = ticks == nullptr ? _snapshots.rbegin()->first : ticks[0];
+          int tick = ticks == nullptr ? _slot_ticks[latest_slot()] : ticks[0];
           auto target_node_index = node_indices[0];
 
           // Check if tick exist.
-          auto target_tick_pair = _snapshots.find(tick);
+          auto* snapshot = get_snapshot(tick);
 
-          if (target_tick_pair == _snapshots.end())
+          if (snapshot == nullptr)
           {
             throw SnapshotQueryInvalidTickError();
           }
 
-          auto& snapshot = target_tick_pair->second;
-          auto& history_node = snapshot.get_node(node_type);
+          auto& history_node = (*snapshot)[node_type];
 
           // Check if the node index exist.
-          if (!history_node.is_node_alive(target_node_index))
+          if (target_node_index >= history_node.max_node_number
+            || !history_node.node_instance_masks.get(target_node_index))
           {
             throw SnapshotListQueryNoNodeIndexError();
           }
 
-          shape.max_slot_number = history_node.get_slot_number(target_node_index, first_attr_type);
+          // Slot number of list attribute saved in its attribute.
+          auto attr_offset = compose_attr_offset_in_node(target_node_index, history_node.dynamic_size_per_node, attr_definition.offset);
+
+          shape.max_slot_number = history_node.get(attr_offset).slot_number;
         }
 
         _query_parameters.ticks = ticks;
@@ -224,14 +490,15 @@ namespace maro
       {
         auto* ticks = _query_parameters.ticks;
         auto max_slot_number = _query_parameters.max_slot_number;
-        auto tick = ticks == nullptr ? _snapshots.rbegin()->first : ticks[0];
+        auto tick = ticks == nullptr ? _slot_ticks[latest_slot()] : ticks[0];
+        auto* snapshot = get_snapshot(tick);
         auto node_index = _query_parameters.node_indices[0];
         auto attr_type = _query_parameters.attributes[0];
 
         // Go through all slots.
         for (UINT i = 0; i < max_slot_number; i++)
         {
-          auto& attr = get_attr(tick, node_index, attr_type, i);
+          auto& attr = get_attr(snapshot, node_index, attr_type, i);
 
           // Ignore nan for now, use default value from outside.
           if (!attr.is_nan())
@@ -261,12 +528,10 @@ namespace maro
         // Prepare ticks if no one provided.
         if (_query_parameters.ticks == nullptr)
         {
-          tick_length = _snapshots.size();
+          tick_length = _size;
+          _ticks.resize(tick_length);
 
-          for (auto& iter : _snapshots)
-          {
-            _ticks.push_back(iter.first);
-          }
+          get_ticks(&_ticks[0]);
         }
 
         vector<NODE_INDEX> _node_indices;
@@ -291,7 +556,8 @@ namespace maro
         // Go through by tick -> node -> attribute -> slot.
         for (UINT i = 0; i < tick_length; i++)
         {
-          auto tick = __ticks[i];
+          // Find the snapshot once for each tick.
+          auto* snapshot = get_snapshot(__ticks[i]);
 
           for (UINT j = 0; j < node_length; j++)
           {
@@ -303,7 +569,7 @@ namespace maro
 
               for (SLOT_INDEX slot_index = 0; slot_index < max_slot_number; slot_index++)
               {
-                auto& attr = get_attr(tick, node_index, attr_type, slot_index);
+                auto& attr = get_attr(snapshot, node_index, attr_type, slot_index);
 
                 if (!attr.is_nan())
                 {
@@ -323,7 +589,7 @@ namespace maro
         _query_parameters.reset();
       }
 
-      Attribute& SnapshotList::get_attr(int tick, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index) noexcept
+      const Attribute& SnapshotList::get_attr(const vector<NodeSnapshot>* snapshot, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index) noexcept
       {
         NODE_TYPE node_type = extract_node_type(attr_type);
 
@@ -349,44 +615,41 @@ namespace maro
           return cur_node.get_attr(node_index, attr_type, slot_index);
         }
 
-        auto target_tick_pair = _snapshots.find(tick);
-
         // Check if tick valid.
-        if (target_tick_pair == _snapshots.end())
+        if (snapshot == nullptr)
         {
           return _nan_attr;
         }
 
-        auto& snapshot = target_tick_pair->second;
-        auto& history_node = snapshot.get_node(node_type);
+        auto& history_node = (*snapshot)[node_type];
 
         // Check if node index valid.
-        if (node_index >= history_node._max_node_number || !history_node.is_node_alive(node_index))
+        if (node_index >= history_node.max_node_number || !history_node.node_instance_masks.get(node_index))
         {
           return _nan_attr;
         }
 
         if (attr_def.is_list)
         {
-          auto attr_offset = compose_attr_offset_in_node(node_index, history_node._dynamic_size_per_node, attr_def.offset);
-          auto& target_attr = history_node._dynamic_block[attr_offset];
+          auto attr_offset = compose_attr_offset_in_node(node_index, history_node.dynamic_size_per_node, attr_def.offset);
+          auto& target_attr = history_node.get(attr_offset);
 
           const auto list_index = target_attr.get_value<ATTR_UINT>();
 
-          auto& target_list = history_node._list_store[list_index];
+          auto list_start = history_node.list_offsets[list_index];
 
           // Check slot for list attribute.
-          if (slot_index >= target_list.size())
+          if (slot_index >= history_node.list_offsets[list_index + 1] - list_start)
           {
             return _nan_attr;
           }
 
-          return target_list[slot_index];
+          return history_node.list_block[list_start + slot_index];
         }
 
-        auto attr_offset = compose_attr_offset_in_node(node_index, history_node._dynamic_size_per_node, attr_def.offset, slot_index);
+        auto attr_offset = compose_attr_offset_in_node(node_index, history_node.dynamic_size_per_node, attr_def.offset, slot_index);
 
-        return history_node._dynamic_block[attr_offset];
+        return history_node.get(attr_offset);
       }
 
       void SnapshotList::SnapshotQueryParameters::reset()
@@ -403,9 +666,9 @@ namespace maro
         is_list = false;
       }
 
-      inline void SnapshotList::write_attribute(ofstream &file, int tick, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index)
+      inline void SnapshotList::write_attribute(ofstream &file, const vector<NodeSnapshot>* snapshot, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index)
       {
-        auto &attr = get_attr(tick, node_index, attr_type, slot_index);
+        auto &attr = get_attr(snapshot, node_index, attr_type, slot_index);
 
         if (attr.is_nan())
         {
@@ -437,16 +700,17 @@ namespace maro
           file << "\n";
 
           // Rows.
-          for(auto& snapshot_iter : _snapshots)
+          for(UINT i = 0; i < _size; i++)
           {
-            auto tick = snapshot_iter.first;
-            auto& snapshot = snapshot_iter.second;
-            auto& history_node = snapshot.get_node(node._type);
+            auto slot = (_head + i) % _max_size;
+            auto tick = _slot_ticks[slot];
+            auto* snapshot = &_slots[slot];
+            auto& history_node = (*snapshot)[node._type];
 
-            for (NODE_INDEX node_index = 0; node_index < node._max_node_number; node_index++)
+            for (NODE_INDEX node_index = 0; node_index < history_node.max_node_number; node_index++)
             {
               // ignore deleted node
-              if(!history_node.is_node_alive(node_index))
+              if(!history_node.node_instance_masks.get(node_index))
               {
                 continue;
               }
@@ -459,17 +723,24 @@ namespace maro
                 {
                   file << ",";
 
-                  write_attribute(file, tick, node_index, attr_def.attr_type, 0);
+                  write_attribute(file, snapshot, node_index, attr_def.attr_type, 0);
                 }
                 else
                 {
                   file << ",\"[";
 
-                  auto slot_number = history_node.get_slot_number(node_index, attr_def.attr_type);
+                  auto slot_number = attr_def.slot_number;
+
+                  if (attr_def.is_list)
+                  {
+                    auto attr_offset = compose_attr_offset_in_node(node_index, history_node.dynamic_size_per_node, attr_def.offset);
+
+                    slot_number = history_node.get(attr_offset).slot_number;
+                  }
 
                   for(SLOT_INDEX slot_index = 0; slot_index < slot_number; slot_index++)
                   {
-                    write_attribute(file, tick, node._type, attr_def.attr_type, slot_index);
+                    write_attribute(file, snapshot, node._type, attr_def.attr_type, slot_index);
 
                     file << ",";
                   }
@@ -491,6 +762,11 @@ namespace maro
         return "Invalid tick to take snapshot, same tick must be used sequentially.";
       }
 
+      const char* SnapshotInvalidModeError::what() const noexcept
+      {
+        return "Snapshot mode must be set before taking snapshot, and block size must be larger than 0.";
+      }
+
       const char* SnapshotSizeError::what() const noexcept
       {
         return "Invalid snapshot list max size, it must be larger than 0.";
@@ -530,6 +806,11 @@ namespace maro
       {
         return "List attribute querying need one alive node index.";
       }
+
+      const char* SnapshotLayoutListAttributeError::what() const noexcept
+      {
+        return "List attribute cannot be accessed without copying, as its slot number is different for each node.";
+      }
     }
   }
 }
@@ -5,7 +5,8 @@
 #define _MARO_BACKENDS_RAW_SNAPSHOTLIST_
 
 
-#include <map>
+#include <memory>
+#include <unordered_map>
 #include <vector>
 #include <string>
 #include <iostream>
@@ -25,6 +26,80 @@ namespace maro
     {
       #define MAX(a, b) a > b ? a : b
 
+      // Default number of attributes in one block for delta snapshot mode.
+      const size_t DEFAULT_SNAPSHOT_BLOCK_SIZE = 256;
+
+      /// <summary>
+      /// How snapshot list keeps the states of dynamic attributes.
+      /// </summary>
+      enum class SnapshotMode : char
+      {
+        // Copy whole dynamic block of each node for each snapshot.
+        FULL,
+        // Only copy the blocks that changed since previous snapshot, unchanged blocks are shared.
+        DELTA,
+      };
+
+      // Block of dynamic attributes, may be shared by several snapshots in delta mode.
+      using AttributeBlock = vector<Attribute>;
+
+      /// <summary>
+      /// States of a node type at one snapshot.
+      /// </summary>
+      struct NodeSnapshot
+      {
+        // Max node instance number at snapshot time.
+        NODE_INDEX max_node_number = 0;
+
+        // Size of each node instance in dynamic block.
+        size_t dynamic_size_per_node = 0;
+
+        // Number of attributes in each block.
+        size_t block_size = 0;
+
+        // Which node instance is alive at snapshot time.
+        Bitset node_instance_masks;
+
+        // Copy of list attributes packed into one block without spare capacity,
+        // list with index i in list store is [list_offsets[i], list_offsets[i + 1]) of this block.
+        vector<Attribute> list_block;
+
+        // Start offset of each list in list block, with total size at the end.
+        vector<size_t> list_offsets;
+
+        // Dynamic block split into fixed size blocks, read-only after taking snapshot,
+        // block that not shared with other snapshots will be reused when this slot being overwritten.
+        vector<shared_ptr<AttributeBlock>> blocks;
+
+        /// <summary>
+        /// Get attribute at specified offset of the dynamic block.
+        /// </summary>
+        /// <param name="offset">Offset of attribute in dynamic block.</param>
+        /// <returns>Attribute at specified offset.</returns>
+        const Attribute& get(size_t offset) const;
+      };
+
+      /// <summary>
+      /// Memory layout of an attribute for all nodes at one snapshot, used to access snapshot without copying.
+      /// </summary>
+      struct SnapshotAttributeLayout
+      {
+        // Block that contains the attribute of all nodes, empty if it cannot be accessed directly.
+        shared_ptr<AttributeBlock> block;
+
+        // Offset of the attribute of 1st node in block.
+        size_t offset = 0;
+
+        // Number of attributes between same attribute of 2 nodes.
+        size_t node_stride = 0;
+
+        // Number of node instance.
+        NODE_INDEX node_number = 0;
+
+        // Number of slot of the attribute.
+        SLOT_INDEX slot_number = 0;
+      };
+
       /// <summary>
       /// Shape of current querying.
       /// </summary>
@@ -88,11 +163,34 @@ namespace maro
 
 
       private:
-        // Tick and its snapshot frame, we will keep a copy of frame.
-        map<int, Frame> _snapshots;
+        // Preallocated slots to hold snapshots as a ring buffer, one item for each node type in each slot.
+        // NOTE: dynamic attributes of a slot are kept in blocks referred by shared_ptr instead of one contiguous
+        // array per attribute, as delta mode shares unchanged blocks between snapshots, and the attribute layout
+        // for querying without copying keeps a block alive after its slot being overwritten.
+        // A block is only referred by its slot in full mode, so it is reused and filled by memcpy when the slot
+        // being overwritten, there is no allocation once the ring is full.
+        vector<vector<NodeSnapshot>> _slots;
+
+        // Tick of each slot.
+        vector<int> _slot_ticks;
+
+        // Tick -> slot index.
+        unordered_map<int, UINT> _tick2slot;
+
+        // Slot index of oldest snapshot.
+        UINT _head = 0;
+
+        // Number of snapshots in slots.
+        UINT _size = 0;
+
+        // How to keep dynamic attributes.
+        SnapshotMode _mode = SnapshotMode::FULL;
+
+        // Number of attributes in each block for delta mode.
+        size_t _block_size = DEFAULT_SNAPSHOT_BLOCK_SIZE;
 
         // Max size of snapshot is memory.
-        USHORT _max_size = 0;
+        UINT _max_size = 0;
 
         // Current frame that used to copy.
         Frame* _cur_frame;
@@ -106,6 +204,25 @@ namespace maro
         // Default attribute for invalid attribute, for padding.
         Attribute _nan_attr = NAN;
 
+        // Number of blocks copied and shared since last reset, used to check delta mode efficiency.
+        size_t _copied_block_number = 0;
+        size_t _shared_block_number = 0;
+
+        // Number of node copies skipped as node not changed since it recorded into same slot, since last reset.
+        size_t _elided_copy_number = 0;
+
+        // Slot of last taken snapshot, -1 if no snapshot taken since last reset.
+        int _last_slot = -1;
+
+        // Copy states of current node into snapshot, blocks same as previous snapshot will be shared in delta mode.
+        void copy_node(const Node& node, NodeSnapshot& snapshot, const NodeSnapshot* prev_snapshot);
+
+        // Slot index of latest snapshot.
+        inline UINT latest_slot() const noexcept;
+
+        // Get snapshot of specified tick, nullptr if not exist.
+        inline const vector<NodeSnapshot>* get_snapshot(int tick) const noexcept;
+
         // Query state for list attribute.
         // NOTE: for list attribute, we only support 1 tick, 1 attribute, 1 node.
         // and node cannot be null. If ticks not provided, then use latest tick.
@@ -114,9 +231,9 @@ namespace maro
         // Query for normal attributes.
         void query_for_normal(QUERY_FLOAT* result);
 
-        // Get attribute from specified tick, this function will not throw exception, it will return a NAN attribute
-        // if invalid.
-        Attribute& get_attr(int tick, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index) noexcept;
+        // Get attribute from specified snapshot, this function will not throw exception, it will return a NAN attribute
+        // if invalid, snapshot can be nullptr for not exist tick.
+        const Attribute& get_attr(const vector<NodeSnapshot>* snapshot, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index) noexcept;
 
         // Make sure currect frame not null.
         inline void ensure_cur_frame();
@@ -124,13 +241,44 @@ namespace maro
         // Make sure max size greater than 0.
         inline void ensure_max_size();
 
-        inline void write_attribute(ofstream &file, int tick, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index);
+        inline void write_attribute(ofstream &file, const vector<NodeSnapshot>* snapshot, NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index);
       public:
         /// <summary>
-        /// Set max size of snapshot in memory.
+        /// Set max size of snapshot in memory, slots will be preallocated, and existing snapshots will be cleared.
         /// </summary>
         /// <param name="max_size">Max size to set.</param>
-        void set_max_size(USHORT max_size);
+        void set_max_size(UINT max_size);
+
+        /// <summary>
+        /// Set how to keep dynamic attributes, must be called before taking any snapshot.
+        /// </summary>
+        /// <param name="mode">Snapshot mode.</param>
+        /// <param name="block_size">Number of attributes in each block, only used for delta mode.</param>
+        void set_mode(SnapshotMode mode, size_t block_size = DEFAULT_SNAPSHOT_BLOCK_SIZE);
+
+        /// <summary>
+        /// Get number of blocks copied since last reset.
+        /// </summary>
+        /// <returns>Number of copied blocks.</returns>
+        size_t get_copied_block_number() const noexcept;
+
+        /// <summary>
+        /// Get number of blocks shared with previous snapshot since last reset.
+        /// </summary>
+        /// <returns>Number of shared blocks.</returns>
+        size_t get_shared_block_number() const noexcept;
+
+        /// <summary>
+        /// Get number of node copies skipped since last reset, when taking snapshot for the same tick again.
+        /// </summary>
+        /// <returns>Number of elided node copies.</returns>
+        size_t get_elided_copy_number() const noexcept;
+
+        /// <summary>
+        /// Forget the last taken snapshot, so next snapshot will copy all the nodes,
+        /// used after snapshots replaced without current frame.
+        /// </summary>
+        void clear_last_slot() noexcept;
 
         /// <summary>
         /// Setup snapshot list with current frame.
@@ -179,6 +327,16 @@ namespace maro
         /// <returns>Max node number.</returns>
         NODE_INDEX get_max_node_number(NODE_TYPE node_type) const;
 
+        /// <summary>
+        /// Get memory layout of an attribute at specified tick, to access the snapshot without copying.
+        /// Block of result will be empty if the tick not exist, the attribute is a const attribute,
+        /// there are deleted or appended nodes since snapshot, or the attribute of all nodes not in one block.
+        /// </summary>
+        /// <param name="tick">Tick of snapshot.</param>
+        /// <param name="attr_type">Type of attribute, cannot be a list attribute.</param>
+        /// <returns>Memory layout of the attribute.</returns>
+        SnapshotAttributeLayout get_attr_layout(int tick, ATTR_TYPE attr_type) const;
+
         /// <summary>
         /// Prepare for querying.
         /// </summary>
@@ -217,6 +375,14 @@ namespace maro
         const char* what() const noexcept override;
       };
 
+      /// <summary>
+      /// Change snapshot mode after taking snapshot, or block size is 0
+      /// </summary>
+      struct SnapshotInvalidModeError : public exception
+      {
+        const char* what() const noexcept override;
+      };
+
       /// <summary>
       /// Snapshot list max size is 0
       /// </summary>
@@ -271,6 +437,11 @@ namespace maro
       {
         const char* what() const noexcept override;
       };
+
+      struct SnapshotLayoutListAttributeError : public exception
+      {
+        const char* what() const noexcept override;
+      };
     }
   }
 }
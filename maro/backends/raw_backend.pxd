@@ -7,7 +7,9 @@
 cimport cython
 from cpython cimport bool
 from libcpp cimport bool as cppbool
+from libcpp.memory cimport shared_ptr
 from libcpp.string cimport string
+from libcpp.vector cimport vector
 
 from maro.backends.backend cimport (
     ATTR_CHAR,
@@ -96,7 +98,13 @@ cdef extern from "raw/frame.h" namespace "maro::backends::raw":
         void resize_list(NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX new_size)
         void remove_from_list(NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index)
         void insert_to_list[T](NODE_INDEX node_index, ATTR_TYPE attr_type, SLOT_INDEX slot_index, T value)
+        void extend_list(NODE_INDEX node_index, ATTR_TYPE attr_type, const QUERY_FLOAT* values, SLOT_INDEX length)
+        void remove_many_from_list(NODE_INDEX node_index, ATTR_TYPE attr_type, const SLOT_INDEX* slot_indices, SLOT_INDEX length)
         SLOT_INDEX get_slot_number(NODE_INDEX node_index, ATTR_TYPE attr_type)
+        NODE_INDEX get_max_node_number(NODE_TYPE node_type)
+
+        void get_attr_column(ATTR_TYPE attr_type, QUERY_FLOAT* result)
+        void set_attr_column(ATTR_TYPE attr_type, const QUERY_FLOAT* values)
 
         void setup()
         void reset()
@@ -107,11 +115,29 @@ cdef extern from "raw/frame.cpp" namespace "maro::backends::raw":
     pass
 
 
+cdef extern from "raw/snapshotlist.h" namespace "maro::backends::raw":
+    cdef cppclass SnapshotMode:
+        pass
+
+    const size_t DEFAULT_SNAPSHOT_BLOCK_SIZE
+
+
+cdef extern from "raw/snapshotlist.h" namespace "maro::backends::raw::SnapshotMode":
+    cdef SnapshotMode FULL
+    cdef SnapshotMode DELTA
+
+
 cdef extern from "raw/snapshotlist.h" namespace "maro::backends::raw":
     cdef cppclass SnapshotList:
-        void set_max_size(USHORT max_size)
+        void set_max_size(UINT max_size)
+        void set_mode(SnapshotMode mode, size_t block_size)
         void setup(Frame* frame)
 
+        size_t get_copied_block_number() const
+        size_t get_shared_block_number() const
+        size_t get_elided_copy_number() const
+        void clear_last_slot()
+
         void take_snapshot(int ticks)
 
         UINT size() const
@@ -124,10 +150,19 @@ cdef extern from "raw/snapshotlist.h" namespace "maro::backends::raw":
 
         void get_ticks(int* result) const
 
+        SnapshotAttributeLayout get_attr_layout(int tick, ATTR_TYPE attr_type) except +
+
         SnapshotQueryResultShape prepare(NODE_TYPE node_type, int ticks[], UINT tick_length, NODE_INDEX node_indices[], UINT node_length, ATTR_TYPE attributes[], UINT attr_length)
         void query(QUERY_FLOAT* result)
         void cancel_query()
 
+    cdef cppclass SnapshotAttributeLayout:
+        shared_ptr[vector[Attribute]] block
+        size_t offset
+        size_t node_stride
+        NODE_INDEX node_number
+        SLOT_INDEX slot_number
+
     cdef struct SnapshotQueryResultShape:
         USHORT attr_number
         int tick_number
@@ -151,7 +186,24 @@ cdef class RawBackend(BackendAbc):
 
         dict _node_info
 
+    # Shape of attribute column for all node instances, (node number,) or (node number, slot number).
+    cdef tuple _get_column_shape(self, NODE_TYPE node_type, ATTR_TYPE attr_type)
+
 
 cdef class RawSnapshotList(SnapshotListAbc):
     cdef:
         SnapshotList _snapshots
+
+        # attr_type -> numpy dtype
+        dict _attr_dtype_dict
+
+        RawBackend _backend
+
+        # node name -> history writer
+        dict _history_dict
+
+    # Copy an attribute of all nodes at specified tick, used if it cannot be accessed directly.
+    cdef object _copy_attr(self, NODE_TYPE node_type, INT tick, ATTR_TYPE attr_type, object dtype)
+
+    # Record current frame states of all nodes into history.
+    cdef void _record_history(self, INT tick) except *
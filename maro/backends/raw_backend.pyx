@@ -5,6 +5,7 @@
 #distutils: language = c++
 #distutils: define_macros=NPY_NO_DEPRECATED_API=NPY_1_7_API_VERSION
 
+import os
 import warnings
 
 import numpy as np
@@ -16,6 +17,8 @@ from cython cimport view
 from cython.operator cimport dereference as deref
 from libcpp cimport bool as cppbool
 from libcpp.map cimport map
+from libcpp.memory cimport shared_ptr
+from libcpp.vector cimport vector
 
 from maro.backends.backend cimport (
     ATTR_CHAR,
@@ -38,8 +41,11 @@ from maro.backends.backend cimport (
     AttributeType,
     BackendAbc,
     SnapshotListAbc,
+    prepare_query_result,
 )
 
+from maro.backends.history import SnapshotHistoryWriter
+
 # Ensure numpy will not crash, as we use numpy as query result
 np.import_array()
 
@@ -56,6 +62,20 @@ cdef dict attribute_accessors = {
     AttributeType.Double: AttributeDoubleAccessor,
 }
 
+# Attribute data type to numpy dtype, used to access snapshots without copying.
+attr_numpy_dtype_mapping = {
+    AttributeType.Byte: np.int8,
+    AttributeType.UByte: np.uint8,
+    AttributeType.Short: np.int16,
+    AttributeType.UShort: np.uint16,
+    AttributeType.Int: np.int32,
+    AttributeType.UInt: np.uint32,
+    AttributeType.Long: np.int64,
+    AttributeType.ULong: np.uint64,
+    AttributeType.Float: np.float32,
+    AttributeType.Double: np.float64,
+}
+
 cdef map[string, AttrDataType] attr_type_mapping
 
 attr_type_mapping[AttributeType.Byte] = ACHAR
@@ -130,7 +150,12 @@ cdef class RawBackend(BackendAbc):
         self._attr_type_dict[attr_type] = acc
 
         # Record the information for output.
-        self._node_info[node_type]["attrs"][attr_type] = {"type": dtype.decode(), "slots": slot_num, "name": attr_name}
+        self._node_info[node_type]["attrs"][attr_type] = {
+            "type": dtype.decode(),
+            "slots": slot_num,
+            "name": attr_name,
+            "is_list": is_list,
+        }
 
         return attr_type
 
@@ -163,6 +188,33 @@ cdef class RawBackend(BackendAbc):
 
         return result
 
+    cdef object get_attr_column(self, NODE_TYPE node_type, ATTR_TYPE attr_type) except +:
+        cdef tuple shape = self._get_column_shape(node_type, attr_type)
+        cdef np.ndarray result = np.zeros(shape, dtype=np.float64)
+        cdef QUERY_FLOAT[::1] buffer = result.reshape(-1)
+
+        if buffer.shape[0] > 0:
+            self._frame.get_attr_column(attr_type, &buffer[0])
+
+        return result.astype(attr_numpy_dtype_mapping[self._node_info[node_type]["attrs"][attr_type]["type"].encode()])
+
+    cdef object set_attr_column(self, NODE_TYPE node_type, ATTR_TYPE attr_type, object value) except +:
+        cdef tuple shape = self._get_column_shape(node_type, attr_type)
+        cdef np.ndarray values = np.ascontiguousarray(np.broadcast_to(value, shape), dtype=np.float64)
+        cdef const QUERY_FLOAT[::1] buffer = values.reshape(-1)
+
+        if buffer.shape[0] > 0:
+            self._frame.set_attr_column(attr_type, &buffer[0])
+
+    cdef tuple _get_column_shape(self, NODE_TYPE node_type, ATTR_TYPE attr_type):
+        cdef NODE_INDEX node_number = self._frame.get_max_node_number(node_type)
+        cdef SLOT_INDEX slot_number = self._node_info[node_type]["attrs"][attr_type]["slots"]
+
+        if slot_number == 1:
+            return (node_number,)
+
+        return (node_number, slot_number)
+
     cdef void append_node(self, NODE_TYPE node_type, NODE_INDEX number) except +:
         self._frame.append_node(node_type, number)
 
@@ -191,14 +243,44 @@ cdef class RawBackend(BackendAbc):
 
         acc.insert_value(index, slot_index, value)
 
+    cdef void extend_list(self, NODE_INDEX index, ATTR_TYPE attr_type, object values) except +:
+        cdef np.ndarray array = np.ascontiguousarray(values, dtype=np.float64).reshape(-1)
+        cdef const QUERY_FLOAT[::1] buffer = array
+
+        if buffer.shape[0] > 0:
+            self._frame.extend_list(index, attr_type, &buffer[0], buffer.shape[0])
+
+    cdef void remove_many_from_list(self, NODE_INDEX index, ATTR_TYPE attr_type, object slot_indices) except +:
+        cdef np.ndarray array = np.ascontiguousarray(slot_indices, dtype=np.uint32).reshape(-1)
+        cdef const SLOT_INDEX[::1] buffer = array
+
+        if buffer.shape[0] > 0:
+            self._frame.remove_many_from_list(index, attr_type, &buffer[0], buffer.shape[0])
+
     cdef void reset(self) except +:
         self._frame.reset()
 
+    cdef object save_state(self) except +:
+        cdef RawFrameState frame_state = RawFrameState()
+
+        frame_state._frame = self._frame
+
+        return frame_state, self.snapshots.save_state() if self.snapshots is not None else None
+
+    cdef object restore_state(self, object state) except +:
+        cdef RawFrameState frame_state = state[0]
+
+        # Node copying only includes dynamic attributes, lists and node masks, const attributes are kept.
+        self._frame = frame_state._frame
+
+        if self.snapshots is not None:
+            self.snapshots.restore_state(state[1])
+
     cdef void setup(self, bool enable_snapshot, USHORT total_snapshot, dict options) except +:
         self._frame.setup()
 
         if enable_snapshot:
-            self.snapshots = RawSnapshotList(self, total_snapshot)
+            self.snapshots = RawSnapshotList(self, total_snapshot, options)
 
     cdef dict get_node_info(self) except +:
         cdef dict node_info = {}
@@ -254,29 +336,104 @@ cdef class RawBackend(BackendAbc):
     cdef SLOT_INDEX get_slot_number(self, NODE_INDEX index, ATTR_TYPE attr_type) except +:
         return self._frame.get_slot_number(index, attr_type)
 
+cdef class RawFrameState:
+    """Copy of frame states, const attributes are not included, as they will not be changed after setting up."""
+    cdef:
+        Frame _frame
+
+
+cdef class RawSnapshotListState:
+    """Copy of snapshot list, snapshot blocks are shared with the origin one, as they are copied on writing."""
+    cdef:
+        SnapshotList _snapshots
+
+
+cdef class SnapshotBlockHolder:
+    """Keep a snapshot memory block alive, and expose an attribute in it with numpy array interface.
+
+    The block will not be released by snapshot list until all the arrays over it are released.
+    """
+    cdef:
+        shared_ptr[vector[Attribute]] _block
+
+        dict _array_interface
+
+    @property
+    def __array_interface__(self):
+        return self._array_interface
+
+
+cdef class RawCompiledQuery:
+    """Querying parameters in the format of raw backend, except ticks."""
+    cdef:
+        NODE_TYPE node_type
+
+        NODE_INDEX[:] node_indices
+
+        ATTR_TYPE[:] attr_types
+
+
 cdef class RawSnapshotList(SnapshotListAbc):
-    def __cinit__(self, RawBackend backend, USHORT total_snapshots):
+    def __cinit__(self, RawBackend backend, USHORT total_snapshots, dict options):
+        self._backend = backend
+        self._history_dict = {}
+
         self._snapshots.setup(&backend._frame)
         self._snapshots.set_max_size(total_snapshots)
 
+        self._attr_dtype_dict = {}
+
+        for node_info in backend._node_info.values():
+            for attr_type, attr_info in node_info["attrs"].items():
+                self._attr_dtype_dict[attr_type] = np.dtype(attr_numpy_dtype_mapping[attr_info["type"].encode()])
+
+        # Delta mode only copy changed attribute blocks, unchanged blocks are shared with previous snapshot.
+        cdef str snapshot_mode = options.get("snapshot_mode", "full")
+        cdef size_t block_size = options.get("snapshot_block_size", DEFAULT_SNAPSHOT_BLOCK_SIZE)
+
+        if snapshot_mode == "delta":
+            self._snapshots.set_mode(DELTA, block_size)
+
     # Query states from snapshot list
+    cdef query(self, NODE_TYPE node_type, list ticks, list node_index_list, list attr_list, object out=None) except +:
+        return self.execute_query(self.compile_query(node_type, node_index_list, attr_list), ticks, out)
+
+    cdef object compile_query(self, NODE_TYPE node_type, list node_index_list, list attr_list) except +:
+        cdef int index
+        cdef RawCompiledQuery compiled_query = RawCompiledQuery()
+
+        compiled_query.node_type = node_type
+
+        # NOTE: format must be changed if NODE_INDEX type changed
+        # Check and construct node indices list
+        if node_index_list is not None and len(node_index_list) > 0:
+            compiled_query.node_indices = view.array(shape=(len(node_index_list),), itemsize=sizeof(NODE_INDEX), format="I")
+        else:
+            compiled_query.node_indices = None
+
+        # Attribute list cannot be empty, so we just use it to construct parameter
+        compiled_query.attr_types = view.array(shape=(len(attr_list),), itemsize=sizeof(ATTR_TYPE), format="I")
+
+        for index in range(len(node_index_list)):
+            compiled_query.node_indices[index] = node_index_list[index]
+
+        for index in range(len(attr_list)):
+            compiled_query.attr_types[index] = attr_list[index]
+
+        return compiled_query
+
     @cython.boundscheck(False)
     @cython.wraparound(False)
-    cdef query(self, NODE_TYPE node_type, list ticks, list node_index_list, list attr_list) except +:
+    cdef execute_query(self, object compiled_query, list ticks, object out=None) except +:
         cdef int index
-        cdef ATTR_TYPE attr_type
+        cdef RawCompiledQuery compiled = compiled_query
+        cdef NODE_TYPE node_type = compiled.node_type
 
-        # NOTE: format must be changed if NODE_INDEX type changed
         # Node indices parameters passed to raw backend
-        cdef NODE_INDEX[:] node_indices = None
+        cdef NODE_INDEX[:] node_indices = compiled.node_indices
         # Tick parameter passed to raw backend
         cdef INT[:] tick_list = None
-        # Attribute list cannot be empty, so we just use it to construct parameter
-        cdef ATTR_TYPE[:] attr_type_list = view.array(shape=(len(attr_list),), itemsize=sizeof(ATTR_TYPE), format="I")
-
-        # Check and construct node indices list
-        if node_index_list is not None and len(node_index_list) > 0:
-            node_indices = view.array(shape=(len(node_index_list),), itemsize=sizeof(NODE_INDEX), format="I")
+        cdef ATTR_TYPE[:] attr_type_list = compiled.attr_types
 
         cdef USHORT ticks_length = len(ticks)
 
@@ -289,12 +446,6 @@ cdef class RawSnapshotList(SnapshotListAbc):
         else:
             ticks_length = self._snapshots.size()
 
-        for index in range(len(node_index_list)):
-            node_indices[index] = node_index_list[index]
-
-        for index in range(len(attr_list)):
-            attr_type_list[index] = attr_list[index]
-
         # Calc 1 frame length
         cdef SnapshotQueryResultShape shape = self._snapshots.prepare(node_type, &tick_list[0], ticks_length, &node_indices[0], len(node_indices), &attr_type_list[0], len(attr_type_list))
 
@@ -305,24 +456,91 @@ cdef class RawSnapshotList(SnapshotListAbc):
 
             return None
 
-        # Result holder
-        cdef QUERY_FLOAT[:, :, :, :] result = view.array(shape=(shape.tick_number, shape.max_node_number, shape.attr_number, shape.max_slot_number), itemsize=sizeof(QUERY_FLOAT), format="d")
+        # Result holder with default value, use the output buffer if provided.
+        try:
+            result = prepare_query_result(out, (shape.tick_number, shape.max_node_number, shape.attr_number, shape.max_slot_number))
+        except Exception:
+            self._snapshots.cancel_query()
+
+            raise
 
-        # Default result value
-        result[:, :, :, :] = 0
+        cdef QUERY_FLOAT[:, :, :, ::1] result_view = result
 
         # Do query
-        self._snapshots.query(&result[0][0][0][0])
+        self._snapshots.query(&result_view[0][0][0][0])
+
+        return result
+
+    cdef view(self, NODE_TYPE node_type, list ticks, ATTR_TYPE attr_type) except +:
+        cdef INT tick
+        cdef SnapshotAttributeLayout layout
+        cdef SnapshotBlockHolder holder
+        cdef list tick_states = []
+        cdef object dtype = self._attr_dtype_dict[attr_type]
+
+        if len(ticks) == 0:
+            ticks = self.get_frame_index_list()
+
+        for tick in ticks:
+            layout = self._snapshots.get_attr_layout(tick, attr_type)
+
+            if layout.block.get() == NULL:
+                tick_states.append(self._copy_attr(node_type, tick, attr_type, dtype))
+
+                continue
+
+            holder = SnapshotBlockHolder()
+            holder._block = layout.block
+            holder._array_interface = {
+                "version": 3,
+                "shape": (layout.node_number, layout.slot_number),
+                "typestr": dtype.str,
+                # Value is at the beginning of each attribute.
+                "data": (<size_t>&deref(layout.block)[layout.offset], True),
+                "strides": (layout.node_stride * sizeof(Attribute), sizeof(Attribute)),
+            }
+
+            tick_states.append(np.asarray(holder))
+
+        # Only one tick can be accessed without copying, as snapshots are not in one block.
+        if len(tick_states) == 1:
+            result = tick_states[0][np.newaxis]
+        elif len(tick_states) > 1:
+            result = np.stack(tick_states)
+        else:
+            result = np.zeros((0, self._snapshots.get_max_node_number(node_type), 1), dtype=dtype)
+
+        if result.shape[2] == 1:
+            result = result[:, :, 0]
+
+        result.flags.writeable = False
+
+        return result
+
+    cdef object _copy_attr(self, NODE_TYPE node_type, INT tick, ATTR_TYPE attr_type, object dtype):
+        cdef NODE_INDEX node_number = self._snapshots.get_max_node_number(node_type)
+
+        if node_number == 0:
+            return np.zeros((0, 1), dtype=dtype)
 
-        return np.array(result)
+        states = self.query(node_type, [tick], [], [attr_type])
+
+        # Query result is in shape (ticks, nodes, attributes, slots).
+        return states.reshape(node_number, -1).astype(dtype)
 
     # Record current backend state into snapshot list
     cdef void take_snapshot(self, INT tick) except +:
         self._snapshots.take_snapshot(tick)
 
+        if len(self._history_dict) > 0:
+            self._record_history(tick)
+
     cdef NODE_INDEX get_node_number(self, NODE_TYPE node_type) except +:
         return self._snapshots.get_max_node_number(node_type)
 
+    cdef ULONG get_elided_copy_number(self) except +:
+        return self._snapshots.get_elided_copy_number()
+
     # List of available frame index in snapshot list
     cdef list get_frame_index_list(self) except +:
         cdef USHORT number = self._snapshots.size()
@@ -334,12 +552,61 @@ cdef class RawSnapshotList(SnapshotListAbc):
 
     # Enable history, history will dump backend into files each time take_snapshot called
     cdef void enable_history(self, str history_folder) except +:
-        pass
+        if len(self._history_dict) > 0:
+            return
+
+        cdef list fields
+
+        for node_info in self._backend._node_info.values():
+            # List attributes are not recorded, as their size is not fixed.
+            fields = [
+                (attr_info["name"], attr_numpy_dtype_mapping[attr_info["type"].encode()])
+                if attr_info["slots"] == 1 else
+                (attr_info["name"], attr_numpy_dtype_mapping[attr_info["type"].encode()], attr_info["slots"])
+                for attr_info in node_info["attrs"].values() if not attr_info["is_list"]
+            ]
+
+            self._history_dict[node_info["name"]] = SnapshotHistoryWriter(
+                os.path.join(history_folder, f"{node_info['name']}.hist"), node_info["name"], np.dtype(fields))
+
+    cdef void _record_history(self, INT tick) except *:
+        cdef NODE_TYPE node_type
+        cdef ATTR_TYPE attr_type
+        cdef np.ndarray states
+
+        for node_type, node_info in self._backend._node_info.items():
+            writer = self._history_dict[node_info["name"]]
+            states = np.zeros(self._backend._frame.get_max_node_number(node_type), dtype=writer.dtype)
+
+            for attr_type, attr_info in node_info["attrs"].items():
+                if not attr_info["is_list"]:
+                    states[attr_info["name"]] = self._backend.get_attr_column(node_type, attr_type)
+
+            writer.record(tick, states)
 
     # Reset internal states
+    cdef object save_state(self) except +:
+        cdef RawSnapshotListState state = RawSnapshotListState()
+
+        state._snapshots = self._snapshots
+
+        return state
+
+    cdef object restore_state(self, object state) except +:
+        cdef RawSnapshotListState snapshots_state = state
+
+        self._snapshots = snapshots_state._snapshots
+
+        # Current frame may be different from the latest restored snapshot.
+        self._snapshots.clear_last_slot()
+
     cdef void reset(self) except +:
         self._snapshots.reset()
 
+        # Following history will be recorded as a new episode.
+        for writer in self._history_dict.values():
+            writer.new_episode()
+
     cdef void dump(self, str folder) except +:
         self._snapshots.dump(folder.encode())
 
@@ -0,0 +1,199 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional
+
+import numpy as np
+
+from maro.utils.exception.backends_exception import BackendsInvalidAttributeException, BackendsInvalidNodeException
+
+
+def attach_shared_memory(name: str) -> SharedMemory:
+    """Attach to an existing shared memory segment, the segment will not be removed when current process exits.
+
+    Args:
+        name (str): Name of the shared memory segment.
+
+    Returns:
+        SharedMemory: Attached shared memory.
+    """
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+
+    # Segments are always tracked before Python 3.13, the tracker will remove it when current process exits,
+    # but it should be removed by the creator. Unregistering after attaching does not work if the tracker
+    # is shared with the creator, so skip registering instead.
+    register = resource_tracker.register
+
+    resource_tracker.register = lambda name, rtype: None
+
+    try:
+        return SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class SharedSnapshotNode:
+    """Snapshots of a node type in shared memory, with same querying interface as the snapshot list of frame.
+
+    Args:
+        snapshots (SharedSnapshotList): Snapshot list this node type belongs to.
+        data (np.ndarray): Structured array of this node type in shape (rows, nodes), 1st row is current frame.
+    """
+
+    def __init__(self, snapshots, data: np.ndarray):
+        self._snapshots = snapshots
+        self._data = data
+
+    def __len__(self):
+        """Number of current node."""
+        return self._data.shape[1]
+
+    def __getitem__(self, key: slice):
+        """Used to support states slice querying."""
+        return self.query(key.start, key.stop, key.step)
+
+    def query(self, ticks=None, node_indices=None, attributes=None) -> Optional[np.ndarray]:
+        """Query states with same parameters and result as snapshot list of frame.
+
+        Args:
+            ticks (Union[int, list, tuple]): Tick or tick list to query, None means all ticks.
+            node_indices (Union[int, list, tuple]): Node index or index list to query, None means all nodes.
+            attributes (Union[str, list, tuple]): Attribute name or name list to query.
+
+        Returns:
+            np.ndarray: 1D float64 array, grouped by tick, node, attribute and slot, ticks not exist are padding with 0.
+        """
+        if attributes is None:
+            return None
+
+        attr_list = list(attributes) if type(attributes) in (list, tuple) else [attributes]
+
+        for attr_name in attr_list:
+            if attr_name not in self._data.dtype.names:
+                raise BackendsInvalidAttributeException()
+
+        if ticks is None:
+            tick_list = []
+        else:
+            tick_list = list(ticks) if type(ticks) in (list, tuple) else [ticks]
+
+        if node_indices is None:
+            node_list = list(range(len(self)))
+        else:
+            node_list = list(node_indices) if type(node_indices) in (list, tuple) else [node_indices]
+
+        return self._snapshots._query(self._data, tick_list, np.array(node_list, dtype=np.int64), attr_list)
+
+
+class SharedSnapshotList:
+    """Read-only snapshot list of a frame that placed in shared memory by another process, such as an environment
+    running in sub-process, states are read from shared memory directly without sending them between processes.
+
+    .. code-block:: python
+
+        # In environment process, enable with frame options or "DEFAULT_BACKEND_SHARED_MEMORY" environment variable.
+        frame = MyFrame(enable_snapshot=True, total_snapshot=100, options={"shared_memory": True})
+
+        # Send descriptor to observer process by pipe or queue, it is a small dictionary.
+        pipe.send(frame.shared_memory_descriptor)
+
+        # In observer process.
+        with SharedSnapshotList(pipe.recv()) as snapshots:
+            states = snapshots["my_nodes"][::["a", "b"]]
+
+    NOTE:
+        Snapshots may be taken while querying, rows being over-written will be read again to keep result consistent.
+        The shared memory is removed when the frame is released, so readers should be closed before that.
+
+    Args:
+        descriptor (dict): Shared memory descriptor from ``FrameBase.shared_memory_descriptor``.
+    """
+
+    def __init__(self, descriptor: dict):
+        self._shared_memory = attach_shared_memory(descriptor["name"])
+
+        buffer = self._shared_memory.buf
+
+        self._nodes = {
+            node_name: SharedSnapshotNode(self, np.ndarray(shape, dtype, buffer=buffer, offset=offset))
+            for node_name, (offset, shape, dtype) in descriptor["nodes"].items()
+        }
+
+        ticks_offset, row_number = descriptor["ticks"]
+
+        self._row_ticks = np.ndarray((row_number,), np.int64, buffer=buffer, offset=ticks_offset)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        """Number of snapshots."""
+        return int((self._row_ticks[1:] >= 0).sum())
+
+    def __getitem__(self, node_name: str) -> SharedSnapshotNode:
+        node = self._nodes.get(node_name, None)
+
+        if node is None:
+            raise BackendsInvalidNodeException()
+
+        return node
+
+    def get_node_names(self) -> List[str]:
+        """Get names of node types in snapshot list."""
+        return list(self._nodes.keys())
+
+    def get_frame_index_list(self) -> List[int]:
+        """Get ticks (frame index) of available snapshots in ascending order."""
+        return sorted(self._row_ticks[1:][self._row_ticks[1:] >= 0].tolist())
+
+    def close(self):
+        """Detach from shared memory, it is required before the frame is released in the creator process."""
+        if self._shared_memory is not None:
+            # Arrays refer to the buffer must be released before closing.
+            for node in self._nodes.values():
+                node._data = None
+
+            self._nodes = {}
+            self._row_ticks = None
+
+            self._shared_memory.close()
+            self._shared_memory = None
+
+    def _query(self, data: np.ndarray, ticks: List[int], nodes: np.ndarray, attributes: List[str]) -> np.ndarray:
+        slot_numbers = [int(np.prod(data.dtype.fields[attr_name][0].shape)) for attr_name in attributes]
+
+        while True:
+            row_ticks = self._row_ticks.copy()
+
+            tick2row = {tick: row for row, tick in enumerate(row_ticks.tolist()) if row > 0 and tick >= 0}
+
+            tick_list = ticks if len(ticks) > 0 else sorted(tick2row.keys())
+            rows = np.array([tick2row.get(tick, 0) for tick in tick_list], dtype=np.int64)
+
+            result = np.zeros((len(rows), len(nodes), sum(slot_numbers)), dtype=np.double)
+
+            slot_offset = 0
+
+            for attr_name, slot_number in zip(attributes, slot_numbers):
+                result[:, :, slot_offset : slot_offset + slot_number] = data[attr_name][rows[:, None], nodes].reshape(
+                    len(rows), len(nodes), slot_number
+                )
+
+                slot_offset += slot_number
+
+            # Rows that changed while reading are over-written by new snapshots, read them again.
+            if np.array_equal(row_ticks[rows], self._row_ticks[rows]):
+                break
+
+        # Padding ticks not exist (1st row is current frame).
+        result[rows == 0] = 0
+
+        return result.reshape(-1)
@@ -10,6 +10,7 @@ import numpy as np
 
 from maro.cli.utils.params import GlobalPaths
 from maro.data_lib.binary_converter import BinaryConverter
+from maro.event_buffer import convert_event_records_to_csv
 from maro.utils.exception.cli_exception import CommandError
 from maro.utils.logger import CliLogger
 
@@ -33,6 +34,13 @@ def convert(meta: str, file: list, output: str, start_timestamp: int = None, **k
         converter.add_csv(csv_file)
 
 
+def convert_events(file: str, output: str, **kwargs):
+    if not os.path.exists(file):
+        raise CommandError("events", "source file not exist.\n")
+
+    convert_event_records_to_csv(file, output)
+
+
 def download_file(source: str, destination: str):
     tmpdir = os.path.join(StaticParameter.data_root, "temp", generate_name_with_uuid())
     temp_file_name = os.path.join(tmpdir, os.path.basename(destination))
@@ -1116,6 +1116,31 @@ def load_parser_data(prev_parser: ArgumentParser, global_parser: ArgumentParser)
 
     build_cmd_parser.set_defaults(func=convert)
 
+    # EVENTS
+    from maro.cli.data_pipeline.utils import convert_events
+
+    events_cmd_parser = data_cmd_sub_parsers.add_parser(
+        "events",
+        help="Convert binary finished events file (recorded with record_format='binary') to csv file.",
+        parents=[global_parser],
+    )
+
+    events_cmd_parser.add_argument(
+        "--file",
+        type=str,
+        required=True,
+        help="Path of the binary finished events file.",
+    )
+
+    events_cmd_parser.add_argument(
+        "--output",
+        type=str,
+        required=True,
+        help="Path (with file name) to dump the csv file.",
+    )
+
+    events_cmd_parser.set_defaults(func=convert_events)
+
 
 def load_parser_meta(prev_parser: ArgumentParser, global_parser: ArgumentParser):
     meta_cmd_sub_parsers = prev_parser.add_subparsers()
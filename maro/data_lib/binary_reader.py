@@ -6,7 +6,7 @@ import os
 import sys
 import warnings
 from datetime import datetime
-from typing import Union
+from typing import Optional, Union
 
 from dateutil.relativedelta import relativedelta
 from dateutil.tz import UTC
@@ -111,6 +111,20 @@ class ItemTickPicker:
                 # here we can log items that not sorted
                 pass
 
+    def next_tick(self) -> Optional[int]:
+        """Get tick of next item that not picked yet, without picking it.
+
+        Returns:
+            Optional[int]: Tick of next item, or None if there is no more items.
+        """
+        if self._cached_item is None:
+            try:
+                self._cached_item = next(self._item_generaotr)
+            except StopIteration:
+                return None
+
+        return int((self._cached_item.timestamp - self._starttime) // unit_seconds(self._time_unit))
+
 
 class BinaryReader:
     """Read binary file converted by csv converter.
@@ -3,6 +3,7 @@
 
 import warnings
 from abc import ABC, abstractmethod
+from bisect import bisect_right
 from math import ceil
 from typing import Dict, List
 
@@ -255,6 +256,20 @@ class CimBaseDataContainer(ABC):
     def get_orders(self, tick: int, total_empty_container: int) -> List[Order]:
         pass
 
+    def get_next_order_tick(self, tick: int) -> int:
+        """Get the next tick after specified tick that may have orders.
+
+        NOTE:
+            Synthetic orders are generated at each tick, as random numbers are consumed even if there is no order.
+
+        Args:
+            tick (int): Current tick.
+
+        Returns:
+            int: Next tick that may have orders.
+        """
+        return tick + 1
+
 
 class CimSyntheticDataContainer(CimBaseDataContainer):
     """Data container for synthetic data from generator and dump files for cim scenario.
@@ -419,6 +434,9 @@ class CimRealDataContainer(CimBaseDataContainer):
         assert isinstance(self._data_collection, CimRealDataCollection)
         self._orders: Dict[int, List[Order]] = self._data_collection.orders
 
+        # Sorted ticks that have orders, used to find next order tick.
+        self._order_ticks: List[int] = sorted(self._orders.keys())
+
     def get_orders(self, tick: int, total_empty_container: int) -> List[Order]:
         """Get order list by specified tick.
 
@@ -441,3 +459,16 @@ class CimRealDataContainer(CimBaseDataContainer):
             return []
 
         return self._orders[tick] if tick in self._orders else []
+
+    def get_next_order_tick(self, tick: int) -> int:
+        """Get the next tick after specified tick that has orders.
+
+        Args:
+            tick (int): Current tick.
+
+        Returns:
+            int: Next tick that has orders, or max tick if there is no more orders.
+        """
+        index = bisect_right(self._order_ticks, tick)
+
+        return self._order_ticks[index] if index < len(self._order_ticks) else self._data_collection.max_tick
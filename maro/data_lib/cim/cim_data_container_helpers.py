@@ -69,6 +69,19 @@ class CimDataContainerWrapper:
         self._random_seed = random_seed
         self._re_init_data_cntr_flag = True
 
+    def get_state(self) -> dict:
+        """Get states of data generating in current episode, including internal states of random objects."""
+        return {
+            "random": random.get_state(),
+            "is_need_reset_seed": self._data_cntr._is_need_reset_seed,
+        }
+
+    def set_state(self, state: dict) -> None:
+        """Set states of data generating from get_state method, data will be generated as the saved point."""
+        random.set_state(state["random"])
+
+        self._data_cntr._is_need_reset_seed = state["is_need_reset_seed"]
+
     def __getattr__(self, name):
         return getattr(self._data_cntr, name)
 
@@ -9,6 +9,7 @@ from collections import namedtuple
 from struct import Struct
 from typing import List, Union
 
+import numpy as np
 from yaml import SafeDumper, SafeLoader, YAMLObject, safe_dump, safe_load
 
 from maro.data_lib.common import dtype_pack_map
@@ -89,6 +90,11 @@ class BinaryMeta:
         """int: Item binary size (in bytes)."""
         return self._item_struct.size
 
+    @property
+    def item_dtype(self) -> np.dtype:
+        """np.dtype: Structured data type of item, used to read items as a NumPy array."""
+        return np.dtype([(a.name, "<" + dtype_pack_map[a.dtype]) for a in self._attrs])
+
     @property
     def columns(self) -> dict:
         """dict: Columns to extract."""
@@ -3,16 +3,32 @@
 
 from .event import AbsEvent, ActualEvent, AtomEvent, CascadeEvent, DummyEvent
 from .event_buffer import EventBuffer
+from .event_recorder import (
+    AbsEventRecorder,
+    BinaryEventRecorder,
+    EventRecorder,
+    convert_event_records_to_csv,
+    read_event_records,
+)
+from .event_scheduler import AbsEventScheduler, CalendarEventScheduler, HeapEventScheduler
 from .event_state import EventState
 from .maro_events import MaroEvents
 
 __all__ = [
     "AbsEvent",
+    "AbsEventRecorder",
+    "AbsEventScheduler",
     "ActualEvent",
     "AtomEvent",
+    "BinaryEventRecorder",
+    "CalendarEventScheduler",
     "CascadeEvent",
     "DummyEvent",
     "EventBuffer",
+    "EventRecorder",
     "EventState",
+    "HeapEventScheduler",
     "MaroEvents",
+    "convert_event_records_to_csv",
+    "read_event_records",
 ]
@@ -2,33 +2,30 @@
 # Licensed under the MIT license.
 
 
-import csv
 from collections import defaultdict
 from typing import Callable, List, Optional, cast
 
 from ..common import BaseAction, BaseDecisionEvent
 from .event import ActualEvent, AtomEvent, CascadeEvent
-from .event_linked_list import EventLinkedList
 from .event_pool import EventPool
+from .event_recorder import AbsEventRecorder, event_recorder_dict
+from .event_scheduler import AbsEventScheduler, event_scheduler_dict
 from .event_state import EventState
 from .maro_events import MaroEvents
 
 
-class EventRecorder:
-    """Recorder used to record events to csv file."""
+def _dump_event(event: ActualEvent) -> tuple:
+    immediate_events = []
 
-    def __init__(self, path: str) -> None:
-        self._fp = open(path, "wt+", newline="")
-        self._writer = csv.writer(self._fp)
-        self._writer.writerow(["episode", "tick", "event_type", "payload"])
+    if isinstance(event, CascadeEvent):
+        immediate_event = event.immediate_event_head.next_event
 
-    def record(self, o: dict) -> None:
-        # yaml.dump(o, self._fp, sort_keys=False)
-        self._writer.writerow([o["episode"], o["tick"], o["type"], o["payload"]])
+        for _ in range(event.immediate_event_count):
+            immediate_events.append(_dump_event(immediate_event))
 
-    def __del__(self):
-        if self._fp is not None and not self._fp.closed:
-            self._fp.close()
+            immediate_event = immediate_event.next_event
+
+    return isinstance(event, CascadeEvent), event.id, event.event_type, event.payload, event.state, immediate_events
 
 
 class EventBuffer:
@@ -49,14 +46,33 @@ class EventBuffer:
             EventBuffer will recycle the finished events for furthure using, not push them
             into finished events list, so it will cause method "get_finished_events" return
             empty list.
-        record_events (bool): If record finished events into csv file.
-        record_path (str): Where to save the csv file.
+        record_events (bool): If record finished events into file.
+        record_path (str): Where to save the recording file.
+        scheduler (str): Name of scheduler to hold pending events, "heap" (binary heap) or "calendar"
+            (calendar queue). Defaults to "heap".
+        record_format (str): Format of recording file, "csv" (EventRecorder) or "binary" (BinaryEventRecorder,
+            written by a background thread). Defaults to "csv".
     """
 
-    def __init__(self, disable_finished_events: bool = False, record_events: bool = False, record_path: str = None):
-        # id for events that generate from this instance
-        self._pending_events = defaultdict(EventLinkedList)
+    def __init__(
+        self,
+        disable_finished_events: bool = False,
+        record_events: bool = False,
+        record_path: str = None,
+        scheduler: str = "heap",
+        record_format: str = "csv",
+    ):
+        if scheduler not in event_scheduler_dict:
+            raise ValueError(f"Invalid event scheduler: {scheduler}, it should be 'heap' or 'calendar'.")
+
+        if record_format not in event_recorder_dict:
+            raise ValueError(f"Invalid event record format: {record_format}, it should be 'csv' or 'binary'.")
+
+        # Pending events of each tick, event list of a tick is removed after all its events processed.
+        self._pending_events: AbsEventScheduler = event_scheduler_dict[scheduler]()
         self._handlers = defaultdict(list)
+        self._batch_handlers = defaultdict(list)
+        self._handler_wrapper: Optional[Callable] = None
 
         # used to hold all the events that been processed
         self._finished_events: List[ActualEvent] = []
@@ -67,13 +83,13 @@ class EventBuffer:
 
         self._record_events: bool = record_events
 
-        self._recorder: Optional[EventRecorder] = None
+        self._recorder: Optional[AbsEventRecorder] = None
         self._recorder_ep: int = 0
 
         if self._record_events:
             if record_path is None:
                 raise ValueError("Invalid path to save finished events.")
-            self._recorder = EventRecorder(record_path)
+            self._recorder = event_recorder_dict[record_format](record_path)
 
     def get_finished_events(self) -> List[ActualEvent]:
         """Get all the processed events, call this function before reset method.
@@ -92,7 +108,9 @@ class EventBuffer:
         Returns:
             EventList: List of event object.
         """
-        return [evt for evt in self._pending_events[tick] if evt is not None]
+        event_list = self._pending_events.get(tick)
+
+        return [] if event_list is None else [evt for evt in event_list if evt is not None]
 
     def reset(self) -> None:
         """Reset internal states, this method will clear all events.
@@ -104,13 +122,79 @@ class EventBuffer:
         self._event_pool.recycle(self._finished_events)
         self._finished_events.clear()
 
-        for pending_pool in self._pending_events.values():
+        for pending_pool in self._pending_events.clear():
             self._event_pool.recycle(pending_pool)
             pending_pool.clear()
 
         if self._record_events:
             self._recorder_ep += 1
 
+    def get_next_event_tick(self, tick: int) -> Optional[int]:
+        """Get the nearest tick after specified tick that has pending events.
+
+        Args:
+            tick (int): Tick to search from, exclusive.
+
+        Returns:
+            Optional[int]: Tick with pending events, or None if there is no pending events after specified tick.
+        """
+        return self._pending_events.next_tick(tick)
+
+    def get_state(self) -> dict:
+        """Get pending events in a plain structure, used to restore pending events later.
+
+        NOTE:
+            Payloads are referred directly without copying, caller should copy the result if the payloads
+            may be changed after this call.
+
+        Returns:
+            dict: Key is tick, value is a list of pending events, each event is a tuple of
+                (is cascade, id, event type, payload, state, immediate events).
+        """
+        return {
+            tick: [_dump_event(event) for event in event_list]
+            for tick, event_list in self._pending_events.items()
+            if len(event_list) > 0
+        }
+
+    def set_state(self, state: dict) -> None:
+        """Replace pending events with the ones from get_state method, new event objects will be generated,
+        so the same state can be set for several times.
+
+        NOTE:
+            Finished events are cleared as reset method.
+
+        Args:
+            state (dict): Pending events from get_state method.
+        """
+        self._event_pool.recycle(self._finished_events)
+        self._finished_events.clear()
+
+        for pending_pool in self._pending_events.clear():
+            self._event_pool.recycle(pending_pool)
+            pending_pool.clear()
+
+        for tick, events in state.items():
+            event_list = self._pending_events.get_or_create(tick)
+
+            for event in events:
+                event_list.append(self._load_event(tick, event))
+
+    def _load_event(self, tick: int, event: tuple) -> ActualEvent:
+        is_cascade, id, event_type, payload, state, immediate_events = event
+
+        new_event = self._event_pool.gen(tick, event_type, payload, is_cascade=is_cascade)
+        new_event.reset_value(id, tick, event_type, payload, state)
+
+        if is_cascade:
+            cascade_event = cast(CascadeEvent, new_event)
+            cascade_event.clear()
+
+            for immediate_event in immediate_events:
+                cascade_event.add_immediate_event(self._load_event(tick, immediate_event))
+
+        return new_event
+
     def gen_atom_event(self, tick: int, event_type: object, payload: object = None) -> AtomEvent:
         """Generate an atom event, an atom event is for normal usages,
         they will not stop current event dispatching process.
@@ -175,8 +259,50 @@ class EventBuffer:
             event_type (object): Type of event that the handler want to process.
             handler (Callable): Handler that will process the event.
         """
+        if self._handler_wrapper is not None:
+            handler = self._handler_wrapper(event_type, handler, False)
+
         self._handlers[event_type].append(handler)
 
+    def register_batch_event_handler(self, event_type: object, handler: Callable) -> None:
+        """Register a handler that processes atom events of specified type in batch.
+
+        When an atom event of this type is the next one to process, it and the following pending atom events
+        of the same type in current tick are removed from pending queue, and passed to the handler together.
+        Events of other types between them are not skipped, so they are not included in the batch,
+        and the processing order between different types is same as handling events one by one.
+
+        NOTE:
+            Callback function should only hold one parameter that is the list of event objects.
+            Handlers registered by register_event_handler with same event type will be invoked
+            for each event after the batch handlers.
+
+        Args:
+            event_type (object): Type of event that the handler want to process.
+            handler (Callable): Handler that will process the list of events.
+        """
+        if self._handler_wrapper is not None:
+            handler = self._handler_wrapper(event_type, handler, True)
+
+        self._batch_handlers[event_type].append(handler)
+
+    def set_handler_wrapper(self, wrapper: Callable) -> None:
+        """Wrap registered and following registered handlers, like timing each handler for profiling.
+
+        Args:
+            wrapper (Callable): Function that accepts event type, handler and is batch handler or not,
+                and returns a handler with same parameter.
+        """
+        assert self._handler_wrapper is None, "Handler wrapper can only be set once."
+
+        self._handler_wrapper = wrapper
+
+        for event_type, handlers in self._handlers.items():
+            handlers[:] = [wrapper(event_type, handler, False) for handler in handlers]
+
+        for event_type, handlers in self._batch_handlers.items():
+            handlers[:] = [wrapper(event_type, handler, True) for handler in handlers]
+
     def insert_event(self, event: ActualEvent) -> None:
         """Insert an event to the pending queue.
 
@@ -184,8 +310,7 @@ class EventBuffer:
             event (Event): Event to insert,
                 usually get event object from get_atom_event or get_cascade_event.
         """
-
-        self._pending_events[event.tick].append(event)
+        self._pending_events.get_or_create(event.tick).append(event)
 
     def execute(self, tick: int) -> List[ActualEvent]:
         """Process and dispatch event by tick.
@@ -201,13 +326,20 @@ class EventBuffer:
         Returns:
             EventList: A list of events that are pending decisions at the current tick.
         """
-        if tick in self._pending_events:
-            cur_events_list = self._pending_events[tick]
+        cur_events_list = self._pending_events.get(tick)
+
+        if cur_events_list is not None:
+            # Finished event is recycled after it is removed from the list, as recycling breaks its link.
+            finished_event: Optional[ActualEvent] = None
 
             # 1. check if current events match tick.
             while len(cur_events_list):
                 next_events = cur_events_list.clear_finished_and_get_front()
 
+                if finished_event is not None:
+                    self._event_pool.recycle(finished_event)
+                    finished_event = None
+
                 if next_events is None:
                     # End of current tick.
                     break
@@ -217,6 +349,14 @@ class EventBuffer:
                 # to finished after received an action.
                 if type(next_events) == list:
                     return next_events
+                elif (
+                    next_events.event_type in self._batch_handlers
+                    and isinstance(next_events, AtomEvent)
+                    and next_events.state == EventState.PENDING
+                ):
+                    self._execute_batch(cur_events_list.pop_front_events_of_same_type())
+
+                    continue
                 else:
                     next_events.state = EventState.EXECUTING
 
@@ -230,18 +370,47 @@ class EventBuffer:
                 next_events.state = EventState.FINISHED
 
                 if self._disable_finished_events:
-                    self._event_pool.recycle(next_events)
+                    finished_event = next_events
                 else:
                     self._finished_events.append(next_events)
 
                 if self._record_events:
                     self._recorder.record(
-                        {
-                            "episode": self._recorder_ep,
-                            "tick": next_events.tick,
-                            "type": str(next_events.event_type),
-                            "payload": next_events.payload,
-                        },
+                        self._recorder_ep,
+                        next_events.tick,
+                        next_events.event_type,
+                        next_events.payload,
                     )
 
+            # All events of current tick are processed.
+            self._pending_events.prune(tick)
+
         return []
+
+    def _execute_batch(self, events: List[AtomEvent]) -> None:
+        """Dispatch atom events of same type that removed from pending queue to batch handlers."""
+        event_type = events[0].event_type
+
+        for event in events:
+            event.state = EventState.EXECUTING
+
+        for handler in self._batch_handlers[event_type]:
+            handler(events)
+
+        if event_type in self._handlers:
+            for event in events:
+                for handler in self._handlers[event_type]:
+                    handler(event)
+
+        for event in events:
+            event.state = EventState.FINISHED
+
+        if self._record_events:
+            for event in events:
+                self._recorder.record(self._recorder_ep, event.tick, event.event_type, event.payload)
+
+        if self._disable_finished_events:
+            # Events are not in the list any more, so they can be recycled at once.
+            self._event_pool.recycle(events)
+        else:
+            self._finished_events.extend(events)
@@ -3,7 +3,7 @@
 
 from typing import List, Optional, Union
 
-from .event import AbsEvent, ActualEvent, CascadeEvent, DummyEvent
+from .event import AbsEvent, ActualEvent, AtomEvent, CascadeEvent, DummyEvent
 from .event_state import EventState
 from .maro_events import MaroEvents
 
@@ -87,6 +87,11 @@ class EventLinkedList:
         """Extract sub events (immediate events) of CascadeEvent to the head."""
         # Make immediate event list as the head of current list.
         event.immediate_event_tail.next_event = self._head.next_event
+
+        # Immediate events are the only ones if current list is empty, so the last one is new tail.
+        if self._tail is self._head:
+            self._tail = event.immediate_event_tail
+
         self._head.next_event = event.immediate_event_head.next_event
         self._count += event.immediate_event_count
         event.clear()
@@ -102,6 +107,10 @@ class EventLinkedList:
             self._head.next_event = event.next_event
             self._count -= 1
 
+            # Removed the last one, or new events will be appended to the removed one.
+            if event is self._tail:
+                self._tail = self._head
+
             if isinstance(event, CascadeEvent) and event.immediate_event_count != 0:
                 self._extract_sub_events(event)
 
@@ -136,6 +145,36 @@ class EventLinkedList:
         else:
             return self._collect_pending_decision_events()
 
+    def pop_front_events_of_same_type(self) -> List[AtomEvent]:
+        """Remove the pending atom events at the head of the list that have same type as the first one.
+
+        Only consecutive events are removed, so the processing order with events of other types is kept.
+
+        Returns:
+            List[AtomEvent]: Removed events in list order, empty if the first event is not a pending atom event.
+        """
+        events = []
+        event = self._head.next_event
+        event_type = None if event is None else event.event_type
+
+        while (
+            event is not None
+            and isinstance(event, AtomEvent)
+            and event.state == EventState.PENDING
+            and event.event_type == event_type
+        ):
+            events.append(event)
+            self._count -= 1
+
+            if event is self._tail:
+                self._tail = self._head
+
+            event = event.next_event
+
+        self._head.next_event = event
+
+        return events
+
     def __len__(self):
         """Length of current list."""
         return self._count
@@ -0,0 +1,458 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import csv
+import json
+import queue
+import struct
+import threading
+import weakref
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter
+from itertools import chain
+from operator import attrgetter
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+# Magic bytes at the beginning of binary event record file, last byte is the version.
+BINARY_RECORD_MAGIC = b"MAROEVT\x01"
+
+CSV_HEADER = ["episode", "tick", "event_type", "payload"]
+
+# Values of these types are kept as they are when recording.
+_SCALAR_TYPES = {
+    int,
+    float,
+    bool,
+    str,
+    type(None),
+    np.int8,
+    np.int16,
+    np.int32,
+    np.int64,
+    np.uint8,
+    np.uint16,
+    np.uint32,
+    np.uint64,
+    np.float32,
+    np.float64,
+    np.bool_,
+}
+
+_UINT32 = struct.Struct("<I")
+
+
+class AbsEventRecorder(ABC):
+    """Recorder used by event buffer to record finished events."""
+
+    @abstractmethod
+    def record(self, episode: int, tick: int, event_type: object, payload: object) -> None:
+        """Record a finished event.
+
+        Args:
+            episode (int): Episode of the event, it is increased when event buffer is reset.
+            tick (int): Tick of the event.
+            event_type (object): Type of the event.
+            payload (object): Payload of the event.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def close(self) -> None:
+        """Write all recorded events and close the file."""
+        raise NotImplementedError
+
+
+class EventRecorder(AbsEventRecorder):
+    """Recorder used to record events to csv file."""
+
+    def __init__(self, path: str) -> None:
+        self._fp = open(path, "wt+", newline="")
+        self._writer = csv.writer(self._fp)
+        self._writer.writerow(CSV_HEADER)
+
+    def record(self, episode: int, tick: int, event_type: object, payload: object) -> None:
+        self._writer.writerow([episode, tick, str(event_type), payload])
+
+    def close(self) -> None:
+        if self._fp is not None and not self._fp.closed:
+            self._fp.close()
+
+    def __del__(self):
+        self.close()
+
+
+class BinaryEventRecorder(AbsEventRecorder):
+    """Recorder that writes events into a compressed columnar binary file with a background thread.
+
+    Events are grouped by event type and payload class, fields in the summary_key of the payload class
+    are recorded as columns, numbers and strings are kept as they are, lists and tuples are copied, other values
+    are converted to string when recording.
+    Payloads without summary_key are recorded as a string. Recorded events are passed to the writer thread
+    in batches, the queue between them is bounded, so recording blocks if the writer falls behind.
+    If the writer thread fails, its error is raised by following recording or closing.
+
+    The file can be read with read_event_records, or converted to the csv format of EventRecorder with
+    convert_event_records_to_csv.
+
+    Args:
+        path (str): Path of the binary file.
+        batch_size (int): Number of events in each batch written to file. Defaults to 4096.
+        queue_size (int): Max number of batches waiting for the writer thread. Defaults to 8.
+    """
+
+    def __init__(self, path: str, batch_size: int = 4096, queue_size: int = 8) -> None:
+        assert batch_size > 0 and queue_size > 0
+
+        self._batch_size = batch_size
+
+        # Schema id of each (event type, payload class), and the function to get values of summary fields.
+        self._schemas: Dict[tuple, Tuple[int, Optional[Callable]]] = {}
+
+        # Schemas that are not sent to writer yet, and the events of current batch.
+        self._batch = _RecordBatch()
+
+        self._queue = queue.Queue(maxsize=queue_size)
+
+        # Error of writer thread, it is raised in simulation thread, as the one in writer thread would be lost.
+        self._errors: List[Exception] = []
+
+        fp = open(path, "wb")
+        fp.write(BINARY_RECORD_MAGIC)
+
+        # Thread and finalizer do not refer to the recorder, so it can be collected,
+        # and the events are written when it is collected, closed or at exiting.
+        self._writer = threading.Thread(target=_write_batches, args=(self._queue, fp, self._errors), daemon=True)
+        self._writer.start()
+
+        self._finalizer = weakref.finalize(self, _close_writer, self._queue, self._writer, self._batch)
+
+    def record(self, episode: int, tick: int, event_type: object, payload: object) -> None:
+        schema = self._schemas.get((event_type, type(payload)), None)
+
+        if schema is None:
+            schema = self._add_schema(event_type, payload)
+
+        schema_id, getter = schema
+
+        if getter is None:
+            values = (str(payload),)
+        else:
+            values = getter(payload)
+
+            if not _SCALAR_TYPES.issuperset(map(type, values)):
+                values = tuple(_capture(value) for value in values)
+
+        rows = self._batch.rows
+        rows.append((schema_id, episode, tick, values))
+
+        if len(rows) >= self._batch_size:
+            self._raise_writer_error()
+
+            self._queue.put(self._batch.take())
+
+    def close(self) -> None:
+        self._finalizer()
+
+        self._raise_writer_error()
+
+    def _raise_writer_error(self) -> None:
+        if len(self._errors) > 0:
+            raise self._errors[0]
+
+    def _add_schema(self, event_type: object, payload: object) -> Tuple[int, Optional[Callable]]:
+        summary_key = getattr(type(payload), "summary_key", None)
+        fields = list(summary_key) if summary_key else None
+        getter = None if fields is None else _make_getter(fields)
+
+        schema = (len(self._schemas), getter)
+
+        self._schemas[(event_type, type(payload))] = schema
+        self._batch.new_schemas.append((schema[0], str(event_type), fields))
+
+        return schema
+
+
+def _capture(value: object) -> object:
+    """Keep value that will not be changed after recording, lists are copied, others are converted to string."""
+    if type(value) in _SCALAR_TYPES:
+        return value
+
+    if type(value) is list or type(value) is tuple:
+        return tuple(value)
+
+    return str(value)
+
+
+def _make_getter(fields: List[str]) -> Callable:
+    """Get a function that returns a tuple of specified attributes, missing attributes are None."""
+    getter = attrgetter(*fields)
+
+    def get_values(payload: object) -> tuple:
+        try:
+            values = getter(payload)
+        except AttributeError:
+            return tuple(getattr(payload, field, None) for field in fields)
+
+        return values if len(fields) > 1 else (values,)
+
+    return get_values
+
+
+class _RecordBatch:
+    """Events recorded in simulation thread, and the schemas that first used by them."""
+
+    def __init__(self) -> None:
+        self.new_schemas: List[Tuple[int, str, Optional[List[str]]]] = []
+
+        # Schema id, episode, tick and values of each event.
+        self.rows: List[Tuple[int, int, int, tuple]] = []
+
+    def take(self) -> "_RecordBatch":
+        """Move content to a new batch, so this one can be used for following events."""
+        batch = _RecordBatch()
+
+        self.new_schemas, batch.new_schemas = batch.new_schemas, self.new_schemas
+        self.rows, batch.rows = batch.rows, self.rows
+
+        return batch
+
+
+def _close_writer(batch_queue: queue.Queue, writer: threading.Thread, batch: _RecordBatch) -> None:
+    if len(batch.rows) > 0 or len(batch.new_schemas) > 0:
+        batch_queue.put(batch.take())
+
+    # Stop signal.
+    batch_queue.put(None)
+
+    writer.join()
+
+
+def _write_batches(batch_queue: queue.Queue, fp, errors: List[Exception]) -> None:
+    is_stopped = False
+
+    try:
+        with fp:
+            while True:
+                batch = batch_queue.get()
+
+                if batch is None:
+                    is_stopped = True
+
+                    break
+
+                block = zlib.compress(_encode_batch(batch), 1)
+
+                fp.write(_UINT32.pack(len(block)))
+                fp.write(block)
+    except Exception as e:
+        errors.append(e)
+
+        # Keep consuming batches until stop signal, so recording and closing are not blocked by the bounded queue.
+        while not is_stopped:
+            is_stopped = batch_queue.get() is None
+
+
+def _pack_str(s: str) -> bytes:
+    data = s.encode("utf-8")
+
+    return _UINT32.pack(len(data)) + data
+
+
+def _encode_column(values: list) -> bytes:
+    if all(type(value) is tuple for value in values):
+        # Variable length lists, offsets of each list and the column of all items.
+        offsets = np.zeros(len(values) + 1, dtype=np.uint32)
+        offsets[1:] = np.cumsum([len(value) for value in values])
+
+        return b"l" + offsets.tobytes() + _encode_column(list(chain.from_iterable(values)))
+
+    try:
+        column = np.array(values)
+    except ValueError:
+        # Lists with different length.
+        column = None
+
+    if column is not None and column.ndim == 1:
+        if column.dtype.kind in "iu":
+            return b"i" + column.astype(np.int64).tobytes()
+
+        if column.dtype.kind == "f":
+            return b"f" + column.astype(np.float64).tobytes()
+
+    data = [str(list(value) if type(value) is tuple else value).encode("utf-8") for value in values]
+    offsets = np.zeros(len(data) + 1, dtype=np.uint32)
+    offsets[1:] = np.cumsum([len(d) for d in data])
+
+    return b"s" + offsets.tobytes() + b"".join(data)
+
+
+def _encode_batch(batch: _RecordBatch) -> bytes:
+    """Encode a batch as: row number, new schemas, schema id/episode/tick columns,
+    then value columns of each schema in this batch."""
+    parts = [_UINT32.pack(len(batch.rows)), _UINT32.pack(len(batch.new_schemas))]
+
+    for schema_id, event_type, fields in batch.new_schemas:
+        parts.append(_UINT32.pack(schema_id))
+        parts.append(_pack_str(event_type))
+
+        # Field number 0 means the payload is recorded as a string.
+        fields = [] if fields is None else fields
+        parts.append(_UINT32.pack(len(fields)))
+        parts.extend(_pack_str(field) for field in fields)
+
+    schema_ids, episodes, ticks, values = zip(*batch.rows) if len(batch.rows) > 0 else ((), (), (), ())
+
+    parts.append(np.array(schema_ids, dtype=np.uint32).tobytes())
+    parts.append(np.array(episodes, dtype=np.uint32).tobytes())
+    parts.append(np.array(ticks, dtype=np.int64).tobytes())
+
+    rows_of_schema: Dict[int, List[tuple]] = {}
+
+    for schema_id, row_values in zip(schema_ids, values):
+        rows_of_schema.setdefault(schema_id, []).append(row_values)
+
+    parts.append(_UINT32.pack(len(rows_of_schema)))
+
+    for schema_id, rows in rows_of_schema.items():
+        parts.append(_UINT32.pack(schema_id))
+        parts.append(_UINT32.pack(len(rows[0])))
+
+        for column in zip(*rows):
+            parts.append(_encode_column(list(column)))
+
+    return b"".join(parts)
+
+
+class _BlockReader:
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+        self._offset = 0
+
+    def uint32(self) -> int:
+        value = _UINT32.unpack_from(self._data, self._offset)[0]
+        self._offset += 4
+
+        return value
+
+    def str(self) -> str:
+        return self.bytes(self.uint32()).decode("utf-8")
+
+    def bytes(self, size: int) -> bytes:
+        value = self._data[self._offset : self._offset + size]
+        self._offset += size
+
+        return value
+
+    def array(self, dtype: type, size: int) -> np.ndarray:
+        value = np.frombuffer(self._data, dtype=dtype, count=size, offset=self._offset)
+        self._offset += value.nbytes
+
+        return value
+
+    def column(self, size: int) -> list:
+        kind = self.bytes(1)
+
+        if kind == b"i":
+            return self.array(np.int64, size).tolist()
+
+        if kind == b"f":
+            return self.array(np.float64, size).tolist()
+
+        offsets = self.array(np.uint32, size + 1)
+
+        if kind == b"l":
+            items = self.column(int(offsets[-1]))
+
+            return [items[offsets[i] : offsets[i + 1]] for i in range(size)]
+
+        data = self.bytes(int(offsets[-1]))
+
+        return [data[offsets[i] : offsets[i + 1]].decode("utf-8") for i in range(size)]
+
+
+def read_event_records(path: str) -> Iterator[Tuple[int, int, str, Union[dict, str]]]:
+    """Read events from a file written by BinaryEventRecorder, in the order of recording.
+
+    Args:
+        path (str): Path of the binary file.
+
+    Returns:
+        Iterator[Tuple[int, int, str, Union[dict, str]]]: Episode, tick, event type and payload of each event.
+            Payload is a dictionary of summary fields, or a string if the payload class has no summary_key.
+    """
+    schemas: Dict[int, Tuple[str, List[str]]] = {}
+
+    with open(path, "rb") as fp:
+        if fp.read(len(BINARY_RECORD_MAGIC)) != BINARY_RECORD_MAGIC:
+            raise ValueError(f"Invalid binary event record file: {path}.")
+
+        while True:
+            header = fp.read(4)
+
+            if len(header) < 4:
+                break
+
+            reader = _BlockReader(zlib.decompress(fp.read(_UINT32.unpack(header)[0])))
+
+            row_number = reader.uint32()
+
+            for _ in range(reader.uint32()):
+                schema_id = reader.uint32()
+                event_type = reader.str()
+                schemas[schema_id] = (event_type, [reader.str() for _ in range(reader.uint32())])
+
+            schema_ids = reader.array(np.uint32, row_number).tolist()
+            episodes = reader.array(np.uint32, row_number).tolist()
+            ticks = reader.array(np.int64, row_number).tolist()
+
+            columns_of_schema: Dict[int, List[list]] = {}
+            schema_row_numbers = Counter(schema_ids)
+
+            for _ in range(reader.uint32()):
+                schema_id = reader.uint32()
+                field_number = reader.uint32()
+                size = schema_row_numbers[schema_id]
+
+                columns_of_schema[schema_id] = [reader.column(size) for _ in range(field_number)]
+
+            # Position of next row in the columns of each schema.
+            cursors = dict.fromkeys(columns_of_schema, 0)
+
+            for schema_id, episode, tick in zip(schema_ids, episodes, ticks):
+                event_type, fields = schemas[schema_id]
+                columns = columns_of_schema[schema_id]
+                cursor = cursors[schema_id]
+                cursors[schema_id] = cursor + 1
+
+                if len(fields) == 0:
+                    payload = columns[0][cursor]
+                else:
+                    payload = {field: column[cursor] for field, column in zip(fields, columns)}
+
+                yield episode, tick, event_type, payload
+
+
+def convert_event_records_to_csv(path: str, csv_path: str) -> None:
+    """Convert a file written by BinaryEventRecorder into the csv format of EventRecorder.
+
+    Payloads with summary fields are written as json objects, others are written as the recorded string.
+
+    Args:
+        path (str): Path of the binary file.
+        csv_path (str): Path of the csv file to write.
+    """
+    with open(csv_path, "wt+", newline="") as fp:
+        writer = csv.writer(fp)
+        writer.writerow(CSV_HEADER)
+
+        for episode, tick, event_type, payload in read_event_records(path):
+            writer.writerow([episode, tick, event_type, payload if type(payload) is str else json.dumps(payload)])
+
+
+event_recorder_dict = {
+    "csv": EventRecorder,
+    "binary": BinaryEventRecorder,
+}
@@ -0,0 +1,237 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import heapq
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .event_linked_list import EventLinkedList
+
+
+class AbsEventScheduler(ABC):
+    """Scheduler used by event buffer to hold pending events of each tick.
+
+    Events of a tick are kept in an EventLinkedList, so the order of events in same tick is decided by
+    the list (append, append_head and immediate events of cascade events). Scheduler only manages the ticks:
+    lists are created when first event of tick inserted, and removed (and reused later) after the tick
+    is drained, sub-classes keep the order of ticks to find the next tick with pending events.
+
+    Args:
+        list_cls (type): Class of event list, it should provide same interface as EventLinkedList.
+    """
+
+    def __init__(self, list_cls: type = EventLinkedList):
+        self._list_cls = list_cls
+        self._event_lists: Dict[int, EventLinkedList] = {}
+
+        # Drained lists, reused for new ticks.
+        self._free_lists: List[EventLinkedList] = []
+
+    def get(self, tick: int) -> Optional[EventLinkedList]:
+        """Get event list of specified tick without creating it.
+
+        Args:
+            tick (int): Tick of events.
+
+        Returns:
+            Optional[EventLinkedList]: Event list, or None if there is no pending events at this tick.
+        """
+        return self._event_lists.get(tick, None)
+
+    def get_or_create(self, tick: int) -> EventLinkedList:
+        """Get event list of specified tick, create an empty one if not exist.
+
+        Args:
+            tick (int): Tick of events.
+
+        Returns:
+            EventLinkedList: Event list of the tick.
+        """
+        event_list = self._event_lists.get(tick, None)
+
+        if event_list is None:
+            event_list = self._free_lists.pop() if len(self._free_lists) > 0 else self._list_cls()
+
+            self._event_lists[tick] = event_list
+
+            self._add_tick(tick)
+
+        return event_list
+
+    def prune(self, tick: int) -> None:
+        """Remove event list of specified tick if it is empty.
+
+        Args:
+            tick (int): Tick to prune.
+        """
+        event_list = self._event_lists.get(tick, None)
+
+        if event_list is not None and len(event_list) == 0:
+            del self._event_lists[tick]
+
+            event_list.clear()
+            self._free_lists.append(event_list)
+
+            self._remove_tick(tick)
+
+    def clear(self) -> List[EventLinkedList]:
+        """Remove all the event lists, lists are kept for reusing after caller collected the events in them.
+
+        Returns:
+            List[EventLinkedList]: Removed event lists, caller should not keep them.
+        """
+        event_lists = list(self._event_lists.values())
+
+        self._event_lists.clear()
+        self._free_lists.extend(event_lists)
+
+        self._clear_ticks()
+
+        return event_lists
+
+    def items(self) -> Iterator[Tuple[int, EventLinkedList]]:
+        """Iterate tick and event list pairs, in insertion order of ticks.
+
+        Returns:
+            Iterator[Tuple[int, EventLinkedList]]: Tick and its event list.
+        """
+        return iter(self._event_lists.items())
+
+    def __contains__(self, tick: int) -> bool:
+        return tick in self._event_lists
+
+    def __len__(self) -> int:
+        """Number of ticks that have event list."""
+        return len(self._event_lists)
+
+    @abstractmethod
+    def next_tick(self, tick: int) -> Optional[int]:
+        """Get the nearest tick after specified tick that has an event list.
+
+        Args:
+            tick (int): Tick to search from, exclusive.
+
+        Returns:
+            Optional[int]: Next tick, or None if there is no event lists after specified tick.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _add_tick(self, tick: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _remove_tick(self, tick: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _clear_ticks(self) -> None:
+        raise NotImplementedError
+
+
+class HeapEventScheduler(AbsEventScheduler):
+    """Scheduler that keeps ticks in a binary heap.
+
+    Removed ticks are not deleted from heap, they are dropped lazily when they reach the top,
+    so next tick can be got from the top of heap.
+
+    Args:
+        list_cls (type): Class of event list, it should provide same interface as EventLinkedList.
+    """
+
+    def __init__(self, list_cls: type = EventLinkedList):
+        super().__init__(list_cls)
+
+        self._ticks: List[int] = []
+
+    def next_tick(self, tick: int) -> Optional[int]:
+        ticks = self._ticks
+        event_lists = self._event_lists
+
+        while len(ticks) > 0 and (ticks[0] <= tick or ticks[0] not in event_lists):
+            heapq.heappop(ticks)
+
+        return ticks[0] if len(ticks) > 0 else None
+
+    def _add_tick(self, tick: int) -> None:
+        heapq.heappush(self._ticks, tick)
+
+    def _remove_tick(self, tick: int) -> None:
+        # Dropped when peeking.
+        pass
+
+    def _clear_ticks(self) -> None:
+        self._ticks.clear()
+
+
+class CalendarEventScheduler(AbsEventScheduler):
+    """Scheduler that keeps ticks in a calendar queue.
+
+    Ticks are placed in buckets by (tick // bucket_width) % bucket_number, each bucket keeps its ticks sorted,
+    so ticks in a bucket belong to different "years" of the calendar. Searching next tick walks the buckets
+    from the specified tick for one year, events near current tick are found in the first few buckets.
+
+    Args:
+        list_cls (type): Class of event list, it should provide same interface as EventLinkedList.
+        bucket_width (int): Number of ticks covered by a bucket in one year.
+        bucket_number (int): Number of buckets.
+    """
+
+    def __init__(self, list_cls: type = EventLinkedList, bucket_width: int = 1, bucket_number: int = 256):
+        super().__init__(list_cls)
+
+        assert bucket_width > 0 and bucket_number > 0
+
+        self._bucket_width = bucket_width
+        self._bucket_number = bucket_number
+        self._buckets: List[List[int]] = [[] for _ in range(bucket_number)]
+
+    def next_tick(self, tick: int) -> Optional[int]:
+        if len(self._event_lists) == 0:
+            return None
+
+        bucket_width = self._bucket_width
+        bucket_number = self._bucket_number
+        buckets = self._buckets
+
+        day = (tick + 1) // bucket_width
+
+        # Walk one year from the day of next tick.
+        for i in range(bucket_number):
+            bucket = buckets[(day + i) % bucket_number]
+
+            if len(bucket) > 0:
+                pos = bisect_left(bucket, tick + 1)
+
+                if pos < len(bucket) and bucket[pos] < (day + i + 1) * bucket_width:
+                    return bucket[pos]
+
+        # No ticks in this year, search the earliest one directly.
+        next_tick = None
+
+        for bucket in buckets:
+            pos = bisect_left(bucket, tick + 1)
+
+            if pos < len(bucket) and (next_tick is None or bucket[pos] < next_tick):
+                next_tick = bucket[pos]
+
+        return next_tick
+
+    def _add_tick(self, tick: int) -> None:
+        insort(self._buckets[(tick // self._bucket_width) % self._bucket_number], tick)
+
+    def _remove_tick(self, tick: int) -> None:
+        bucket = self._buckets[(tick // self._bucket_width) % self._bucket_number]
+
+        del bucket[bisect_left(bucket, tick)]
+
+    def _clear_ticks(self) -> None:
+        for bucket in self._buckets:
+            bucket.clear()
+
+
+event_scheduler_dict = {
+    "heap": HeapEventScheduler,
+    "calendar": CalendarEventScheduler,
+}
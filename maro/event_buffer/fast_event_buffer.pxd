@@ -0,0 +1,115 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+#cython: language_level=3
+#distutils: language = c++
+
+
+cdef class AbsEvent:
+    cdef:
+        public object id
+        public object tick
+        public object payload
+        public object event_type
+
+        # Used to link to next event in linked list.
+        public AbsEvent next_event
+
+        # Value of EventState.
+        int _state
+
+    cpdef void reset_value(self, object id, object tick, object event_type, object payload, int state)
+
+
+cdef class DummyEvent(AbsEvent):
+    pass
+
+
+cdef class ActualEvent(AbsEvent):
+    pass
+
+
+cdef class AtomEvent(ActualEvent):
+    pass
+
+
+cdef class CascadeEvent(ActualEvent):
+    cdef:
+        # Head & tail of immediate event list.
+        DummyEvent _immediate_event_head
+        ActualEvent _immediate_event_tail
+
+        int _immediate_event_count
+
+    cpdef void clear(self)
+
+    cpdef bint add_immediate_event(self, ActualEvent event, bint is_head=*)
+
+
+cdef class EventLinkedList:
+    cdef:
+        # Head & tail of events.
+        DummyEvent _head
+        AbsEvent _tail
+
+        int _count
+
+    cpdef void clear(self)
+
+    cpdef void append_tail(self, ActualEvent event)
+
+    cpdef void append(self, ActualEvent event)
+
+    cpdef void append_head(self, ActualEvent event)
+
+    cdef void _extract_sub_events(self, CascadeEvent event)
+
+    cdef void _clear_finished_events(self)
+
+    cpdef object clear_finished_and_get_front(self)
+
+    cpdef list pop_front_events_of_same_type(self)
+
+
+cdef class EventPool:
+    cdef:
+        list _atom_events
+        list _cascade_events
+
+        long long _event_count
+
+    cpdef ActualEvent gen(self, object tick, object event_type, object payload, bint is_cascade=*)
+
+    cpdef void recycle(self, object events)
+
+    cdef void _append(self, ActualEvent event)
+
+
+cdef class EventBuffer:
+    cdef:
+        # Scheduler of pending events, and its tick to event list mapping.
+        readonly object _pending_events
+        dict _event_lists
+
+        dict _handlers
+        dict _batch_handlers
+        object _handler_wrapper
+        readonly list _finished_events
+        readonly EventPool _event_pool
+
+        bint _disable_finished_events
+        bint _record_events
+        object _recorder
+        int _recorder_ep
+
+    cdef ActualEvent _load_event(self, object tick, tuple event)
+
+    cpdef AtomEvent gen_atom_event(self, object tick, object event_type, object payload=*)
+
+    cpdef CascadeEvent gen_cascade_event(self, object tick, object event_type, object payload)
+
+    cpdef void insert_event(self, ActualEvent event)
+
+    cpdef list execute(self, object tick)
+
+    cdef void _execute_batch(self, list events) except *
@@ -0,0 +1,702 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+#cython: language_level=3, always_allow_keywords=True
+#distutils: language = c++
+
+"""Compiled event buffer, a drop-in replacement of maro.event_buffer.EventBuffer.
+
+Events, event linked list and event pool are cdef classes with fixed fields, so the dispatching loop
+(clearing finished events, handler matching, state changing and recycling) runs without Python attribute lookup.
+"""
+
+from typing import Callable, List, Optional
+
+from maro.common import BaseAction, BaseDecisionEvent
+
+from .event_recorder import event_recorder_dict
+from .event_scheduler import event_scheduler_dict
+from .event_state import EventState
+from .maro_events import MaroEvents
+
+
+# Same values as EventState.
+cdef enum:
+    STATE_PENDING = 0
+    STATE_EXECUTING = 1
+    STATE_FINISHED = 2
+    STATE_RECYCLING = 3
+
+
+cdef object PENDING_DECISION = MaroEvents.PENDING_DECISION
+cdef object TAKE_ACTION = MaroEvents.TAKE_ACTION
+
+
+cdef class AbsEvent:
+    """Event with fixed fields, same interface as maro.event_buffer.AbsEvent.
+
+    Args:
+        id (int): Id of this event.
+        tick (int): Tick that this event will be processed.
+        event_type (object): Type of this event.
+        payload (object): Payload of this event.
+    """
+
+    def __init__(self, id: Optional[int], tick: Optional[int], event_type: object, payload: object) -> None:
+        self.id = id
+        self.tick = tick
+        self.payload = payload
+        self.event_type = event_type
+        self.next_event = None
+        self._state = STATE_PENDING
+
+    @property
+    def state(self) -> EventState:
+        """EventState: Internal life-circle state of event."""
+        return EventState(self._state)
+
+    @state.setter
+    def state(self, value: EventState) -> None:
+        self._state = value
+
+    cpdef void reset_value(self, object id, object tick, object event_type, object payload, int state):
+        self.id = id
+        self.tick = tick
+        self.event_type = event_type
+        self.payload = payload
+        self._state = state
+
+
+cdef class DummyEvent(AbsEvent):
+    def __init__(self) -> None:
+        super().__init__(None, None, None, None)
+
+
+cdef class ActualEvent(AbsEvent):
+    pass
+
+
+cdef class AtomEvent(ActualEvent):
+    """Basic atom event without any additional functions or attributes."""
+    pass
+
+
+cdef class CascadeEvent(ActualEvent):
+    """Event that support add immediate events (or sub events), these events will be execute right after its parent."""
+
+    def __init__(self, id: Optional[int], tick: Optional[int], event_type: object, payload: object) -> None:
+        super().__init__(id, tick, event_type, payload)
+
+        self._immediate_event_head = DummyEvent()
+        self._immediate_event_tail = None
+        self._immediate_event_count = 0
+
+    @property
+    def immediate_event_count(self) -> int:
+        return self._immediate_event_count
+
+    @property
+    def immediate_event_head(self) -> DummyEvent:
+        return self._immediate_event_head
+
+    @property
+    def immediate_event_tail(self) -> Optional[ActualEvent]:
+        return self._immediate_event_tail
+
+    cpdef void clear(self):
+        self._immediate_event_head.next_event = None
+        self._immediate_event_tail = None
+        self._immediate_event_count = 0
+
+    cpdef bint add_immediate_event(self, ActualEvent event, bint is_head=False):
+        """Add an immediate event, that will be processed right after the current event.
+
+        Args:
+            event (ActualEvent): Event object to insert, its tick must be the same as the current event.
+            is_head (bool): Whether to insert at the head or append to the end.
+
+        Returns:
+            bool: True if success, or False.
+        """
+        if event.tick != self.tick:
+            return False
+
+        if self._immediate_event_count == 0:
+            self._immediate_event_head.next_event = event
+            self._immediate_event_tail = event
+        elif is_head:
+            assert event.next_event is None, "Follow-up events are unacceptable when inserting the event into the head"
+            event.next_event = self._immediate_event_head.next_event
+            self._immediate_event_head.next_event = event
+        else:
+            self._immediate_event_tail.next_event = event
+            self._immediate_event_tail = event
+
+        self._immediate_event_count += 1
+
+        return True
+
+
+cdef class EventLinkedList:
+    """Event linked list of compiled events, same interface as maro.event_buffer.event_linked_list.EventLinkedList."""
+
+    def __init__(self) -> None:
+        self._head = DummyEvent()
+        self._tail = self._head
+        self._count = 0
+
+    cpdef void clear(self):
+        self._head.next_event = None
+        self._tail = self._head
+        self._count = 0
+
+    cpdef void append_tail(self, ActualEvent event):
+        self._tail.next_event = event
+        self._tail = event
+        self._count += 1
+
+    cpdef void append(self, ActualEvent event):
+        self.append_tail(event)
+
+    cpdef void append_head(self, ActualEvent event):
+        if self._count == 0:
+            self.append_tail(event)
+        else:
+            event.next_event = self._head.next_event
+            self._head.next_event = event
+            self._count += 1
+
+    cdef void _extract_sub_events(self, CascadeEvent event):
+        event._immediate_event_tail.next_event = self._head.next_event
+
+        # Immediate events are the only ones if current list is empty, so the last one is new tail.
+        if self._tail is self._head:
+            self._tail = event._immediate_event_tail
+
+        self._head.next_event = event._immediate_event_head.next_event
+        self._count += event._immediate_event_count
+        event.clear()
+
+    cdef void _clear_finished_events(self):
+        cdef AbsEvent event = self._head.next_event
+
+        while event is not None and (event._state == STATE_FINISHED or event._state == STATE_RECYCLING):
+            self._head.next_event = event.next_event
+            self._count -= 1
+
+            # Removed the last one, or new events will be appended to the removed one.
+            if event is self._tail:
+                self._tail = self._head
+
+            if isinstance(event, CascadeEvent) and (<CascadeEvent>event)._immediate_event_count != 0:
+                self._extract_sub_events(<CascadeEvent>event)
+
+            event = self._head.next_event
+
+    cpdef object clear_finished_and_get_front(self):
+        """Clear all finished events in the head of the list and then get the first event that is not finished.
+
+        Returns:
+            Union[Event, EventList]: A list of decision events if current event is a decision event, or an AtomEvent.
+        """
+        self._clear_finished_events()
+
+        cdef AbsEvent event = self._head.next_event
+
+        if event is None:
+            return None
+
+        if event._state == STATE_EXECUTING or event.event_type is not PENDING_DECISION:
+            return event
+
+        cdef list decision_events = []
+
+        while event is not None and event.event_type is PENDING_DECISION:
+            decision_events.append(event)
+            event = event.next_event
+
+        return decision_events
+
+    cpdef list pop_front_events_of_same_type(self):
+        """Remove the pending atom events at the head of the list that have same type as the first one.
+
+        Returns:
+            List[AtomEvent]: Removed events in list order, empty if the first event is not a pending atom event.
+        """
+        cdef list events = []
+        cdef AbsEvent event = self._head.next_event
+        cdef object event_type = None if event is None else event.event_type
+
+        while (
+            event is not None
+            and isinstance(event, AtomEvent)
+            and event._state == STATE_PENDING
+            and event.event_type == event_type
+        ):
+            events.append(event)
+            self._count -= 1
+
+            if event is self._tail:
+                self._tail = self._head
+
+            event = event.next_event
+
+        self._head.next_event = event
+
+        return events
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        cdef AbsEvent event = self._head.next_event
+
+        while event is not None:
+            yield event
+
+            event = event.next_event
+
+
+cdef class EventPool:
+    """Event pool used to generate and pool compiled event objects."""
+
+    def __init__(self):
+        self._atom_events = []
+        self._cascade_events = []
+        self._event_count = 0
+
+    @property
+    def atom_event_count(self) -> int:
+        return len(self._atom_events)
+
+    @property
+    def cascade_event_count(self) -> int:
+        return len(self._cascade_events)
+
+    cpdef ActualEvent gen(self, object tick, object event_type, object payload, bint is_cascade=False):
+        """Generate an event.
+
+        Args:
+            tick (int): Tick of the event will be trigger.
+            event_type (object): Type of new event.
+            payload (object): Payload attached to this event.
+            is_cascade (bool): Is the new event is cascade event.
+
+        Returns:
+            Event: AtomEvent or CascadeEvent instance.
+        """
+        cdef ActualEvent event
+
+        if is_cascade:
+            event = self._cascade_events.pop() if len(self._cascade_events) > 0 else CascadeEvent(None, None, None, None)
+        else:
+            event = self._atom_events.pop() if len(self._atom_events) > 0 else AtomEvent(None, None, None, None)
+
+        event.id = self._event_count
+        event.tick = tick
+        event.event_type = event_type
+        event.payload = payload
+        event._state = STATE_PENDING
+
+        self._event_count += 1
+
+        return event
+
+    cpdef void recycle(self, object events):
+        """Recycle specified event for further using.
+
+        Args:
+            events (Union[Event, EventList]): Event object(s) to recycle.
+        """
+        cdef AbsEvent event
+        cdef AbsEvent next_event
+
+        if isinstance(events, ActualEvent):
+            self._append(<ActualEvent>events)
+        elif isinstance(events, EventLinkedList):
+            # Get next one before recycling, as recycling breaks the link.
+            event = (<EventLinkedList>events)._head.next_event
+
+            while event is not None:
+                next_event = event.next_event
+
+                self._append(<ActualEvent>event)
+
+                event = next_event
+        else:
+            for event in events:
+                self._append(<ActualEvent>event)
+
+    cdef void _append(self, ActualEvent event):
+        event.payload = None
+        event.next_event = None
+        event._state = STATE_RECYCLING
+
+        if isinstance(event, CascadeEvent):
+            (<CascadeEvent>event).clear()
+
+            self._cascade_events.append(event)
+        else:
+            self._atom_events.append(event)
+
+
+cdef tuple _dump_event(ActualEvent event):
+    cdef list immediate_events = []
+    cdef AbsEvent immediate_event
+
+    if isinstance(event, CascadeEvent):
+        immediate_event = (<CascadeEvent>event)._immediate_event_head.next_event
+
+        for _ in range((<CascadeEvent>event)._immediate_event_count):
+            immediate_events.append(_dump_event(<ActualEvent>immediate_event))
+
+            immediate_event = immediate_event.next_event
+
+    return isinstance(event, CascadeEvent), event.id, event.event_type, event.payload, event.state, immediate_events
+
+
+cdef class EventBuffer:
+    """Compiled EventBuffer, it has same interface and behavior as maro.event_buffer.EventBuffer,
+    but events generated by it are compiled ones from this module.
+
+    Args:
+        disable_finished_events (bool): Is disable the method to get finished event list,
+            events will be recycled after processing.
+        record_events (bool): If record finished events into file.
+        record_path (str): Where to save the recording file.
+        scheduler (str): Name of scheduler to hold pending events, "heap" (binary heap) or "calendar"
+            (calendar queue). Defaults to "heap".
+        record_format (str): Format of recording file, "csv" or "binary". Defaults to "csv".
+    """
+
+    def __init__(
+        self,
+        disable_finished_events: bool = False,
+        record_events: bool = False,
+        record_path: str = None,
+        scheduler: str = "heap",
+        record_format: str = "csv",
+    ):
+        if scheduler not in event_scheduler_dict:
+            raise ValueError(f"Invalid event scheduler: {scheduler}, it should be 'heap' or 'calendar'.")
+
+        if record_format not in event_recorder_dict:
+            raise ValueError(f"Invalid event record format: {record_format}, it should be 'csv' or 'binary'.")
+
+        self._pending_events = event_scheduler_dict[scheduler](EventLinkedList)
+
+        # Scheduler never replaces its tick to list mapping, we refer it to get the list of tick without calling.
+        self._event_lists = self._pending_events._event_lists
+
+        self._handlers = {}
+        self._batch_handlers = {}
+        self._handler_wrapper = None
+        self._finished_events = []
+        self._event_pool = EventPool()
+        self._disable_finished_events = disable_finished_events
+        self._record_events = record_events
+        self._recorder = None
+        self._recorder_ep = 0
+
+        if self._record_events:
+            if record_path is None:
+                raise ValueError("Invalid path to save finished events.")
+            self._recorder = event_recorder_dict[record_format](record_path)
+
+    def get_finished_events(self) -> List[ActualEvent]:
+        """Get all the processed events, call this function before reset method.
+
+        Returns:
+            EventList: List of event object.
+        """
+        return self._finished_events
+
+    def get_pending_events(self, tick: int) -> List[ActualEvent]:
+        """Get pending event at specified tick.
+
+        Args:
+            tick (int): tick of events to get.
+
+        Returns:
+            EventList: List of event object.
+        """
+        event_list = self._event_lists.get(tick, None)
+
+        return [] if event_list is None else [evt for evt in event_list if evt is not None]
+
+    def reset(self) -> None:
+        """Reset internal states, this method will clear all events."""
+        self._event_pool.recycle(self._finished_events)
+        self._finished_events.clear()
+
+        for pending_pool in self._pending_events.clear():
+            self._event_pool.recycle(pending_pool)
+            pending_pool.clear()
+
+        if self._record_events:
+            self._recorder_ep += 1
+
+    def get_next_event_tick(self, tick: int) -> Optional[int]:
+        """Get the nearest tick after specified tick that has pending events.
+
+        Args:
+            tick (int): Tick to search from, exclusive.
+
+        Returns:
+            Optional[int]: Tick with pending events, or None if there is no pending events after specified tick.
+        """
+        return self._pending_events.next_tick(tick)
+
+    def get_state(self) -> dict:
+        """Get pending events in a plain structure, used to restore pending events later.
+
+        Returns:
+            dict: Key is tick, value is a list of pending events, each event is a tuple of
+                (is cascade, id, event type, payload, state, immediate events).
+        """
+        return {
+            tick: [_dump_event(event) for event in event_list]
+            for tick, event_list in self._pending_events.items()
+            if len(event_list) > 0
+        }
+
+    def set_state(self, state: dict) -> None:
+        """Replace pending events with the ones from get_state method.
+
+        Args:
+            state (dict): Pending events from get_state method.
+        """
+        self._event_pool.recycle(self._finished_events)
+        self._finished_events.clear()
+
+        for pending_pool in self._pending_events.clear():
+            self._event_pool.recycle(pending_pool)
+            pending_pool.clear()
+
+        for tick, events in state.items():
+            event_list = self._pending_events.get_or_create(tick)
+
+            for event in events:
+                event_list.append(self._load_event(tick, event))
+
+    cdef ActualEvent _load_event(self, object tick, tuple event):
+        is_cascade, id, event_type, payload, state, immediate_events = event
+
+        cdef ActualEvent new_event = self._event_pool.gen(tick, event_type, payload, is_cascade)
+        new_event.reset_value(id, tick, event_type, payload, state)
+
+        if is_cascade:
+            for immediate_event in immediate_events:
+                (<CascadeEvent>new_event).add_immediate_event(self._load_event(tick, immediate_event))
+
+        return new_event
+
+    cpdef AtomEvent gen_atom_event(self, object tick, object event_type, object payload=None):
+        """Generate an atom event, an atom event is for normal usages,
+        they will not stop current event dispatching process.
+
+        Args:
+            tick (int): Tick that the event will be processed.
+            event_type (object): Type of this event.
+            payload (object): Payload of event, used to pass data to handlers.
+
+        Returns:
+            AtomEvent: Atom event object
+        """
+        return <AtomEvent>self._event_pool.gen(tick, event_type, payload, False)
+
+    cpdef CascadeEvent gen_cascade_event(self, object tick, object event_type, object payload):
+        """Generate an cascade event that used to hold immediate events that run right after current event.
+
+        Args:
+            tick (int): Tick that the event will be processed.
+            event_type (object): Type of this event.
+            payload (object): Payload of event, used to pass data to handlers.
+
+        Returns:
+            CascadeEvent: Cascade event object.
+        """
+        return <CascadeEvent>self._event_pool.gen(tick, event_type, payload, True)
+
+    def gen_decision_event(self, tick: int, payload: BaseDecisionEvent) -> CascadeEvent:
+        """Generate a decision event that will stop current simulation, and ask agent for action.
+
+        Args:
+            tick (int): Tick that the event will be processed.
+            payload (BaseDecisionEvent): Payload of event, used to pass data to handlers.
+        Returns:
+            CascadeEvent: Event object
+        """
+        assert isinstance(payload, BaseDecisionEvent)
+        return self.gen_cascade_event(tick, PENDING_DECISION, payload)
+
+    def gen_action_event(self, tick: int, payloads: List[BaseAction]) -> CascadeEvent:
+        """Generate an event that used to dispatch action to business engine.
+
+        Args:
+            tick (int): Tick that the event will be processed.
+            payloads (List[BaseAction]): Payloads of event, used to pass data to handlers.
+        Returns:
+            CascadeEvent: Event object
+        """
+        assert isinstance(payloads, list)
+        assert all(isinstance(p, BaseAction) for p in payloads)
+        return self.gen_cascade_event(tick, TAKE_ACTION, payloads)
+
+    def register_event_handler(self, event_type: object, handler: Callable) -> None:
+        """Register an event with handler.
+
+        Args:
+            event_type (object): Type of event that the handler want to process.
+            handler (Callable): Handler that will process the event.
+        """
+        if self._handler_wrapper is not None:
+            handler = self._handler_wrapper(event_type, handler, False)
+
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    def register_batch_event_handler(self, event_type: object, handler: Callable) -> None:
+        """Register a handler that processes consecutive pending atom events of specified type in batch.
+
+        Args:
+            event_type (object): Type of event that the handler want to process.
+            handler (Callable): Handler that will process the list of events.
+        """
+        if self._handler_wrapper is not None:
+            handler = self._handler_wrapper(event_type, handler, True)
+
+        self._batch_handlers.setdefault(event_type, []).append(handler)
+
+    def set_handler_wrapper(self, wrapper: Callable) -> None:
+        """Wrap registered and following registered handlers.
+
+        Args:
+            wrapper (Callable): Function that accepts event type, handler and is batch handler or not,
+                and returns a handler with same parameter.
+        """
+        assert self._handler_wrapper is None, "Handler wrapper can only be set once."
+
+        self._handler_wrapper = wrapper
+
+        for event_type, handlers in self._handlers.items():
+            handlers[:] = [wrapper(event_type, handler, False) for handler in handlers]
+
+        for event_type, handlers in self._batch_handlers.items():
+            handlers[:] = [wrapper(event_type, handler, True) for handler in handlers]
+
+    cpdef void insert_event(self, ActualEvent event):
+        """Insert an event to the pending queue.
+
+        Args:
+            event (Event): Event to insert, usually get event object from get_atom_event or get_cascade_event.
+        """
+        cdef EventLinkedList event_list = self._event_lists.get(event.tick, None)
+
+        if event_list is None:
+            event_list = self._pending_events.get_or_create(event.tick)
+
+        event_list.append_tail(event)
+
+    cpdef list execute(self, object tick):
+        """Process and dispatch event by tick.
+
+        NOTE:
+            The executing process will be stopped if there is any cascade event,
+            and all following cascade events will be returned,
+            so should check if the return list is empty before step to next tick.
+
+        Args:
+            tick (int): Tick used to process events.
+
+        Returns:
+            EventList: A list of events that are pending decisions at the current tick.
+        """
+        cdef EventLinkedList cur_events_list = self._event_lists.get(tick, None)
+        cdef ActualEvent finished_event = None
+        cdef ActualEvent event
+        cdef object next_events
+        cdef list handlers
+
+        if cur_events_list is None:
+            return []
+
+        while cur_events_list._count > 0:
+            next_events = cur_events_list.clear_finished_and_get_front()
+
+            # Finished event is recycled after it is removed from the list, as recycling breaks its link.
+            if finished_event is not None:
+                self._event_pool._append(finished_event)
+                finished_event = None
+
+            if next_events is None:
+                break
+
+            # Only decision event is a list (even only one item).
+            if type(next_events) is list:
+                return <list>next_events
+
+            event = <ActualEvent>next_events
+
+            if (
+                len(self._batch_handlers) > 0
+                and isinstance(event, AtomEvent)
+                and event._state == STATE_PENDING
+                and event.event_type in self._batch_handlers
+            ):
+                self._execute_batch(cur_events_list.pop_front_events_of_same_type())
+
+                continue
+
+            event._state = STATE_EXECUTING
+
+            if event.event_type:
+                handlers = self._handlers.get(event.event_type, None)
+
+                if handlers is not None:
+                    for handler in handlers:
+                        handler(event)
+
+            event._state = STATE_FINISHED
+
+            if self._disable_finished_events:
+                finished_event = event
+            else:
+                self._finished_events.append(event)
+
+            if self._record_events:
+                self._recorder.record(self._recorder_ep, event.tick, event.event_type, event.payload)
+
+        # All events of current tick are processed.
+        self._pending_events.prune(tick)
+
+        return []
+
+    cdef void _execute_batch(self, list events) except *:
+        cdef object event_type = (<ActualEvent>events[0]).event_type
+        cdef list handlers = self._handlers.get(event_type, None)
+        cdef ActualEvent event
+
+        for event in events:
+            event._state = STATE_EXECUTING
+
+        for handler in self._batch_handlers[event_type]:
+            handler(events)
+
+        if handlers is not None:
+            for event in events:
+                for handler in handlers:
+                    handler(event)
+
+        for event in events:
+            event._state = STATE_FINISHED
+
+        if self._record_events:
+            for event in events:
+                self._recorder.record(self._recorder_ep, event.tick, event.event_type, event.payload)
+
+        if self._disable_finished_events:
+            # Events are not in the list any more, so they can be recycled at once.
+            for event in events:
+                self._event_pool._append(event)
+        else:
+            self._finished_events.extend(events)
@@ -1,20 +1,42 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import copy
+import os
+from collections import namedtuple
 from importlib import import_module
-from inspect import getmembers, isclass
-from typing import Generator, List, Optional, Tuple, Union, cast
+from inspect import GEN_CREATED, getgeneratorstate, getmembers, isclass
+from time import perf_counter_ns
+from typing import Callable, Dict, Generator, List, Optional, Tuple, Union, cast
 
 from maro.backends.frame import FrameBase, SnapshotList
 from maro.data_lib.dump_csv_converter import DumpConverter
 from maro.event_buffer import ActualEvent, CascadeEvent, EventBuffer, EventState
+from maro.event_buffer.fast_event_buffer import EventBuffer as FastEventBuffer
 from maro.streamit import streamit
-from maro.utils.exception.simulator_exception import BusinessEngineNotFoundError
+from maro.utils.exception.simulator_exception import (
+    BusinessEngineNotFoundError,
+    EnvRunNotAllowedError,
+    EnvStateNotSavableError,
+)
 
 from ..common import BaseAction, BaseDecisionEvent
 from .abs_core import AbsEnv, DecisionMode
 from .scenarios.abs_business_engine import AbsBusinessEngine
+from .scenarios.helpers import LazyMetrics
 from .utils.common import tick_to_frame_index
+from .utils.profiler import EnvProfiler
+
+EnvState = namedtuple(
+    "EnvState",
+    [
+        "tick",
+        "is_started",
+        "decision_payload_number",
+        "frame_state",
+        "python_state",
+    ],
+)
 
 
 class Env(AbsEnv):
@@ -34,9 +56,20 @@ class Env(AbsEnv):
             or search internally by scenario.
         disable_finished_events (bool): Disable finished events list, with this set to True, EventBuffer will
             re-use finished event object, this reduce event object number.
-        record_finished_events (bool): If record finished events into csv file, default is False.
+        record_finished_events (bool): If record finished events into file, default is False.
         record_file_path (str): Where to save the recording file, only work if record_finished_events is True.
-        options (dict): Additional parameters passed to business engine.
+        options (dict): Additional parameters passed to business engine. "enable-profiling" (or environment
+            variable ENABLE_ENV_PROFILING=true) enables the profiler of simulation phases and event handlers,
+            "profiling-trace-ticks" is the range of ticks [start, end) to keep trace events for profiler.
+        skip_inactive_ticks (bool): Jump to the next tick that business engine reports as active or has pending
+            events, instead of stepping each tick. Business engine that does not report active ticks
+            will be stepped at each tick. Defaults to False.
+        event_scheduler (str): Scheduler of event buffer to hold pending events, "heap" (binary heap) or
+            "calendar" (calendar queue). Defaults to "heap".
+        fast_event_buffer (bool): Use the compiled event buffer (maro.event_buffer.fast_event_buffer), events
+            passed to business engine will be compiled ones with same interface. Defaults to False.
+        record_format (str): Format of the recording file, "csv", or "binary" that records the summary fields
+            of payloads with a background thread. Defaults to "csv".
     """
 
     def __init__(
@@ -53,6 +86,10 @@ class Env(AbsEnv):
         record_finished_events: bool = False,
         record_file_path: str = None,
         options: Optional[dict] = None,
+        skip_inactive_ticks: bool = False,
+        event_scheduler: str = "heap",
+        fast_event_buffer: bool = False,
+        record_format: str = "csv",
     ) -> None:
         super().__init__(
             scenario,
@@ -71,7 +108,17 @@ class Env(AbsEnv):
             f"{self._scenario}:{self._topology}" if business_engine_cls is None else business_engine_cls.__name__
         )
 
-        self._event_buffer = EventBuffer(disable_finished_events, record_finished_events, record_file_path)
+        event_buffer_cls = FastEventBuffer if fast_event_buffer else EventBuffer
+
+        self._event_buffer = event_buffer_cls(
+            disable_finished_events,
+            record_finished_events,
+            record_file_path,
+            event_scheduler,
+            record_format,
+        )
+
+        self._skip_inactive_ticks = skip_inactive_ticks
 
         # decision_payloads array for dump.
         self._decision_payloads = []
@@ -79,9 +126,18 @@ class Env(AbsEnv):
         # The generator used to push the simulator forward.
         self._simulate_generator = self._simulate()
 
+        # Is business engine stepped at current tick before run method stops at max decisions.
+        self._is_resuming = False
+
         # Initialize the business engine.
         self._init_business_engine()
 
+        self._profiler: Optional[EnvProfiler] = None
+
+        if self._additional_options.get("enable-profiling", False) or os.environ.get("ENABLE_ENV_PROFILING") == "true":
+            self._profiler = EnvProfiler(trace_ticks=self._additional_options.get("profiling-trace-ticks", None))
+            self._event_buffer.set_handler_wrapper(self._profiler.wrap_handler)
+
         if "enable-dump-snapshot" in self._additional_options:
             parent_path = self._additional_options["enable-dump-snapshot"]
             self._converter = DumpConverter(parent_path, self._business_engine.scenario_name)
@@ -89,6 +145,8 @@ class Env(AbsEnv):
 
         self._streamit_episode = 0
 
+        self._is_done = False
+
     def step(
         self,
         action: Union[BaseAction, List[BaseAction], None] = None,
@@ -132,6 +190,63 @@ class Env(AbsEnv):
 
         return metrics, decision_payloads, _is_done
 
+    def run(
+        self,
+        policy_fn: Callable[[Union[BaseDecisionEvent, List[BaseDecisionEvent]]], Union[BaseAction, List, None]],
+        max_decisions: Optional[int] = None,
+        batch_decisions: bool = False,
+    ) -> Optional[dict]:
+        """Run current episode with actions from a policy function, without going through step method.
+
+        Policy function is called at each decision event, and its result is assigned to the decision event in the
+        same way as the action passed to step method. Under Joint mode, if batch_decisions is True, it is called
+        with the list of all decision events of a decision point, and should return a list of actions like step
+        method. Metrics are not provided at decision points, they can be got from metrics property.
+
+        NOTE:
+            It can only be called before the first step of an episode, or after it stops at max decisions. After
+            stopping at max decisions, the episode can be continued by calling it again, or by step method
+            from step(None) as a new episode.
+
+        Examples:
+
+            .. code-block:: python
+
+                def first_fit(decision_event: DecisionEvent) -> Action:
+                    if len(decision_event.valid_pms) == 0:
+                        return PostponeAction(vm_id=decision_event.vm_id, postpone_step=1)
+
+                    return AllocateAction(vm_id=decision_event.vm_id, pm_id=decision_event.valid_pms[0])
+
+                metrics = env.run(first_fit)
+
+        Args:
+            policy_fn (Callable): Function that takes a decision event (or list of decision events if batched)
+                and returns action(s).
+            max_decisions (int): Stop before the decision event after this number of decisions, None means running
+                to the end of episode. Defaults to None.
+            batch_decisions (bool): Call policy function with all decision events of a decision point under Joint
+                mode. Defaults to False.
+
+        Returns:
+            dict: Metrics of business engine when the episode finishes or stops at max decisions.
+        """
+        if getgeneratorstate(self._simulate_generator) != GEN_CREATED:
+            raise EnvRunNotAllowedError()
+
+        is_resuming = self._is_resuming
+        self._is_resuming = False
+
+        if self._run(policy_fn, max_decisions, batch_decisions, is_resuming):
+            # No more decision events for step method.
+            self._simulate_generator.close()
+        else:
+            # Pending decision events will be processed again, as their actions are not assigned.
+            self._simulate_generator = self._simulate(is_resuming=True)
+            self._is_resuming = True
+
+        return self._business_engine.get_metrics()
+
     def dump(self) -> None:
         """Dump environment for restore.
 
@@ -140,6 +255,102 @@ class Env(AbsEnv):
         """
         return
 
+    def save_state(self) -> EnvState:
+        """Save current state of environment, used to branch from current tick without re-simulating from the start.
+
+        Frame states and snapshots are copied in memory block level, pending events and Python side states of
+        business engine are deep copied.
+
+        NOTE:
+            State can be saved before the first step, or at a decision point (after getting a decision event
+            from step method), it cannot be saved after the episode finished.
+
+        Examples:
+
+            .. code-block:: python
+
+                metrics, decision_event, is_done = env.step(None)
+
+                state = env.save_state()
+
+                for action in candidate_actions:
+                    # Continue from the same decision event for each candidate action.
+                    metrics, decision_event, is_done = env.restore_state(state)
+
+                    while not is_done:
+                        metrics, decision_event, is_done = env.step(action)
+
+                        action = None
+
+        Returns:
+            EnvState: State of environment, it can be restored for several times.
+        """
+        is_started = getgeneratorstate(self._simulate_generator) != GEN_CREATED or self._is_resuming
+
+        if is_started and self._is_done:
+            raise EnvStateNotSavableError()
+
+        be_state = self._business_engine.get_state()
+
+        python_state = copy.deepcopy(
+            (be_state, self._event_buffer.get_state()),
+            self._get_state_copy_memo(be_state),
+        )
+
+        return EnvState(
+            self._tick,
+            is_started,
+            len(self._decision_payloads),
+            self._business_engine.frame.save_state(),
+            python_state,
+        )
+
+    def restore_state(
+        self,
+        state: EnvState,
+    ) -> Tuple[Optional[dict], Union[BaseDecisionEvent, List[BaseDecisionEvent], None], bool]:
+        """Restore environment to a saved state, current episode will continue from the saved point.
+
+        NOTE:
+            Data sequence of business engine is not a part of state, so the state should be restored in
+            the same episode, or after reset with keep_seed set to True.
+
+        Args:
+            state (EnvState): State from save_state method.
+
+        Returns:
+            tuple: a tuple of (metrics, decision event, is_done) same as the one when saving,
+                metrics and decision event are None if it is saved before the first step.
+        """
+        self._simulate_generator.close()
+
+        self._business_engine.frame.restore_state(state.frame_state)
+
+        # Copy again, so that the saved state is not changed by following simulation.
+        be_state, events_state = copy.deepcopy(state.python_state, self._get_state_copy_memo({}))
+
+        self._event_buffer.set_state(events_state)
+        # Business engine had been stepped at saved tick if simulation started.
+        self._business_engine.set_state(be_state, state.tick + 1 if state.is_started else state.tick)
+
+        self._tick = state.tick
+        self._is_done = False
+        self._is_resuming = False
+
+        del self._decision_payloads[state.decision_payload_number :]
+
+        self._simulate_generator = self._simulate(is_resuming=state.is_started)
+
+        if not state.is_started:
+            return None, None, False
+
+        # Pending decision events will be yielded again, as their actions are not assigned.
+        result = next(self._simulate_generator)
+
+        del self._decision_payloads[state.decision_payload_number :]
+
+        return result
+
     def reset(self, keep_seed: bool = False) -> None:
         """Reset environment.
 
@@ -150,6 +361,7 @@ class Env(AbsEnv):
 
         self._simulate_generator.close()
         self._simulate_generator = self._simulate()
+        self._is_resuming = False
 
         self._event_buffer.reset()
 
@@ -167,6 +379,8 @@ class Env(AbsEnv):
 
         self._decision_payloads.clear()
 
+        self._is_done = False
+
         self._business_engine.reset(keep_seed)
 
     @property
@@ -250,6 +464,31 @@ class Env(AbsEnv):
         """
         return self._event_buffer.get_pending_events(tick)
 
+    def profile_summary(self) -> Dict[str, dict]:
+        """Get call count and latency of each simulation phase and event handler, profiling should be enabled
+        with "enable-profiling" option or environment variable ENABLE_ENV_PROFILING=true.
+
+        Phases include business_engine.step, event_buffer.execute (including handlers), take_snapshot
+        (before decision events), get_metrics, business_engine.post_step, and agent (time between yielding
+        decision events and receiving actions). Each event handler is named as "handler:{event type}:{handler name}".
+
+        Returns:
+            Dict[str, dict]: Key is name of phase or handler, value contains call count, total time in milliseconds,
+                mean, p50, p90, p99 and max latency in microseconds, sorted by total time.
+        """
+        return {} if self._profiler is None else self._profiler.summary()
+
+    def dump_profile_trace(self, path: str) -> None:
+        """Dump calls of phases and handlers in ticks of "profiling-trace-ticks" option into a Chrome trace-event
+        json file, which can be loaded by chrome://tracing or Perfetto. Each episode is shown as a process.
+
+        Args:
+            path (str): Path of json file.
+        """
+        assert self._profiler is not None, "Profiling is not enabled."
+
+        self._profiler.dump_trace(path)
+
     def get_ticks_frame_index_mapping(self) -> dict:
         """Helper method to get current available ticks to related frame index mapping.
 
@@ -298,6 +537,30 @@ class Env(AbsEnv):
             additional_options=self._additional_options,
         )
 
+    def _get_state_copy_memo(self, be_state: dict) -> dict:
+        """Memo for copying states, objects referred by business engine but not included in state are shared."""
+        memo = {id(value): value for value in vars(self._business_engine).values()}
+
+        for value in be_state.values():
+            memo.pop(id(value), None)
+
+        memo[id(self._business_engine)] = self._business_engine
+        memo[id(self._event_buffer)] = self._event_buffer
+
+        return memo
+
+    def _get_next_tick(self) -> int:
+        """Get next tick to simulate, ticks that neither active for business engine nor have pending events
+        are skipped, as frame will not be changed in them."""
+        next_tick = self._business_engine.get_next_active_tick(self._tick)
+        next_event_tick = self._event_buffer.get_next_event_tick(self._tick)
+
+        if next_event_tick is not None:
+            next_tick = min(next_tick, next_event_tick)
+
+        # Last tick is always simulated, so that business engine can end the episode.
+        return max(self._tick + 1, min(next_tick, self._start_tick + self._durations - 1))
+
     def _assign_action(
         self,
         action: Union[BaseAction, List[BaseAction], None],
@@ -314,68 +577,199 @@ class Env(AbsEnv):
 
         decision_event.add_immediate_event(self._event_buffer.gen_action_event(self._tick, actions), is_head=True)
 
-    def _simulate(
-        self,
-    ) -> Generator[
-        Tuple[dict, Union[BaseDecisionEvent, List[BaseDecisionEvent]], bool],
-        Union[BaseAction, List[BaseAction], None],
-        None,
-    ]:
-        """This is the generator to wrap each episode process."""
+    def _get_phase_functions(self) -> Tuple[Callable, Callable, Callable, Callable, Callable]:
+        """Get business engine step, post step, event buffer execute, take snapshot and get metrics functions,
+        they are wrapped if profiling is enabled."""
+        be_step = self._business_engine.step
+        be_post_step = self._business_engine.post_step
+        execute = self._event_buffer.execute
+        take_snapshot = self._business_engine.frame.take_snapshot
+        get_metrics = self._business_engine.get_metrics
+
+        profiler = self._profiler
+
+        if profiler is not None:
+            be_step = profiler.wrap("business_engine.step", be_step)
+            be_post_step = profiler.wrap("business_engine.post_step", be_post_step)
+            execute = profiler.wrap("event_buffer.execute", execute)
+            take_snapshot = profiler.wrap("take_snapshot", take_snapshot)
+            get_metrics = profiler.wrap("get_metrics", get_metrics)
+
+        return be_step, be_post_step, execute, take_snapshot, get_metrics
+
+    def _start_episode(self) -> None:
         self._streamit_episode += 1
 
         streamit.episode(self._streamit_episode)
 
+        if self._profiler is not None:
+            self._profiler.new_episode()
+
+    def _process_ticks(self, is_resuming: bool) -> Generator[List[CascadeEvent], Optional[list], None]:
+        """Process ticks of current episode, shared by _simulate generator and _run.
+
+        It yields decision events of each decision point after taking snapshot, only the first one under Sequential
+        mode, and assigns the list of actions sent back to them in order.
+
+        Args:
+            is_resuming (bool): Is resuming from a restored state, business engine had been stepped at current tick,
+                so it will continue to process pending events of current tick.
+        """
+        profiler = self._profiler
+        be_step, be_post_step, execute, take_snapshot, _ = self._get_phase_functions()
+
+        if not is_resuming:
+            self._start_episode()
+
         while True:
-            # Ask business engine to do thing for this tick, such as generating and pushing events.
-            # We do not push events now.
-            streamit.tick(self._tick)
+            if profiler is not None:
+                profiler.set_tick(self._tick)
 
-            self._business_engine.step(self._tick)
+            if is_resuming:
+                is_resuming = False
+            else:
+                # Ask business engine to do thing for this tick, such as generating and pushing events.
+                # We do not push events now.
+                streamit.tick(self._tick)
+
+                be_step(self._tick)
 
             while True:
                 # Keep processing events, until no more events in this tick.
-                pending_events = cast(List[CascadeEvent], self._event_buffer.execute(self._tick))
+                pending_events = cast(List[CascadeEvent], execute(self._tick))
 
                 if len(pending_events) == 0:
                     # We have processed all the event of current tick, lets go for next tick.
                     break
 
                 # Insert snapshot before each action.
-                self._business_engine.frame.take_snapshot(self.frame_index)
-
-                # Append source event id to decision events, to support sequential action in joint mode.
-                decision_payloads = [event.payload for event in pending_events]
+                take_snapshot(self.frame_index)
 
                 if self._decision_mode == DecisionMode.Sequential:
-                    self._decision_payloads.append(decision_payloads[0])
-                    action = yield self._business_engine.get_metrics(), decision_payloads[0], False
-                    self._assign_action(action, pending_events[0])
-                else:
-                    self._decision_payloads += decision_payloads
-                    actions = yield self._business_engine.get_metrics(), decision_payloads, False
-                    if actions is None:
-                        actions = []
-                    assert isinstance(actions, list)
+                    # Only the first decision event is processed, following ones are pending.
+                    pending_events = pending_events[:1]
+
+                actions = yield pending_events
 
-                    for action, event in zip(actions, pending_events):
-                        self._assign_action(action, event)
+                for action, event in zip(actions, pending_events):
+                    self._assign_action(action, event)
 
-                    if self._decision_mode == DecisionMode.Joint:
-                        for event in pending_events[len(actions) :]:
-                            event.state = EventState.FINISHED
+                if self._decision_mode == DecisionMode.Joint:
+                    for event in pending_events[len(actions) :]:
+                        event.state = EventState.FINISHED
 
             # Check the end tick of the simulation to decide if we should end the simulation.
-            is_end_tick = self._business_engine.post_step(self._tick)
+            is_end_tick = be_post_step(self._tick)
 
             if is_end_tick:
                 break
 
-            self._tick += 1
+            self._tick = self._get_next_tick() if self._skip_inactive_ticks else self._tick + 1
 
         # Make sure we have no missing data.
         if (self._tick + 1) % self._snapshot_resolution != 0:
-            self._business_engine.frame.take_snapshot(self.frame_index)
+            take_snapshot(self.frame_index)
+
+        self._is_done = True
+
+    def _run(
+        self,
+        policy_fn: Callable,
+        max_decisions: Optional[int],
+        batch_decisions: bool,
+        is_resuming: bool,
+    ) -> bool:
+        """Same process as _simulate generator, but actions are got from policy function directly.
+
+        Returns:
+            bool: Is the episode finished, False if stopped at max decisions.
+        """
+        if self._profiler is not None:
+            policy_fn = self._profiler.wrap("agent", policy_fn)
+
+        is_batched = batch_decisions and self._decision_mode == DecisionMode.Joint
+        decision_number = 0
+
+        ticks = self._process_ticks(is_resuming)
+        actions = None
+
+        while True:
+            try:
+                pending_events = ticks.send(actions)
+            except StopIteration:
+                return True
+
+            if max_decisions is not None and decision_number >= max_decisions:
+                ticks.close()
+
+                return False
+
+            decision_payloads = [event.payload for event in pending_events]
+            self._decision_payloads += decision_payloads
+
+            if is_batched:
+                actions = policy_fn(decision_payloads)
+
+                if actions is None:
+                    actions = []
+                assert isinstance(actions, list)
+            else:
+                actions = [policy_fn(payload) for payload in decision_payloads]
+
+            decision_number += len(decision_payloads)
+
+    def _simulate(
+        self,
+        is_resuming: bool = False,
+    ) -> Generator[
+        Tuple[dict, Union[BaseDecisionEvent, List[BaseDecisionEvent]], bool],
+        Union[BaseAction, List[BaseAction], None],
+        None,
+    ]:
+        """This is the generator to wrap each episode process.
+
+        Args:
+            is_resuming (bool): Is resuming from a restored state, business engine had been stepped at current tick,
+                so it will continue to process pending events of current tick.
+        """
+        profiler = self._profiler
+        get_metrics = self._get_phase_functions()[-1]
+
+        if profiler is not None:
+            agent_stat = profiler.get_stat("agent")
+
+        ticks = self._process_ticks(is_resuming)
+        actions = None
+
+        while True:
+            try:
+                pending_events = ticks.send(actions)
+            except StopIteration:
+                break
+
+            # Append source event id to decision events, to support sequential action in joint mode.
+            decision_payloads = [event.payload for event in pending_events]
+            self._decision_payloads += decision_payloads
+
+            # Most agents do not read metrics at decision points, so they are got on the first access.
+            metrics = LazyMetrics(get_metrics)
+            agent_start_ns = perf_counter_ns()
+
+            try:
+                if self._decision_mode == DecisionMode.Sequential:
+                    actions = [(yield metrics, decision_payloads[0], False)]
+                else:
+                    actions = yield metrics, decision_payloads, False
+            finally:
+                # Also expired if generator is closed by restoring or resetting.
+                metrics.expire()
+
+            if profiler is not None:
+                profiler.record(agent_stat, agent_start_ns)
+
+            if actions is None:
+                actions = []
+            assert isinstance(actions, list)
 
         # The end.
-        yield self._business_engine.get_metrics(), None, True
+        yield get_metrics(), None, True
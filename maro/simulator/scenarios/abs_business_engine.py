@@ -187,6 +187,29 @@ class AbsBusinessEngine(ABC):
     def set_seed(self, seed: int) -> None:
         raise NotImplementedError
 
+    def get_state(self) -> dict:
+        """Get Python side states that changed during simulation, used by simulator to save environment state.
+
+        NOTE:
+            States in frame and pending events are saved by simulator, they should not be included.
+            Returned objects are not copied by business engine, simulator will copy them, and the copies share
+            the objects that referred by attributes of business engine but not included in the result,
+            such as frame, nodes and data readers.
+
+        Returns:
+            dict: States of business engine, key is the name of state.
+        """
+        raise NotImplementedError
+
+    def set_state(self, state: dict, next_tick: int) -> None:
+        """Set Python side states from get_state method, simulator will continue processing pending events.
+
+        Args:
+            state (dict): A copy of result from get_state method.
+            next_tick (int): Tick of next step method calling, data readers should continue from this tick.
+        """
+        raise NotImplementedError
+
     def post_step(self, tick: int) -> bool:
         """This method will be called at the end of each tick, used to post-process for each tick,
         for complex business logic with many events, it maybe not easy to determine
@@ -200,6 +223,37 @@ class AbsBusinessEngine(ABC):
         """
         return False
 
+    def get_next_active_tick(self, tick: int) -> int:
+        """Get the next tick after specified tick that business engine needs to be stepped at,
+        simulator will skip the ticks in between if tick skipping is enabled.
+
+        A tick is active if business engine does anything at it, like reading data items, generating events,
+        or taking a snapshot at the end of a snapshot resolution. Ticks of pending events are checked by
+        simulator, so they are not needed to be included.
+
+        NOTE:
+            Default implementation returns the tick right after specified one, that means no skipping.
+
+        Args:
+            tick (int): Current tick.
+
+        Returns:
+            int: Next active tick.
+        """
+        return tick + 1
+
+    def next_snapshot_tick(self, tick: int) -> int:
+        """Helper method for child class, used to get the next tick (after specified tick) that is the end of
+        a snapshot resolution, snapshot is taken at this tick in post_step.
+
+        Args:
+            tick (int): Current tick.
+
+        Returns:
+            int: Next tick to take snapshot.
+        """
+        return ((tick + 1) // self._snapshot_resolution + 1) * self._snapshot_resolution - 1
+
     def get_node_mapping(self) -> dict:
         """Get mapping for nodes, like index->name or index->id, may different for scenarios.
 
@@ -89,6 +89,10 @@ class CimBusinessEngine(AbsBusinessEngine):
         # Used to collect total cost to avoid to much snapshot querying.
         self._total_operate_num: float = 0
 
+        # Sum of acc_booking and acc_shortage of all ports, so that metrics do not need to go through ports.
+        self._total_booking: int = 0
+        self._total_shortage: int = 0
+
         self._init_frame()
 
         # Snapshot list should be initialized after frame.
@@ -208,18 +212,17 @@ class CimBusinessEngine(AbsBusinessEngine):
 
         if (tick + 1) % self._snapshot_resolution == 0:
             # Update acc_fulfillment before take snapshot.
-            for port in self._ports:
-                port.acc_fulfillment = port.acc_booking - port.acc_shortage
+            self._port_columns.set_column(
+                "acc_fulfillment",
+                self._port_columns.get_column("acc_booking") - self._port_columns.get_column("acc_shortage"),
+            )
 
             # Before go to next tick, we will take a snapshot first.
             self._frame.take_snapshot(self.frame_index(tick))
 
             # Reset port statistics (by tick) fields.
-            for port in self._ports:
-                port.shortage = 0
-                port.booking = 0
-                port.fulfillment = 0
-                port.transfer_cost = 0
+            for attr_name in ("shortage", "booking", "fulfillment", "transfer_cost"):
+                self._port_columns.fill(attr_name, 0)
 
         return tick + 1 == self._max_tick
 
@@ -240,10 +243,43 @@ class CimBusinessEngine(AbsBusinessEngine):
         self._init_vessel_plans()
 
         self._total_operate_num = 0
+        self._total_booking = 0
+        self._total_shortage = 0
 
     def set_seed(self, seed: int) -> None:
         self._data_cntr.set_seed(seed)
 
+    def get_state(self) -> dict:
+        return {
+            "total_operate_num": self._total_operate_num,
+            "total_booking": self._total_booking,
+            "total_shortage": self._total_shortage,
+            "data_container": self._data_cntr.get_state(),
+        }
+
+    def set_state(self, state: dict, next_tick: int) -> None:
+        self._total_operate_num = state["total_operate_num"]
+        self._total_booking = state["total_booking"]
+        self._total_shortage = state["total_shortage"]
+
+        self._data_cntr.set_state(state["data_container"])
+
+    def get_next_active_tick(self, tick: int) -> int:
+        """Next tick that has orders, vessel arrivals or snapshot taking, departures are pending events."""
+        next_tick = min(self._data_cntr.get_next_order_tick(tick), self.next_snapshot_tick(tick))
+
+        for vessel in self._vessels:
+            loc_idx: int = vessel.next_loc_idx
+
+            # Same as step, vessel parking at the beginning will not arrive.
+            if loc_idx > 0:
+                arrival_tick: int = self._data_cntr.vessel_stops[vessel.idx, loc_idx].arrival_tick
+
+                if tick < arrival_tick < next_tick:
+                    next_tick = arrival_tick
+
+        return next_tick
+
     def action_scope(self, port_idx: int, vessel_idx: int) -> ActionScope:
         """Get the action scope of specified agent.
 
@@ -269,14 +305,11 @@ class CimBusinessEngine(AbsBusinessEngine):
 
     def get_metrics(self) -> DocableDict:
         """Get metrics information for cim scenario."""
-        total_shortage = sum([p.acc_shortage for p in self._ports])
-        total_booking = sum([p.acc_booking for p in self._ports])
-
         return DocableDict(
             metrics_desc,
             {
-                "order_requirements": total_booking,
-                "container_shortage": total_shortage,
+                "order_requirements": self._total_booking,
+                "container_shortage": self._total_shortage,
                 "operation_number": self._total_operate_num,
             },
         )
@@ -416,6 +449,9 @@ class CimBusinessEngine(AbsBusinessEngine):
         self._ports = self._frame.ports
         self._vessels = self._frame.vessels
 
+        # Used to update fields of all ports in one call.
+        self._port_columns = self._frame.columns("ports")
+
         self._full_on_ports = self._frame.matrix[0]["full_on_ports"]
         self._full_on_vessels = self._frame.matrix[0]["full_on_vessels"]
         self._vessel_plans = self._frame.matrix[0]["vessel_plans"]
@@ -463,6 +499,7 @@ class CimBusinessEngine(AbsBusinessEngine):
         src_empty = src_port.empty
         src_port.booking += execute_qty
         src_port.acc_booking += execute_qty
+        self._total_booking += execute_qty
 
         # Check if there is any shortage.
         if src_empty < order.quantity:
@@ -470,6 +507,7 @@ class CimBusinessEngine(AbsBusinessEngine):
             shortage_qty = order.quantity - src_empty
             src_port.shortage += shortage_qty
             src_port.acc_shortage += shortage_qty
+            self._total_shortage += shortage_qty
             execute_qty = src_empty
 
         # Update port state.
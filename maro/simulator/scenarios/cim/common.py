@@ -140,6 +140,15 @@ class DecisionEvent(BaseDecisionEvent):
         self._action_scope = state["action_scope"]
         self._early_discharge = state["early_discharge"]
 
+    def __deepcopy__(self, memo):
+        """Copy without evaluating lazy fields, so that they are still calculated at decision tick."""
+        event = self.__class__.__new__(self.__class__)
+        event.__dict__.update(self.__dict__)
+
+        memo[id(self)] = event
+
+        return event
+
     def __repr__(self):
         return "%s {port_idx: %r, vessel_idx: %r, action_scope: %r, early_discharge: %r}" % (
             self.__class__.__name__,
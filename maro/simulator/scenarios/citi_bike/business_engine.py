@@ -2,6 +2,7 @@
 # Licensed under the MIT license.
 
 import datetime
+import math
 import os
 from typing import List, Optional
 
@@ -33,6 +34,10 @@ from .weather_table import WeatherTable
 
 logger = CliLogger(name=__name__)
 
+# Trips and returns are processed with numpy if there are enough of them in a batch,
+# or one by one to avoid the overhead of columnar accessing.
+MIN_VECTORIZED_EVENTS = 16
+
 metrics_desc = """
 Citi bike metrics used to provide statistics information at current point (may be in the middle of a tick).
 It contains following keys:
@@ -134,14 +139,17 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
             self._frame.take_snapshot(self.frame_index(tick))
 
             # We reset the station station each resolution.
-            for station in self._stations:
-                station.shortage = 0
-                station.trip_requirement = 0
-                station.extra_cost = 0
-                station.transfer_cost = 0
-                station.fulfillment = 0
-                station.failed_return = 0
-                station.min_bikes = station.bikes
+            for attr_name in (
+                "shortage",
+                "trip_requirement",
+                "extra_cost",
+                "transfer_cost",
+                "fulfillment",
+                "failed_return",
+            ):
+                self._station_columns.fill(attr_name, 0)
+
+            self._station_columns.set_column("min_bikes", self._station_columns.get_column("bikes"))
 
         # Stop current episode if we reach max tick.
         return tick + 1 == self._max_tick
@@ -192,6 +200,45 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
     def set_seed(self, seed: int) -> None:
         pass
 
+    def get_state(self) -> dict:
+        return {
+            "total_trips": self._total_trips,
+            "total_shortages": self._total_shortages,
+            "total_operate_num": self._total_operate_num,
+            "last_date": self._last_date,
+        }
+
+    def set_state(self, state: dict, next_tick: int) -> None:
+        self._total_trips = state["total_trips"]
+        self._total_shortages = state["total_shortages"]
+        self._total_operate_num = state["total_operate_num"]
+        self._last_date = state["last_date"]
+
+        # Trips before next tick already been pushed as events.
+        self._item_picker = self._trip_reader.items_tick_picker(
+            next_tick,
+            self._max_tick,
+            time_unit="m",
+        )
+
+        # Cached states of snapshots may be changed after restoring.
+        self._decision_strategy.reset()
+
+    def get_next_active_tick(self, tick: int) -> int:
+        """Next tick that has trips, decision checking, snapshot taking or date changing."""
+        decision_resolution = self._decision_strategy.resolution
+        next_decision_tick = ((tick + 1) // decision_resolution + 1) * decision_resolution - 1
+
+        # Extra features are updated at the first tick of each date.
+        cur_datetime = self._trip_start_date + relativedelta(minutes=tick)
+        next_date = cur_datetime.replace(hour=0, minute=0, second=0, microsecond=0) + relativedelta(days=1)
+        next_date_tick = tick + math.ceil((next_date - cur_datetime).total_seconds() / 60)
+
+        next_tick = min(next_decision_tick, next_date_tick, self.next_snapshot_tick(tick))
+        next_trip_tick = self._item_picker.next_tick()
+
+        return next_tick if next_trip_tick is None else min(next_tick, next_trip_tick)
+
     def get_agent_idx_list(self) -> List[int]:
         """Get a list of agent index.
 
@@ -300,6 +347,9 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
         # we need to create a mapping for it, as our trip data only contains id.
         self._stations = self._frame.stations
 
+        # Used to update fields of all stations in one call.
+        self._station_columns = self._frame.columns("stations")
+
         for state in stations_states:
             # Get related station, and set the init states.
             station = self._stations[state.index]
@@ -339,13 +389,14 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
 
     def _register_events(self):
         # Register our own events and their callback handlers.
-        self._event_buffer.register_event_handler(
+        # Trips and returns of a tick are processed in batch, to update stations with columnar accessing.
+        self._event_buffer.register_batch_event_handler(
             CitiBikeEvents.RequireBike,
-            self._on_required_bike,
+            self._on_required_bikes,
         )
-        self._event_buffer.register_event_handler(
+        self._event_buffer.register_batch_event_handler(
             CitiBikeEvents.ReturnBike,
-            self._on_bike_returned,
+            self._on_bikes_returned,
         )
         self._event_buffer.register_event_handler(
             CitiBikeEvents.RebalanceBike,
@@ -436,6 +487,105 @@ class CitibikeBusinessEngine(AbsBusinessEngine):
 
             self._event_buffer.insert_event(bike_return_evt)
 
+    def _on_required_bikes(self, evts: List[AtomEvent]):
+        """Callback when there are trip requirements generated, trips are processed in their order."""
+        if len(evts) < MIN_VECTORIZED_EVENTS:
+            for evt in evts:
+                self._on_required_bike(evt)
+
+            return
+
+        trips = [evt.payload for evt in evts]
+        src_stations = np.array([trip.src_station for trip in trips], dtype=np.int64)
+        dest_stations = np.array([trip.dest_station for trip in trips], dtype=np.int64)
+
+        station_num = len(self._stations)
+        station_columns = self._station_columns
+        station_bikes = station_columns.get_column("bikes")
+
+        # Order of each trip among the trips from same station, bikes are taken by trips one by one,
+        # so a trip is fulfilled if its order is less than the bikes of station.
+        sorted_indices = np.argsort(src_stations, kind="stable")
+        sorted_stations = src_stations[sorted_indices]
+        trip_orders = np.empty(len(trips), dtype=np.int64)
+        trip_orders[sorted_indices] = np.arange(len(trips)) - np.searchsorted(sorted_stations, sorted_stations)
+
+        is_fulfilled = trip_orders < station_bikes[src_stations]
+
+        requirements = np.bincount(src_stations, minlength=station_num)
+        fulfillments = np.bincount(src_stations[is_fulfilled], minlength=station_num)
+        shortages = requirements - fulfillments
+
+        station_bikes -= fulfillments
+
+        # Bikes only decrease here, so min bikes is the smaller one of current min and the final bikes.
+        station_columns.set_column("bikes", station_bikes)
+        station_columns.set_column("min_bikes", np.minimum(station_columns.get_column("min_bikes"), station_bikes))
+
+        for attr_name, values in (
+            ("trip_requirement", requirements),
+            ("shortage", shortages),
+            ("fulfillment", fulfillments),
+        ):
+            station_columns.set_column(attr_name, station_columns.get_column(attr_name) + values)
+
+        # Statistics for metrics.
+        self._total_trips += len(trips)
+        self._total_shortages += int(shortages.sum())
+
+        trips_adj_slots, trips_adj_counts = np.unique(src_stations * station_num + dest_stations, return_counts=True)
+        trips_adj_slots = trips_adj_slots.tolist()
+        trips_adj = self._matrices_node.trips_adj
+        trips_adj[trips_adj_slots] = trips_adj[trips_adj_slots] + trips_adj_counts
+
+        for i in np.flatnonzero(is_fulfilled):
+            trip = trips[i]
+
+            # Generate a bike return event by end tick.
+            return_payload = BikeReturnPayload(
+                trip.src_station,
+                trip.dest_station,
+                1,
+            )
+
+            # Durations from csv file is in seconds, convert it into minutes.
+            return_tick = evts[i].tick + trip.durations
+
+            bike_return_evt = self._event_buffer.gen_atom_event(
+                return_tick,
+                CitiBikeEvents.ReturnBike,
+                payload=return_payload,
+            )
+
+            self._event_buffer.insert_event(bike_return_evt)
+
+    def _on_bikes_returned(self, evts: List[AtomEvent]):
+        """Callback when there are bikes returned to stations."""
+        if len(evts) < MIN_VECTORIZED_EVENTS:
+            for evt in evts:
+                self._on_bike_returned(evt)
+
+            return
+
+        station_num = len(self._stations)
+        station_columns = self._station_columns
+
+        to_stations = np.array([evt.payload.to_station_idx for evt in evts], dtype=np.int64)
+        return_numbers = np.array([evt.payload.number for evt in evts], dtype=np.int64)
+        station_bikes = station_columns.get_column("bikes") + np.bincount(
+            to_stations,
+            weights=return_numbers,
+            minlength=station_num,
+        ).astype(np.int64)
+
+        if np.all(station_bikes <= station_columns.get_column("capacity")):
+            # All the bikes are accepted, min bikes is not changed as bikes only increase.
+            station_columns.set_column("bikes", station_bikes)
+        else:
+            # Additional bikes are moved to neighbors one return by one return, as it changes bikes of neighbors.
+            for evt in evts:
+                self._on_bike_returned(evt)
+
     def _on_bike_returned(self, evt: AtomEvent):
         """Callback when there is a bike returned to a station."""
         payload: BikeReturnPayload = evt.payload
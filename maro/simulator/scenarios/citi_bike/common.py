@@ -120,6 +120,15 @@ class DecisionEvent(BaseDecisionEvent):
         self.type = state["type"]
         self._action_scope = state["action_scope"]
 
+    def __deepcopy__(self, memo):
+        """Copy without evaluating lazy fields, so that they are still calculated at decision tick."""
+        event = self.__class__.__new__(self.__class__)
+        event.__dict__.update(self.__dict__)
+
+        memo[id(self)] = event
+
+        return event
+
     def __repr__(self):
         return "%s {station_idx: %r, type: %r, action_scope:%r}" % (
             self.__class__.__name__,
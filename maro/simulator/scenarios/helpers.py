@@ -4,10 +4,13 @@
 import sys
 import warnings
 from datetime import datetime
+from typing import Callable, Optional
 
 from dateutil.relativedelta import relativedelta
 from dateutil.tz import UTC
 
+from maro.utils.exception.simulator_exception import MetricsExpiredError
+
 timestamp_start = datetime(1970, 1, 1, 0, 0, 0, tzinfo=UTC)
 
 
@@ -60,3 +63,46 @@ class DocableDict:
 
     def __len__(self):
         return len(self._original_dict)
+
+
+class LazyMetrics(DocableDict):
+    """Read-only metrics of a decision point, which are got from business engine on the first access.
+
+    Environment expires it when it moves on from the decision point, metrics that are not accessed before
+    that cannot be got any more, as business engine has changed, and accessing them raises MetricsExpiredError.
+
+    Args:
+        getter (Callable[[], dict]): Function to get metrics, usually get_metrics of business engine.
+    """
+
+    def __init__(self, getter: Callable[[], dict]):
+        self._getter: Optional[Callable[[], dict]] = getter
+        self._metrics: Optional[dict] = None
+        self._is_expired = False
+
+    @property
+    def _original_dict(self) -> dict:
+        if self._metrics is None:
+            if self._is_expired:
+                raise MetricsExpiredError()
+
+            metrics = self._getter()
+
+            # Keep items only, getter is not needed any more.
+            self._metrics = metrics._original_dict if isinstance(metrics, DocableDict) else metrics
+            self._getter = None
+
+        return self._metrics
+
+    @property
+    def is_evaluated(self) -> bool:
+        """bool: Are metrics got from business engine."""
+        return self._metrics is not None
+
+    def expire(self) -> None:
+        """Mark that environment has moved on from the decision point."""
+        self._is_expired = True
+
+    def __getstate__(self):
+        # Getter is usually a method of business engine, so metrics are evaluated before copying or pickling.
+        return {"_getter": None, "_metrics": self._original_dict, "_is_expired": self._is_expired}
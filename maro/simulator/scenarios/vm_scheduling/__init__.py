@@ -2,20 +2,27 @@
 # Licensed under the MIT license.
 
 from .business_engine import VmSchedulingBusinessEngine
+from .capacity_columns import PmCapacityColumns
 from .common import AllocateAction, DecisionEvent, Latency, PostponeAction, VmRequestPayload
-from .cpu_reader import CpuReader
+from .cpu_reader import CpuReader, CpuReadingsFile
 from .enums import Events, PmState, PostponeType, VmCategory
+from .live_vm_table import LiveVmTable
 from .physical_machine import PhysicalMachine
+from .utilization_store import UtilizationStore
 from .virtual_machine import VirtualMachine
 
 __all__ = [
     "VmSchedulingBusinessEngine",
+    "PmCapacityColumns",
+    "LiveVmTable",
+    "UtilizationStore",
     "AllocateAction",
     "PostponeAction",
     "DecisionEvent",
     "Latency",
     "VmRequestPayload",
     "CpuReader",
+    "CpuReadingsFile",
     "Events",
     "PmState",
     "PostponeType",
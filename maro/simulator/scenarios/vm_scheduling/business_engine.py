@@ -4,8 +4,10 @@
 import os
 import shutil
 import tarfile
+from collections import defaultdict
 from typing import Dict, List, Optional
 
+import numpy as np
 from yaml import safe_load
 
 from maro.backends.frame import FrameBase, SnapshotList
@@ -17,11 +19,14 @@ from maro.simulator.scenarios.helpers import DocableDict
 from maro.utils.logger import CliLogger
 from maro.utils.utils import convert_dottable
 
+from .capacity_columns import PmCapacityColumns
 from .common import Action, AllocateAction, DecisionEvent, Latency, PostponeAction, VmRequestPayload
 from .cpu_reader import CpuReader
 from .enums import Events, PmState, PostponeType, VmCategory
 from .frame_builder import build_frame
+from .live_vm_table import LiveVmTable
 from .physical_machine import PhysicalMachine
+from .utilization_store import UtilizationStore
 from .virtual_machine import VirtualMachine
 
 metrics_desc = """
@@ -82,8 +87,35 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
         # Data center structure for quick accessing.
         self._init_structure()
 
+        # Used to update fields of all PMs in one call.
+        self._pm_columns = self._frame.columns("pms")
+
+        # Capacity state of PMs, used to find valid PMs of VM requests.
+        self._capacity_columns = PmCapacityColumns(
+            cpu_cores_capacity=self._pm_columns.get_column("cpu_cores_capacity"),
+            memory_capacity=self._pm_columns.get_column("memory_capacity"),
+            max_cpu_oversubscription_rate=self._max_cpu_oversubscription_rate,
+            max_memory_oversubscription_rate=self._max_memory_oversubscription_rate,
+            max_utilization_rate=self._max_utilization_rate,
+        )
+        self._capacity_columns.load(self._pm_columns)
+
+        self._init_power_curves()
+
+        # Used to update empty machine number of all racks in one call.
+        self._rack_columns = self._frame.columns("racks")
+        self._pm_rack_ids = self._pm_columns.get_column("rack_id")
+
         # All living VMs.
         self._live_vms: Dict[int, VirtualMachine] = {}
+        # Fields of living VMs in arrays, used to update all PMs in each tick.
+        self._live_vm_table = LiveVmTable()
+        # Deletion tick -> ids of VMs that finish at that tick, VMs killed by overload are skipped when processing.
+        self._deletion_tick_vm_ids: Dict[int, List[int]] = defaultdict(list)
+        # Sum of unit price of living VMs, that is the income of each tick.
+        self._live_vm_unit_price_sum: float = 0.0
+        # CPU utilization series of living and pending VMs.
+        self._utilization_store = UtilizationStore()
         # All request payload of the pending decision VMs.
         # NOTE: Need naming suggestestion.
         self._pending_vm_request_payload: Dict[int, VmRequestPayload] = {}
@@ -92,6 +124,10 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
         self._vm_item_picker = self._vm_reader.items_tick_picker(self._start_tick, self._max_tick, time_unit="s")
 
         self._cpu_reader = CpuReader(data_path=self._config.CPU_READINGS, start_tick=self._start_tick)
+        # CPU utilization of current tick indexed by VM id, NaN if VM has no reading, grows by doubling.
+        self._cpu_utilization_lookup = np.full(1024, np.nan, dtype=np.float32)
+        # Id of VMs that have reading in current tick.
+        self._cpu_readings_vm_ids = np.zeros(0, dtype=np.int64)
 
         self._tick: int = 0
         self._pending_action_vm_id: int = 0
@@ -398,6 +434,15 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
 
         return start_pm_id
 
+    def _init_power_curves(self):
+        """Initialize power curve parameters of each PM, used to calculate energy consumption of all PMs."""
+        pm_types = self._pm_columns.get_column("pm_type")
+        power_curves = [self._pm_config_dict[pm_type]["power_curve"] for pm_type in range(len(self._pm_config_dict))]
+
+        self._pm_calibration_parameter = np.array([curve["calibration_parameter"] for curve in power_curves])[pm_types]
+        self._pm_busy_power = np.array([curve["busy_power"] for curve in power_curves])[pm_types]
+        self._pm_idle_power = np.array([curve["idle_power"] for curve in power_curves])[pm_types]
+
     def reset(self, keep_seed: bool = False):
         """Reset internal states for episode."""
         self._init_metrics()
@@ -408,6 +453,8 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
         for pm in self._machines:
             pm.reset()
 
+        self._capacity_columns.load(self._pm_columns)
+
         for rack in self._racks:
             rack.reset()
 
@@ -424,16 +471,85 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
             region.reset()
 
         self._live_vms.clear()
+        self._live_vm_table.clear()
+        self._deletion_tick_vm_ids.clear()
+        self._live_vm_unit_price_sum = 0.0
+        self._utilization_store.clear()
         self._pending_vm_request_payload.clear()
 
         self._vm_reader.reset()
         self._vm_item_picker = self._vm_reader.items_tick_picker(self._start_tick, self._max_tick, time_unit="s")
 
         self._cpu_reader.reset()
+        self._cpu_utilization_lookup[:] = np.nan
 
     def set_seed(self, seed: int) -> None:
         pass
 
+    def get_state(self) -> dict:
+        return {
+            "total_vm_requests": self._total_vm_requests,
+            "total_incomes": self._total_incomes,
+            "total_profit": self._total_profit,
+            "energy_consumption_cost": self._energy_consumption_cost,
+            "total_energy_consumption": self._total_energy_consumption,
+            "successful_allocation": self._successful_allocation,
+            "successful_completion": self._successful_completion,
+            "failed_allocation": self._failed_allocation,
+            "failed_completion": self._failed_completion,
+            "total_latency": self._total_latency,
+            "total_oversubscriptions": self._total_oversubscriptions,
+            "total_overload_pms": self._total_overload_pms,
+            "total_overload_vms": self._total_overload_vms,
+            "live_vms": self._live_vms,
+            "live_vm_table": self._live_vm_table,
+            "deletion_tick_vm_ids": self._deletion_tick_vm_ids,
+            "live_vm_unit_price_sum": self._live_vm_unit_price_sum,
+            "utilization_store": self._utilization_store,
+            "pending_vm_request_payload": self._pending_vm_request_payload,
+            "tick": self._tick,
+            "pending_action_vm_id": self._pending_action_vm_id,
+            "pm_live_vms": {pm.index: pm.live_vms for pm in self._machines},
+        }
+
+    def set_state(self, state: dict, next_tick: int) -> None:
+        self._total_vm_requests = state["total_vm_requests"]
+        self._total_incomes = state["total_incomes"]
+        self._total_profit = state["total_profit"]
+        self._energy_consumption_cost = state["energy_consumption_cost"]
+        self._total_energy_consumption = state["total_energy_consumption"]
+        self._successful_allocation = state["successful_allocation"]
+        self._successful_completion = state["successful_completion"]
+        self._failed_allocation = state["failed_allocation"]
+        self._failed_completion = state["failed_completion"]
+        self._total_latency = state["total_latency"]
+        self._total_oversubscriptions = state["total_oversubscriptions"]
+        self._total_overload_pms = state["total_overload_pms"]
+        self._total_overload_vms = state["total_overload_vms"]
+
+        # Payloads of pending events refer to these objects, keep them in same containers.
+        self._live_vms = state["live_vms"]
+        self._live_vm_table = state["live_vm_table"]
+        self._deletion_tick_vm_ids = state["deletion_tick_vm_ids"]
+        self._live_vm_unit_price_sum = state["live_vm_unit_price_sum"]
+        # VMs refer to the store, it is copied with them.
+        self._utilization_store = state["utilization_store"]
+        self._pending_vm_request_payload = state["pending_vm_request_payload"]
+        self._tick = state["tick"]
+        self._pending_action_vm_id = state["pending_action_vm_id"]
+
+        for pm in self._machines:
+            pm.live_vms.clear()
+            pm.live_vms.update(state["pm_live_vms"][pm.index])
+
+        # Frame is restored before business engine.
+        self._capacity_columns.load(self._pm_columns)
+
+        # VM requests and CPU readings before next tick already been processed.
+        self._vm_item_picker = self._vm_reader.items_tick_picker(next_tick, self._max_tick, time_unit="s")
+        self._cpu_reader.seek(next_tick)
+        self._cpu_utilization_lookup[:] = np.nan
+
     def _init_frame(self):
         self._frame = build_frame(
             snapshots_num=self.calc_max_snapshots(),
@@ -454,12 +570,12 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
         """
         self._tick = tick
         # All vm's cpu utilization at current tick.
-        cur_tick_cpu_utilization = self._cpu_reader.items(tick=tick)
+        self._load_cpu_readings(tick=tick)
 
         # Process finished VMs.
         self._process_finished_vm()
         # Update all live VMs CPU utilization.
-        self._update_vm_workload(cur_tick_cpu_utilization=cur_tick_cpu_utilization)
+        self._update_vm_workload()
         # Update all PM CPU utilization.
         self._update_pm_workload()
         self._update_upper_level_metrics()
@@ -477,12 +593,17 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
                 deployment_id=vm.deploy_id,
                 category=VmCategory(vm.vm_category),
                 unit_price=unit_price,
+                utilization_store=self._utilization_store,
             )
 
-            if vm.vm_id not in cur_tick_cpu_utilization:
+            cpu_utilization = self._get_cpu_utilization(np.array([vm.vm_id], dtype=np.int64))[0]
+
+            if np.isnan(cpu_utilization):
                 raise Exception(f"The VM id: '{vm.vm_id}' does not exist at this tick.")
 
-            vm_info.add_utilization(cpu_utilization=cur_tick_cpu_utilization[vm.vm_id])
+            # Series contains ticks of pending and living.
+            self._utilization_store.reserve(vm.vm_id, self._buffer_time_budget + vm.vm_lifetime + 1)
+            vm_info.add_utilization(cpu_utilization=float(cpu_utilization))
             vm_req_payload: VmRequestPayload = VmRequestPayload(
                 vm_info=vm_info,
                 remaining_buffer_time=self._buffer_time_budget,
@@ -496,19 +617,24 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
             self._total_vm_requests += 1
 
     def post_step(self, tick: int):
+        columns = self._capacity_columns
+        is_oversubscribed = (columns.oversubscribable != PmState.EMPTY) & (
+            columns.cpu_cores_allocated > columns.cpu_cores_capacity
+        )
+        self._total_oversubscriptions += int(np.count_nonzero(is_oversubscribed))
+
         # Update energy to the environment metrices.
-        total_energy: float = 0.0
-        total_energy_cost: float = 0.0
-        for pm in self._machines:
-            if pm.oversubscribable and pm.cpu_cores_allocated > pm.cpu_cores_capacity:
-                self._total_oversubscriptions += 1
-            total_energy += pm.energy_consumption
-            # Update the energy consumption cost.
-            pm_cost = pm.energy_consumption * self._unit_energy_price_per_kwh * self._power_usage_efficiency
-            total_energy_cost += pm_cost
-            # Overload PMs.
-            if pm.cpu_utilization > 100:
-                self._overload(pm.id, tick)
+        # NOTE: Sum in PM order with Python floats, to keep same result as accumulating PM by PM.
+        energy_consumption = self._pm_columns.get_column("energy_consumption").astype(np.float64)
+        total_energy: float = sum(energy_consumption.tolist())
+        # Update the energy consumption cost.
+        pm_costs = energy_consumption * self._unit_energy_price_per_kwh * self._power_usage_efficiency
+        total_energy_cost: float = sum(pm_costs.tolist())
+
+        # Overload PMs.
+        for pm_id in np.flatnonzero(self._pm_columns.get_column("cpu_utilization") > 100).tolist():
+            self._overload(pm_id, tick)
+
         self._total_energy_consumption += total_energy
         self._energy_consumption_cost += total_energy_cost
 
@@ -540,12 +666,12 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
 
         return node_mapping
 
-    def get_vm_cpu_utilization_series(self, vm_id: int) -> List[float]:
+    def get_vm_cpu_utilization_series(self, vm_id: int) -> np.ndarray:
         """Get the CPU utilization series of the specific VM by the given ID."""
         if vm_id in self._live_vms:
             return self._live_vms[vm_id].get_historical_utilization_series(cur_tick=self._tick)
 
-        return []
+        return np.zeros(0, dtype=np.float32)
 
     def get_metrics(self) -> DocableDict:
         """Get current environment metrics information.
@@ -579,26 +705,63 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
         # Generate decision event.
         self._event_buffer.register_event_handler(event_type=MaroEvents.TAKE_ACTION, handler=self._on_action_received)
 
-    def _update_vm_workload(self, cur_tick_cpu_utilization: dict):
+    def _load_cpu_readings(self, tick: int):
+        """Load CPU readings of the tick into the lookup array."""
+        self._cpu_utilization_lookup[self._cpu_readings_vm_ids] = np.nan
+
+        vm_ids, cpu_utilization = self._cpu_reader.readings(tick=tick)
+
+        if len(vm_ids) > 0 and vm_ids.max() >= len(self._cpu_utilization_lookup):
+            size = len(self._cpu_utilization_lookup)
+
+            while size <= vm_ids.max():
+                size *= 2
+
+            lookup = np.full(size, np.nan, dtype=np.float32)
+            lookup[: len(self._cpu_utilization_lookup)] = self._cpu_utilization_lookup
+            self._cpu_utilization_lookup = lookup
+
+        self._cpu_utilization_lookup[vm_ids] = cpu_utilization
+        self._cpu_readings_vm_ids = vm_ids
+
+    def _get_cpu_utilization(self, vm_ids: np.ndarray) -> np.ndarray:
+        """Get CPU utilization of VMs at current tick, NaN if VM has no reading."""
+        cpu_utilization = np.full(len(vm_ids), np.nan, dtype=np.float32)
+        is_known = vm_ids < len(self._cpu_utilization_lookup)
+        cpu_utilization[is_known] = self._cpu_utilization_lookup[vm_ids[is_known]]
+
+        return cpu_utilization
+
+    def _update_vm_workload(self):
         """Update all live VMs CPU utilization.
 
         The length of VMs utilization series could be difference among all VMs,
         because index 0 represents the VM's CPU utilization at the tick it starts.
         """
-        for live_vm in self._live_vms.values():
-            # NOTE: Some data could be lost. We use -1.0 to represent the missing data.
-            if live_vm.id not in cur_tick_cpu_utilization:
-                live_vm.add_utilization(cpu_utilization=-1.0)
-            else:
-                live_vm.add_utilization(cpu_utilization=cur_tick_cpu_utilization[live_vm.id])
-                live_vm.cpu_utilization = live_vm.get_utilization(cur_tick=self._tick)
-
-        for pending_vm_payload in self._pending_vm_request_payload.values():
-            pending_vm = pending_vm_payload.vm_info
-            if pending_vm.id not in cur_tick_cpu_utilization:
-                pending_vm.add_utilization(cpu_utilization=-1.0)
-            else:
-                pending_vm.add_utilization(cpu_utilization=cur_tick_cpu_utilization[pending_vm.id])
+        table = self._live_vm_table
+        live_slots = np.flatnonzero(table.vm_id >= 0)
+        live_vm_ids = table.vm_id[live_slots]
+        pending_vm_ids = np.fromiter(self._pending_vm_request_payload, dtype=np.int64)
+
+        live_cpu_utilization = self._get_cpu_utilization(live_vm_ids)
+        pending_cpu_utilization = self._get_cpu_utilization(pending_vm_ids)
+
+        # NOTE: Some data could be lost. We use -1.0 to represent the missing data.
+        self._utilization_store.append(
+            np.concatenate([live_vm_ids, pending_vm_ids]),
+            np.nan_to_num(np.concatenate([live_cpu_utilization, pending_cpu_utilization]), nan=-1.0),
+        )
+
+        has_reading = ~np.isnan(live_cpu_utilization)
+        live_slots = live_slots[has_reading]
+        table.cpu_utilization[live_slots] = np.clip(
+            self._utilization_store.get_many(
+                table.vm_id[live_slots],
+                self._tick - table.creation_tick[live_slots],
+            ),
+            0,
+            100,
+        )
 
     def _update_upper_level_metrics(self):
         self._update_rack_metrics()
@@ -628,26 +791,25 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
             cluster.empty_machine_num = sum(self._racks[rack_id].empty_machine_num for rack_id in cluster.rack_list)
 
     def _update_rack_metrics(self):
-        for rack in self._racks:
-            count_empty_machine: int = 0
-            for pm_id in rack.pm_list:
-                pm = self._machines[pm_id]
-                if pm.cpu_cores_allocated == 0:
-                    count_empty_machine += 1
-            rack.empty_machine_num = count_empty_machine
+        empty_pm_rack_ids = self._pm_rack_ids[self._capacity_columns.cpu_cores_allocated == 0]
+        self._rack_columns.set_column("empty_machine_num", np.bincount(empty_pm_rack_ids, minlength=self._rack_amount))
 
     def _update_pm_workload(self):
         """Update CPU utilization occupied by total VMs on each PM."""
-        for pm in self._machines:
-            total_pm_cpu_cores_used: float = 0.0
-            for vm_id in pm.live_vms:
-                vm = self._live_vms[vm_id]
-                total_pm_cpu_cores_used += vm.cpu_utilization * vm.cpu_cores_requirement
-            pm.update_cpu_utilization(vm=None, cpu_utilization=total_pm_cpu_cores_used / pm.cpu_cores_capacity)
-            pm.energy_consumption = self._cpu_utilization_to_energy_consumption(
-                pm_type=self._pm_config_dict[pm.pm_type],
-                cpu_utilization=pm.cpu_utilization,
-            )
+        total_pm_cpu_cores_used = self._live_vm_table.get_pm_cpu_cores_used(self._pm_amount)
+        self._pm_columns.set_column(
+            "cpu_utilization",
+            np.round(np.maximum(0, total_pm_cpu_cores_used / self._capacity_columns.cpu_cores_capacity), 2),
+        )
+
+        # Energy consumption is calculated with the utilization stored in frame, same as updating PM by PM.
+        cpu_utilization = self._pm_columns.get_column("cpu_utilization")
+        self._pm_columns.set_column(
+            "energy_consumption",
+            self._get_pm_energy_consumption(cpu_utilization.astype(np.float64)),
+        )
+
+        self._capacity_columns.cpu_utilization[:] = cpu_utilization
 
     def _overload(self, pm_id: int, tick: int):
         """Overload logic.
@@ -663,7 +825,9 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
         if self._kill_all_vms_if_overload:
             for vm_id in vm_ids:
                 self._total_incomes -= self._live_vms[vm_id].get_income_till_now(tick)
-                self._live_vms.pop(vm_id)
+                self._live_vm_unit_price_sum -= self._live_vms.pop(vm_id).unit_price
+                self._live_vm_table.remove(vm_id)
+                self._utilization_store.release(vm_id)
 
             pm.deallocate_vms(vm_ids=vm_ids)
             self._failed_completion += len(vm_ids)
@@ -687,6 +851,22 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
 
         return (energy_consumption_per_hour / self._ticks_per_hour) / 1000
 
+    def _get_pm_energy_consumption(self, cpu_utilization: np.ndarray) -> np.ndarray:
+        """Convert the CPU utilization of all PMs to energy consumption, same as _cpu_utilization_to_energy_consumption.
+
+        Args:
+            cpu_utilization (np.ndarray): CPU utilization of each PM, indexed by PM id.
+
+        Returns:
+            np.ndarray: Energy consumption of each PM.
+        """
+        cpu_utilization = np.minimum(1, cpu_utilization / 100)
+        energy_consumption_per_hour = self._pm_idle_power + (self._pm_busy_power - self._pm_idle_power) * (
+            2 * cpu_utilization - np.power(cpu_utilization, self._pm_calibration_parameter)
+        )
+
+        return (energy_consumption_per_hour / self._ticks_per_hour) / 1000
+
     def _postpone_vm_request(self, postpone_type: PostponeType, vm_id: int, remaining_buffer_time: int):
         """Postpone VM request."""
         if remaining_buffer_time >= self._delay_duration:
@@ -707,6 +887,7 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
             # Fail
             # Pop out VM request payload.
             self._pending_vm_request_payload.pop(vm_id)
+            self._utilization_store.release(vm_id)
             # Add failed allocation.
             self._failed_allocation += 1
 
@@ -741,66 +922,50 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
         return valid_pm_list
 
     def _get_valid_non_oversubscribable_pms(self, vm_cpu_cores_requirement: int, vm_memory_requirement: int) -> list:
-        valid_pm_list = []
-        for pm in self._machines:
-            if pm.oversubscribable == PmState.EMPTY or pm.oversubscribable == PmState.NON_OVERSUBSCRIBABLE:
-                # In the condition of non-oversubscription, the valid PMs mean:
-                # PM allocated resource + VM allocated resource <= PM capacity.
-                if (
-                    pm.cpu_cores_allocated + vm_cpu_cores_requirement <= pm.cpu_cores_capacity
-                    and pm.memory_allocated + vm_memory_requirement <= pm.memory_capacity
-                ):
-                    valid_pm_list.append(pm.id)
-
-        return valid_pm_list
+        return self._capacity_columns.get_valid_non_oversubscribable_pms(
+            vm_cpu_cores_requirement,
+            vm_memory_requirement,
+        )
 
     def _get_valid_oversubscribable_pms(self, vm_cpu_cores_requirement: int, vm_memory_requirement: int) -> List[int]:
-        valid_pm_list = []
-        for pm in self._machines:
-            if pm.oversubscribable == PmState.EMPTY or pm.oversubscribable == PmState.OVERSUBSCRIBABLE:
-                # In the condition of oversubscription, the valid PMs mean:
-                # 1. PM allocated resource + VM allocated resource <= Max oversubscription rate * PM capacity.
-                # 2. PM CPU usage + VM requirements <= Max utilization rate * PM capacity.
-                if (
-                    (
-                        pm.cpu_cores_allocated + vm_cpu_cores_requirement
-                        <= self._max_cpu_oversubscription_rate * pm.cpu_cores_capacity
-                    )
-                    and (
-                        pm.memory_allocated + vm_memory_requirement
-                        <= self._max_memory_oversubscription_rate * pm.memory_capacity
-                    )
-                    and (
-                        pm.cpu_utilization / 100 * pm.cpu_cores_capacity + vm_cpu_cores_requirement
-                        <= self._max_utilization_rate * pm.cpu_cores_capacity
-                    )
-                ):
-                    valid_pm_list.append(pm.id)
+        return self._capacity_columns.get_valid_oversubscribable_pms(vm_cpu_cores_requirement, vm_memory_requirement)
 
-        return valid_pm_list
+    def _update_capacity_columns(self, pm: PhysicalMachine):
+        """Update capacity columns with current state of the PM."""
+        pm_id = pm.index
+        columns = self._capacity_columns
+
+        columns.cpu_cores_allocated[pm_id] = pm.cpu_cores_allocated
+        columns.memory_allocated[pm_id] = pm.memory_allocated
+        columns.cpu_utilization[pm_id] = pm.cpu_utilization
+        columns.oversubscribable[pm_id] = pm.oversubscribable
 
     def _process_finished_vm(self):
         """Release PM resource from the finished VM."""
-        # Get the VM info.
-        vm_id_list = []
-        for vm in self._live_vms.values():
-            if vm.deletion_tick == self._tick:
-                # Release PM resources.
-                pm: PhysicalMachine = self._machines[vm.pm_id]
-                pm.cpu_cores_allocated -= vm.cpu_cores_requirement
-                pm.memory_allocated -= vm.memory_requirement
-                pm.deallocate_vms(vm_ids=[vm.id])
-                # If the VM list is empty, switch the state to empty.
-                if not pm.live_vms:
-                    pm.oversubscribable = PmState.EMPTY
-
-                vm_id_list.append(vm.id)
-                # VM completed task succeed.
-                self._successful_completion += 1
-
-        # Remove dead VM.
-        for vm_id in vm_id_list:
-            self._live_vms.pop(vm_id)
+        for vm_id in self._deletion_tick_vm_ids.pop(self._tick, []):
+            # Skip the VM killed by overload.
+            if vm_id not in self._live_vms:
+                continue
+
+            # Remove dead VM.
+            vm = self._live_vms.pop(vm_id)
+            self._live_vm_table.remove(vm_id)
+            self._utilization_store.release(vm_id)
+            self._live_vm_unit_price_sum -= vm.unit_price
+
+            # Release PM resources.
+            pm: PhysicalMachine = self._machines[vm.pm_id]
+            pm.cpu_cores_allocated -= vm.cpu_cores_requirement
+            pm.memory_allocated -= vm.memory_requirement
+            pm.deallocate_vms(vm_ids=[vm.id])
+            # If the VM list is empty, switch the state to empty.
+            if not pm.live_vms:
+                pm.oversubscribable = PmState.EMPTY
+
+            self._update_capacity_columns(pm)
+
+            # VM completed task succeed.
+            self._successful_completion += 1
 
     def _on_vm_required(self, vm_request_event: CascadeEvent):
         """Callback when there is a VM request generated."""
@@ -851,6 +1016,7 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
 
         if len(actions) == 0:
             self._pending_vm_request_payload.pop(self._pending_action_vm_id)
+            self._utilization_store.release(self._pending_action_vm_id)
             return
 
         for action in actions:
@@ -877,6 +1043,9 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
                 # Pop out the VM from pending requests and add to live VM dict.
                 self._pending_vm_request_payload.pop(vm_id)
                 self._live_vms[vm_id] = vm
+                self._live_vm_table.add(vm)
+                self._deletion_tick_vm_ids[vm.deletion_tick].append(vm_id)
+                self._live_vm_unit_price_sum += vm.unit_price
 
                 # Update PM resources requested by VM.
                 pm = self._machines[pm_id]
@@ -901,6 +1070,7 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
                     pm_type=self._pm_config_dict[pm.pm_type],
                     cpu_utilization=pm.cpu_utilization,
                 )
+                self._update_capacity_columns(pm)
                 self._successful_allocation += 1
 
             elif isinstance(action, PostponeAction):
@@ -914,8 +1084,7 @@ class VmSchedulingBusinessEngine(AbsBusinessEngine):
                 )
 
     def _update_incomes(self):
-        for vm in self._live_vms.values():
-            self._total_incomes += vm.unit_price
+        self._total_incomes += self._live_vm_unit_price_sum
 
     def _update_profit(self):
         self._total_profit = self._total_incomes - self._energy_consumption_cost
@@ -0,0 +1,108 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from typing import List
+
+import numpy as np
+
+from maro.backends.frame import NodeColumns
+
+from .enums import PmState
+
+
+class PmCapacityColumns:
+    """Capacity state of all PMs in arrays, used to find valid PMs of a VM request with a few vectorized
+    operations, instead of checking PM nodes one by one.
+
+    NOTE: Each lookup still scans the columns of all PMs, it is not a sublinear index. The utilization limit of
+    oversubscribable PMs depends on CPU utilization that changes for all PMs in each tick, so a sorted or bucketed
+    structure would need to be rebuilt in each tick anyway.
+
+    Business engine keeps it same as PM nodes, by updating it when resources of a PM are allocated or released,
+    and when CPU utilization or oversubscription state of a PM changes.
+
+    Args:
+        cpu_cores_capacity (np.ndarray): CPU cores capacity of each PM.
+        memory_capacity (np.ndarray): Memory capacity of each PM.
+        max_cpu_oversubscription_rate (float): Max CPU oversubscription rate.
+        max_memory_oversubscription_rate (float): Max memory oversubscription rate.
+        max_utilization_rate (float): Max CPU utilization rate.
+    """
+
+    def __init__(
+        self,
+        cpu_cores_capacity: np.ndarray,
+        memory_capacity: np.ndarray,
+        max_cpu_oversubscription_rate: float,
+        max_memory_oversubscription_rate: float,
+        max_utilization_rate: float,
+    ):
+        self.cpu_cores_capacity = np.asarray(cpu_cores_capacity, dtype=np.int64)
+        self.memory_capacity = np.asarray(memory_capacity, dtype=np.int64)
+
+        # Limits of oversubscribable PMs, they are same for all requests.
+        self._cpu_cores_oversubscription_limit = max_cpu_oversubscription_rate * self.cpu_cores_capacity
+        self._memory_oversubscription_limit = max_memory_oversubscription_rate * self.memory_capacity
+        self._cpu_cores_utilization_limit = max_utilization_rate * self.cpu_cores_capacity
+
+        pm_amount = len(self.cpu_cores_capacity)
+
+        self.cpu_cores_allocated = np.zeros(pm_amount, dtype=np.int64)
+        self.memory_allocated = np.zeros(pm_amount, dtype=np.int64)
+        # Same value as cpu_utilization attribute of PM node.
+        self.cpu_utilization = np.zeros(pm_amount, dtype=np.float64)
+        self.oversubscribable = np.zeros(pm_amount, dtype=np.int8)
+
+    def load(self, pm_columns: NodeColumns) -> None:
+        """Load states from PM nodes, used after frame is reset or restored.
+
+        Args:
+            pm_columns (NodeColumns): Columnar accessor of PM nodes.
+        """
+        self.cpu_cores_allocated[:] = pm_columns.get_column("cpu_cores_allocated")
+        self.memory_allocated[:] = pm_columns.get_column("memory_allocated")
+        self.cpu_utilization[:] = pm_columns.get_column("cpu_utilization")
+        self.oversubscribable[:] = pm_columns.get_column("oversubscribable")
+
+    def get_valid_non_oversubscribable_pms(
+        self,
+        vm_cpu_cores_requirement: int,
+        vm_memory_requirement: int,
+    ) -> List[int]:
+        """Get empty or non-oversubscribable PMs that have enough resource for the VM.
+
+        Args:
+            vm_cpu_cores_requirement (int): The CPU cores requested by the VM.
+            vm_memory_requirement (int): The memory requested by the VM.
+
+        Returns:
+            List[int]: Id of valid PMs in ascending order.
+        """
+        # PM allocated resource + VM allocated resource <= PM capacity.
+        mask = self.oversubscribable != PmState.OVERSUBSCRIBABLE
+        mask &= self.cpu_cores_allocated + vm_cpu_cores_requirement <= self.cpu_cores_capacity
+        mask &= self.memory_allocated + vm_memory_requirement <= self.memory_capacity
+
+        return np.flatnonzero(mask).tolist()
+
+    def get_valid_oversubscribable_pms(self, vm_cpu_cores_requirement: int, vm_memory_requirement: int) -> List[int]:
+        """Get empty or oversubscribable PMs that have enough resource for the VM.
+
+        Args:
+            vm_cpu_cores_requirement (int): The CPU cores requested by the VM.
+            vm_memory_requirement (int): The memory requested by the VM.
+
+        Returns:
+            List[int]: Id of valid PMs in ascending order.
+        """
+        # 1. PM allocated resource + VM allocated resource <= Max oversubscription rate * PM capacity.
+        # 2. PM CPU usage + VM requirements <= Max utilization rate * PM capacity.
+        mask = self.oversubscribable != PmState.NON_OVERSUBSCRIBABLE
+        mask &= self.cpu_cores_allocated + vm_cpu_cores_requirement <= self._cpu_cores_oversubscription_limit
+        mask &= self.memory_allocated + vm_memory_requirement <= self._memory_oversubscription_limit
+        mask &= (
+            self.cpu_utilization / 100 * self.cpu_cores_capacity + vm_cpu_cores_requirement
+            <= self._cpu_cores_utilization_limit
+        )
+
+        return np.flatnonzero(mask).tolist()
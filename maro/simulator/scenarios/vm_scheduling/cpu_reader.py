@@ -2,76 +2,206 @@
 # Licensed under the MIT license.
 
 import os
+import re
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
 
 from maro.data_lib.binary_reader import BinaryReader
 
+# Index of file in the name of CPU readings files, like vm_cpu_readings-file-1-of-195.bin.
+FILE_INDEX_PATTERN = re.compile(r"-(\d+)-of-")
+
+
+class CpuReadingsFile:
+    """Memory-mapped CPU readings file, with the offset of first item of each tick.
+
+    NOTE:
+        Items of the file should be sorted by timestamp, and a VM should have at most one reading in each tick,
+        like the processed Azure data.
+
+    Args:
+        data_path (str): Path of the binary file.
+    """
+
+    def __init__(self, data_path: str):
+        self.data_path = data_path
+
+        reader = BinaryReader(data_path)
+        self.starttime: int = reader.header.starttime
+        self.endtime: int = reader.header.endtime
+        item_count = reader.header.item_count
+        data_offset = reader.header.data_offset
+        item_dtype = reader.meta.item_dtype
+        reader.close()
+
+        if item_count > 0:
+            self._items = np.memmap(
+                os.path.expanduser(data_path),
+                dtype=item_dtype,
+                mode="r",
+                offset=data_offset,
+                shape=(item_count,),
+            )
+        else:
+            self._items = np.zeros(0, dtype=item_dtype)
+
+        # Tick (from start time to end time + 1) -> offset of first item.
+        self._tick_offsets = np.searchsorted(
+            self._items["timestamp"],
+            np.arange(self.starttime, self.endtime + 2),
+        )
+
+    def readings(self, tick: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get CPU readings of specified tick.
+
+        Args:
+            tick (int): Tick to read.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: VM ids and CPU utilization.
+        """
+        if not self.starttime <= tick <= self.endtime:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        start = self._tick_offsets[tick - self.starttime]
+        end = self._tick_offsets[tick - self.starttime + 1]
+        items = self._items[start:end]
+
+        return items["vm_id"].astype(np.int64), items["cpu_utilization"].astype(np.float32)
+
 
 class CpuReader:
-    """A wrapper class for the BinaryReader."""
+    """CPU readings reader of all files, which returns readings of a tick as arrays.
+
+    Readings files are named with file index, like vm_cpu_readings-file-1-of-195.bin, the next file is opened
+    when the end tick of current file is read, and the next file is loaded by a background thread in advance.
+    """
 
     def __init__(self, data_path: str, start_tick: int):
         # Use for re-initialization.
         self._data_path = data_path
-        self._cpu_reader = BinaryReader(self._data_path)
-        self._cpu_item_picker = self._cpu_reader.items_tick_picker(
-            start_time_offset=self._cpu_reader.header.starttime,
-            end_time_offset=self._cpu_reader.header.endtime,
-            time_unit="s",
-        )
-        while start_tick > self._cpu_reader.header.endtime:
+        self._file = CpuReadingsFile(self._data_path)
+
+        self._prefetch_thread: Optional[threading.Thread] = None
+        self._prefetched_file: Optional[CpuReadingsFile] = None
+
+        while start_tick > self._file.endtime:
             self._switch()
 
         self._init_data_path = self._data_path
+        self._init_file = self._file
+
+        self._prefetch()
 
     def _switch_to_next_file_name(self, data_path) -> str:
         """Switch to next file name."""
-        file_name = data_path.split("-")
-        file_name[2] = str(int(file_name[2]) + 1)
-        new_data_path = "-".join(file_name)
+        directory, file_name = os.path.split(data_path)
+        file_index = FILE_INDEX_PATTERN.findall(file_name)[-1]
+        file_name = FILE_INDEX_PATTERN.sub(f"-{int(file_index) + 1}-of-", file_name)
+
+        return os.path.join(directory, file_name)
+
+    def _prefetch(self):
+        """Load next file in background, if it exists."""
+        next_data_path = os.path.expanduser(self._switch_to_next_file_name(self._data_path))
 
-        return new_data_path
+        is_prefetching = self._prefetch_thread is not None or self._prefetched_file is not None
+
+        if is_prefetching or not os.path.exists(next_data_path):
+            return
+
+        def load():
+            self._prefetched_file = CpuReadingsFile(next_data_path)
+
+        self._prefetch_thread = threading.Thread(target=load, daemon=True)
+        self._prefetch_thread.start()
 
     def _switch(self):
-        """Switch to a new binary reader."""
+        """Switch to next file."""
         self._data_path = self._switch_to_next_file_name(self._data_path)
-        self._cpu_reader = BinaryReader(self._data_path)
-        self._cpu_item_picker = self._cpu_reader.items_tick_picker(
-            start_time_offset=0,
-            end_time_offset=self._cpu_reader.header.endtime - self._cpu_reader.header.starttime,
-            time_unit="s",
-        )
 
-    def _pick_up_items(self, cur_items: dict, tick: int):
-        end_time = 0
-        for cpu in self._cpu_item_picker.items(tick=tick - self._cpu_reader.header.starttime):
-            cur_items[cpu.vm_id] = cpu.cpu_utilization
-            end_time = cpu.timestamp
+        if self._prefetch_thread is not None:
+            self._prefetch_thread.join()
+            self._prefetch_thread = None
+
+        if self._prefetched_file is not None and self._prefetched_file.data_path == os.path.expanduser(
+            self._data_path,
+        ):
+            self._file = self._prefetched_file
+        else:
+            self._file = CpuReadingsFile(self._data_path)
+
+        self._prefetched_file = None
 
-        return cur_items, end_time
+    def readings(self, tick: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get CPU readings of specified tick, ticks should be read in order.
+
+        Args:
+            tick (int): Tick to read.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Id of VMs and their CPU utilization, VM ids are unique.
+        """
+        vm_ids, cpu_utilization = self._file.readings(tick)
+        end_time = tick if len(vm_ids) > 0 else 0
 
-    def items(self, tick: int):
-        cur_items = {}
-        cur_items, end_time = self._pick_up_items(cur_items, tick)
         # The most end tick is 8638.
         if end_time == 8638:
-            return cur_items
+            return vm_ids, cpu_utilization
+
         # If the current tick is the end tick of the file, then switch to next file.
-        while end_time == self._cpu_reader.header.endtime:
+        while end_time == self._file.endtime:
             new_file = os.path.expanduser(self._switch_to_next_file_name(self._data_path))
             if not os.path.exists(new_file):
                 break
             self._switch()
+            self._prefetch()
             # Check the start tick of the new file is same as the end tick of the last file.
-            if self._cpu_reader.header.starttime == end_time:
-                cur_items, _ = self._pick_up_items(cur_items, tick)
+            if self._file.starttime == end_time:
+                new_vm_ids, new_cpu_utilization = self._file.readings(tick)
+
+                # Readings in new file override the ones in last file.
+                is_kept = ~np.isin(vm_ids, new_vm_ids)
+                vm_ids = np.concatenate([vm_ids[is_kept], new_vm_ids])
+                cpu_utilization = np.concatenate([cpu_utilization[is_kept], new_cpu_utilization])
+
+        return vm_ids, cpu_utilization
+
+    def items(self, tick: int) -> dict:
+        """Get CPU readings of specified tick as a dictionary, ticks should be read in order.
 
-        return cur_items
+        Args:
+            tick (int): Tick to read.
+
+        Returns:
+            dict: VM id -> CPU utilization.
+        """
+        vm_ids, cpu_utilization = self.readings(tick)
+
+        return dict(zip(vm_ids.tolist(), cpu_utilization.tolist()))
 
     def reset(self):
-        self._data_path = self._init_data_path
-        self._cpu_reader = BinaryReader(self._data_path)
-        self._cpu_item_picker = self._cpu_reader.items_tick_picker(
-            start_time_offset=self._cpu_reader.header.starttime,
-            end_time_offset=self._cpu_reader.header.endtime,
-            time_unit="s",
-        )
+        if self._prefetch_thread is not None:
+            self._prefetch_thread.join()
+            self._prefetch_thread = None
+
+        # Keep the prefetched file if it is still the next one.
+        if self._data_path != self._init_data_path:
+            self._data_path = self._init_data_path
+            self._file = self._init_file
+            self._prefetched_file = None
+
+        self._prefetch()
+
+    def seek(self, tick: int):
+        """Reset the reader and move to specified tick, items before this tick will be skipped."""
+        self.reset()
+
+        while tick > self._file.endtime:
+            new_file = os.path.expanduser(self._switch_to_next_file_name(self._data_path))
+            if not os.path.exists(new_file):
+                break
+            self._switch()
+            self._prefetch()
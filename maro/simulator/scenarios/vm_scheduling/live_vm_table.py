@@ -0,0 +1,143 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from typing import Dict, List
+
+import numpy as np
+
+from .virtual_machine import VirtualMachine
+
+
+class LiveVmTable:
+    """Fields of live VMs in arrays, one slot per VM, used to update all PMs with a few vectorized operations,
+    instead of iterating VMs on each PM.
+
+    Slots of removed VMs are reused by following VMs, and the arrays grow by doubling when there is no free slot.
+    Field values of free slots are meaningless, VM id of them is -1.
+
+    Args:
+        capacity (int): Initial number of slots. Defaults to 1024.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.vm_id = np.full(capacity, -1, dtype=np.int64)
+        self.pm_id = np.zeros(capacity, dtype=np.int64)
+        self.cpu_cores_requirement = np.zeros(capacity, dtype=np.int64)
+        self.memory_requirement = np.zeros(capacity, dtype=np.int64)
+        self.cpu_utilization = np.zeros(capacity, dtype=np.float64)
+        self.unit_price = np.zeros(capacity, dtype=np.float64)
+        self.creation_tick = np.zeros(capacity, dtype=np.int64)
+        self.deletion_tick = np.zeros(capacity, dtype=np.int64)
+
+        # VM id -> slot.
+        self._slots: Dict[int, int] = {}
+        # VM id -> VM, the CPU utilization of VMs is kept in table.
+        self._vms: Dict[int, VirtualMachine] = {}
+        # Free slots, the last one will be used first.
+        self._free_slots: List[int] = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, vm_id: int) -> bool:
+        return vm_id in self._slots
+
+    def add(self, vm: VirtualMachine) -> int:
+        """Add a VM that is allocated to a PM, CPU utilization of the VM will be kept in table until it is removed.
+
+        Args:
+            vm (VirtualMachine): The VM to add, its PM id, creation tick and deletion tick should be set.
+
+        Returns:
+            int: Slot of the VM.
+        """
+        if not self._free_slots:
+            self._grow()
+
+        slot = self._free_slots.pop()
+
+        self.vm_id[slot] = vm.id
+        self.pm_id[slot] = vm.pm_id
+        self.cpu_cores_requirement[slot] = vm.cpu_cores_requirement
+        self.memory_requirement[slot] = vm.memory_requirement
+        self.cpu_utilization[slot] = vm.cpu_utilization
+        self.unit_price[slot] = vm.unit_price
+        self.creation_tick[slot] = vm.creation_tick
+        self.deletion_tick[slot] = vm.deletion_tick
+
+        self._slots[vm.id] = slot
+        self._vms[vm.id] = vm
+        vm.attach(self)
+
+        return slot
+
+    def remove(self, vm_id: int) -> None:
+        """Remove a VM, and free its slot.
+
+        Args:
+            vm_id (int): Id of the VM to remove.
+        """
+        self._vms.pop(vm_id).detach()
+        slot = self._slots.pop(vm_id)
+
+        self.vm_id[slot] = -1
+        self._free_slots.append(slot)
+
+    def get_slot(self, vm_id: int) -> int:
+        """Get slot of a live VM.
+
+        Args:
+            vm_id (int): Id of the VM.
+
+        Returns:
+            int: Slot of the VM.
+        """
+        return self._slots[vm_id]
+
+    def clear(self) -> None:
+        """Remove all VMs, capacity is kept."""
+        for vm in self._vms.values():
+            vm.detach()
+
+        self._vms.clear()
+        self.vm_id[:] = -1
+        self._slots.clear()
+        self._free_slots = list(range(len(self.vm_id) - 1, -1, -1))
+
+    def get_pm_cpu_cores_used(self, pm_amount: int) -> np.ndarray:
+        """Get CPU cores used by live VMs on each PM, that is the sum of VM CPU utilization * VM CPU cores requirement.
+
+        Args:
+            pm_amount (int): Number of PMs.
+
+        Returns:
+            np.ndarray: CPU cores used of each PM, indexed by PM id.
+        """
+        live_slots = self.vm_id >= 0
+
+        return np.bincount(
+            self.pm_id[live_slots],
+            weights=self.cpu_utilization[live_slots] * self.cpu_cores_requirement[live_slots],
+            minlength=pm_amount,
+        )
+
+    def _grow(self):
+        capacity = len(self.vm_id)
+
+        for name in [
+            "vm_id",
+            "pm_id",
+            "cpu_cores_requirement",
+            "memory_requirement",
+            "cpu_utilization",
+            "unit_price",
+            "creation_tick",
+            "deletion_tick",
+        ]:
+            values = getattr(self, name)
+            new_values = np.full(capacity * 2, -1 if name == "vm_id" else 0, dtype=values.dtype)
+            new_values[:capacity] = values
+
+            setattr(self, name, new_values)
+
+        self._free_slots.extend(range(capacity * 2 - 1, capacity - 1, -1))
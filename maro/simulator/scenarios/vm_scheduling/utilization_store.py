@@ -0,0 +1,227 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from typing import Dict, List, Union
+
+import numpy as np
+
+# Minimum number of samples of a block.
+MIN_BLOCK_SIZE = 8
+
+
+class UtilizationStore:
+    """CPU utilization series of VMs in one float32 array, 4 bytes per sample, keyed by VM id and offset in series.
+
+    Series of each VM is kept in a block of continuous samples, block size is a power of 2. A series is moved to
+    a block with double size when its block is full, blocks of released series are reused by following series
+    with same block size.
+
+    NOTE:
+        VM id is used as index of the arrays of series fields, so it should be a non-negative integer, like the VM
+        id of processed Azure data.
+
+    Args:
+        capacity (int): Initial number of samples. Defaults to 1M.
+    """
+
+    def __init__(self, capacity: int = 1 << 20):
+        self._values = np.zeros(capacity, dtype=np.float32)
+        # Number of samples used by blocks, blocks are allocated from the end if there is no free block.
+        self._used = 0
+        # Block size -> start of free blocks.
+        self._free_blocks: Dict[int, List[int]] = {}
+
+        # Fields of series, indexed by VM id, start is -1 if VM has no series.
+        self._starts = np.full(MIN_BLOCK_SIZE, -1, dtype=np.int64)
+        self._lengths = np.zeros(MIN_BLOCK_SIZE, dtype=np.int64)
+        self._block_sizes = np.zeros(MIN_BLOCK_SIZE, dtype=np.int64)
+
+    def reserve(self, vm_id: int, length: int) -> None:
+        """Reserve a block for the series of a VM, it is optional but can avoid moving series when appending.
+
+        Args:
+            vm_id (int): Id of the VM.
+            length (int): Expected length of series.
+        """
+        self._ensure_vm_id(vm_id)
+
+        if self._starts[vm_id] < 0:
+            self._allocate(vm_id, length)
+
+    def append(self, vm_ids: Union[int, np.ndarray], cpu_utilization: Union[float, np.ndarray]) -> None:
+        """Append a sample to series of each VM.
+
+        If CPU utilization is smaller than 0, it means the missing data in the cpu readings file,
+        the last sample of the VM will be used.
+
+        Args:
+            vm_ids (Union[int, np.ndarray]): Id of VMs, should be unique.
+            cpu_utilization (Union[float, np.ndarray]): CPU utilization of each VM.
+        """
+        vm_ids = np.array(vm_ids, dtype=np.int64, ndmin=1)
+        cpu_utilization = np.array(cpu_utilization, dtype=np.float32, ndmin=1)
+
+        if len(vm_ids) == 0:
+            return
+
+        self._ensure_vm_id(int(vm_ids.max()))
+
+        # Series without block, or with a full block.
+        for vm_id in vm_ids[(self._starts[vm_ids] < 0) | (self._lengths[vm_ids] == self._block_sizes[vm_ids])]:
+            self._grow(int(vm_id))
+
+        ends = self._starts[vm_ids] + self._lengths[vm_ids]
+
+        # TODO: We use the last utilization, it could be further refined to use average or others.
+        is_missing = cpu_utilization < 0.0
+
+        if np.any(self._lengths[vm_ids[is_missing]] == 0):
+            raise ValueError("The first CPU utilization of series should not be missing.")
+
+        cpu_utilization[is_missing] = self._values[ends[is_missing] - 1]
+
+        self._values[ends] = cpu_utilization
+        self._lengths[vm_ids] += 1
+
+    def get(self, vm_id: int, offset: int) -> float:
+        """Get a sample of the series of a VM.
+
+        Args:
+            vm_id (int): Id of the VM.
+            offset (int): Offset of sample in series.
+
+        Returns:
+            float: CPU utilization.
+        """
+        if not 0 <= offset < self.get_length(vm_id):
+            raise IndexError(f"The offset {offset} is out of the series of VM {vm_id}.")
+
+        return float(self._values[self._starts[vm_id] + offset])
+
+    def get_many(self, vm_ids: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+        """Get a sample of the series of each VM.
+
+        Args:
+            vm_ids (np.ndarray): Id of VMs.
+            offsets (np.ndarray): Offset of sample in series of each VM.
+
+        Returns:
+            np.ndarray: CPU utilization of each VM.
+        """
+        if np.any((offsets < 0) | (offsets >= self._lengths[vm_ids])):
+            raise IndexError("The offsets are out of the series of VMs.")
+
+        return self._values[self._starts[vm_ids] + offsets]
+
+    def get_series(self, vm_id: int) -> np.ndarray:
+        """Get the series of a VM.
+
+        Args:
+            vm_id (int): Id of the VM.
+
+        Returns:
+            np.ndarray: A copy of series, empty if VM has no series.
+        """
+        start = self._starts[vm_id] if vm_id < len(self._starts) else -1
+
+        if start < 0:
+            return np.zeros(0, dtype=np.float32)
+
+        return self._values[start : start + self._lengths[vm_id]].copy()
+
+    def get_length(self, vm_id: int) -> int:
+        """Get the length of the series of a VM.
+
+        Args:
+            vm_id (int): Id of the VM.
+
+        Returns:
+            int: Number of samples, 0 if VM has no series.
+        """
+        return int(self._lengths[vm_id]) if vm_id < len(self._lengths) else 0
+
+    def release(self, vm_id: int) -> None:
+        """Release the series of a VM, its block will be reused.
+
+        Args:
+            vm_id (int): Id of the VM.
+        """
+        if vm_id >= len(self._starts) or self._starts[vm_id] < 0:
+            return
+
+        self._free_blocks.setdefault(int(self._block_sizes[vm_id]), []).append(int(self._starts[vm_id]))
+
+        self._starts[vm_id] = -1
+        self._lengths[vm_id] = 0
+        self._block_sizes[vm_id] = 0
+
+    def clear(self) -> None:
+        """Release all series, capacity is kept."""
+        self._used = 0
+        self._free_blocks.clear()
+
+        self._starts[:] = -1
+        self._lengths[:] = 0
+        self._block_sizes[:] = 0
+
+    def _ensure_vm_id(self, vm_id: int):
+        if vm_id < 0:
+            raise ValueError(f"VM id {vm_id} should be non-negative.")
+
+        size = len(self._starts)
+
+        if vm_id < size:
+            return
+
+        while size <= vm_id:
+            size *= 2
+
+        extra_size = size - len(self._starts)
+
+        self._starts = np.concatenate([self._starts, np.full(extra_size, -1, dtype=np.int64)])
+        self._lengths = np.concatenate([self._lengths, np.zeros(extra_size, dtype=np.int64)])
+        self._block_sizes = np.concatenate([self._block_sizes, np.zeros(extra_size, dtype=np.int64)])
+
+    def _allocate(self, vm_id: int, length: int):
+        block_size = MIN_BLOCK_SIZE
+
+        while block_size < length:
+            block_size *= 2
+
+        free_blocks = self._free_blocks.get(block_size, None)
+
+        if free_blocks:
+            start = free_blocks.pop()
+        else:
+            start = self._used
+            self._used += block_size
+
+            if self._used > len(self._values):
+                capacity = len(self._values)
+
+                while capacity < self._used:
+                    capacity *= 2
+
+                values = np.zeros(capacity, dtype=np.float32)
+                values[: len(self._values)] = self._values
+                self._values = values
+
+        self._starts[vm_id] = start
+        self._block_sizes[vm_id] = block_size
+
+    def _grow(self, vm_id: int):
+        """Allocate a block for a series without block, or move a series to a block with double size."""
+        start = self._starts[vm_id]
+
+        if start < 0:
+            self._allocate(vm_id, MIN_BLOCK_SIZE)
+
+            return
+
+        length = int(self._lengths[vm_id])
+        block_size = int(self._block_sizes[vm_id])
+
+        self._allocate(vm_id, block_size * 2)
+        self._values[self._starts[vm_id] : self._starts[vm_id] + length] = self._values[start : start + length]
+
+        self._free_blocks.setdefault(block_size, []).append(int(start))
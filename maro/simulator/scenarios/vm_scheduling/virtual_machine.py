@@ -1,9 +1,15 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
-from typing import List
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
 
 from .enums import VmCategory
+from .utilization_store import UtilizationStore
+
+if TYPE_CHECKING:
+    from .live_vm_table import LiveVmTable
 
 
 class VirtualMachine:
@@ -20,6 +26,8 @@ class VirtualMachine:
         cpu_cores_requirement (int): The amount of virtual cores requested by VM.
         memory_requirement (int): The memory requested by VM. The unit is (GBs).
         lifetime (int): The lifetime of the VM, that is, deletion tick - creation tick.
+        utilization_store (UtilizationStore): Store of the CPU utilization series, it is shared by VMs of
+            business engine. If not specified, the VM has its own store. Defaults to None.
     """
 
     def __init__(
@@ -32,6 +40,7 @@ class VirtualMachine:
         deployment_id: int,
         category: VmCategory,
         unit_price: float,
+        utilization_store: Optional[UtilizationStore] = None,
     ):
         # VM Requirement parameters.
         self.id: int = id
@@ -48,11 +57,19 @@ class VirtualMachine:
         # The unit price of the VM.
         self.unit_price: float = unit_price
 
-        # VM utilization list with VM cpu utilization(%) in corresponding tick.
-        self._utilization_series: List[float] = []
+        # VM utilization series with VM cpu utilization(%) in corresponding tick.
+        # Series is keyed by VM id in shared store, and by 0 in own store.
+        if utilization_store is None:
+            self._utilization_store = UtilizationStore(capacity=64)
+            self._series_id = 0
+        else:
+            self._utilization_store = utilization_store
+            self._series_id = id
         # The physical machine Id that the VM is assigned.
         self.pm_id: int = -1
         self._cpu_utilization: float = 0.0
+        # Live VM table that keeps the CPU utilization when the VM is live.
+        self._live_vm_table: Optional["LiveVmTable"] = None
         self.creation_tick: int = -1
         self.deletion_tick: int = -1
 
@@ -62,17 +79,32 @@ class VirtualMachine:
 
     @property
     def cpu_utilization(self) -> float:
+        if self._live_vm_table is not None:
+            return float(self._live_vm_table.cpu_utilization[self._live_vm_table.get_slot(self.id)])
+
         return self._cpu_utilization
 
     @cpu_utilization.setter
     def cpu_utilization(self, cpu_utilization: float):
         self._cpu_utilization = min(max(0, cpu_utilization), 100)
 
+        if self._live_vm_table is not None:
+            self._live_vm_table.cpu_utilization[self._live_vm_table.get_slot(self.id)] = self._cpu_utilization
+
+    def attach(self, live_vm_table: "LiveVmTable"):
+        """Keep CPU utilization in the live VM table, which is updated by business engine for all live VMs."""
+        self._live_vm_table = live_vm_table
+
+    def detach(self):
+        """Keep CPU utilization in VM again, with the latest value in the live VM table."""
+        self._cpu_utilization = self.cpu_utilization
+        self._live_vm_table = None
+
     def get_utilization(self, cur_tick: int) -> float:
-        if cur_tick - self.creation_tick > len(self._utilization_series):
+        if cur_tick - self.creation_tick > self._utilization_store.get_length(self._series_id):
             raise Exception(f"The tick {cur_tick} is invalid for the VM {self.id}.")
 
-        return self._utilization_series[cur_tick - self.creation_tick]
+        return self._utilization_store.get(self._series_id, cur_tick - self.creation_tick)
 
     def add_utilization(self, cpu_utilization: float):
         """VM CPU utilization list.
@@ -82,13 +114,10 @@ class VirtualMachine:
         Hence, this function is designed to append the CPU utilization to the end of the corresponding
         VM utilization series one by one.
         """
-        # If cpu_utilization is smaller than 0, it means the missing data in the cpu readings file.
-        # TODO: We use the last utilization, it could be further refined to use average or others.
-        if cpu_utilization < 0.0:
-            self._utilization_series.append(self._utilization_series[-1])
-        else:
-            self._utilization_series.append(cpu_utilization)
+        # If cpu_utilization is smaller than 0, it means the missing data in the cpu readings file,
+        # the last utilization will be used.
+        self._utilization_store.append(self._series_id, cpu_utilization)
 
-    def get_historical_utilization_series(self, cur_tick: int) -> List[float]:
+    def get_historical_utilization_series(self, cur_tick: int) -> np.ndarray:
         """ "Only expose the CPU utilization series before the current tick."""
-        return self._utilization_series[: cur_tick - self.creation_tick + 1]
+        return self._utilization_store.get_series(self._series_id)[: cur_tick - self.creation_tick + 1]
@@ -0,0 +1,233 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import json
+from array import array
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class ProfileStat:
+    """Aggregated latency of a phase or an event handler.
+
+    Args:
+        name (str): Name of the phase or handler.
+        sample_size (int): Number of latest latencies kept for percentiles.
+    """
+
+    __slots__ = ["name", "count", "total_ns", "max_ns", "_samples", "_sample_size"]
+
+    def __init__(self, name: str, sample_size: int):
+        self.name = name
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+        # Pre-allocated ring buffer, so adding a latency does not allocate.
+        self._samples = array("q", bytes(8 * sample_size))
+        self._sample_size = sample_size
+
+    def add(self, duration_ns: int) -> None:
+        """Add latency of a call.
+
+        Args:
+            duration_ns (int): Latency in nanoseconds.
+        """
+        self._samples[self.count % self._sample_size] = duration_ns
+        self.count += 1
+        self.total_ns += duration_ns
+
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    def clear(self) -> None:
+        """Clear recorded latencies."""
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def percentile(self, q: float) -> float:
+        """Percentile of latest latencies in nanoseconds.
+
+        Args:
+            q (float): Percentile to compute, in range [0, 100].
+
+        Returns:
+            float: Latency in nanoseconds, 0 if there is no call.
+        """
+        size = min(self.count, self._sample_size)
+
+        if size == 0:
+            return 0.0
+
+        return float(np.percentile(np.frombuffer(self._samples, dtype=np.int64, count=size), q))
+
+
+class EnvProfiler:
+    """Profiler that aggregates call count and latency of each simulation phase and event handler.
+
+    Functions are timed by wrappers from wrap and wrap_handler methods, so there is no overhead for environments
+    without profiler. Calls in ticks of trace range are also kept as trace events, which can be dumped into
+    a Chrome trace-event json file (chrome://tracing or https://ui.perfetto.dev).
+
+    Args:
+        sample_size (int): Number of latest latencies kept for percentiles of each phase. Defaults to 4096.
+        trace_ticks (Tuple[int, int]): Range of ticks [start, end) to keep trace events, None means no tracing.
+            Defaults to None.
+    """
+
+    def __init__(self, sample_size: int = 4096, trace_ticks: Optional[Tuple[int, int]] = None):
+        assert sample_size > 0
+        assert trace_ticks is None or trace_ticks[0] <= trace_ticks[1]
+
+        self._sample_size = sample_size
+        self._trace_ticks = trace_ticks
+        self._stats: Dict[str, ProfileStat] = {}
+
+        self._tick = 0
+        self._episode = 0
+        self._is_tracing = False
+
+        # Stat, start time, duration, tick and episode of each call in trace range.
+        self._trace_events: List[Tuple[ProfileStat, int, int, int, int]] = []
+
+    def get_stat(self, name: str) -> ProfileStat:
+        """Get stat of a phase, create it if not exist.
+
+        Args:
+            name (str): Name of the phase.
+
+        Returns:
+            ProfileStat: Stat of the phase.
+        """
+        stat = self._stats.get(name, None)
+
+        if stat is None:
+            stat = ProfileStat(name, self._sample_size)
+
+            self._stats[name] = stat
+
+        return stat
+
+    def set_tick(self, tick: int) -> None:
+        """Set current tick of simulation, used to filter trace events.
+
+        Args:
+            tick (int): Current tick.
+        """
+        self._tick = tick
+        self._is_tracing = self._trace_ticks is not None and self._trace_ticks[0] <= tick < self._trace_ticks[1]
+
+    def new_episode(self) -> None:
+        """Start a new episode, trace events of different episodes are shown as different processes."""
+        self._episode += 1
+
+    def record(self, stat: ProfileStat, start_ns: int) -> None:
+        """Record a call that started at specified time and ends now.
+
+        Args:
+            stat (ProfileStat): Stat of the phase.
+            start_ns (int): Start time from time.perf_counter_ns.
+        """
+        duration_ns = perf_counter_ns() - start_ns
+
+        stat.add(duration_ns)
+
+        if self._is_tracing:
+            self._trace_events.append((stat, start_ns, duration_ns, self._tick, self._episode))
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """Wrap a function to record its calls into stat of specified name.
+
+        Args:
+            name (str): Name of the phase.
+            func (Callable): Function to wrap.
+
+        Returns:
+            Callable: Wrapped function with same parameters and result.
+        """
+        stat = self.get_stat(name)
+        record = self.record
+
+        def wrapper(*args, **kwargs):
+            start_ns = perf_counter_ns()
+
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(stat, start_ns)
+
+        return wrapper
+
+    def wrap_handler(self, event_type: object, handler: Callable, is_batch: bool) -> Callable:
+        """Wrap an event handler, used as handler wrapper of event buffer.
+
+        Args:
+            event_type (object): Type of events processed by the handler.
+            handler (Callable): Event handler.
+            is_batch (bool): Is it a batch event handler.
+
+        Returns:
+            Callable: Wrapped handler.
+        """
+        handler_name = getattr(handler, "__qualname__", repr(handler))
+
+        return self.wrap(f"{'batch_handler' if is_batch else 'handler'}:{event_type}:{handler_name}", handler)
+
+    def summary(self) -> Dict[str, dict]:
+        """Get aggregated latencies of each phase, sorted by total time.
+
+        Returns:
+            Dict[str, dict]: Key is name of phase, value contains call count, total time in milliseconds,
+                mean, p50, p90, p99 and max latency in microseconds. Percentiles are computed from latest
+                calls within sample size.
+        """
+        result = {}
+
+        for stat in sorted(self._stats.values(), key=lambda s: s.total_ns, reverse=True):
+            if stat.count == 0:
+                continue
+
+            result[stat.name] = {
+                "count": stat.count,
+                "total_ms": stat.total_ns / 1e6,
+                "mean_us": stat.total_ns / stat.count / 1e3,
+                "p50_us": stat.percentile(50) / 1e3,
+                "p90_us": stat.percentile(90) / 1e3,
+                "p99_us": stat.percentile(99) / 1e3,
+                "max_us": stat.max_ns / 1e3,
+            }
+
+        return result
+
+    def dump_trace(self, path: str) -> None:
+        """Dump calls in trace range into a Chrome trace-event json file.
+
+        Args:
+            path (str): Path of json file.
+        """
+        trace_events = [
+            {
+                "name": stat.name,
+                "cat": stat.name.split(":")[0],
+                "ph": "X",
+                "ts": start_ns / 1e3,
+                "dur": duration_ns / 1e3,
+                "pid": episode,
+                "tid": 0,
+                "args": {"tick": tick},
+            }
+            for stat, start_ns, duration_ns, tick, episode in self._trace_events
+        ]
+
+        with open(path, "wt") as fp:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, fp)
+
+    def clear(self) -> None:
+        """Clear all stats and trace events."""
+        for stat in self._stats.values():
+            stat.clear()
+
+        self._trace_events.clear()
@@ -86,6 +86,23 @@ class SimRandom:
         rand = self._rand_instances[key]
         rand.seed(self._seed_dict[key])
 
+    def get_state(self) -> Dict[str, tuple]:
+        """Get internal states of all random objects, used to continue the random sequences later.
+
+        Returns:
+            Dict[str, tuple]: Key is the key of random object, value is its internal state.
+        """
+        return {key: rand.getstate() for key, rand in self._rand_instances.items()}
+
+    def set_state(self, state: Dict[str, tuple]) -> None:
+        """Set internal states of random objects from get_state method.
+
+        Args:
+            state (Dict[str, tuple]): Internal states of random objects.
+        """
+        for key, rand_state in state.items():
+            self[key].setstate(rand_state)
+
     def clear(self) -> None:
         """Clear all existing random keys."""
         self._rand_instances = OrderedDict()
@@ -9,6 +9,9 @@ streamit = None
 # We use environment variable to control if streaming enabled.
 is_streamit_enabled: bool = os.environ.get("MARO_STREAMIT_ENABLED", "") == "true"
 
+# Send data in batches of columns through shared memory.
+is_streamit_buffered: bool = os.environ.get("MARO_STREAMIT_BUFFERED", "") == "true"
+
 experiment_name: str = os.environ.get("MARO_STREAMIT_EXPERIMENT_NAME", "UNNAMED_EXPERIMENT")
 
 # Append timestamp to all experiment name to make sure all experiment name are unique.
@@ -46,6 +49,6 @@ if streamit is None:
     else:
         from .client import StreamitClient
 
-        streamit = StreamitClient(experiment_name, server_ip)
+        streamit = StreamitClient(experiment_name, server_ip, buffered=is_streamit_buffered)
 
 __all__ = ["streamit"]
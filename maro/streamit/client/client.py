@@ -2,12 +2,15 @@
 # Licensed under the MIT license.
 
 import json
+import pickle
 from multiprocessing import Queue
+from typing import Dict, List
 
 import numpy
 import torch
 
 from .common import MessageType
+from .ring_buffer import DEFAULT_RING_BUFFER_SIZE, RingBuffer
 from .sender import StreamitSender
 
 
@@ -26,18 +29,85 @@ def ensure_state(func):
     return _wrapper
 
 
+class _ColumnBatch:
+    """Columns of a category collected in current tick."""
+
+    __slots__ = ["rows", "columns"]
+
+    def __init__(self):
+        self.rows = 0
+        self.columns: Dict[str, List[object]] = {}
+
+    def append(self, row: dict):
+        rows = self.rows
+        columns = self.columns
+
+        for name, value in row.items():
+            column = columns.get(name, None)
+
+            if column is None:
+                # New column, no value for previous rows.
+                column = [None] * rows
+                columns[name] = column
+
+            column.append(value)
+
+        self.rows = rows + 1
+
+        if len(row) != len(columns):
+            for column in columns.values():
+                if len(column) == rows:
+                    column.append(None)
+
+    def to_arrays(self) -> dict:
+        """Convert numeric columns into numpy arrays, which are much faster to pickle than lists of numbers."""
+        result = {}
+
+        for name, column in self.columns.items():
+            try:
+                array = numpy.asarray(column)
+            except ValueError:
+                # Lists with different length.
+                array = None
+
+            result[name] = array if array is not None and array.ndim == 1 and array.dtype.kind in "iufb" else column
+
+        return result
+
+
 class StreamitClient:
     """Client that used to collect data and stream the to server.
 
+    In buffered mode, data of each category are collected as columns in current tick, and sent to sender process
+    in one batch through a ring buffer in shared memory when tick or episode changes, then sent to data service
+    as one multi-line message.
+
     Args:
         experiment_name (str): Name of current experiment, must be unique.
         host (str): Host ip of data service.
+        buffered (bool): Send data in batches of columns. Defaults to False.
+        port (int): Port of data service. Defaults to 9009.
+        ring_buffer_size (int): Size of ring buffer in bytes in buffered mode. Defaults to 64MB.
     """
 
-    def __init__(self, experiment_name: str, host="127.0.0.1"):
+    def __init__(
+        self,
+        experiment_name: str,
+        host="127.0.0.1",
+        buffered: bool = False,
+        port: int = 9009,
+        ring_buffer_size: int = DEFAULT_RING_BUFFER_SIZE,
+    ):
         self._sender: StreamitSender
         self._data_queue = Queue()
 
+        self._is_buffered = buffered
+        self._port = port
+        self._ring_buffer = RingBuffer(ring_buffer_size) if buffered else None
+
+        # Category name to its columns of current tick.
+        self._batches: Dict[str, _ColumnBatch] = {}
+
         self._cur_episode = 0
         self._cur_tick = 0
 
@@ -76,6 +146,12 @@ class StreamitClient:
         Args:
             tick (int): Current tick.
         """
+        if self._is_buffered:
+            self._flush()
+            self._cur_tick = tick
+
+            return
+
         self._cur_tick = tick
 
         self._put(MessageType.Tick, tick)
@@ -87,6 +163,9 @@ class StreamitClient:
         Args:
             episode (int): Current episode.
         """
+        if self._is_buffered:
+            self._flush()
+
         self._cur_episode = episode
 
         self._put(MessageType.Episode, episode)
@@ -102,7 +181,10 @@ class StreamitClient:
             category (str): Category name of current data collection.
             kwargs (dict): Named data to send of current category.
         """
-        self._put(MessageType.Data, (category, kwargs))
+        if self._is_buffered:
+            self._append(category, kwargs)
+        else:
+            self._put(MessageType.Data, (category, kwargs))
 
     @ensure_state
     def complex(self, category: str, value: dict):
@@ -156,11 +238,14 @@ class StreamitClient:
                 )
 
         for item in items:
-            self._put(MessageType.Data, (category, item))
+            self.data(category, **item)
 
     def close(self):
         """Close current client connection."""
         if self._is_started and self._sender is not None and self._sender.is_alive():
+            if self._is_buffered:
+                self._flush()
+
             # Send a close command and wait for stop.
             self._put(MessageType.Close, None)
 
@@ -177,9 +262,41 @@ class StreamitClient:
         """
         self._data_queue.put((msg_type, data))
 
+    def _append(self, category: str, row: dict):
+        """Append a row to columns of specified category in current tick."""
+        batch = self._batches.get(category, None)
+
+        if batch is None:
+            batch = _ColumnBatch()
+
+            self._batches[category] = batch
+
+        batch.append(row)
+
+    def _flush(self):
+        """Send columns of current tick to sender process in one frame."""
+        if len(self._batches) == 0:
+            return
+
+        batches = {category: batch.to_arrays() for category, batch in self._batches.items()}
+        frame = pickle.dumps((self._cur_episode, self._cur_tick, batches), protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._batches.clear()
+
+        # Wait for sender process if buffer is full, data are dropped if it stopped.
+        while not self._ring_buffer.put(frame, timeout=1):
+            if not self._sender.is_alive():
+                break
+
     def _start(self):
         """Start sender process, then we are ready to go."""
-        self._sender = StreamitSender(self._data_queue, self._experiment_name, self._host)
+        self._sender = StreamitSender(
+            self._data_queue,
+            self._experiment_name,
+            self._host,
+            self._ring_buffer,
+            self._port,
+        )
 
         try:
             self._sender.start()
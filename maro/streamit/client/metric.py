@@ -93,6 +93,60 @@ def parse_value(value: object):
     return '"%s"' % escape(value, True)
 
 
+def parse_column(name: str, column: object):
+    """Parse a column of values into fields of influxdb line protocol.
+
+    Args:
+        name (str): Name of the column.
+        column (object): List of values, or 1 dimension numpy array. None in list means no value for that row.
+
+    Returns:
+        list: Field string of each row, empty string if no value.
+    """
+    escaped_name = escape(name)
+
+    if type(column) is np.ndarray:
+        kind = column.dtype.kind
+
+        if kind in "iu":
+            return [f"{escaped_name}={v}i" for v in column.tolist()]
+
+        if kind == "f":
+            return [f"{escaped_name}=%g" % v for v in column.tolist()]
+
+        if kind == "b":
+            return [f"{escaped_name}={'t' if v else 'f'}" for v in column.tolist()]
+
+        column = column.tolist()
+
+    return ["" if v is None else f"{escaped_name}={parse_value(v)}" for v in column]
+
+
+def columns_to_lines(measurement: str, tags: dict, timestamp: int, columns: dict):
+    """Convert columns of a measurement into influxdb line protocol messages, one line for each row.
+
+    Args:
+        measurement (str): Name of the measurement.
+        tags (dict): Tags of all rows.
+        timestamp (int): Timestamp of all rows.
+        columns (dict): Column name to list or 1 dimension numpy array of values, with same length.
+
+    Returns:
+        list: Line of each row, same as converting each row with Metric.
+    """
+    # Measurement, tags and timestamp are same for all the rows.
+    prefix = measurement.replace(",", "\\,").replace(" ", "\\ ")
+
+    if len(tags) > 0:
+        prefix += "," + ",".join(f"{escape(str(k))}={escape(str(v))}" for k, v in tags.items())
+
+    suffix = "" if timestamp is None else " %d" % timestamp
+
+    fields = [parse_column(str(name), column) for name, column in columns.items()]
+
+    return [f"{prefix} {','.join(f for f in row_fields if f)}{suffix}" for row_fields in zip(*fields)]
+
+
 # modified version from: https://pypi.org/project/influx-line-protocol/
 class Metric(object):
     """Metric used to convert message into to influxdb line protocol message.
@@ -170,4 +224,4 @@ class Metric(object):
         return protocol
 
 
-__all__ = ["Metric"]
+__all__ = ["Metric", "columns_to_lines"]
@@ -0,0 +1,133 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import ctypes
+import struct
+import time
+from multiprocessing.sharedctypes import RawArray, RawValue
+from typing import Optional
+
+DEFAULT_RING_BUFFER_SIZE = 64 * 1024 * 1024
+
+FRAME_HEADER = struct.Struct("<I")
+
+
+class RingBuffer:
+    """Ring buffer in shared memory, used to pass byte frames from environment process to sender process.
+
+    It supports one producer and one consumer only, producer only updates the written size, and consumer only
+    updates the read size. Frame is written before the written size, so consumer never reads a partial frame.
+
+    NOTE:
+        It should be created before starting the consumer process, and passed as its parameter.
+
+    Args:
+        capacity (int): Size of buffer in bytes. Defaults to 64MB.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_RING_BUFFER_SIZE):
+        self._capacity = capacity
+        self._buffer = RawArray(ctypes.c_ubyte, capacity)
+
+        # Total bytes written and read.
+        self._written = RawValue(ctypes.c_uint64, 0)
+        self._read = RawValue(ctypes.c_uint64, 0)
+
+        self._view: Optional[memoryview] = None
+
+    @property
+    def capacity(self) -> int:
+        """int: Size of buffer in bytes."""
+        return self._capacity
+
+    def put(self, frame: bytes, timeout: Optional[float] = None) -> bool:
+        """Put a frame into buffer, wait if there is no enough space.
+
+        Args:
+            frame (bytes): Frame to put.
+            timeout (float): Seconds to wait for space, None means waiting until there is enough space.
+                Defaults to None.
+
+        Returns:
+            bool: Is the frame put, False if timeout.
+        """
+        size = FRAME_HEADER.size + len(frame)
+
+        if size > self._capacity:
+            raise ValueError(f"Frame size {len(frame)} exceeds capacity of ring buffer {self._capacity}.")
+
+        written = self._written.value
+
+        if written + size - self._read.value > self._capacity:
+            deadline = None if timeout is None else time.time() + timeout
+
+            while written + size - self._read.value > self._capacity:
+                if deadline is not None and time.time() > deadline:
+                    return False
+
+                time.sleep(0.001)
+
+        self._write(written, FRAME_HEADER.pack(len(frame)))
+        self._write(written + FRAME_HEADER.size, frame)
+
+        self._written.value = written + size
+
+        return True
+
+    def get(self) -> Optional[bytes]:
+        """Get next frame from buffer.
+
+        Returns:
+            bytes: Next frame, None if buffer is empty.
+        """
+        read = self._read.value
+
+        if read == self._written.value:
+            return None
+
+        (frame_size,) = FRAME_HEADER.unpack(self._read_bytes(read, FRAME_HEADER.size))
+
+        frame = self._read_bytes(read + FRAME_HEADER.size, frame_size)
+
+        self._read.value = read + FRAME_HEADER.size + frame_size
+
+        return frame
+
+    def __len__(self):
+        return self._written.value - self._read.value
+
+    def _get_view(self) -> memoryview:
+        # Memory view cannot be passed to another process, so it is created on first use of each process.
+        if self._view is None:
+            self._view = memoryview(self._buffer).cast("B")
+
+        return self._view
+
+    def _write(self, offset: int, data: bytes) -> None:
+        view = self._get_view()
+        start = offset % self._capacity
+        first_size = min(len(data), self._capacity - start)
+
+        view[start : start + first_size] = data[:first_size]
+
+        if first_size < len(data):
+            view[: len(data) - first_size] = data[first_size:]
+
+    def _read_bytes(self, offset: int, size: int) -> bytes:
+        view = self._get_view()
+        start = offset % self._capacity
+        first_size = min(size, self._capacity - start)
+
+        if first_size == size:
+            return view[start : start + size].tobytes()
+
+        return view[start:].tobytes() + view[: size - first_size].tobytes()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_view"] = None
+
+        return state
+
+
+__all__ = ["RingBuffer"]
@@ -3,12 +3,15 @@
 
 import asyncio
 import os
+import pickle
 import warnings
 from datetime import datetime
 from multiprocessing import Process, Queue
+from typing import Optional
 
 from .common import MessageType
-from .metric import Metric
+from .metric import Metric, columns_to_lines
+from .ring_buffer import RingBuffer
 
 # We disable streamit here as we are in another process now,
 # or it will try to start the sender again.
@@ -26,14 +29,26 @@ class StreamitSender(Process):
         data_queue (Queue): Queue used to pass data from environment process to current.
         experiment_name (str): Name of current experiment.
         address (str): IP address of data service.
+        ring_buffer (RingBuffer): Ring buffer to receive batches of data columns in buffered mode,
+            None if not buffered. Defaults to None.
+        port (int): Port of data service. Defaults to 9009.
     """
 
-    def __init__(self, data_queue: Queue, experiment_name: str, address: str):
+    def __init__(
+        self,
+        data_queue: Queue,
+        experiment_name: str,
+        address: str,
+        ring_buffer: Optional[RingBuffer] = None,
+        port: int = 9009,
+    ):
         super().__init__()
 
         self._address = address
+        self._port = port
         self._experiment_name = experiment_name
         self._data_queue = data_queue
+        self._ring_buffer = ring_buffer
 
         self._cur_episode = 0
         self._cur_tick = 0
@@ -54,7 +69,7 @@ class StreamitSender(Process):
         reader: asyncio.StreamReader
 
         try:
-            reader, writer = await asyncio.open_connection(host=self._address, port=9009, loop=loop)
+            reader, writer = await asyncio.open_connection(host=self._address, port=self._port)
         except Exception as ex:
             print(ex)
 
@@ -68,9 +83,15 @@ class StreamitSender(Process):
         # If we received stop message?
         is_stopping = False
 
+        # Data batches are in ring buffer in buffered mode, so queue is checked more frequently.
+        queue_timeout = 1 if self._ring_buffer is None else 0.01
+
         while True:
             try:
-                msg = self._data_queue.get(timeout=1)
+                if self._ring_buffer is not None:
+                    await self._send_batches(writer)
+
+                msg = self._data_queue.get(timeout=queue_timeout)
 
                 msg_type, data = msg
 
@@ -137,6 +158,30 @@ class StreamitSender(Process):
 
         loop.stop()
 
+    async def _send_batches(self, writer: asyncio.StreamWriter):
+        """Send all batches in ring buffer, lines of each batch are sent together."""
+        while True:
+            frame = self._ring_buffer.get()
+
+            if frame is None:
+                break
+
+            episode, tick, batches = pickle.loads(frame)
+
+            tags = {"episode": episode, "tick": tick, "experiment": self._experiment_name}
+            lines = []
+
+            for category, columns in batches.items():
+                lines.extend(
+                    columns_to_lines(f"{self._experiment_name}.{category}", tags, (episode << 32) | tick, columns),
+                )
+
+            if len(lines) > 0:
+                writer.write(bytes("\n".join(lines), "utf-8"))
+                writer.write(NEXT_LINE)
+
+                await writer.drain()
+
     async def _send(self, writer: asyncio.StreamWriter, metrics: list):
         if metrics and len(metrics) > 0:
             msg_str = "\n".join([str(m) for m in metrics])
@@ -92,3 +92,10 @@ class BackendsInvalidAttributeException(MAROException):
 
     def __init__(self):
         super().__init__(2110, ERROR_CODE[2110])
+
+
+class BackendsInvalidQueryOutputException(MAROException):
+    """Exception when the output buffer for snapshot querying does not match the result."""
+
+    def __init__(self):
+        super().__init__(2111, ERROR_CODE[2111])
@@ -34,8 +34,12 @@ ERROR_CODE = {
     2108: "Node already been deleted.",
     2109: "Node not exist.",
     2110: "Invalid attribute.",
+    2111: "Invalid output buffer for snapshot querying, it must be a C-contiguous float64 array of result size.",
     # simulator
     2200: "Cannot find specified business engine",
+    2201: "Environment state can only be saved before the first step or at a decision point",
+    2202: "Environment can only run an episode before the first step, or after run stops at max decisions",
+    2203: "Metrics of a decision point can only be read before the environment moves on from it",
     # 3000-3999: Error code for CLI
     3000: "CLI Internal Error",
     3001: "Command Error",
@@ -11,3 +11,24 @@ class BusinessEngineNotFoundError(MAROException):
 
     def __init__(self):
         super().__init__(2200, ERROR_CODE[2200])
+
+
+class EnvStateNotSavableError(MAROException):
+    """Exception when saving environment state after the episode finished."""
+
+    def __init__(self):
+        super().__init__(2201, ERROR_CODE[2201])
+
+
+class EnvRunNotAllowedError(MAROException):
+    """Exception when running environment after it is stepped in current episode."""
+
+    def __init__(self):
+        super().__init__(2202, ERROR_CODE[2202])
+
+
+class MetricsExpiredError(MAROException):
+    """Exception when reading metrics of a decision point for the first time after environment moved on."""
+
+    def __init__(self):
+        super().__init__(2203, ERROR_CODE[2203])
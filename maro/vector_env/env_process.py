@@ -1,6 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import os
 from multiprocessing import Process
 from multiprocessing.connection import Connection
 
@@ -12,13 +13,16 @@ class EnvProcess(Process):
 
     Args:
         pipe (Connection): Pipe that used to communicate between main process and this process.
+        shared_memory (bool): Place frame of static backend in shared memory, so main process can query snapshots
+            without sending them by pipe.
         (args, kwargs): Parameter for Env class.
     """
 
-    def __init__(self, pipe: Connection, *args, **kwargs):
+    def __init__(self, pipe: Connection, *args, shared_memory: bool = False, **kwargs):
         super().__init__()
 
         self._pipe = pipe
+        self._shared_memory = shared_memory
         self._env: Env = None
         self._args = args
         self._kwargs = kwargs
@@ -29,6 +33,9 @@ class EnvProcess(Process):
         decision_event = None
         is_done = False
 
+        if self._shared_memory:
+            os.environ["DEFAULT_BACKEND_SHARED_MEMORY"] = "true"
+
         env = Env(*self._args, **self._kwargs)
 
         while True:
@@ -56,6 +63,8 @@ class EnvProcess(Process):
                 states = env.snapshot_list[node_name][args]
 
                 self._pipe.send(states)
+            elif cmd == "shared_memory_descriptor":
+                self._pipe.send(env.business_engine.frame.shared_memory_descriptor)
             elif cmd == "tick":
                 self._pipe.send(env.tick)
             elif cmd == "frame_index":
@@ -6,10 +6,11 @@ from __future__ import annotations
 import os
 from multiprocessing import Pipe
 from multiprocessing.connection import Connection
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
 
+from maro.backends.shared_memory import SharedSnapshotList
 from maro.simulator import DecisionMode
 
 from .env_process import EnvProcess
@@ -65,8 +66,10 @@ class VectorEnv:
         business_engine_cls: type = None,
         disable_finished_events: bool = False,
         options: dict = {},
+        shared_memory: bool = False,
     ):
         self._is_env_started = False
+        self._shared_snapshots: Optional[List[SharedSnapshotList]] = None
 
         # Ensure batch number less than CPU core
         assert 0 < batch_num <= os.cpu_count()
@@ -90,8 +93,16 @@ class VectorEnv:
             business_engine_cls,
             disable_finished_events,
             options,
+            shared_memory=shared_memory,
         )
 
+        if shared_memory:
+            descriptors = self._send("shared_memory_descriptor")
+
+            # Only static backend can be placed in shared memory, query by pipe otherwise.
+            if all(descriptor is not None for descriptor in descriptors):
+                self._shared_snapshots = [SharedSnapshotList(descriptor) for descriptor in descriptors]
+
     @property
     def batch_number(self) -> int:
         """Int: Number of environment processes."""
@@ -153,6 +164,11 @@ class VectorEnv:
         if self._is_env_started and not self._is_stopping:
             self._is_stopping = True
 
+            # Shared memory will be removed after environments stopped.
+            if self._shared_snapshots is not None:
+                for snapshots in self._shared_snapshots:
+                    snapshots.close()
+
             self._send("stop", wait_response=False)
 
             for proc in self._sub_process_list:
@@ -181,6 +197,10 @@ class VectorEnv:
             node_name (str): Node name to query.
             args (slice): Args for snapshot list querying.
         """
+        if self._shared_snapshots is not None:
+            # Read from shared memory directly, environments are waiting for commands, so states are not changing.
+            return [snapshots[node_name][args] for snapshots in self._shared_snapshots]
+
         return self._send("query", (node_name, args))
 
     def _send(self, cmd: str, content: Union[list, object, dict] = None, wait_response=True):
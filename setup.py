@@ -82,6 +82,15 @@ extensions.append(
     ),
 )
 
+# compiled event buffer
+extensions.append(
+    Extension(
+        "maro.event_buffer.fast_event_buffer",
+        sources=["./maro/event_buffer/fast_event_buffer.cpp"],
+        extra_compile_args=[compile_flag],
+    ),
+)
+
 # It is not necessary to install these packages when using manylinux action, as we only need numpy to build wheels
 # NOTE: install following package will cause build error in current(2023-03-14) manylinux image
 if "GITHUB_BUILD_ACTION" in os.environ:
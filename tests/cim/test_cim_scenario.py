@@ -361,6 +361,44 @@ class TestCimScenarios(unittest.TestCase):
             self.assertListEqual(port_info_1, port_info_2)
             self.assertFalse(all(port1 == port3 for port1, port3 in zip(port_info_1, port_info_3)))
 
+    def test_save_and_restore_state(self) -> None:
+        def run_to_end(metrics, decision_event, is_done):
+            while not is_done:
+                action = Action(
+                    decision_event.vessel_idx,
+                    decision_event.port_idx,
+                    min(10, decision_event.action_scope.load),
+                    ActionType.LOAD,
+                )
+                metrics, decision_event, is_done = self._env.step(action)
+
+            return metrics, self._env.snapshot_list["ports"][::["empty", "full", "shortage"]].flatten().tolist()
+
+        for backend_name in backends_to_test:
+            self._init_env(backend_name)
+
+            metrics, decision_event, is_done = self._env.step(None)
+
+            for _ in range(3):
+                metrics, decision_event, is_done = self._env.step(None)
+
+            state = self._env.save_state()
+
+            metrics_1, states_1 = run_to_end(metrics, decision_event, is_done)
+
+            # Same decision event should be returned after restoring, and following simulation should be same.
+            for _ in range(2):
+                metrics, restored_decision_event, is_done = self._env.restore_state(state)
+
+                self.assertEqual(decision_event.tick, self._env.tick)
+                self.assertEqual(decision_event.port_idx, restored_decision_event.port_idx)
+                self.assertEqual(decision_event.vessel_idx, restored_decision_event.vessel_idx)
+
+                metrics_2, states_2 = run_to_end(metrics, restored_decision_event, is_done)
+
+                self.assertTrue(compare_dictionary(metrics_1, metrics_2))
+                self.assertListEqual(states_1, states_2)
+
     def test_order_export(self) -> None:
         """order.tick, order.src_port_idx, order.dest_port_idx, order.quantity"""
         Order = namedtuple("Order", ["tick", "src_port_idx", "dest_port_idx", "quantity"])
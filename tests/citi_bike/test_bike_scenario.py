@@ -3,10 +3,16 @@
 
 import os
 import unittest
+from unittest.mock import patch
+
+import numpy as np
 
 from maro.data_lib import BinaryConverter
 from maro.event_buffer import EventBuffer
+from maro.simulator import Env
+from maro.simulator.scenarios.citi_bike import business_engine
 from maro.simulator.scenarios.citi_bike.business_engine import CitibikeBusinessEngine
+from maro.simulator.scenarios.citi_bike.common import Action, DecisionType
 from maro.simulator.scenarios.citi_bike.events import CitiBikeEvents
 
 from tests.utils import backends_to_test, be_run_to_end, next_step
@@ -206,6 +212,154 @@ class TestCitibike(unittest.TestCase):
             self.assertEqual(0, states_at_tick_1[1])
             self.assertEqual(6, states_at_tick_1[2])
 
+    def test_save_and_restore_state(self):
+        """Test if simulation continues from the saved decision point after restoring, case_2"""
+        for backend_name in backends_to_test:
+            os.environ["DEFAULT_BACKEND_NAME"] = backend_name
+
+            # Make sure binary files exist.
+            setup_case("case_2", max_tick=5)
+
+            env = Env(scenario="citi_bike", topology="tests/data/citi_bike/case_2", start_tick=0, durations=100)
+
+            metrics, decision_event, is_done = env.step(None)
+            metrics, decision_event, is_done = env.step(None)
+
+            state = env.save_state()
+            saved_tick = env.tick
+
+            while not is_done:
+                metrics, decision_event, is_done = env.step(None)
+
+            metrics_before_restoring = dict(metrics)
+            states = env.snapshot_list["stations"][::["bikes", "shortage", "fulfillment"]].flatten().tolist()
+
+            metrics, decision_event, is_done = env.restore_state(state)
+
+            self.assertEqual(saved_tick, env.tick)
+            self.assertFalse(is_done)
+
+            while not is_done:
+                metrics_after_restoring, decision_event, is_done = env.step(None)
+
+            self.assertDictEqual(metrics_before_restoring, dict(metrics_after_restoring))
+            self.assertListEqual(
+                states,
+                env.snapshot_list["stations"][::["bikes", "shortage", "fulfillment"]].flatten().tolist(),
+            )
+
+    def test_skip_inactive_ticks(self):
+        """Test if skipping inactive ticks gets same result as stepping each tick, case_3"""
+        for backend_name in backends_to_test:
+            os.environ["DEFAULT_BACKEND_NAME"] = backend_name
+
+            # Make sure binary files exist.
+            setup_case("case_3", max_tick=5)
+
+            results = []
+            stepped_ticks_list = []
+
+            for skip_inactive_ticks in [False, True]:
+                # Transfer time of bikes is sampled from global random state.
+                np.random.seed(0)
+
+                env = Env(
+                    scenario="citi_bike",
+                    topology="tests/data/citi_bike/case_3",
+                    start_tick=0,
+                    durations=300,
+                    snapshot_resolution=7,
+                    skip_inactive_ticks=skip_inactive_ticks,
+                )
+
+                decision_ticks = []
+                stepped_ticks = []
+
+                be_step = env.business_engine.step
+
+                def step_and_record(tick: int, be_step=be_step, stepped_ticks=stepped_ticks):
+                    stepped_ticks.append(tick)
+                    be_step(tick)
+
+                env.business_engine.step = step_and_record
+
+                metrics, decision_event, is_done = env.step(None)
+
+                while not is_done:
+                    decision_ticks.append(env.tick)
+
+                    # Supply stations send bikes to the other one, to generate transfer events.
+                    action = None
+
+                    if decision_event.type == DecisionType.Supply:
+                        action = Action(decision_event.station_idx, 1 - decision_event.station_idx, 2)
+
+                    metrics, decision_event, is_done = env.step(action)
+
+                results.append(
+                    (
+                        dict(metrics),
+                        decision_ticks,
+                        env.snapshot_list.get_frame_index_list(),
+                        env.snapshot_list["stations"][::["bikes", "shortage", "fulfillment", "min_bikes"]]
+                        .flatten()
+                        .tolist(),
+                    ),
+                )
+                stepped_ticks_list.append(stepped_ticks)
+
+            self.assertEqual(results[0], results[1])
+
+            # All ticks are stepped without skipping, while trips are sparse in case_3.
+            self.assertEqual(list(range(300)), stepped_ticks_list[0])
+            self.assertLess(len(stepped_ticks_list[1]), 150)
+            self.assertEqual(299, stepped_ticks_list[1][-1])
+
+    def test_vectorized_handlers(self):
+        """Test if processing trips and returns with numpy gets same result as one by one, case_3"""
+        for backend_name in backends_to_test:
+            os.environ["DEFAULT_BACKEND_NAME"] = backend_name
+
+            setup_case("case_3", max_tick=5)
+
+            results = []
+
+            for min_vectorized_events in [business_engine.MIN_VECTORIZED_EVENTS, 1]:
+                with patch.object(business_engine, "MIN_VECTORIZED_EVENTS", min_vectorized_events):
+                    np.random.seed(0)
+
+                    env = Env(
+                        scenario="citi_bike",
+                        topology="tests/data/citi_bike/case_3",
+                        start_tick=0,
+                        durations=300,
+                        snapshot_resolution=7,
+                    )
+
+                    metrics, decision_event, is_done = env.step(None)
+
+                    while not is_done:
+                        action = None
+
+                        if decision_event.type == DecisionType.Supply:
+                            action = Action(decision_event.station_idx, 1 - decision_event.station_idx, 2)
+
+                        metrics, decision_event, is_done = env.step(action)
+
+                    results.append(
+                        (
+                            dict(metrics),
+                            env.snapshot_list["stations"][
+                                ::["bikes", "shortage", "fulfillment", "trip_requirement", "min_bikes"]
+                            ]
+                            .flatten()
+                            .tolist(),
+                            env.snapshot_list["matrices"][::"trips_adj"].flatten().tolist(),
+                        ),
+                    )
+
+            self.assertEqual(results[0], results[1])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,11 +1,19 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import os
+import sys
+import tempfile
 from time import time
 
+import numpy as np
+import psutil
 from termgraph import termgraph as tg
 
 from maro.backends.frame import FrameBase, FrameNode, NodeAttribute, NodeBase, node
+from maro.event_buffer import EventBuffer
+from maro.event_buffer.fast_event_buffer import EventBuffer as FastEventBuffer
+from maro.simulator import Env
 
 NODE1_NUMBER = 100
 NODE2_NUMBER = 100
@@ -18,6 +26,83 @@ TAKE_SNAPSHOT_TIME = 10000
 
 AVG_TIME = 4
 
+# Settings for snapshot mode comparison, large node number with few changes per tick.
+SNAPSHOT_MODE_NODE_NUMBER = 10000
+SNAPSHOT_MODE_TICKS = 1000
+SNAPSHOT_MODE_CHANGED_NODES = 10
+
+# Settings for window querying, like building states with latest ticks for all nodes.
+WINDOW_QUERYING_TIME = 1000
+WINDOW_QUERYING_SIZE = 10
+COMPILED_QUERYING_NODES = [0, 1, 2, 3]
+
+# Settings for branching rollouts, like evaluating candidate actions from same decision point.
+BRANCH_DURATIONS = 1120
+BRANCH_DECISION_NUMBER = 100
+BRANCH_ROLLOUT_DECISIONS = 10
+BRANCH_TIMES = 100
+
+# Settings for list heavy frame, like live VMs on each PM, lists keep growing and are trimmed periodically.
+LIST_NODE_NUMBER = 100
+LIST_TICKS = 1000
+LIST_APPEND_PER_TICK = 20
+LIST_TRIM_INTERVAL = 10
+
+# Settings for event scheduling, events are scattered in a long episode, each one generates a follow-up event.
+EVENT_SCHEDULING_TICKS = 100000
+EVENT_SCHEDULING_NUMBER = 1000000
+EVENT_SCHEDULING_MAX_DELAY = 1000
+
+# Settings for event dispatching, each tick has atom events, and cascade events with an immediate event.
+EVENT_DISPATCHING_TICKS = 10000
+EVENT_DISPATCHING_ATOM_PER_TICK = 50
+EVENT_DISPATCHING_CASCADE_PER_TICK = 10
+
+# Settings for event recording, events with a payload that declares summary fields, including a list like valid PMs.
+EVENT_RECORDING_TICKS = 1000
+EVENT_RECORDING_PER_TICK = 200
+EVENT_RECORDING_DEST_NUMBER = 100
+
+# Settings for tick skipping, built-in topologies with scenario name, topology name, durations and snapshot resolution.
+TICK_SKIPPING_TOPOLOGIES = [
+    ("cim", "toy.5p_ssddd_l0.0", 1120, 1),
+    ("citi_bike", "toy.3s_4t", 10080, 60),
+]
+
+
+# Settings for closed-loop running, rule-based algorithms of examples/vm_scheduling/rule_based_algorithm,
+# with module, class name and arguments.
+RULE_BASED_TOPOLOGY = "azure.2019.10k"
+RULE_BASED_DURATIONS = 8638
+RULE_BASED_ALGORITHMS = [
+    ("first_fit", "FirstFit", {}),
+    ("best_fit", "BestFit", {"metric_type": "remaining_cpu_cores"}),
+    ("round_robin", "RoundRobin", {}),
+]
+
+
+# Settings for streaming data, like details of ports and vessels in each tick of CIM.
+STREAMIT_TICKS = 1000
+STREAMIT_ROWS_PER_TICK = 100
+
+# Settings for valid PM lookup, PMs with random allocated resource, and VM requests of random requirements.
+VALID_PM_NUMBERS = [1000, 10000, 50000]
+VALID_PM_LOOKUP_TIME = 100
+
+# Settings for PM workload updating in each tick, VMs are randomly placed on PMs with a power curve.
+PM_WORKLOAD_PM_NUMBER = 10000
+PM_WORKLOAD_VM_NUMBER = 100000
+PM_WORKLOAD_TICKS = 20
+PM_WORKLOAD_POWER_CURVE = {"calibration_parameter": 1.4, "busy_power": 300, "idle_power": 100}
+
+# Settings for VM utilization series, each live VM appends a sample in each tick, some samples are missing.
+UTILIZATION_VM_NUMBER = 20000
+UTILIZATION_TICKS = 300
+
+# Settings for CPU readings, each tick has readings of a few VMs, like the processed Azure data.
+CPU_READINGS_TICKS = 500
+CPU_READINGS_VM_PER_TICK = 2000
+
 
 @node("node1")
 class TestNode1(NodeBase):
@@ -49,6 +134,96 @@ def build_frame(backend_name: str):
     return TestFrame(backend_name)
 
 
+def build_snapshot_mode_frame(snapshot_mode: str):
+    class SnapshotModeFrame(FrameBase):
+        node1 = FrameNode(TestNode1, SNAPSHOT_MODE_NODE_NUMBER)
+
+        def __init__(self):
+            super().__init__(
+                enable_snapshot=True,
+                total_snapshot=SNAPSHOT_MODE_TICKS,
+                options={"snapshot_mode": snapshot_mode},
+                backend_name="dynamic",
+            )
+
+    return SnapshotModeFrame()
+
+
+def snapshot_mode_cost(snapshot_mode: str):
+    """Return time cost (in seconds) and memory increasing (in MB) to take snapshots with specified mode"""
+    process = psutil.Process()
+    start_memory = process.memory_info().rss
+
+    frame = build_snapshot_mode_frame(snapshot_mode)
+    nodes = frame.node1
+
+    start_time = time()
+
+    for tick in range(SNAPSHOT_MODE_TICKS):
+        for i in range(SNAPSHOT_MODE_CHANGED_NODES):
+            nodes[(tick * SNAPSHOT_MODE_CHANGED_NODES + i) % SNAPSHOT_MODE_NODE_NUMBER].a = tick
+
+        frame.take_snapshot(tick)
+
+    time_cost = time() - start_time
+    memory_cost = (process.memory_info().rss - start_memory) / 1024 / 1024
+
+    # Make sure querying still works.
+    frame.snapshots["node1"][::"a"]
+
+    return time_cost, memory_cost
+
+
+def list_attribute_cost(bulk: bool):
+    """Return time cost (in seconds) to update list attributes and take snapshots, with bulk or per item methods"""
+
+    @node("list_node")
+    class ListNode(NodeBase):
+        items = NodeAttribute("i", 1, is_list=True)
+
+    class ListFrame(FrameBase):
+        list_nodes = FrameNode(ListNode, LIST_NODE_NUMBER)
+
+        def __init__(self):
+            super().__init__(enable_snapshot=True, total_snapshot=LIST_TICKS, backend_name="dynamic")
+
+    frame = ListFrame()
+    new_items = list(range(LIST_APPEND_PER_TICK))
+
+    update_cost = 0.0
+    snapshot_cost = 0.0
+
+    for tick in range(LIST_TICKS):
+        start_time = time()
+
+        for list_node in frame.list_nodes:
+            items = list_node.items
+
+            if bulk:
+                items.extend(new_items)
+            else:
+                for item in new_items:
+                    items.append(item)
+
+            # Remove half of items periodically, to keep lists in a reasonable size.
+            if tick % LIST_TRIM_INTERVAL == 0:
+                if bulk:
+                    items.remove_many(range(0, len(items), 2))
+                else:
+                    for slot_index in range(len(items) - 1 - (len(items) - 1) % 2, -1, -2):
+                        items.remove(slot_index)
+
+        update_cost += time() - start_time
+
+        start_time = time()
+
+        frame.take_snapshot(tick)
+
+        snapshot_cost += time() - start_time
+
+    return update_cost, snapshot_cost
+
+
 def attribute_access(frame, times: int):
     """Return time cost (in seconds) for attribute acceesing test"""
     start_time = time()
@@ -84,6 +259,459 @@ def snapshot_query(frame, times: int):
     return time() - start_time
 
 
+def snapshot_window_query(frame, times: int, reuse_buffer: bool = False):
+    """Return time cost (in seconds) for querying all attributes of all nodes in latest ticks"""
+    ticks = frame.snapshots.get_frame_index_list()[-WINDOW_QUERYING_SIZE:]
+    attrs = ["a", "b", "c", "d", "e"]
+    node_snapshots = frame.snapshots["node1"]
+
+    out = np.empty(node_snapshots[ticks::attrs].size, dtype=np.float64) if reuse_buffer else None
+
+    start_time = time()
+
+    for _ in range(times):
+        states = node_snapshots.query(ticks, None, attrs, out=out)
+
+    return time() - start_time
+
+
+def sliding_window_query(frame, times: int, compiled: bool = False):
+    """Return time cost (in seconds) for querying same nodes and attributes with a sliding tick window"""
+    attrs = ["a", "b", "c"]
+    node_snapshots = frame.snapshots["node1"]
+
+    plan = node_snapshots.compile(COMPILED_QUERYING_NODES, attrs, window=WINDOW_QUERYING_SIZE)
+
+    start_time = time()
+
+    for tick in range(times):
+        if compiled:
+            states = plan.execute(tick)
+        else:
+            states = node_snapshots[
+                list(range(tick - WINDOW_QUERYING_SIZE + 1, tick + 1)) : COMPILED_QUERYING_NODES : attrs
+            ]
+
+    return time() - start_time
+
+
+def branch_rollout(backend_name: str, restore: bool):
+    """Return time cost (in seconds) to start rollouts from same decision point by restoring or reset and replay"""
+    os.environ["DEFAULT_BACKEND_NAME"] = backend_name
+
+    env = Env(scenario="cim", topology="toy.5p_ssddd_l0.0", durations=BRANCH_DURATIONS)
+
+    def run_decisions(decision_number: int):
+        metrics, decision_event, is_done = env.step(None)
+
+        for _ in range(decision_number):
+            if is_done:
+                break
+
+            metrics, decision_event, is_done = env.step(None)
+
+    run_decisions(BRANCH_DECISION_NUMBER)
+
+    state = env.save_state()
+
+    start_time = time()
+
+    for _ in range(BRANCH_TIMES):
+        if restore:
+            env.restore_state(state)
+        else:
+            env.reset(keep_seed=True)
+
+            run_decisions(BRANCH_DECISION_NUMBER)
+
+        run_decisions(BRANCH_ROLLOUT_DECISIONS)
+
+    return time() - start_time
+
+
+def event_scheduling(scheduler: str):
+    """Return time cost (in seconds) to insert events, and process them tick by tick with specified scheduler"""
+    rng = np.random.default_rng(0)
+
+    eb = EventBuffer(disable_finished_events=True, scheduler=scheduler)
+
+    ticks = rng.integers(0, EVENT_SCHEDULING_TICKS, EVENT_SCHEDULING_NUMBER).tolist()
+    delays = rng.integers(1, EVENT_SCHEDULING_MAX_DELAY, EVENT_SCHEDULING_NUMBER).tolist()
+
+    def on_event(evt):
+        # Follow-up events (like bike returning) for the events inserted at beginning.
+        if evt.event_type == 1:
+            eb.insert_event(eb.gen_atom_event(evt.tick + delays[evt.payload], 2, evt.payload))
+
+    eb.register_event_handler(1, on_event)
+
+    start_time = time()
+
+    for i, tick in enumerate(ticks):
+        eb.insert_event(eb.gen_atom_event(tick, 1, i))
+
+    insert_cost = time() - start_time
+
+    start_time = time()
+
+    tick = eb.get_next_event_tick(-1)
+
+    while tick is not None:
+        eb.execute(tick)
+
+        tick = eb.get_next_event_tick(tick)
+
+    return insert_cost, time() - start_time
+
+
+def event_dispatching(fast: bool):
+    """Return events per second to dispatch events tick by tick with Python or compiled event buffer"""
+    eb = (FastEventBuffer if fast else EventBuffer)(disable_finished_events=True)
+
+    def on_event(evt):
+        pass
+
+    def on_cascade_event(evt):
+        evt.add_immediate_event(eb.gen_atom_event(evt.tick, 1, None))
+
+    eb.register_event_handler(1, on_event)
+    eb.register_event_handler(2, on_cascade_event)
+
+    start_time = time()
+
+    for tick in range(EVENT_DISPATCHING_TICKS):
+        for _ in range(EVENT_DISPATCHING_ATOM_PER_TICK):
+            eb.insert_event(eb.gen_atom_event(tick, 1, None))
+
+        for _ in range(EVENT_DISPATCHING_CASCADE_PER_TICK):
+            eb.insert_event(eb.gen_cascade_event(tick, 2, None))
+
+        eb.execute(tick)
+
+    event_number = EVENT_DISPATCHING_TICKS * (EVENT_DISPATCHING_ATOM_PER_TICK + EVENT_DISPATCHING_CASCADE_PER_TICK * 2)
+
+    return event_number / (time() - start_time)
+
+
+class RecordingPayload:
+    summary_key = ["src_idx", "quantity", "valid_dest_list"]
+
+    def __init__(self, src_idx: int, quantity: int, valid_dest_list: list):
+        self.src_idx = src_idx
+        self.quantity = quantity
+        self.valid_dest_list = valid_dest_list
+
+    def __repr__(self):
+        return "%s {src_idx: %r, quantity: %r, valid_dest_list: %r}" % (
+            self.__class__.__name__,
+            self.src_idx,
+            self.quantity,
+            self.valid_dest_list,
+        )
+
+
+def event_recording(record_format: str):
+    """Return events per second to dispatch events with finished events recorded in specified format"""
+    record_path = os.path.join(tempfile.gettempdir(), f"perf_events.{record_format}")
+
+    eb = EventBuffer(
+        disable_finished_events=True,
+        record_events=record_format != "none",
+        record_path=record_path,
+        record_format="csv" if record_format == "none" else record_format,
+    )
+
+    def on_event(evt):
+        pass
+
+    eb.register_event_handler(1, on_event)
+
+    valid_dest_list = list(range(EVENT_RECORDING_DEST_NUMBER))
+
+    start_time = time()
+
+    for tick in range(EVENT_RECORDING_TICKS):
+        for i in range(EVENT_RECORDING_PER_TICK):
+            eb.insert_event(eb.gen_atom_event(tick, 1, RecordingPayload(i, tick, valid_dest_list)))
+
+        eb.execute(tick)
+
+    # Wait for the events to be written.
+    if eb._recorder is not None:
+        eb._recorder.close()
+
+    return EVENT_RECORDING_TICKS * EVENT_RECORDING_PER_TICK / (time() - start_time)
+
+
+def tick_skipping(scenario: str, topology: str, durations: int, snapshot_resolution: int, skip_inactive_ticks: bool):
+    """Return ticks per second to run an episode to end with or without skipping inactive ticks"""
+    env = Env(
+        scenario=scenario,
+        topology=topology,
+        durations=durations,
+        snapshot_resolution=snapshot_resolution,
+        skip_inactive_ticks=skip_inactive_ticks,
+    )
+
+    start_time = time()
+
+    metrics, decision_event, is_done = env.step(None)
+
+    while not is_done:
+        metrics, decision_event, is_done = env.step(None)
+
+    return durations / (time() - start_time)
+
+
+def rule_based_running(module_name: str, class_name: str, args: dict, use_run: bool):
+    """Return decisions per second to run an episode of vm scheduling with a rule-based algorithm of examples,
+    by step method or run method"""
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../examples/vm_scheduling/rule_based_algorithm"))
+
+    from agent import VMSchedulingAgent
+
+    algorithm_class = getattr(__import__(module_name), class_name)
+
+    env = Env(scenario="vm_scheduling", topology=RULE_BASED_TOPOLOGY, durations=RULE_BASED_DURATIONS)
+    env.set_seed(666)
+
+    agent = VMSchedulingAgent(algorithm_class(env=env, **args))
+    decision_number = 0
+
+    def policy(decision_event):
+        nonlocal decision_number
+
+        decision_number += 1
+
+        return agent.choose_action(decision_event, env)
+
+    start_time = time()
+
+    if use_run:
+        env.run(policy)
+    else:
+        metrics, decision_event, is_done = env.step(None)
+
+        while not is_done:
+            metrics, decision_event, is_done = env.step(policy(decision_event))
+
+    return decision_number / (time() - start_time)
+
+
+def streamit_sending(buffered: bool):
+    """Return rows per second to stream data to a local stand-in server, with or without buffered mode"""
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+    from maro.streamit.client.client import StreamitClient
+
+    from tests.streamit.stand_in_server import StandInServer
+
+    with StandInServer() as server:
+        start_time = time()
+
+        with StreamitClient("performance", buffered=buffered, port=server.port) as client:
+            client.episode(0)
+
+            for tick in range(STREAMIT_TICKS):
+                client.tick(tick)
+
+                for index in range(STREAMIT_ROWS_PER_TICK):
+                    client.data("port_details", index=index, capacity=100000, empty=tick, full=index, shortage=0)
+
+        row_number = server.line_number
+
+    return row_number / (time() - start_time)
+
+
+def valid_pm_lookup(pm_number: int, use_columns: bool):
+    """Return lookups per second to get valid PMs of oversubscribable VM requests, by checking PM nodes one by one,
+    or by capacity columns"""
+    from maro.simulator.scenarios.vm_scheduling import PmState
+    from maro.simulator.scenarios.vm_scheduling.capacity_columns import PmCapacityColumns
+    from maro.simulator.scenarios.vm_scheduling.frame_builder import build_frame
+
+    frame = build_frame(1, 1, 1, 1, 1, 1, pm_number)
+    pm_columns = frame.columns("pms")
+
+    rng = np.random.default_rng(0)
+    cpu_cores_capacity = rng.choice([16, 32, 64], pm_number)
+    memory_capacity = cpu_cores_capacity * 4
+
+    pm_columns.set_column("cpu_cores_capacity", cpu_cores_capacity)
+    pm_columns.set_column("memory_capacity", memory_capacity)
+    pm_columns.set_column("cpu_cores_allocated", rng.integers(0, cpu_cores_capacity + 1))
+    pm_columns.set_column("memory_allocated", rng.integers(0, memory_capacity + 1))
+    pm_columns.set_column("cpu_utilization", rng.uniform(0, 100, pm_number))
+    pm_columns.set_column("oversubscribable", rng.choice([PmState.EMPTY, PmState.OVERSUBSCRIBABLE], pm_number))
+
+    capacity_columns = PmCapacityColumns(cpu_cores_capacity, memory_capacity, 1.15, 1.15, 1.0)
+    capacity_columns.load(pm_columns)
+
+    requirements = rng.integers(1, 9, (VALID_PM_LOOKUP_TIME, 2))
+
+    start_time = time()
+
+    for cpu_cores, memory in requirements:
+        if use_columns:
+            capacity_columns.get_valid_oversubscribable_pms(cpu_cores, memory)
+        else:
+            valid_pms = []
+
+            for pm in frame.pms:
+                if pm.oversubscribable != PmState.NON_OVERSUBSCRIBABLE and (
+                    pm.cpu_cores_allocated + cpu_cores <= 1.15 * pm.cpu_cores_capacity
+                    and pm.memory_allocated + memory <= 1.15 * pm.memory_capacity
+                    and pm.cpu_utilization / 100 * pm.cpu_cores_capacity + cpu_cores <= pm.cpu_cores_capacity
+                ):
+                    valid_pms.append(pm.id)
+
+    return VALID_PM_LOOKUP_TIME / (time() - start_time)
+
+
+def pm_workload_updating(use_table: bool):
+    """Return ticks per second to update CPU utilization and energy consumption of all PMs, by iterating VMs on each
+    PM node, or by live VM table"""
+    from maro.simulator.scenarios.vm_scheduling import VirtualMachine, VmCategory
+    from maro.simulator.scenarios.vm_scheduling.frame_builder import build_frame
+    from maro.simulator.scenarios.vm_scheduling.live_vm_table import LiveVmTable
+
+    frame = build_frame(1, 1, 1, 1, 1, 1, PM_WORKLOAD_PM_NUMBER)
+    pm_columns = frame.columns("pms")
+    pm_columns.fill("cpu_cores_capacity", 64)
+
+    rng = np.random.default_rng(0)
+    pm_live_vms = [[] for _ in range(PM_WORKLOAD_PM_NUMBER)]
+    live_vms = {}
+    table = LiveVmTable()
+
+    for vm_id, pm_id in enumerate(rng.integers(0, PM_WORKLOAD_PM_NUMBER, PM_WORKLOAD_VM_NUMBER).tolist()):
+        vm = VirtualMachine(vm_id, int(rng.integers(1, 5)), 4, 100, 0, 0, VmCategory.DELAY_INSENSITIVE, 1.0)
+        vm.pm_id = pm_id
+        vm.cpu_utilization = rng.uniform(0, 100)
+
+        pm_live_vms[pm_id].append(vm_id)
+        live_vms[vm_id] = vm
+        table.add(vm)
+
+    power = PM_WORKLOAD_POWER_CURVE["calibration_parameter"]
+    busy_power = PM_WORKLOAD_POWER_CURVE["busy_power"]
+    idle_power = PM_WORKLOAD_POWER_CURVE["idle_power"]
+
+    start_time = time()
+
+    for _ in range(PM_WORKLOAD_TICKS):
+        if use_table:
+            cpu_utilization = np.round(table.get_pm_cpu_cores_used(PM_WORKLOAD_PM_NUMBER) / 64, 2)
+            pm_columns.set_column("cpu_utilization", cpu_utilization)
+
+            cpu_utilization = np.minimum(1, pm_columns.get_column("cpu_utilization").astype(np.float64) / 100)
+            pm_columns.set_column(
+                "energy_consumption",
+                idle_power + (busy_power - idle_power) * (2 * cpu_utilization - np.power(cpu_utilization, power)),
+            )
+        else:
+            for pm in frame.pms:
+                total_cpu_cores_used = 0.0
+
+                for vm_id in pm_live_vms[pm.index]:
+                    vm = live_vms[vm_id]
+                    total_cpu_cores_used += vm.cpu_utilization * vm.cpu_cores_requirement
+
+                pm.cpu_utilization = round(total_cpu_cores_used / pm.cpu_cores_capacity, 2)
+
+                cpu_utilization = min(1, pm.cpu_utilization / 100)
+                pm.energy_consumption = idle_power + (busy_power - idle_power) * (
+                    2 * cpu_utilization - pow(cpu_utilization, power)
+                )
+
+    return PM_WORKLOAD_TICKS / (time() - start_time)
+
+
+def utilization_series_storing(use_store: bool):
+    """Return time cost (in seconds) and memory increasing (in MB) to append CPU utilization of VMs in each tick,
+    into series list of each VM, or into utilization store"""
+    from maro.simulator.scenarios.vm_scheduling.utilization_store import UtilizationStore
+
+    rng = np.random.default_rng(0)
+    readings = rng.uniform(0, 100, (UTILIZATION_TICKS, UTILIZATION_VM_NUMBER)).astype(np.float32)
+    readings[1:][rng.random((UTILIZATION_TICKS - 1, UTILIZATION_VM_NUMBER)) < 0.01] = -1.0
+
+    vm_ids = np.arange(UTILIZATION_VM_NUMBER)
+
+    process = psutil.Process()
+    start_memory = process.memory_info().rss
+    start_time = time()
+
+    if use_store:
+        store = UtilizationStore()
+
+        for vm_id in vm_ids.tolist():
+            store.reserve(vm_id, UTILIZATION_TICKS)
+
+        for tick_readings in readings:
+            store.append(vm_ids, tick_readings)
+    else:
+        series_list = [[] for _ in range(UTILIZATION_VM_NUMBER)]
+
+        for tick_readings in readings:
+            for series, cpu_utilization in zip(series_list, tick_readings.tolist()):
+                series.append(series[-1] if cpu_utilization < 0.0 else cpu_utilization)
+
+    time_cost = time() - start_time
+    memory_cost = (process.memory_info().rss - start_memory) / 1024 / 1024
+
+    return time_cost, memory_cost
+
+
+def cpu_readings_reading(use_arrays: bool):
+    """Return ticks per second to read CPU readings of each tick, into a dictionary by binary reader items,
+    or into arrays by CPU reader"""
+    from maro.data_lib import BinaryConverter
+    from maro.data_lib.binary_reader import BinaryReader
+    from maro.simulator.scenarios.vm_scheduling import CpuReader
+
+    temp_dir = tempfile.mkdtemp()
+    csv_path = os.path.join(temp_dir, "vm_cpu_readings-file-1-of-perf.csv")
+    bin_path = os.path.join(temp_dir, "vm_cpu_readings-file-1-of-perf.bin")
+
+    rng = np.random.default_rng(0)
+
+    with open(csv_path, "w") as fp:
+        fp.write("timestamp,vmid,maxcpu\n")
+
+        for tick in range(CPU_READINGS_TICKS):
+            for vm_id, cpu_utilization in zip(
+                rng.choice(CPU_READINGS_VM_PER_TICK * 10, CPU_READINGS_VM_PER_TICK, replace=False).tolist(),
+                rng.uniform(0, 100, CPU_READINGS_VM_PER_TICK).tolist(),
+            ):
+                fp.write(f"{tick},{vm_id},{cpu_utilization}\n")
+
+    meta_path = os.path.join(os.path.dirname(__file__), "data/vm_scheduling/cpu_readings.yml")
+
+    converter = BinaryConverter(bin_path, meta_path)
+    converter.add_csv(csv_path)
+    converter.flush()
+
+    start_time = time()
+
+    if use_arrays:
+        reader = CpuReader(bin_path, 0)
+
+        for tick in range(CPU_READINGS_TICKS):
+            vm_ids, cpu_utilization = reader.readings(tick)
+    else:
+        reader = BinaryReader(bin_path)
+        picker = reader.items_tick_picker(0, CPU_READINGS_TICKS - 1, time_unit="s")
+
+        for tick in range(CPU_READINGS_TICKS):
+            cur_items = {}
+
+            for item in picker.items(tick):
+                cur_items[item.vm_id] = item.cpu_utilization
+
+    return CPU_READINGS_TICKS / (time() - start_time)
+
+
 if __name__ == "__main__":
     chart_colors = [91, 94]
 
@@ -139,3 +767,241 @@ if __name__ == "__main__":
 
     tg.print_categories(["static", "dynamic"], chart_colors)
     tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+
+    # Compare window querying with and without output buffer, with snapshots for all ticks.
+    chart_args["title"] = f"Window querying ({WINDOW_QUERYING_SIZE} ticks, all nodes, all attributes)"
+
+    chart_labels = [
+        f"new result ({WINDOW_QUERYING_TIME})",
+        f"reuse output buffer ({WINDOW_QUERYING_TIME})",
+    ]
+
+    chart_data = [[0.0, 0.0], [0.0, 0.0]]
+
+    for i, backend_name in enumerate(["static", "dynamic"]):
+        frame = build_frame(backend_name)
+
+        take_snapshot(frame, TAKE_SNAPSHOT_TIME)
+
+        for j, reuse_buffer in enumerate([False, True]):
+            chart_data[j][i] = snapshot_window_query(frame, WINDOW_QUERYING_TIME, reuse_buffer)
+
+    tg.print_categories(["static", "dynamic"], chart_colors)
+    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+
+    # Compare slicing and compiled querying plan with a sliding tick window.
+    chart_args["title"] = (
+        f"Sliding window querying ({WINDOW_QUERYING_SIZE} ticks, "
+        f"{len(COMPILED_QUERYING_NODES)} nodes, 3 attributes)"
+    )
+
+    chart_labels = [
+        f"slice interface ({STATES_QURING_TIME})",
+        f"compiled plan ({STATES_QURING_TIME})",
+    ]
+
+    chart_data = [[0.0, 0.0], [0.0, 0.0]]
+
+    for i, backend_name in enumerate(["static", "dynamic"]):
+        frame = build_frame(backend_name)
+
+        take_snapshot(frame, TAKE_SNAPSHOT_TIME)
+
+        for j, compiled in enumerate([False, True]):
+            chart_data[j][i] = sliding_window_query(frame, STATES_QURING_TIME, compiled)
+
+    tg.print_categories(["static", "dynamic"], chart_colors)
+    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+
+    # Compare snapshot modes of dynamic backend.
+    chart_args["title"] = (
+        f"Snapshot mode comparison of dynamic backend ({SNAPSHOT_MODE_NODE_NUMBER} nodes, "
+        f"{SNAPSHOT_MODE_CHANGED_NODES} changed per tick)"
+    )
+
+    chart_labels = [
+        f"take snapshot in seconds ({SNAPSHOT_MODE_TICKS})",
+        f"memory increasing in MB ({SNAPSHOT_MODE_TICKS})",
+    ]
+
+    chart_data = [[0.0, 0.0], [0.0, 0.0]]
+
+    for i, snapshot_mode in enumerate(["full", "delta"]):
+        chart_data[0][i], chart_data[1][i] = snapshot_mode_cost(snapshot_mode)
+
+    tg.print_categories(["full", "delta"], chart_colors)
+    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+
+    # Compare branching from a decision point by restoring saved state, and by reset and replay.
+    chart_args["title"] = (
+        f"Branching rollouts from decision {BRANCH_DECISION_NUMBER} "
+        f"({BRANCH_ROLLOUT_DECISIONS} decisions per rollout)"
+    )
+
+    chart_labels = [
+        f"reset and replay ({BRANCH_TIMES})",
+        f"restore state ({BRANCH_TIMES})",
+    ]
+
+    chart_data = [[0.0, 0.0], [0.0, 0.0]]
+
+    for i, backend_name in enumerate(["static", "dynamic"]):
+        for j, restore in enumerate([False, True]):
+            chart_data[j][i] = branch_rollout(backend_name, restore)
+
+    tg.print_categories(["static", "dynamic"], chart_colors)
+    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+
+    # Compare updating list attributes with bulk methods and per item methods.
+    chart_args["title"] = (
+        f"List heavy frame ({LIST_NODE_NUMBER} nodes, {LIST_APPEND_PER_TICK} appended per tick, "
+        f"half removed every {LIST_TRIM_INTERVAL} ticks)"
+    )
+
+    chart_labels = [
+        f"update lists ({LIST_TICKS})",
+        f"take snapshot ({LIST_TICKS})",
+    ]
+
+    chart_data = [[0.0, 0.0], [0.0, 0.0]]
+
+    for i, bulk in enumerate([False, True]):
+        chart_data[0][i], chart_data[1][i] = list_attribute_cost(bulk)
+
+    tg.print_categories(["per item", "bulk"], chart_colors)
+    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+
+    # Compare simulation speed (ticks per second) with and without skipping inactive ticks.
+    chart_args["title"] = "Ticks per second with and without skipping inactive ticks"
+
+    chart_labels = [
+        f"{scenario} {topology} ({durations})" for scenario, topology, durations, _ in TICK_SKIPPING_TOPOLOGIES
+    ]
+
+    chart_data = [[0.0, 0.0] for _ in TICK_SKIPPING_TOPOLOGIES]
+
+    for i, (scenario, topology, durations, snapshot_resolution) in enumerate(TICK_SKIPPING_TOPOLOGIES):
+        for j, skip_inactive_ticks in enumerate([False, True]):
+            chart_data[i][j] = tick_skipping(scenario, topology, durations, snapshot_resolution, skip_inactive_ticks)
+
+    tg.print_categories(["every tick", "skip inactive"], chart_colors)
+    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+
+    # Compare schedulers of event buffer with events scattered in a long episode.
+    chart_args["title"] = (
+        f"Event scheduling ({EVENT_SCHEDULING_NUMBER} events in {EVENT_SCHEDULING_TICKS} ticks, "
+        f"each one generates a follow-up event)"
+    )
+
+    chart_labels = [
+        f"insert events ({EVENT_SCHEDULING_NUMBER})",
+        f"process events ({EVENT_SCHEDULING_NUMBER * 2})",
+    ]
+
+    chart_data = [[0.0, 0.0], [0.0, 0.0]]
+
+    for i, scheduler in enumerate(["heap", "calendar"]):
+        chart_data[0][i], chart_data[1][i] = event_scheduling(scheduler)
+
+    tg.print_categories(["heap", "calendar"], chart_colors)
+    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+
+    # Compare Python and compiled event buffer with events generated and dispatched in each tick.
+    chart_args["title"] = (
+        f"Events per second to dispatch ({EVENT_DISPATCHING_ATOM_PER_TICK} atom events and "
+        f"{EVENT_DISPATCHING_CASCADE_PER_TICK} cascade events per tick, {EVENT_DISPATCHING_TICKS} ticks)"
+    )
+
+    chart_labels = ["python", "compiled"]
+
+    chart_data = [[event_dispatching(fast)] for fast in [False, True]]
+
+    tg.print_categories(["events per second"], chart_colors)
+    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+
+    # Compare recording finished events into csv file and binary file with background writer.
+    chart_args["title"] = (
+        f"Events per second to dispatch with recording ({EVENT_RECORDING_PER_TICK} events per tick, "
+        f"{EVENT_RECORDING_TICKS} ticks)"
+    )
+
+    chart_labels = ["no recording", "csv", "binary"]
+
+    chart_data = [[event_recording(record_format)] for record_format in ["none", "csv", "binary"]]
+
+    tg.print_categories(["events per second"], chart_colors)
+    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+
+    # Compare running an episode with step method and run method, with rule-based algorithms.
+    chart_args["title"] = f"Rule-based decisions per second ({RULE_BASED_TOPOLOGY}, {RULE_BASED_DURATIONS} ticks)"
+
+    chart_labels = [class_name for _, class_name, _ in RULE_BASED_ALGORITHMS]
+
+    chart_data = [
+        [rule_based_running(module_name, class_name, args, use_run) for use_run in [False, True]]
+        for module_name, class_name, args in RULE_BASED_ALGORITHMS
+    ]
+
+    tg.print_categories(["step", "run"], chart_colors)
+    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+
+    # Compare streaming data by a message for each row and batches of columns.
+    chart_args["title"] = (
+        f"Rows per second to stream ({STREAMIT_ROWS_PER_TICK} rows per tick, {STREAMIT_TICKS} ticks, "
+        f"local stand-in server)"
+    )
+
+    chart_labels = ["message per row", "buffered"]
+
+    chart_data = [[streamit_sending(buffered)] for buffered in [False, True]]
+
+    tg.print_categories(["rows per second"], chart_colors)
+    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+
+    # Compare getting valid PMs by checking PM nodes one by one, and by capacity columns.
+    chart_args["title"] = f"Valid PM lookups per second ({VALID_PM_LOOKUP_TIME} VM requests)"
+
+    chart_labels = [f"{pm_number} PMs" for pm_number in VALID_PM_NUMBERS]
+
+    chart_data = [
+        [valid_pm_lookup(pm_number, use_columns) for use_columns in [False, True]] for pm_number in VALID_PM_NUMBERS
+    ]
+
+    tg.print_categories(["node scan", "capacity columns"], chart_colors)
+    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+
+    # Compare updating PM workload by iterating VMs on each PM node, and by live VM table.
+    chart_args["title"] = (
+        f"PM workload updates per second ({PM_WORKLOAD_PM_NUMBER} PMs, {PM_WORKLOAD_VM_NUMBER} VMs, "
+        f"{PM_WORKLOAD_TICKS} ticks)"
+    )
+
+    chart_labels = ["node by node", "live vm table"]
+
+    chart_data = [[pm_workload_updating(use_table)] for use_table in [False, True]]
+
+    tg.print_categories(["ticks per second"], chart_colors)
+    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+
+    # Compare keeping CPU utilization series of VMs in lists and in utilization store.
+    chart_args["title"] = f"Appending CPU utilization series ({UTILIZATION_VM_NUMBER} VMs, {UTILIZATION_TICKS} ticks)"
+
+    chart_labels = ["time cost in seconds", "memory increasing in MB"]
+
+    chart_data = [[0.0, 0.0], [0.0, 0.0]]
+
+    for i, use_store in enumerate([False, True]):
+        chart_data[0][i], chart_data[1][i] = utilization_series_storing(use_store)
+
+    tg.print_categories(["list", "store"], chart_colors)
+    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
+
+    # Compare reading CPU readings of each tick into a dictionary, and into arrays from memory-mapped file.
+    chart_args["title"] = f"CPU readings per second ({CPU_READINGS_TICKS} ticks, {CPU_READINGS_VM_PER_TICK} VMs each)"
+
+    chart_labels = ["items dictionary", "readings arrays"]
+
+    chart_data = [[cpu_readings_reading(use_arrays)] for use_arrays in [False, True]]
+
+    tg.print_categories(["ticks per second"], chart_colors)
+    tg.chart(chart_colors, chart_data, chart_args, chart_labels)
@@ -0,0 +1,74 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import socketserver
+import threading
+from typing import List
+
+
+class _LineHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        server: StandInServer = self.server.stand_in
+        remaining = b""
+
+        while True:
+            data = self.request.recv(1 << 20)
+
+            if not data:
+                break
+
+            server.add_bytes(data)
+
+            if server.keep_lines:
+                lines = (remaining + data).split(b"\n")
+                remaining = lines.pop()
+
+                server.lines.extend(line.decode("utf-8") for line in lines)
+
+
+class StandInServer:
+    """Local TCP server in place of the influxdb line protocol port of data service, it counts received lines,
+    used to test streamit client and its throughput.
+
+    Args:
+        keep_lines (bool): Keep received lines. Defaults to False.
+    """
+
+    def __init__(self, keep_lines: bool = False):
+        self.keep_lines = keep_lines
+        self.lines: List[str] = []
+        self.byte_number = 0
+        self.line_number = 0
+
+        self._lock = threading.Lock()
+
+        # Port 0 to get a free port.
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _LineHandler)
+        self._server.stand_in = self
+
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def add_bytes(self, data: bytes):
+        with self._lock:
+            self.byte_number += len(data)
+            self.line_number += data.count(b"\n")
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Stop server, wait for connections to be closed by clients."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -0,0 +1,113 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import pickle
+import unittest
+from multiprocessing import Queue
+
+import numpy as np
+
+from maro.streamit.client.common import MessageType
+from maro.streamit.client.metric import Metric, columns_to_lines
+from maro.streamit.client.ring_buffer import RingBuffer
+from maro.streamit.client.sender import StreamitSender
+
+from tests.streamit.stand_in_server import StandInServer
+
+
+class TestStreamit(unittest.TestCase):
+    def test_ring_buffer(self):
+        """Test frames across the end of ring buffer, and putting into a full buffer"""
+        ring_buffer = RingBuffer(64)
+
+        self.assertIsNone(ring_buffer.get())
+
+        for i in range(100):
+            frame = bytes([i % 256]) * (i % 13)
+
+            self.assertTrue(ring_buffer.put(frame))
+            self.assertEqual(frame, ring_buffer.get())
+
+        self.assertEqual(0, len(ring_buffer))
+
+        # 3 frames with header are 60 bytes.
+        for i in range(3):
+            self.assertTrue(ring_buffer.put(bytes([i]) * 16))
+
+        self.assertFalse(ring_buffer.put(b"1234", timeout=0.01))
+
+        with self.assertRaises(ValueError):
+            ring_buffer.put(bytes(61))
+
+        self.assertEqual(bytes([0]) * 16, ring_buffer.get())
+        self.assertTrue(ring_buffer.put(b"1234", timeout=0.01))
+
+        for frame in (bytes([1]) * 16, bytes([2]) * 16, b"1234", None):
+            self.assertEqual(frame, ring_buffer.get())
+
+    def test_columns_to_lines(self):
+        """Test converting columns into lines, it should be same as converting each row with Metric"""
+        rows = [
+            {"index": 0, "empty": 10, "cost": 1.5, "name": "port a", "flag": True, "stops": [1, 2]},
+            {"index": 1, "empty": 0, "cost": 0.25, "name": "port,b", "flag": False, "stops": [3]},
+            {"index": 2, "cost": 3.0, "name": 'port "c"', "flag": True, "stops": []},
+        ]
+
+        tags = {"episode": 1, "tick": 5, "experiment": "exp"}
+        timestamp = (1 << 32) | 5
+
+        expected_lines = []
+
+        for row in rows:
+            metric = Metric("exp.port details")
+
+            for k, v in row.items():
+                metric.add_value(k, v)
+
+            for k, v in tags.items():
+                metric.add_tag(k, v)
+
+            metric.with_timestamp(timestamp)
+
+            expected_lines.append(str(metric))
+
+        columns = {
+            "index": np.array([0, 1, 2]),
+            "empty": [10, 0, None],
+            "cost": np.array([1.5, 0.25, 3.0]),
+            "name": [row["name"] for row in rows],
+            "flag": np.array([True, False, True]),
+            "stops": [row["stops"] for row in rows],
+        }
+
+        self.assertListEqual(expected_lines, columns_to_lines("exp.port details", tags, timestamp, columns))
+
+    def test_sender_with_ring_buffer(self):
+        """Test sender process, batches in ring buffer should be sent as lines before closing"""
+        with StandInServer(keep_lines=True) as server:
+            data_queue = Queue()
+            ring_buffer = RingBuffer(1024)
+
+            sender = StreamitSender(data_queue, "exp", "127.0.0.1", ring_buffer, server.port)
+            sender.start()
+
+            for tick in range(10):
+                batches = {"ports": {"index": np.arange(5), "empty": np.full(5, tick)}, "vessels": {"index": [0]}}
+
+                ring_buffer.put(pickle.dumps((1, tick, batches)))
+
+            data_queue.put((MessageType.Close, None))
+            sender.join(timeout=30)
+
+            self.assertEqual(0, sender.exitcode)
+
+        self.assertEqual(60, len(server.lines))
+        self.assertEqual(60, server.line_number)
+        timestamp = (1 << 32) | 9
+
+        self.assertEqual(f"exp.ports,episode=1,tick=9,experiment=exp index=4i,empty=9i {timestamp}", server.lines[-2])
+        self.assertEqual(f"exp.vessels,episode=1,tick=9,experiment=exp index=0i {timestamp}", server.lines[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,9 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import json
 import os
+import tempfile
 import unittest
 
 from maro.simulator.core import Env
@@ -222,6 +224,259 @@ class TestEnv(unittest.TestCase):
                     msg=f"states should be {tick}",
                 )
 
+    def test_skip_inactive_ticks(self):
+        """Test env with skip_inactive_ticks, it should only step at active ticks but keep snapshots correct"""
+
+        class SparseEngine(DummyEngine):
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+
+                self.stepped_ticks = []
+
+            def step(self, tick: int):
+                self.stepped_ticks.append(tick)
+
+                super().step(tick)
+
+                # An event at tick that is not active for business engine.
+                if tick == 0:
+                    self._event_buffer.insert_event(self._event_buffer.gen_atom_event(7, 0))
+
+            def get_next_active_tick(self, tick: int) -> int:
+                return min((tick // 4 + 1) * 4, self.next_snapshot_tick(tick))
+
+        for backend_name in backends_to_test:
+            os.environ["DEFAULT_BACKEND_NAME"] = backend_name
+
+            env = Env(
+                business_engine_cls=SparseEngine,
+                start_tick=0,
+                durations=20,
+                snapshot_resolution=3,
+                skip_inactive_ticks=True,
+            )
+
+            run_to_end(env)
+
+            self.assertListEqual(
+                [0, 2, 4, 5, 7, 8, 11, 12, 14, 16, 17, 19],
+                env.business_engine.stepped_ticks,
+            )
+            self.assertEqual(19, env.tick)
+            self.assertEqual(7, len(env.snapshot_list))
+
+            states = env.snapshot_list["dummies"][::"val"].reshape(-1, 10)
+
+            for frame_index, tick in enumerate((2, 5, 8, 11, 14, 17, 19)):
+                self.assertListEqual(list(states[frame_index]), [tick] * 10)
+
+            # Reset should work as normal.
+            env.reset()
+            env.business_engine.stepped_ticks.clear()
+
+            run_to_end(env)
+
+            self.assertEqual(12, len(env.business_engine.stepped_ticks))
+
+    def test_profiling(self):
+        """Test env with profiling enabled, phases and handlers should be counted, trace only has specified ticks"""
+
+        class HandlerEngine(DummyEngine):
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+
+                self._event_buffer.register_event_handler(1, self._on_event)
+
+            def step(self, tick: int):
+                super().step(tick)
+
+                self._event_buffer.insert_event(self._event_buffer.gen_atom_event(tick, 1))
+
+            def _on_event(self, event):
+                pass
+
+        env = Env(business_engine_cls=HandlerEngine, start_tick=0, durations=10)
+
+        run_to_end(env)
+
+        self.assertDictEqual({}, env.profile_summary())
+
+        for options in [{"enable-profiling": True, "profiling-trace-ticks": (2, 4)}, {"profiling-trace-ticks": (2, 4)}]:
+            os.environ["ENABLE_ENV_PROFILING"] = "true" if "enable-profiling" not in options else ""
+
+            env = Env(business_engine_cls=HandlerEngine, start_tick=0, durations=10, options=options)
+
+            run_to_end(env)
+            env.reset()
+            run_to_end(env)
+
+            summary = env.profile_summary()
+            handler_name = f"handler:1:{HandlerEngine._on_event.__qualname__}"
+
+            self.assertEqual(20, summary["business_engine.step"]["count"])
+            self.assertEqual(20, summary["business_engine.post_step"]["count"])
+            self.assertEqual(20, summary["event_buffer.execute"]["count"])
+            self.assertEqual(20, summary[handler_name]["count"])
+            self.assertEqual(2, summary["get_metrics"]["count"])
+            self.assertNotIn("agent", summary)
+
+            stat = summary["business_engine.step"]
+            self.assertTrue(0 < stat["p50_us"] <= stat["p99_us"] <= stat["max_us"])
+            self.assertAlmostEqual(stat["total_ms"] * 1000 / 20, stat["mean_us"])
+
+            trace_path = os.path.join(tempfile.gettempdir(), "maro_env_profile.json")
+            env.dump_profile_trace(trace_path)
+
+            with open(trace_path, "r") as fp:
+                trace_events = json.load(fp)["traceEvents"]
+
+            # 2 ticks of 2 episodes, each tick has step, execute, handler and post_step.
+            self.assertEqual(16, len(trace_events))
+            self.assertSetEqual({2, 3}, {event["args"]["tick"] for event in trace_events})
+            self.assertSetEqual({1, 2}, {event["pid"] for event in trace_events})
+            self.assertEqual(4, len([event for event in trace_events if event["name"] == handler_name]))
+
+        del os.environ["ENABLE_ENV_PROFILING"]
+
+    def test_lazy_metrics(self):
+        """Test metrics at decision points, they should be same as the dict of business engine when accessed"""
+        from maro.simulator.scenarios.helpers import LazyMetrics
+        from maro.simulator.scenarios.vm_scheduling import AllocateAction
+        from maro.utils.exception.simulator_exception import MetricsExpiredError
+
+        def check_metrics(env: Env, metrics: LazyMetrics):
+            self.assertFalse(metrics.is_evaluated)
+            self.assertDictEqual(dict(env.business_engine.get_metrics()), dict(metrics))
+            self.assertTrue(metrics.is_evaluated)
+
+        for backend_name in backends_to_test:
+            os.environ["DEFAULT_BACKEND_NAME"] = backend_name
+
+            env = Env(scenario="cim", topology="toy.5p_ssddd_l0.0", start_tick=0, durations=100)
+
+            for _ in range(2):
+                metrics, decision_event, is_done = env.step(None)
+
+                while not is_done:
+                    check_metrics(env, metrics)
+
+                    # Incremental counters should be same as summing over ports.
+                    ports = env.current_frame.ports
+                    self.assertEqual(sum(port.acc_booking for port in ports), metrics["order_requirements"])
+                    self.assertEqual(sum(port.acc_shortage for port in ports), metrics["container_shortage"])
+
+                    metrics, decision_event, is_done = env.step(None)
+
+                self.assertGreater(metrics["container_shortage"], 0)
+
+                env.reset()
+
+            env = Env(
+                scenario="vm_scheduling",
+                topology="tests/data/vm_scheduling/azure.2019.toy",
+                start_tick=0,
+                durations=5,
+                snapshot_resolution=1,
+            )
+
+            metrics, decision_event, is_done = env.step(None)
+
+            while not is_done:
+                check_metrics(env, metrics)
+
+                action = AllocateAction(vm_id=decision_event.vm_id, pm_id=decision_event.valid_pms[0])
+                metrics, decision_event, is_done = env.step(action)
+
+        # Metrics not accessed before moving on cannot be got, the ones accessed before are kept.
+        env = Env(scenario="cim", topology="toy.5p_ssddd_l0.0", start_tick=0, durations=100)
+
+        metrics, _, _ = env.step(None)
+        accessed_metrics, _, _ = env.step(None)
+        expected = dict(env.business_engine.get_metrics())
+
+        self.assertDictEqual(expected, dict(accessed_metrics))
+
+        env.step(None)
+
+        with self.assertRaises(MetricsExpiredError):
+            dict(metrics)
+
+        self.assertDictEqual(expected, dict(accessed_metrics))
+
+    def test_run(self):
+        """Test running episode with policy function, it should be same as stepping with same actions"""
+        from maro.simulator.scenarios.vm_scheduling import AllocateAction, PostponeAction
+        from maro.utils.exception.simulator_exception import EnvRunNotAllowedError
+
+        def first_fit(decision_event):
+            if len(decision_event.valid_pms) == 0:
+                return PostponeAction(vm_id=decision_event.vm_id, postpone_step=1)
+
+            return AllocateAction(vm_id=decision_event.vm_id, pm_id=decision_event.valid_pms[0])
+
+        for backend_name in backends_to_test:
+            os.environ["DEFAULT_BACKEND_NAME"] = backend_name
+
+            env = Env(
+                scenario="vm_scheduling",
+                topology="tests/data/vm_scheduling/azure.2019.toy",
+                start_tick=0,
+                durations=5,
+                snapshot_resolution=1,
+            )
+
+            metrics, decision_event, is_done = env.step(None)
+            decision_number = 0
+
+            while not is_done:
+                decision_number += 1
+                metrics, decision_event, is_done = env.step(first_fit(decision_event))
+
+            # Latency in metrics is not comparable, so repr is used.
+            expected_metrics = repr(metrics)
+            expected_states = env.snapshot_list["pms"][::"cpu_cores_allocated"].flatten()
+
+            self.assertGreater(decision_number, 2)
+
+            env.reset(keep_seed=True)
+
+            self.assertEqual(expected_metrics, repr(env.run(first_fit)))
+            states = env.snapshot_list["pms"][::"cpu_cores_allocated"].flatten()
+
+            self.assertListEqual(list(expected_states), list(states))
+            self.assertEqual(decision_number, len(env._decision_payloads))
+
+            # No more steps after finishing.
+            self.assertTupleEqual((None, None, True), env.step(None))
+
+            with self.assertRaises(EnvRunNotAllowedError):
+                env.run(first_fit)
+
+            # Stop at max decisions, then continue by run and step.
+            for continue_by_step in (False, True):
+                env.reset(keep_seed=True)
+
+                env.run(first_fit, max_decisions=2)
+
+                self.assertFalse(env._is_done)
+
+                if continue_by_step:
+                    metrics, decision_event, is_done = env.step(None)
+
+                    while not is_done:
+                        metrics, decision_event, is_done = env.step(first_fit(decision_event))
+                else:
+                    metrics = env.run(first_fit)
+
+                self.assertEqual(expected_metrics, repr(metrics))
+
+            # Cannot run after stepping.
+            env.reset(keep_seed=True)
+            env.step(None)
+
+            with self.assertRaises(EnvRunNotAllowedError):
+                env.run(first_fit)
+
     def test_max_snapshots(self):
         """Test env  with max_snapshots, it should take snapshot every tick, but should last N kept"""
         for backend_name in backends_to_test:
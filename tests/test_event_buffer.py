@@ -1,41 +1,73 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import random
 import tempfile
 import time
 import unittest
 from typing import Optional
+from unittest.mock import patch
 
 from maro.common import BaseDecisionEvent
-from maro.event_buffer import ActualEvent, AtomEvent, CascadeEvent, DummyEvent, EventBuffer, EventState, MaroEvents
+from maro.event_buffer import (
+    ActualEvent,
+    AtomEvent,
+    BinaryEventRecorder,
+    CascadeEvent,
+    DummyEvent,
+    EventBuffer,
+    EventState,
+    MaroEvents,
+    convert_event_records_to_csv,
+    fast_event_buffer,
+    read_event_records,
+)
 from maro.event_buffer.event_linked_list import EventLinkedList
 from maro.event_buffer.event_pool import EventPool
 
 
+class SummaryPayload:
+    summary_key = ["port_idx", "quantity", "name", "targets"]
+
+    def __init__(self, port_idx: int, quantity: float, name: str, targets: list):
+        self.port_idx = port_idx
+        self.quantity = quantity
+        self.name = name
+        self.targets = targets
+
+
 class TestEventBuffer(unittest.TestCase):
+    event_buffer_cls = EventBuffer
+    actual_event_cls = ActualEvent
+    atom_event_cls = AtomEvent
+    cascade_event_cls = CascadeEvent
+    dummy_event_cls = DummyEvent
+    event_linked_list_cls = EventLinkedList
+    event_pool_cls = EventPool
+
     def setUp(self):
-        self.eb = EventBuffer()
+        self.eb = self.event_buffer_cls()
 
     def test_cascade_event(self):
-        evt = CascadeEvent(0, 1, None, None)
-        self.assertEqual(type(evt.immediate_event_head), DummyEvent)
+        evt = self.cascade_event_cls(0, 1, None, None)
+        self.assertEqual(type(evt.immediate_event_head), self.dummy_event_cls)
         self.assertIsNone(evt.immediate_event_head.next_event)
         self.assertIsNone(evt.immediate_event_tail)
         self.assertEqual(evt.immediate_event_head.next_event, evt.immediate_event_tail)
         self.assertEqual(evt.immediate_event_count, 0)
 
-        evt.add_immediate_event(AtomEvent(1, 1, None, None), is_head=False)
-        evt.add_immediate_event(AtomEvent(2, 1, None, None), is_head=False)
-        evt.add_immediate_event(AtomEvent(3, 1, None, None), is_head=True)
-        evt.add_immediate_event(AtomEvent(4, 1, None, None), is_head=True)
-        evt.add_immediate_event(AtomEvent(5, 1, None, None), is_head=False)
-        evt.add_immediate_event(AtomEvent(6, 1, None, None), is_head=False)
-        evt.add_immediate_event(AtomEvent(7, 1, None, None), is_head=True)
-        evt.add_immediate_event(AtomEvent(8, 1, None, None), is_head=True)
+        evt.add_immediate_event(self.atom_event_cls(1, 1, None, None), is_head=False)
+        evt.add_immediate_event(self.atom_event_cls(2, 1, None, None), is_head=False)
+        evt.add_immediate_event(self.atom_event_cls(3, 1, None, None), is_head=True)
+        evt.add_immediate_event(self.atom_event_cls(4, 1, None, None), is_head=True)
+        evt.add_immediate_event(self.atom_event_cls(5, 1, None, None), is_head=False)
+        evt.add_immediate_event(self.atom_event_cls(6, 1, None, None), is_head=False)
+        evt.add_immediate_event(self.atom_event_cls(7, 1, None, None), is_head=True)
+        evt.add_immediate_event(self.atom_event_cls(8, 1, None, None), is_head=True)
         self.assertEqual(evt.immediate_event_count, 8)
 
         # Should be declined because the tick of the events are not equal
-        self.assertTrue(not evt.add_immediate_event(AtomEvent(9, 2, None, None)))
+        self.assertTrue(not evt.add_immediate_event(self.atom_event_cls(9, 2, None, None)))
 
         iter_evt: Optional[ActualEvent] = evt.immediate_event_head.next_event
         event_ids = []
@@ -51,11 +83,11 @@ class TestEventBuffer(unittest.TestCase):
         self.assertEqual(evt.immediate_event_count, 0)
 
     def test_event_linked_list(self):
-        event_linked_list = EventLinkedList()
+        event_linked_list = self.event_linked_list_cls()
         self.assertEqual(len(event_linked_list), 0)
         self.assertListEqual([evt for evt in event_linked_list], [])
 
-        evt_list = [CascadeEvent(i, None, None, None) for i in range(7)]
+        evt_list = [self.cascade_event_cls(i, None, None, None) for i in range(7)]
         evt_list[0].add_immediate_event(evt_list[3])
         evt_list[0].add_immediate_event(evt_list[4])
         evt_list[0].add_immediate_event(evt_list[5])
@@ -75,7 +107,7 @@ class TestEventBuffer(unittest.TestCase):
         # Test `_clear_finished_events()`
         evt_list[0].state = EventState.FINISHED
         evt = event_linked_list.clear_finished_and_get_front()
-        self.assertIsInstance(evt, ActualEvent)
+        self.assertIsInstance(evt, self.actual_event_cls)
         self.assertEqual(evt.id, 3)
         self.assertEqual(len(event_linked_list), 6)
 
@@ -85,7 +117,7 @@ class TestEventBuffer(unittest.TestCase):
         evt_list[4].event_type = MaroEvents.PENDING_DECISION
         evt_list[5].event_type = MaroEvents.PENDING_DECISION
         evts = event_linked_list.clear_finished_and_get_front()
-        self.assertTrue(all(isinstance(evt, ActualEvent) for evt in evts))
+        self.assertTrue(all(isinstance(evt, self.actual_event_cls) for evt in evts))
         self.assertEqual(len(evts), 3)
         self.assertListEqual([evt.id for evt in evts], [3, 4, 5])
         self.assertListEqual([evt.id for evt in event_linked_list], [3, 4, 5, 6, 1, 2])
@@ -95,9 +127,9 @@ class TestEventBuffer(unittest.TestCase):
         self.assertListEqual([evt for evt in event_linked_list], [])
 
     def test_event_pool(self):
-        ep = EventPool()
-        cascade_events = [CascadeEvent(i, None, None, None) for i in range(5)]
-        atom_events = [AtomEvent(i, None, None, None) for i in range(5, 10)]
+        ep = self.event_pool_cls()
+        cascade_events = [self.cascade_event_cls(i, None, None, None) for i in range(5)]
+        atom_events = [self.atom_event_cls(i, None, None, None) for i in range(5, 10)]
 
         for evt in cascade_events:
             ep.recycle(evt)
@@ -113,7 +145,7 @@ class TestEventBuffer(unittest.TestCase):
             self.assertEqual(evt.tick, i)
             self.assertEqual(evt.event_type, -1)
             self.assertEqual(evt.payload, -1)
-            self.assertIsInstance(evt, CascadeEvent if is_cascade else AtomEvent)
+            self.assertIsInstance(evt, self.cascade_event_cls if is_cascade else self.atom_event_cls)
 
         self.assertEqual(ep.atom_event_count, 3)
         self.assertEqual(ep.cascade_event_count, 2)
@@ -123,14 +155,14 @@ class TestEventBuffer(unittest.TestCase):
         evt = self.eb.gen_atom_event(1, 1, (0, 0))
 
         # fields should be same as specified
-        self.assertEqual(AtomEvent, type(evt))
+        self.assertEqual(self.atom_event_cls, type(evt))
         self.assertEqual(evt.tick, 1)
         self.assertEqual(evt.event_type, 1)
         self.assertEqual(evt.payload, (0, 0))
 
         evt = self.eb.gen_cascade_event(2, 2, (1, 1, 1))
 
-        self.assertEqual(CascadeEvent, type(evt))
+        self.assertEqual(self.cascade_event_cls, type(evt))
         self.assertEqual(evt.tick, 2)
         self.assertEqual(evt.event_type, 2)
         self.assertEqual(evt.payload, (1, 1, 1))
@@ -225,14 +257,140 @@ class TestEventBuffer(unittest.TestCase):
 
         self.eb.reset()
 
-        # reset will not clear the tick (key), just clear the pending pool
-        self.assertEqual(len(self.eb._pending_events), 1)
-
-        for tick, pending_pool in self.eb._pending_events.items():
-            self.assertEqual(0, len(pending_pool))
+        # reset will remove the event lists of all ticks
+        self.assertEqual(len(self.eb._pending_events), 0)
+        self.assertEqual(0, len(self.eb.get_pending_events(1)))
 
         self.assertEqual(len(self.eb._finished_events), 0)
 
+    def test_insert_event_in_immediate_event_handler(self):
+        """Test if events inserted at current tick by handlers of immediate events are processed"""
+        processed = []
+
+        def cb(evt):
+            processed.append(evt.payload)
+
+            if evt.payload == 2:
+                self.eb.insert_event(self.eb.gen_atom_event(1, 1, 3))
+
+        self.eb.register_event_handler(1, cb)
+
+        cascade_evt = self.eb.gen_cascade_event(1, 1, 1)
+        cascade_evt.add_immediate_event(self.eb.gen_atom_event(1, 1, 2))
+
+        self.eb.insert_event(cascade_evt)
+        self.eb.execute(1)
+
+        self.assertListEqual([1, 2, 3], processed)
+        self.assertEqual(0, len(self.eb._pending_events))
+
+    def test_prune_drained_ticks(self):
+        """Test event list of tick is removed after all events processed, and querying will not create it"""
+        for scheduler in ("heap", "calendar"):
+            eb = self.event_buffer_cls(scheduler=scheduler)
+
+            self.assertListEqual([], eb.get_pending_events(3))
+            self.assertEqual(0, len(eb._pending_events))
+
+            eb.insert_event(eb.gen_atom_event(1, 1, 1))
+            eb.insert_event(eb.gen_decision_event(2, BaseDecisionEvent()))
+            eb.insert_event(eb.gen_atom_event(3, 1, 1))
+
+            self.assertEqual(3, len(eb._pending_events))
+
+            eb.execute(1)
+
+            self.assertEqual(2, len(eb._pending_events))
+            self.assertEqual(2, eb.get_next_event_tick(1))
+
+            # Tick with pending decision is kept until the decision finished.
+            decision_events = eb.execute(2)
+
+            self.assertEqual(1, len(decision_events))
+            self.assertEqual(2, len(eb._pending_events))
+
+            decision_events[0].state = EventState.FINISHED
+
+            eb.execute(2)
+
+            self.assertEqual(1, len(eb._pending_events))
+            self.assertEqual(3, eb.get_next_event_tick(1))
+
+    def test_event_schedulers(self):
+        """Test if different schedulers process events in same order"""
+        results = []
+
+        for scheduler in ("heap", "calendar"):
+            random.seed(0)
+
+            eb = self.event_buffer_cls(scheduler=scheduler)
+            processed = []
+
+            def cb(evt):
+                processed.append((evt.tick, evt.payload))
+
+                # Insert new events at current and later ticks in handlers.
+                if evt.payload % 7 == 0:
+                    eb.insert_event(eb.gen_atom_event(evt.tick, 1, evt.payload + 1))
+                    eb.insert_event(eb.gen_atom_event(evt.tick + random.randint(1, 1000), 1, evt.payload + 2))
+
+            eb.register_event_handler(1, cb)
+
+            for i in range(1000):
+                tick = random.randint(0, 2000)
+
+                if i % 3 == 0:
+                    cascade_evt = eb.gen_cascade_event(tick, 1, i * 10)
+                    cascade_evt.add_immediate_event(eb.gen_atom_event(tick, 1, i * 10 + 1))
+                    cascade_evt.add_immediate_event(eb.gen_atom_event(tick, 1, i * 10 + 2), is_head=True)
+
+                    eb.insert_event(cascade_evt)
+                else:
+                    eb.insert_event(eb.gen_atom_event(tick, 1, i * 10))
+
+            next_ticks = []
+            tick = -1
+
+            while True:
+                tick = eb.get_next_event_tick(tick)
+
+                if tick is None:
+                    break
+
+                next_ticks.append(tick)
+
+                eb.execute(tick)
+
+            self.assertEqual(0, len(eb._pending_events))
+
+            results.append((processed, next_ticks))
+
+        self.assertEqual(results[0], results[1])
+
+    def test_get_next_event_tick(self):
+        """Test if we can get tick of next pending event after specified tick"""
+        self.assertIsNone(self.eb.get_next_event_tick(0))
+
+        for tick in (5, 3, 3, 8):
+            self.eb.insert_event(self.eb.gen_atom_event(tick, 1, 1))
+
+        self.assertEqual(3, self.eb.get_next_event_tick(0))
+        self.assertEqual(5, self.eb.get_next_event_tick(3))
+
+        self.eb.execute(5)
+
+        # Event at tick 8 is still pending, and new inserted one should be considered.
+        self.assertEqual(8, self.eb.get_next_event_tick(5))
+
+        self.eb.insert_event(self.eb.gen_atom_event(6, 1, 1))
+
+        self.assertEqual(6, self.eb.get_next_event_tick(5))
+        self.assertIsNone(self.eb.get_next_event_tick(8))
+
+        self.eb.reset()
+
+        self.assertIsNone(self.eb.get_next_event_tick(0))
+
     def test_sub_events(self):
         def cb1(evt):
             self.assertEqual(1, evt.payload)
@@ -279,9 +437,13 @@ class TestEventBuffer(unittest.TestCase):
         self.assertEqual(sub2, decision_events[1])
 
     def test_disable_finished_events(self):
-        eb = EventBuffer(disable_finished_events=True)
+        eb = self.event_buffer_cls(disable_finished_events=True)
         self.assertListEqual([], eb.get_finished_events(), msg="finished pool should be empty")
 
+        processed = []
+
+        eb.register_event_handler(1, lambda evt: processed.append(evt.payload))
+
         eb.insert_event(eb.gen_atom_event(1, 1, (1, 3)))
         eb.insert_event(eb.gen_atom_event(1, 1, (1, 3)))
         eb.insert_event(eb.gen_atom_event(1, 1, (1, 3)))
@@ -291,17 +453,21 @@ class TestEventBuffer(unittest.TestCase):
         # after dispatching, finish pool should still contains no object
         self.assertListEqual([], eb.get_finished_events(), msg="finished pool should be empty")
 
+        # all events should be processed, and recycled for further using
+        self.assertListEqual([(1, 3)] * 4, processed)
+        self.assertEqual(4, eb._event_pool.atom_event_count)
+
     def test_record_events(self):
         timestamp = str(time.time()).replace(".", "_")
         temp_file_path = f"{tempfile.gettempdir()}/{timestamp}.txt"
 
         try:
-            EventBuffer(record_events=True, record_path=None)
+            self.event_buffer_cls(record_events=True, record_path=None)
             self.assertTrue(False)
         except ValueError:
             pass
 
-        eb = EventBuffer(record_events=True, record_path=temp_file_path)
+        eb = self.event_buffer_cls(record_events=True, record_path=temp_file_path)
         eb.insert_event(eb.gen_atom_event(1, 1, (1, 3)))
         eb.insert_event(eb.gen_atom_event(1, 1, (1, 3)))
         eb.insert_event(eb.gen_atom_event(1, 1, (1, 3)))
@@ -332,6 +498,169 @@ class TestEventBuffer(unittest.TestCase):
                 ],
             )
 
+    def test_record_events_binary(self):
+        timestamp = str(time.time()).replace(".", "_")
+        temp_file_path = f"{tempfile.gettempdir()}/{timestamp}.bin"
+        temp_csv_path = f"{tempfile.gettempdir()}/{timestamp}.csv"
+
+        with self.assertRaises(ValueError):
+            self.event_buffer_cls(record_events=True, record_path=temp_file_path, record_format="json")
+
+        eb = self.event_buffer_cls(record_events=True, record_path=temp_file_path, record_format="binary")
+
+        for ep in range(2):
+            eb.insert_event(eb.gen_atom_event(1, 1, (1, 3)))
+            eb.insert_event(eb.gen_atom_event(1, 2, SummaryPayload(ep, 1.5, "a,b", [1, 2])))
+            eb.insert_event(eb.gen_atom_event(2, 2, SummaryPayload(2, 2.0, "c", [])))
+            eb.execute(1)
+            eb.execute(2)
+            eb.reset()
+
+        del eb
+
+        records = list(read_event_records(temp_file_path))
+
+        self.assertEqual(6, len(records))
+        self.assertEqual((0, 1, "1", "(1, 3)"), records[0])
+        self.assertEqual(
+            (1, 1, "2", {"port_idx": 1, "quantity": 1.5, "name": "a,b", "targets": [1, 2]}),
+            records[4],
+        )
+        self.assertEqual(
+            (1, 2, "2", {"port_idx": 2, "quantity": 2.0, "name": "c", "targets": []}),
+            records[5],
+        )
+
+        convert_event_records_to_csv(temp_file_path, temp_csv_path)
+
+        with open(temp_csv_path, "r") as input_stream:
+            texts = input_stream.readlines()
+
+            self.assertEqual(7, len(texts))
+            self.assertEqual("episode,tick,event_type,payload\n", texts[0])
+            self.assertEqual('1,1,1,"(1, 3)"\n', texts[4])
+            self.assertEqual(
+                '1,2,2,"{""port_idx"": 2, ""quantity"": 2.0, ""name"": ""c"", ""targets"": []}"\n',
+                texts[6],
+            )
+
+        # Events are written in several batches, and order between types is kept.
+        recorder = BinaryEventRecorder(temp_file_path, batch_size=2)
+
+        for tick in range(5):
+            recorder.record(0, tick, tick % 2, SummaryPayload(tick, 0.5, "a", None) if tick % 2 else tick)
+
+        recorder.close()
+
+        expected = [
+            (0, tick, "1", {"port_idx": tick, "quantity": 0.5, "name": "a", "targets": "None"})
+            if tick % 2
+            else (0, tick, "0", str(tick))
+            for tick in range(5)
+        ]
+
+        self.assertListEqual(expected, list(read_event_records(temp_file_path)))
+
+        # Error of writer thread is raised by recording and closing.
+        recorder = BinaryEventRecorder(temp_file_path, batch_size=1)
+
+        with patch("maro.event_buffer.event_recorder._encode_batch", side_effect=RuntimeError("encode")):
+            recorder.record(0, 0, 0, 0)
+
+            with self.assertRaises(RuntimeError):
+                for tick in range(1, 100):
+                    recorder.record(0, tick, 0, tick)
+
+        with self.assertRaises(RuntimeError):
+            recorder.close()
+
+    def test_batch_event_handler(self):
+        """Test if consecutive atom events of same type are passed to batch handler together"""
+        for disable_finished_events in [False, True]:
+            eb = self.event_buffer_cls(disable_finished_events=disable_finished_events)
+            processed = []
+
+            def batch_cb(evts):
+                self.assertTrue(all(evt.state == EventState.EXECUTING for evt in evts))
+
+                processed.append([evt.payload for evt in evts])
+
+                # Events inserted by batch handler are processed later, with the following events of same type.
+                if evts[0].payload == 0:
+                    eb.insert_event(eb.gen_atom_event(1, 1, 9))
+
+            eb.register_batch_event_handler(1, batch_cb)
+            eb.register_event_handler(1, lambda evt: processed.append(evt.payload))
+            eb.register_event_handler(2, lambda evt: processed.append(evt.payload))
+
+            for event_type, payload in [(1, 0), (1, 1), (2, 2), (1, 3), (1, 4), (1, 5)]:
+                eb.insert_event(eb.gen_atom_event(1, event_type, payload))
+
+            # Immediate events are extracted after cascade event, they can be a batch too.
+            cascade_evt = eb.gen_cascade_event(1, 2, 6)
+            cascade_evt.add_immediate_event(eb.gen_atom_event(1, 1, 7))
+            cascade_evt.add_immediate_event(eb.gen_atom_event(1, 1, 8))
+            eb.insert_event(cascade_evt)
+
+            self.assertListEqual([], eb.execute(1))
+
+            # Handlers for single event are invoked after batch handler, order of different types is kept.
+            self.assertListEqual([[0, 1], 0, 1, 2, [3, 4, 5], 3, 4, 5, 6, [7, 8, 9], 7, 8, 9], processed)
+            self.assertIsNone(eb.get_next_event_tick(0))
+
+            if disable_finished_events:
+                self.assertListEqual([], eb.get_finished_events())
+                self.assertEqual(9, eb._event_pool.atom_event_count)
+            else:
+                finished_events = eb.get_finished_events()
+
+                self.assertListEqual([0, 1, 2, 3, 4, 5, 6, 7, 8, 9], [evt.payload for evt in finished_events])
+                self.assertTrue(all(evt.state == EventState.FINISHED for evt in finished_events))
+
+
+class TestFastEventBuffer(TestEventBuffer):
+    """Same cases for compiled event buffer and events."""
+
+    event_buffer_cls = fast_event_buffer.EventBuffer
+    actual_event_cls = fast_event_buffer.ActualEvent
+    atom_event_cls = fast_event_buffer.AtomEvent
+    cascade_event_cls = fast_event_buffer.CascadeEvent
+    dummy_event_cls = fast_event_buffer.DummyEvent
+    event_linked_list_cls = fast_event_buffer.EventLinkedList
+    event_pool_cls = fast_event_buffer.EventPool
+
+    def test_same_order_as_python_event_buffer(self):
+        """Test if compiled event buffer processes events in same order as Python one"""
+        results = []
+
+        for event_buffer_cls in (EventBuffer, fast_event_buffer.EventBuffer):
+            random.seed(0)
+
+            eb = event_buffer_cls(disable_finished_events=True)
+            processed = []
+
+            def cb(evt):
+                processed.append((evt.tick, evt.payload))
+
+                if evt.payload % 5 == 0:
+                    cascade_evt = eb.gen_cascade_event(evt.tick, 1, evt.payload + 1)
+                    cascade_evt.add_immediate_event(eb.gen_atom_event(evt.tick, 1, evt.payload + 2), is_head=True)
+
+                    eb.insert_event(cascade_evt)
+                    eb.insert_event(eb.gen_atom_event(evt.tick + random.randint(1, 10), 1, evt.payload + 3))
+
+            eb.register_event_handler(1, cb)
+
+            for i in range(500):
+                eb.insert_event(eb.gen_atom_event(random.randint(0, 100), 1, i * 10))
+
+            for tick in range(120):
+                eb.execute(tick)
+
+            results.append(processed)
+
+        self.assertListEqual(results[0], results[1])
+
 
 if __name__ == "__main__":
     unittest.main()
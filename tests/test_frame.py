@@ -10,8 +10,11 @@ import pandas as pd
 from maro.backends.backend import AttributeType
 from maro.backends.frame import FrameBase, FrameNode, NodeAttribute, NodeBase, node
 from maro.utils.exception.backends_exception import (
+    BackendsAppendToNonListAttributeException,
     BackendsArrayAttributeAccessException,
     BackendsGetItemInvalidException,
+    BackendsInvalidAttributeException,
+    BackendsInvalidNodeException,
     BackendsSetItemInvalidException,
 )
 
@@ -34,7 +37,7 @@ class DynamicNode(NodeBase):
     b2 = NodeAttribute(AttributeType.Double)
 
 
-def build_frame(enable_snapshot: bool = False, total_snapshot: int = 10, backend_name="static"):
+def build_frame(enable_snapshot: bool = False, total_snapshot: int = 10, backend_name="static", options: dict = None):
     class MyFrame(FrameBase):
         static_nodes = FrameNode(StaticNode, STATIC_NODE_NUM)
         dynamic_nodes = FrameNode(DynamicNode, DYNAMIC_NODE_NUM)
@@ -43,6 +46,7 @@ def build_frame(enable_snapshot: bool = False, total_snapshot: int = 10, backend
             super().__init__(
                 enable_snapshot=enable_snapshot,
                 total_snapshot=total_snapshot,
+                options=options if options is not None else {},
                 backend_name=backend_name,
             )
 
@@ -168,6 +172,154 @@ class TestFrame(unittest.TestCase):
             with self.assertRaises(BackendsArrayAttributeAccessException) as ctx:
                 static_node.a1 = 1
 
+    def test_node_columns(self):
+        """Test getting and setting attribute for all nodes in one call"""
+        for backend_name in backends_to_test:
+            frame = build_frame(backend_name=backend_name)
+
+            static_columns = frame.columns("static")
+            dynamic_columns = frame.columns("dynamic")
+
+            static_columns.fill("a2", 3)
+            dynamic_columns.set_column("b2", np.arange(DYNAMIC_NODE_NUM) * 1.5)
+            static_columns.set_column("a1", np.arange(STATIC_NODE_NUM * 2).reshape(STATIC_NODE_NUM, 2))
+
+            for node in frame.static_nodes:
+                self.assertEqual(3, node.a2, backend_name)
+                self.assertListEqual([node.index * 2, node.index * 2 + 1], node.a1[:], backend_name)
+
+            for node in frame.dynamic_nodes:
+                self.assertEqual(node.index * 1.5, node.b2, backend_name)
+
+            frame.static_nodes[1].a3 = 12
+
+            a3 = static_columns.get_column("a3")
+
+            self.assertEqual(np.int64, a3.dtype, backend_name)
+            self.assertListEqual([0, 12, 0, 0, 0], a3.tolist(), backend_name)
+            self.assertTupleEqual((STATIC_NODE_NUM, 2), static_columns.get_column("a1").shape, backend_name)
+
+            # Value will be broadcast to all nodes.
+            static_columns.set_column("a1", [7, 8])
+
+            self.assertListEqual([[7, 8]] * STATIC_NODE_NUM, static_columns.get_column("a1").tolist(), backend_name)
+
+            # Result is a copy, changes will not affect frame.
+            a3[:] = 1
+
+            self.assertEqual(0, frame.static_nodes[0].a3, backend_name)
+
+            with self.assertRaises(BackendsInvalidNodeException):
+                frame.columns("not_exist")
+
+            with self.assertRaises(BackendsInvalidAttributeException):
+                static_columns.fill("b1", 0)
+
+    def test_node_columns_with_deleted_node(self):
+        frame = build_frame(backend_name="dynamic")
+
+        static_columns = frame.columns("static")
+
+        frame.delete_node(frame.static_nodes[1])
+
+        # Deleted node will be skipped, and its value is 0 when getting.
+        static_columns.fill("a3", 5)
+
+        self.assertListEqual([5, 0, 5, 5, 5], static_columns.get_column("a3").tolist())
+
+        frame.append_node("static", 1)
+
+        self.assertTupleEqual((STATIC_NODE_NUM + 1,), static_columns.get_column("a3").shape)
+
+    def test_save_and_restore_state(self):
+        """Test if frame states and snapshots can be restored several times"""
+        for backend_name in backends_to_test:
+            frame = build_frame(True, 10, backend_name)
+
+            for tick in range(3):
+                frame.static_nodes[0].a3 = tick
+                frame.take_snapshot(tick)
+
+            frame.static_nodes[1].a1[:] = (7, 8)
+
+            state = frame.save_state()
+
+            for _ in range(2):
+                for tick in range(3, 15):
+                    frame.static_nodes[0].a3 = tick * 10
+                    frame.static_nodes[1].a1[1] = tick
+                    frame.take_snapshot(tick)
+
+                frame.restore_state(state)
+
+                self.assertEqual(2, frame.static_nodes[0].a3, backend_name)
+                self.assertListEqual([7, 8], list(frame.static_nodes[1].a1[:]), backend_name)
+                self.assertListEqual([0, 1, 2], frame.snapshots.get_frame_index_list(), backend_name)
+                self.assertListEqual(
+                    [0, 1, 2],
+                    frame.snapshots["static"][[0, 1, 2]:0:"a3"].flatten().astype(int).tolist(),
+                    backend_name,
+                )
+
+    def test_restore_state_with_dynamic_nodes(self):
+        @node("list")
+        class ListNode(NodeBase):
+            a1 = NodeAttribute("i", 1, is_list=True)
+
+        class ListFrame(FrameBase):
+            static_nodes = FrameNode(StaticNode, STATIC_NODE_NUM)
+            list_nodes = FrameNode(ListNode, 2)
+
+            def __init__(self):
+                super().__init__(True, 10, backend_name="dynamic")
+
+        frame = ListFrame()
+
+        frame.list_nodes[1].a1.append(3)
+        frame.delete_node(frame.static_nodes[1])
+
+        state = frame.save_state()
+
+        frame.append_node("static", 2)
+        frame.resume_node(frame.static_nodes[1])
+        frame.list_nodes[0].a1.append(1)
+        frame.list_nodes[1].a1.clear()
+
+        frame.restore_state(state)
+
+        # Appended nodes are removed, and deleted flag is restored.
+        self.assertEqual(STATIC_NODE_NUM, len(frame.static_nodes))
+        self.assertTrue(frame.static_nodes[1].is_deleted)
+        self.assertEqual(0, len(frame.list_nodes[0].a1))
+        self.assertListEqual([3], frame.list_nodes[1].a1[:])
+
+    def test_save_and_restore_state_with_empty_node_type(self):
+        """Test if frame with a node type that has no instance can be restored"""
+
+        # NOTE: dynamic backend requires at least 1 instance for each node type.
+        class EmptyNodeFrame(FrameBase):
+            static_nodes = FrameNode(StaticNode, STATIC_NODE_NUM)
+            dynamic_nodes = FrameNode(DynamicNode, 0)
+
+            def __init__(self):
+                super().__init__(True, 10, backend_name="static")
+
+        frame = EmptyNodeFrame()
+
+        frame.static_nodes[0].a3 = 1
+        frame.take_snapshot(0)
+
+        state = frame.save_state()
+
+        frame.static_nodes[0].a3 = 2
+        frame.take_snapshot(1)
+
+        frame.restore_state(state)
+
+        self.assertEqual(1, frame.static_nodes[0].a3)
+        self.assertEqual(0, len(frame.dynamic_nodes))
+        self.assertListEqual([0], frame.snapshots.get_frame_index_list())
+
     def test_get_node_info(self):
         for backend_name in backends_to_test:
             """Test if node information correct"""
@@ -651,6 +803,68 @@ class TestFrame(unittest.TestCase):
         with self.assertRaises(RuntimeError) as ctx:
             n1a1.remove(0)
 
+    def test_list_attribute_bulk_operations(self):
+        @node("test")
+        class TestNode(NodeBase):
+            a1 = NodeAttribute("i", 1, is_list=True)
+            a2 = NodeAttribute("f", 1, is_list=True)
+
+        class TestFrame(FrameBase):
+            test_nodes = FrameNode(TestNode, 2)
+
+            def __init__(self):
+                super().__init__(enable_snapshot=True, total_snapshot=2, backend_name="dynamic")
+
+        frame = TestFrame()
+
+        n1, n2 = frame.test_nodes
+
+        n1.a1.extend([1, 2, 3])
+        n1.a1.append(4)
+        n1.a1.extend(np.arange(5, 9))
+        n1.a1.extend([])
+        n2.a2.extend([0.5, 1.5])
+
+        self.assertEqual(8, len(n1.a1))
+        self.assertListEqual([1, 2, 3, 4, 5, 6, 7, 8], n1.a1[:])
+        self.assertListEqual([0.5, 1.5], n2.a2[:])
+        self.assertEqual(0, len(n2.a1))
+
+        frame.take_snapshot(0)
+
+        # Duplicated and unordered indices, each slot is removed once.
+        n1.a1.remove_many([7, 0, 3, 3])
+        n1.a1.remove_many([])
+
+        self.assertEqual(5, len(n1.a1))
+        self.assertListEqual([2, 3, 5, 6, 7], n1.a1[:])
+
+        with self.assertRaises(RuntimeError):
+            n1.a1.remove_many([1, 5])
+
+        # Nothing removed if any index is invalid.
+        self.assertListEqual([2, 3, 5, 6, 7], n1.a1[:])
+
+        frame.take_snapshot(1)
+
+        # Lists in snapshots are not affected by later changes.
+        n1.a1.clear()
+        n2.a2.append(2.5)
+
+        self.assertListEqual([1, 2, 3, 4, 5, 6, 7, 8], frame.snapshots["test"][0:0:"a1"].flatten().tolist())
+        self.assertListEqual([2, 3, 5, 6, 7], frame.snapshots["test"][1:0:"a1"].flatten().tolist())
+        self.assertListEqual([0.5, 1.5], frame.snapshots["test"][1:1:"a2"].flatten().tolist())
+
+        # Overwrite the oldest snapshot, its list block is reused.
+        n1.a1.extend(range(10))
+        frame.take_snapshot(2)
+
+        self.assertListEqual(list(range(10)), frame.snapshots["test"][2:0:"a1"].flatten().tolist())
+        self.assertListEqual([0.5, 1.5, 2.5], frame.snapshots["test"][2:1:"a2"].flatten().tolist())
+
+        with self.assertRaises(BackendsAppendToNonListAttributeException):
+            build_frame(backend_name="dynamic").static_nodes[0].a1.extend([1])
+
     def test_frame_dump(self):
         frame = build_frame(enable_snapshot=True, total_snapshot=10, backend_name="dynamic")
 
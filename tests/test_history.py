@@ -0,0 +1,89 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import gc
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from maro.backends.history import SnapshotHistoryReader, SnapshotHistoryWriter, footer_struct
+
+from .test_frame import STATIC_NODE_NUM, build_frame
+from tests.utils import backends_to_test
+
+
+class TestSnapshotHistory(unittest.TestCase):
+    def test_frame_history(self):
+        """Test if history of both backends can be read by tick, node and episode"""
+        for backend_name in backends_to_test:
+            with tempfile.TemporaryDirectory() as history_folder:
+                frame = build_frame(True, 10, backend_name)
+
+                frame.enable_history(history_folder)
+
+                # Reset before first episode should not start a new episode.
+                frame.snapshots.reset()
+
+                for episode in range(2):
+                    for tick in range(250):
+                        frame.static_nodes[tick % STATIC_NODE_NUM].a3 = episode * 1000 + tick
+                        frame.static_nodes[0].a1[1] = tick
+
+                        frame.take_snapshot(tick)
+
+                    frame.snapshots.reset()
+                    frame.reset()
+
+                # History file will be closed with the frame.
+                del frame
+
+                gc.collect()
+
+                with SnapshotHistoryReader(os.path.join(history_folder, "static.hist")) as reader:
+                    self.assertEqual("static", reader.node_name, backend_name)
+                    self.assertListEqual([0, 1], reader.episodes, backend_name)
+                    self.assertListEqual(list(range(250)), reader.get_ticks(1), backend_name)
+
+                    states = reader.read([3, 249, 1000], [0, 3, STATIC_NODE_NUM], episode=1)
+
+                    self.assertTupleEqual((3, 3), states.shape, backend_name)
+
+                    # Ticks and nodes not recorded are padding with 0.
+                    self.assertListEqual([[1000, 1003, 0], [1245, 1248, 0], [0, 0, 0]], states["a3"].tolist())
+                    self.assertListEqual([[0, 3], [0, 249], [0, 0]], states["a1"][:, 0].tolist())
+
+                    states = reader.read(4, episode=0)
+
+                    self.assertTupleEqual((1, STATIC_NODE_NUM), states.shape, backend_name)
+                    self.assertEqual(4, states["a3"][0, 4], backend_name)
+
+    def test_read_without_index(self):
+        """Test if history can be read by scanning chunks if the writer was not closed normally"""
+        dtype = np.dtype([("a", "i4"), ("b", "f8", (2,))])
+
+        with tempfile.TemporaryDirectory() as history_folder:
+            path = os.path.join(history_folder, "test.hist")
+
+            writer = SnapshotHistoryWriter(path, "test", dtype, chunk_size=4)
+
+            for tick in range(10):
+                states = np.zeros(3, dtype=dtype)
+                states["a"] = tick
+
+                writer.record(tick, states)
+
+            writer.close()
+
+            # Remove the footer, last 2 records are already flushed when closing.
+            with open(path, "r+b") as fp:
+                fp.truncate(os.path.getsize(path) - footer_struct.size)
+
+            with SnapshotHistoryReader(path) as reader:
+                self.assertListEqual(list(range(10)), reader.get_ticks())
+                self.assertListEqual([[9, 9, 9], [2, 2, 2]], reader.read([9, 2])["a"].tolist())
+
+
+if __name__ == "__main__":
+    unittest.main()
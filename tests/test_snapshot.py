@@ -3,6 +3,11 @@
 
 import unittest
 
+import numpy as np
+
+from maro.backends.shared_memory import SharedSnapshotList
+from maro.utils.exception.backends_exception import BackendsInvalidQueryOutputException
+
 from .test_frame import DYNAMIC_NODE_NUM, STATIC_NODE_NUM, build_frame
 from tests.utils import backends_to_test
 
@@ -327,6 +332,259 @@ class TestFrame(unittest.TestCase):
                     * STATIC_NODE_NUM,
                 )
 
+    def test_overwrite_and_evict_snapshot(self):
+        """Test if same tick over-written in place, and oldest tick evicted when reach max size"""
+        for backend_name in backends_to_test:
+            frame = build_frame(True, total_snapshot=3, backend_name=backend_name)
+
+            for tick in (0, 1, 2, 2, 3, 4, 4):
+                frame.static_nodes[0].a2 = tick * 10 + len(frame.snapshots)
+
+                frame.take_snapshot(tick)
+
+            self.assertListEqual([2, 3, 4], frame.snapshots.get_frame_index_list())
+
+            states = frame.snapshots["static"][(2, 3, 4):0:"a2"]
+
+            self.assertListEqual([23, 33, 43], list(states.flatten().astype("i")))
+
+            # Evicted tick should be padding.
+            states = frame.snapshots["static"][1:0:"a2"]
+
+            self.assertListEqual([0], list(states.flatten().astype("i")))
+
+    def test_retake_snapshot_elision(self):
+        """Test if taking snapshot for same tick again only copies changed nodes"""
+        cases = [(name, {}) for name in backends_to_test] + [("dynamic", {"snapshot_mode": "delta"})]
+
+        for backend_name, options in cases:
+            frame = build_frame(True, total_snapshot=3, backend_name=backend_name, options=options)
+
+            frame.static_nodes[0].a2 = 1
+            frame.dynamic_nodes[0].b1 = 1.5
+            frame.take_snapshot(0)
+
+            self.assertEqual(0, frame.snapshots.elided_copy_number)
+
+            # Only static nodes changed.
+            frame.static_nodes[0].a2 = 2
+            frame.take_snapshot(0)
+
+            self.assertEqual(1, frame.snapshots.elided_copy_number)
+
+            # Nothing changed.
+            frame.take_snapshot(0)
+
+            self.assertEqual(3, frame.snapshots.elided_copy_number)
+
+            # Changed by columnar accessing.
+            frame.columns("dynamic").fill("b1", 2.5)
+            frame.take_snapshot(0)
+
+            self.assertEqual(4, frame.snapshots.elided_copy_number)
+            self.assertListEqual([2], list(frame.snapshots["static"][0:0:"a2"].astype("i")))
+            self.assertListEqual([2.5] * DYNAMIC_NODE_NUM, list(frame.snapshots["dynamic"][0::"b1"].flatten()))
+
+            # Snapshot of new tick copies all the nodes, changes after it are not elided when back to old tick.
+            frame.static_nodes[0].a2 = 3
+            frame.take_snapshot(1)
+            frame.static_nodes[0].a2 = 4
+            frame.take_snapshot(0)
+
+            self.assertEqual(4, frame.snapshots.elided_copy_number)
+            self.assertListEqual([4, 3], list(frame.snapshots["static"][[0, 1]:0:"a2"].astype("i")))
+
+            # Restored snapshots may be different from current frame.
+            state = frame.save_state()
+            frame.static_nodes[0].a2 = 5
+            frame.take_snapshot(0)
+
+            self.assertEqual(5, frame.snapshots.elided_copy_number)
+
+            # Counter is restored too.
+            frame.restore_state(state)
+            frame.take_snapshot(0)
+
+            self.assertEqual(4, frame.snapshots.elided_copy_number)
+            self.assertListEqual([4], list(frame.snapshots["static"][0:0:"a2"].astype("i")))
+
+            frame.reset()
+            frame.snapshots.reset()
+
+            self.assertEqual(0, frame.snapshots.elided_copy_number)
+
+    def test_delta_snapshot_mode(self):
+        """Test if delta snapshot mode of dynamic backend get same result as full mode"""
+        frames = [
+            build_frame(True, total_snapshot=3, backend_name="dynamic"),
+            build_frame(True, total_snapshot=3, backend_name="dynamic", options={"snapshot_mode": "delta"}),
+        ]
+
+        for tick in range(5):
+            for frame in frames:
+                # Only change one node each tick.
+                frame.static_nodes[tick % STATIC_NODE_NUM].a2 = tick + 1
+                frame.static_nodes[tick % STATIC_NODE_NUM].a1[:] = [tick, tick * 2]
+
+                if tick == 2:
+                    frame.delete_node(frame.static_nodes[0])
+
+                frame.take_snapshot(tick)
+
+        full_states, delta_states = [frame.snapshots["static"][::["a1", "a2", "a3"]] for frame in frames]
+
+        self.assertListEqual(list(full_states.flatten()), list(delta_states.flatten()))
+
+        full_states, delta_states = [frame.snapshots["static"][(1, 2, 3):[1, 2]:"a2"] for frame in frames]
+
+        # Over-wrote tick should be padding.
+        self.assertListEqual([0, 0, 2, 3, 2, 3], list(delta_states.flatten().astype("i")))
+        self.assertListEqual(list(full_states.flatten()), list(delta_states.flatten()))
+
+        with self.assertRaises(ValueError):
+            build_frame(True, backend_name="dynamic", options={"snapshot_mode": "bad mode"})
+
+    def test_query_with_output_buffer(self):
+        """Test if querying with output buffer get same result as slice interface"""
+        for backend_name in backends_to_test:
+            frame = build_frame(True, total_snapshot=3, backend_name=backend_name)
+
+            for tick in range(3):
+                for node in frame.static_nodes:
+                    node.a1[:] = [tick, node.index]
+                    node.a2 = tick * 10 + node.index
+
+                frame.take_snapshot(tick)
+
+            # Include a tick not exist for padding.
+            expected = frame.snapshots["static"][(0, 2, 5):(1, 3):["a2", "a1"]]
+
+            buffer = np.full(expected.size, -1, dtype=np.float64)
+            states = frame.snapshots["static"].query((0, 2, 5), (1, 3), ["a2", "a1"], out=buffer)
+
+            self.assertListEqual(list(expected.flatten()), list(states.flatten()))
+            self.assertListEqual(list(expected.flatten()), list(buffer))
+
+            # Reuse the buffer with another tick.
+            frame.snapshots["static"].query((1, 1, 1), (1, 3), ["a2", "a1"], out=buffer)
+
+            self.assertListEqual(list(frame.snapshots["static"][(1, 1, 1):(1, 3):["a2", "a1"]].flatten()), list(buffer))
+
+            with self.assertRaises(BackendsInvalidQueryOutputException):
+                frame.snapshots["static"].query(0, 1, "a2", out=np.zeros(2, dtype=np.float64))
+
+            with self.assertRaises(BackendsInvalidQueryOutputException):
+                frame.snapshots["static"].query(0, 1, "a2", out=np.zeros(1, dtype=np.float32))
+
+    def test_compiled_query_plan(self):
+        """Test if compiled querying plan get same result as slice interface"""
+        for backend_name in backends_to_test:
+            frame = build_frame(True, total_snapshot=5, backend_name=backend_name)
+            static_snapshots = frame.snapshots["static"]
+
+            plan = static_snapshots.compile([0, 2], ["a2", "a1"], window=3)
+
+            self.assertEqual(3, plan.window)
+
+            for tick in range(6):
+                for node in frame.static_nodes:
+                    node.a1[:] = [tick, node.index]
+                    node.a2 = tick * 10 + node.index
+
+                frame.take_snapshot(tick)
+
+                # Window contains negative ticks at beginning, which should be padding.
+                expected = static_snapshots[[tick - 2, tick - 1, tick] : [0, 2] : ["a2", "a1"]]
+
+                self.assertListEqual(list(expected.flatten()), list(plan.execute(tick).flatten()))
+
+            with self.assertRaises(ValueError):
+                static_snapshots.compile(None, "a2", window=0)
+
+    def test_view(self):
+        """Test if view get same states as slice interface in attribute data type"""
+        for backend_name in backends_to_test:
+            frame = build_frame(True, total_snapshot=3, backend_name=backend_name)
+
+            for tick in range(4):
+                for node in frame.static_nodes:
+                    node.a1[:] = [tick, node.index]
+                    node.a2 = tick * 10 + node.index
+
+                frame.take_snapshot(tick)
+
+            static_snapshots = frame.snapshots["static"]
+
+            # Single tick without ticks dimension.
+            a2 = static_snapshots.view(3, "a2")
+
+            self.assertEqual((STATIC_NODE_NUM,), a2.shape)
+            self.assertEqual("int16", a2.dtype.name)
+            self.assertFalse(a2.flags.writeable)
+            self.assertListEqual([30 + i for i in range(STATIC_NODE_NUM)], list(a2))
+
+            # Tick 0 is over-wrote, should be padding.
+            states = static_snapshots.view([0, 2, 3], ["a1", "a2"])
+
+            self.assertEqual((3, STATIC_NODE_NUM, 2), states["a1"].shape)
+            self.assertEqual((3, STATIC_NODE_NUM), states["a2"].shape)
+            self.assertListEqual(
+                list(static_snapshots[(0, 2, 3)::"a1"].flatten().astype("i")),
+                list(states["a1"].flatten()),
+            )
+            self.assertListEqual(
+                list(static_snapshots[(0, 2, 3)::"a2"].flatten().astype("i")),
+                list(states["a2"].flatten()),
+            )
+
+            with self.assertRaises(ValueError):
+                a2[0] = 1
+
+            # Over-write all the snapshots, view should keep the states of its ticks.
+            for tick in range(4, 7):
+                for node in frame.static_nodes:
+                    node.a2 = tick * 10 + node.index
+
+                frame.take_snapshot(tick)
+
+            self.assertListEqual([30 + i for i in range(STATIC_NODE_NUM)], list(a2))
+
+    def test_shared_memory_snapshot_list(self):
+        """Test if snapshot list attached by shared memory descriptor get same result as frame"""
+        frame = build_frame(True, total_snapshot=3, backend_name="static", options={"shared_memory": True})
+
+        for tick in (0, 1, 2, 2, 3):
+            frame.static_nodes[tick % STATIC_NODE_NUM].a2 = tick + 1
+            frame.static_nodes[0].a1[:] = [tick, tick * 2]
+
+            frame.take_snapshot(tick)
+
+        with SharedSnapshotList(frame.shared_memory_descriptor) as snapshots:
+            self.assertEqual(3, len(snapshots))
+            self.assertListEqual([1, 2, 3], snapshots.get_frame_index_list())
+            self.assertEqual(STATIC_NODE_NUM, len(snapshots["static"]))
+
+            for args in (
+                slice(None, None, "a2"),
+                slice((3, 0, 1), (0, 3), ["a1", "a2"]),
+                slice(2, 0, "a1"),
+            ):
+                self.assertListEqual(
+                    list(frame.snapshots["static"][args]),
+                    list(snapshots["static"][args]),
+                )
+
+            # Changes of frame can be read without attaching again.
+            frame.snapshots.reset()
+
+            self.assertEqual(0, len(snapshots))
+
+        # Only static backend supports shared memory.
+        with self.assertRaises(ValueError):
+            build_frame(True, backend_name="dynamic", options={"shared_memory": True})
+
+        self.assertIsNone(build_frame(True, backend_name="static").shared_memory_descriptor)
+
     def test_get_attribute_with_undefined_attribute(self):
         for backend_name in backends_to_test:
             frm = build_frame(True, backend_name=backend_name)
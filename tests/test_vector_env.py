@@ -52,6 +52,34 @@ class TestVectorEnv(unittest.TestCase):
                 ticks = ve.tick
                 self.assertListEqual([99, 99], ticks)
 
+    def test_query_with_shared_memory(self):
+        results = []
+
+        os.environ["DEFAULT_BACKEND_NAME"] = "static"
+
+        for shared_memory in (False, True):
+            with VectorEnv(
+                batch_num=1,
+                scenario="cim",
+                topology="toy.5p_ssddd_l0.0",
+                durations=100,
+                shared_memory=shared_memory,
+            ) as ve:
+                is_done = False
+
+                while not is_done:
+                    metrics, decision_event, is_done = ve.step(None)
+
+                    results.append(ve.snapshot_list["ports"][::["empty", "shortage"]])
+
+        # Result from shared memory should be same as querying by pipe.
+        pipe_results, shared_results = results[: len(results) // 2], results[len(results) // 2 :]
+
+        self.assertEqual(len(pipe_results), len(shared_results))
+
+        for pipe_states, shared_states in zip(pipe_results, shared_results):
+            self.assertListEqual(list(pipe_states[0]), list(shared_states[0]))
+
 
 if __name__ == "__main__":
     unittest.main()